@@ -28,7 +28,7 @@ from flask import (
     session,
     make_response,
 )
-from flask_socketio import SocketIO, emit
+from flask_socketio import SocketIO, emit, join_room
 import threading
 import time
 import pandas as pd
@@ -57,12 +57,22 @@ from datetime import datetime, timedelta
 import requests
 from requests.exceptions import Timeout
 from concurrent.futures import TimeoutError as FutureTimeoutError, ThreadPoolExecutor
-import matplotlib
+from app.runtime.lazy import LazyImport, LazyService, is_resolved, startup_stage
 
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from matplotlib.figure import Figure
+
+def _select_headless_matplotlib_backend():
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+
+# Plotting, scipy and scikit-learn are only needed by training/reporting
+# paths; import them on first use so workers and scripts boot cheaply.
+plt = LazyImport("matplotlib.pyplot", before_import=_select_headless_matplotlib_backend)
+mdates = LazyImport("matplotlib.dates", before_import=_select_headless_matplotlib_backend)
+Figure = LazyImport(
+    "matplotlib.figure", "Figure", before_import=_select_headless_matplotlib_backend
+)
 import base64
 import io
 from io import BytesIO
@@ -94,8 +104,18 @@ from app.services import (
     RealtimeUpdateService,
     TimescaleDBService,
     evaluate_health_payload,
+    get_control_state_bus,
 )
 from app.services.binance import _coerce_bool
+from app.services.bar_store import get_bar_store
+from app.services.correlation import get_correlation_service, nested as nested_correlations
+from app.services.realtime import DASHBOARD_ROOM, user_room
+from app.services.order_tracking import BinanceUserDataStream, OrderStateTracker
+from app.services.price_triggers import get_price_trigger_book, track_positions
+from app.services.signal_context import get_signal_context
+from app.services.user_eligibility import get_eligibility_index
+from app.indicators.crt import IncrementalCRTEngine
+from app.trading.kline_replay import KlineStore, candles_from_frame, interval_ms
 from app.services.pathing import resolve_profile_path, safe_parse_datetime
 from app.tasks import BackgroundTaskManager, ModelTrainingWorker, SelfImprovementWorker
 from app.runtime.indicators import (
@@ -115,27 +135,8 @@ from app.runtime.system import initialize_runtime_from_context
 
 # DB-backed user enumeration for automated multi-user trading.
 def _get_auto_user_ids_from_db() -> list[int]:
-    try:
-        from app.models import User
-        from typing import Any, cast
-
-        # Only include active, subscribed, non-admin users by default.
-        users = (
-            User.query.filter(cast(Any, User.is_active).is_(True))
-            .filter(cast(Any, User.is_admin).is_(False))
-            .all()
-        )
-        eligible: list[int] = []
-        for user in users:
-            try:
-                subscription = getattr(user, "active_subscription", None)
-                if subscription and getattr(subscription, "is_active", False):
-                    eligible.append(int(user.id))
-            except Exception:
-                continue
-        return eligible
-    except Exception:
-        return []
+    """Active, subscribed, non-admin users (cached; see ``user_eligibility``)."""
+    return get_eligibility_index().eligible_user_ids()
 from app.runtime.symbols import (
     DEFAULT_DISABLED_SYMBOLS,
     DEFAULT_FUTURES_SYMBOLS,
@@ -176,19 +177,20 @@ except Exception as _err:  # pragma: no cover - optional C dependency
     talib = SimpleNamespace()
     _TALIB_AVAILABLE = False
     _TALIB_IMPORT_ERROR = str(_err)
-from scipy import stats
-from sklearn.ensemble import (
-    RandomForestClassifier,
-    VotingClassifier,
-    GradientBoostingClassifier,
-)
-from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.metrics import accuracy_score, classification_report
-from sklearn.linear_model import LogisticRegression
-from sklearn.svm import SVC
-from sklearn.preprocessing import StandardScaler
-import joblib
-from joblib import Parallel, delayed
+stats = LazyImport("scipy.stats")
+RandomForestClassifier = LazyImport("sklearn.ensemble", "RandomForestClassifier")
+VotingClassifier = LazyImport("sklearn.ensemble", "VotingClassifier")
+GradientBoostingClassifier = LazyImport("sklearn.ensemble", "GradientBoostingClassifier")
+train_test_split = LazyImport("sklearn.model_selection", "train_test_split")
+cross_val_score = LazyImport("sklearn.model_selection", "cross_val_score")
+accuracy_score = LazyImport("sklearn.metrics", "accuracy_score")
+classification_report = LazyImport("sklearn.metrics", "classification_report")
+LogisticRegression = LazyImport("sklearn.linear_model", "LogisticRegression")
+SVC = LazyImport("sklearn.svm", "SVC")
+StandardScaler = LazyImport("sklearn.preprocessing", "StandardScaler")
+joblib = LazyImport("joblib")
+Parallel = LazyImport("joblib", "Parallel")
+delayed = LazyImport("joblib", "delayed")
 import multiprocessing
 import shutil
 import atexit
@@ -2266,6 +2268,7 @@ TRADING_CONFIG = {
     "auto_take_profit_adjust_interval": 30,
     "auto_take_profit_reprice_threshold": 0.002,
     "auto_take_profit_spread_margin": 0.0005,
+    "auto_take_profit_reconcile_interval": 300,
     # RIBS Quality Diversity Optimization
     "enable_ribs_optimization": True,
     "ribs_optimization_interval_hours": 6,
@@ -2341,6 +2344,7 @@ OPTIMIZED_TRADING_CONFIG = {
     "auto_take_profit_adjust_interval": 30,
     "auto_take_profit_reprice_threshold": 0.002,
     "auto_take_profit_spread_margin": 0.0005,
+    "auto_take_profit_reconcile_interval": 300,
 }
 
 TRADING_CONFIG.update(OPTIMIZED_TRADING_CONFIG)
@@ -2650,48 +2654,34 @@ class CRTSignalGenerator:
             "volume_confirmation": True,
             "pattern_recognition": True,
         }
+        self.crt_engine = IncrementalCRTEngine()
         print("🎯 CRT Signal Generator Initialized")
 
     def generate_crt_signals(self, symbol, market_data, historical_prices):
         """Generate comprehensive CRT signals"""
         try:
-            if len(historical_prices) < 50:
+            # Fold only the bars that arrived since the last call; observed OHLC
+            # comes from the shared bar store when this is the live stream.
+            bars, analyses = self.crt_engine.analyze(
+                symbol, historical_prices, store=get_bar_store()
+            )
+            if bars < 50:
                 self.logger.warning(
-                    f"Insufficient data for {symbol}: {len(historical_prices)} candles < 50 minimum"
+                    f"Insufficient data for {symbol}: {bars} candles < 50 minimum"
                 )
                 return self._get_default_signal(symbol)
 
-            signals = {}
-
-            # 1. Multi-timeframe Analysis
-            signals["multi_timeframe"] = self._multi_timeframe_analysis(
-                historical_prices
-            )
-
-            # 2. Momentum Composite
-            signals["momentum_composite"] = self._momentum_composite_analysis(
-                historical_prices
-            )
-
-            # 3. Trend Analysis
-            signals["trend_analysis"] = self._trend_analysis(historical_prices)
-
-            # 4. Volume Analysis
-            signals["volume_analysis"] = self._volume_analysis(
-                market_data, historical_prices
-            )
-
-            # 5. Pattern Recognition
-            signals["pattern_recognition"] = self._pattern_recognition(
-                historical_prices
-            )
-
-            # 6. Market Structure
-            signals["market_structure"] = self._market_structure_analysis(
-                historical_prices
-            )
+            signals = {
+                "multi_timeframe": analyses["multi_timeframe"],
+                "momentum_composite": analyses["momentum_composite"],
+                "trend_analysis": analyses["trend_analysis"],
+                "volume_analysis": self._volume_analysis(
+                    market_data, historical_prices
+                ),
+                "pattern_recognition": analyses["pattern_recognition"],
+                "market_structure": analyses["market_structure"],
+            }
 
-            # 7. Generate Composite Signal
             composite_signal = self._generate_composite_signal(
                 symbol, signals, market_data
             )
@@ -2721,146 +2711,6 @@ class CRTSignalGenerator:
             )
             return self._get_default_signal(symbol)
 
-    def _multi_timeframe_analysis(self, prices):
-        """Multi-timeframe technical analysis"""
-        try:
-            analysis = {}
-
-            # Analyze different timeframes using different window sizes
-            timeframes = {
-                "short_term": 20,  # ~1 month
-                "medium_term": 50,  # ~2 months
-                "long_term": 100,  # ~4 months
-            }
-
-            for tf_name, window in timeframes.items():
-                if len(prices) >= window:
-                    tf_prices = prices[-window:]
-
-                    # RSI Analysis
-                    rsi = talib.RSI(np.array(tf_prices), timeperiod=14)
-                    rsi_signal = (
-                        "BULLISH"
-                        if rsi[-1] > 50
-                        else "BEARISH"
-                        if rsi[-1] < 50
-                        else "NEUTRAL"
-                    )
-
-                    # MACD Analysis
-                    macd, macd_signal, macd_hist = talib.MACD(np.array(tf_prices))
-                    macd_trend = "BULLISH" if macd_hist[-1] > 0 else "BEARISH"
-
-                    # Moving Average Analysis
-                    sma_20 = talib.SMA(np.array(tf_prices), timeperiod=20)
-                    sma_50 = talib.SMA(np.array(tf_prices), timeperiod=50)
-                    ma_trend = "BULLISH" if sma_20[-1] > sma_50[-1] else "BEARISH"
-
-                    analysis[tf_name] = {
-                        "rsi": float(rsi[-1]) if not np.isnan(rsi[-1]) else 50,
-                        "rsi_signal": rsi_signal,
-                        "macd_trend": macd_trend,
-                        "ma_trend": ma_trend,
-                        "price_trend": "BULLISH"
-                        if tf_prices[-1] > tf_prices[0]
-                        else "BEARISH",
-                    }
-
-            return analysis
-
-        except Exception as e:
-            log_warning_once(
-                "CRT_ANALYSIS",
-                "MULTI_TIMEFRAME",
-                f"Multi-timeframe analysis error: {e}",
-            )
-            return {}
-
-    def _momentum_composite_analysis(self, prices):
-        """Composite momentum analysis using multiple indicators"""
-        try:
-            momentum_score = 0
-            total_indicators = 0
-
-            # RSI Momentum
-            rsi = talib.RSI(np.array(prices), timeperiod=14)
-            if not np.isnan(rsi[-1]):
-                rsi_strength = (rsi[-1] - 50) / 50  # -1 to 1
-                momentum_score += rsi_strength
-                total_indicators += 1
-
-            # MACD Momentum
-            macd, macd_signal, macd_hist = talib.MACD(np.array(prices))
-            if len(macd_hist) > 0 and not np.isnan(macd_hist[-1]):
-                macd_strength = np.tanh(macd_hist[-1] * 10)  # Normalize
-                momentum_score += macd_strength
-                total_indicators += 1
-
-            # Stochastic Momentum
-            slowk, slowd = talib.STOCH(
-                np.array(prices), np.array(prices), np.array(prices)
-            )
-            if not np.isnan(slowk[-1]):
-                stoch_strength = (slowk[-1] - 50) / 50
-                momentum_score += stoch_strength
-                total_indicators += 1
-
-            # Average momentum score
-            avg_momentum = (
-                momentum_score / total_indicators if total_indicators > 0 else 0
-            )
-
-            return {
-                "momentum_score": float(avg_momentum),
-                "strength": "STRONG"
-                if abs(avg_momentum) > 0.3
-                else "MODERATE"
-                if abs(avg_momentum) > 0.1
-                else "WEAK",
-                "direction": "BULLISH" if avg_momentum > 0 else "BEARISH",
-            }
-
-        except Exception as e:
-            print(f"❌ Momentum analysis error: {e}")
-            return {"momentum_score": 0, "strength": "NEUTRAL", "direction": "NEUTRAL"}
-
-    def _trend_analysis(self, prices):
-        """Comprehensive trend analysis"""
-        try:
-            if len(prices) < 20:
-                return {"trend": "SIDEWAYS", "strength": 0, "direction": 0}
-
-            # Linear regression trend
-            x = np.arange(len(prices))
-            linreg_result = stats.linregress(x, prices)
-            slope = linreg_result.slope  # type: ignore
-            r_value = linreg_result.rvalue  # type: ignore
-
-            # ADX for trend strength
-            high = np.array(prices) * 1.01  # Simulated high
-            low = np.array(prices) * 0.99  # Simulated low
-            adx = talib.ADX(high, low, np.array(prices), timeperiod=14)
-            adx_strength = adx[-1] / 100 if not np.isnan(adx[-1]) else 0
-
-            # Moving average alignment
-            sma_20 = talib.SMA(np.array(prices), timeperiod=20)
-            sma_50 = talib.SMA(np.array(prices), timeperiod=50)
-            ma_alignment = 1 if sma_20[-1] > sma_50[-1] else -1
-
-            trend_strength = (abs(slope) * 1000 + adx_strength + abs(ma_alignment)) / 3
-
-            return {
-                "trend": "UPTREND" if slope > 0 else "DOWNTREND",
-                "strength": float(trend_strength),
-                "slope": float(slope),
-                "r_squared": float(r_value**2),
-                "adx_strength": float(adx_strength),
-            }
-
-        except Exception as e:
-            log_warning_once("CRT_ANALYSIS", "TREND", f"Trend analysis error: {e}")
-            return {"trend": "SIDEWAYS", "strength": 0, "direction": 0}
-
     def _volume_analysis(self, market_data, prices):
         """Volume-based analysis"""
         try:
@@ -2885,114 +2735,6 @@ class CRTSignalGenerator:
                 "volume_change_percent": 0,
             }
 
-    def _pattern_recognition(self, prices):
-        """Candlestick pattern recognition"""
-        try:
-            patterns = {}
-
-            # Convert to OHLC format (simplified)
-            opens = np.array([p * 0.998 for p in prices])  # Simulated open
-            highs = np.array([p * 1.005 for p in prices])  # Simulated high
-            lows = np.array([p * 0.995 for p in prices])  # Simulated low
-            closes = np.array(prices)
-
-            # Detect common patterns
-            patterns_found = []
-
-            # Bullish patterns
-            if talib.CDLHAMMER(opens, highs, lows, closes)[-1] > 0:
-                patterns_found.append("HAMMER")
-            if talib.CDLENGULFING(opens, highs, lows, closes)[-1] > 0:
-                patterns_found.append("BULLISH_ENGULFING")
-            if talib.CDLMORNINGSTAR(opens, highs, lows, closes)[-1] > 0:
-                patterns_found.append("MORNING_STAR")
-
-            # Bearish patterns
-            if talib.CDLHANGINGMAN(opens, highs, lows, closes)[-1] > 0:
-                patterns_found.append("HANGING_MAN")
-            if talib.CDLENGULFING(opens, highs, lows, closes)[-1] < 0:
-                patterns_found.append("BEARISH_ENGULFING")
-            if talib.CDLEVENINGSTAR(opens, highs, lows, closes)[-1] > 0:
-                patterns_found.append("EVENING_STAR")
-
-            return {
-                "patterns_detected": patterns_found,
-                "pattern_count": len(patterns_found),
-                "signal": "BULLISH"
-                if len([p for p in patterns_found if "BULL" in p])
-                > len([p for p in patterns_found if "BEAR" in p])
-                else "BEARISH",
-            }
-
-        except Exception as e:
-            log_warning_once(
-                "CRT_ANALYSIS", "PATTERN", f"Pattern recognition error: {e}"
-            )
-            return {"patterns_detected": [], "pattern_count": 0, "signal": "NEUTRAL"}
-
-    def _market_structure_analysis(self, prices):
-        """Market structure and support/resistance analysis"""
-        try:
-            if len(prices) < 20:
-                return {
-                    "support_levels": [],
-                    "resistance_levels": [],
-                    "market_structure": "UNKNOWN",
-                }
-
-            # Simple support/resistance detection
-            recent_prices = prices[-20:]
-            support_levels = []
-            resistance_levels = []
-
-            # Find local minima and maxima
-            for i in range(2, len(recent_prices) - 2):
-                if (
-                    recent_prices[i] < recent_prices[i - 1]
-                    and recent_prices[i] < recent_prices[i - 2]
-                    and recent_prices[i] < recent_prices[i + 1]
-                    and recent_prices[i] < recent_prices[i + 2]
-                ):
-                    support_levels.append(float(recent_prices[i]))
-
-                if (
-                    recent_prices[i] > recent_prices[i - 1]
-                    and recent_prices[i] > recent_prices[i - 2]
-                    and recent_prices[i] > recent_prices[i + 1]
-                    and recent_prices[i] > recent_prices[i + 2]
-                ):
-                    resistance_levels.append(float(recent_prices[i]))
-
-            current_price = prices[-1]
-            nearest_support = (
-                min(support_levels, key=lambda x: abs(x - current_price))
-                if support_levels
-                else 0
-            )
-            nearest_resistance = (
-                min(resistance_levels, key=lambda x: abs(x - current_price))
-                if resistance_levels
-                else 0
-            )
-
-            return {
-                "support_levels": support_levels[:3],  # Top 3
-                "resistance_levels": resistance_levels[:3],  # Top 3
-                "nearest_support": float(nearest_support),
-                "nearest_resistance": float(nearest_resistance),
-                "market_structure": "UPTREND"
-                if current_price > nearest_support
-                else "DOWNTREND",
-            }
-
-        except Exception as e:
-            print(f"❌ Market structure analysis error: {e}")
-            return {
-                "support_levels": [],
-                "resistance_levels": [],
-                "market_structure": "UNKNOWN",
-            }
-
     def _generate_composite_signal(self, symbol, signals, market_data):
         """Generate composite CRT signal from all analyses"""
         try:
@@ -4106,9 +3848,20 @@ class QuantumFusionMomentumEngine:
 
 
 # ==================== PARALLEL PROCESSING SYSTEM ====================
-strategy_manager = (
-    StrategyManager()
-)  # Initialize after QuantumFusionMomentumEngine class definition
+def _fetch_backtest_klines(symbol, interval, bars):
+    """Download ``bars`` candles for a strategy backtest into the KlineStore."""
+    years = bars * interval_ms(interval) / (365 * 86_400_000)
+    ultimate_ml_system.get_real_historical_data(symbol, years=years, interval=interval)
+
+
+def _build_strategy_manager():
+    manager = StrategyManager()
+    manager.kline_fetcher = _fetch_backtest_klines
+    return manager
+
+
+# Built on first access (after QuantumFusionMomentumEngine class definition).
+strategy_manager = LazyService("strategy_manager", _build_strategy_manager)
 
 
 class ParallelPredictionEngine:
@@ -4360,8 +4113,9 @@ class PerformanceOptimizer:
         }
 
 
-# Global performance optimizer instance
-performance_optimizer = PerformanceOptimizer()
+# Global performance optimizer instance. Its thread pools and event-loop
+# thread are only started once something actually uses the optimizer.
+performance_optimizer = LazyService("performance_optimizer", PerformanceOptimizer)
 
 
 # ==================== PERFORMANCE MONITORING SYSTEM ====================
@@ -4415,7 +4169,9 @@ class PerformanceMonitor:
         self.metrics["cpu_usage"] = psutil.cpu_percent(interval=0.1)
         self.metrics["active_threads"] = threading.active_count()
 
-        # Cache metrics
+        # Cache metrics (skip when the optimizer has not been started yet)
+        if not is_resolved(performance_optimizer):
+            return
         cache_stats = performance_optimizer.get_cache_stats()
         total_cache_requests = sum(stats["size"] for stats in cache_stats.values())
         if total_cache_requests > 0:
@@ -4839,7 +4595,13 @@ class UltimateEnsembleSystem:
             return False
 
     def create_correlation_matrix(self, predictions_data):
-        """Enhanced correlation matrix with parallel processing"""
+        """Rolling cross-symbol correlation of ensemble signal strengths.
+
+        Each call appends this cycle's signal strengths to the ensemble's
+        stream in the shared correlation service. Until the stream holds
+        ``min_periods`` cycles the matrix falls back to the product of the
+        current strengths (the historical co-signal score).
+        """
         try:
             prediction_frames = []
             signal_score_map = {
@@ -4884,18 +4646,20 @@ class UltimateEnsembleSystem:
                 )
 
             if len(prediction_frames) > 3:
-                df = pd.DataFrame(prediction_frames)
-                correlation_data = {}
-
-                for _, row1 in df.iterrows():
-                    symbol1 = row1["symbol"]
-                    correlation_data[symbol1] = {}
-                    for _, row2 in df.iterrows():
-                        symbol2 = row2["symbol"]
-                        if symbol1 == symbol2:
-                            continue
-                        corr = row1["signal_strength"] * row2["signal_strength"]
-                        correlation_data[symbol1][symbol2] = corr
+                strengths = {
+                    frame["symbol"]: frame["signal_strength"]
+                    for frame in prediction_frames
+                }
+                stream = get_correlation_service().record_signals(
+                    os.path.basename(os.path.normpath(self.models_dir)), strengths
+                )
+                if stream.ready:
+                    symbols, matrix = stream.matrix()
+                else:
+                    symbols = list(strengths)
+                    values = np.fromiter(strengths.values(), dtype=float)
+                    matrix = np.outer(values, values)
+                correlation_data = nested_correlations(symbols, matrix)
 
                 self.correlation_matrix = correlation_data
                 self.log_ensemble(
@@ -5298,8 +5062,8 @@ class UltimateMLTrainingSystem:
                 "timestamp": datetime.now().isoformat(),
                 "components": {},
             }
-        return self.crt_generator.generate_crt_signals(
-            symbol, market_data, historical_prices
+        return get_signal_context().crt_signals(
+            self.crt_generator, symbol, market_data, historical_prices
         )
 
     def get_crt_dashboard_data(self, symbol=None):
@@ -6290,6 +6054,7 @@ class UltimateMLTrainingSystem:
                             f"📊 Retrieved {len(cached_data)} candles from TimescaleDB cache",
                             80,
                         )
+                        self._record_klines(symbol, interval, cached_data)
                         return cached_data
 
                     # If we have some data but not enough, get the latest timestamp
@@ -6336,6 +6101,7 @@ class UltimateMLTrainingSystem:
                         90,
                     )
 
+            self._record_klines(symbol, interval, df)
             self.log_training(symbol, f"✅ Successfully loaded {len(df)} records", 100)
             return df
 
@@ -6343,6 +6109,21 @@ class UltimateMLTrainingSystem:
             self.log_training(symbol, f"❌ Historical data error: {e}", 0)
             return self.generate_fallback_data(symbol, years)
 
+    def _record_klines(self, symbol, interval, frame):
+        """Upsert real candles into the local KlineStore.
+
+        Paper replay, strategy backtests and the feature store read candles
+        from the store; this is the path that fills it.
+        """
+        try:
+            KlineStore().merge(symbol, interval, candles_from_frame(frame))
+        except Exception as exc:
+            log_component_debug(
+                "KLINE_STORE",
+                "Failed to record candles",
+                {"symbol": symbol, "interval": interval, "error": str(exc)},
+            )
+
     def _estimate_candle_count(self, years, interval):
         """Estimate the number of candles expected for given years and interval."""
         intervals_minutes = {
@@ -8666,6 +8447,24 @@ class FuturesMLTrainingSystem(UltimateMLTrainingSystem):
 
 # ==================== ULTIMATE AI TRADER ====================
 class UltimateAIAutoTrader:
+    @property
+    def positions(self):
+        return self._positions
+
+    @positions.setter
+    def positions(self, value):
+        # Open positions are mirrored into the shared price-trigger book so
+        # stop/take-profit checks only visit positions a tick actually crossed.
+        self._positions = track_positions(self, value)
+
+    def refresh_position_triggers(self, symbol=None):
+        """Re-index trigger levels after editing a position in place."""
+        book = get_price_trigger_book()
+        if symbol is None:
+            book.replace_all(self, self.positions)
+        else:
+            book.update(self, symbol, self.positions.get(symbol))
+
     def _get_trading_config(self) -> dict:
         cfg = getattr(self, "trading_config", None)
         return cfg if isinstance(cfg, dict) else TRADING_CONFIG
@@ -9218,7 +9017,10 @@ class UltimateAIAutoTrader:
 
         return report
 
-    def __init__(self, initial_balance=10000):
+    def __init__(self, initial_balance=10000, shared_engines=None):
+        # Market-level engines (ensemble, CRT, prediction engine, TimescaleDB)
+        # may be shared across user-scoped traders; see app.services.user_accounts.
+        shared = dict(shared_engines or {})
         self.profile_prefix = getattr(self, "profile_prefix", "ULTIMATE")
         self.trade_type_label = getattr(self, "trade_type_label", "ULTIMATE_TRADE")
         self.strategy_label = getattr(self, "strategy_label", "50_INDICATORS_ULTIMATE")
@@ -9232,7 +9034,9 @@ class UltimateAIAutoTrader:
         # NEW: Use ComprehensiveTradeHistory instead of EnhancedTradeHistory
         self.trade_history = ComprehensiveTradeHistory(log_callback=log_component_event)
         # Initialize TimescaleDB service for efficient candle storage
-        self.timescaledb_service = TimescaleDBService(logger=bot_logger)
+        self.timescaledb_service = shared.get(
+            "timescaledb_service"
+        ) or TimescaleDBService(logger=bot_logger)
         self.trading_enabled = TRADING_CONFIG.get("auto_trade_enabled", False)
         self.paper_trading = False
         self.real_trader = RealBinanceTrader(
@@ -9251,19 +9055,27 @@ class UltimateAIAutoTrader:
         self.daily_pnl = 0
         self.max_drawdown = 0
         self.peak_balance = initial_balance
-        self.ensemble_system = UltimateEnsembleSystem()
+        self.ensemble_system = shared.get("ensemble_system") or UltimateEnsembleSystem()
         self.risk_manager = AdaptiveRiskManager()
         self.safety_manager = SafetyManager(initial_balance=initial_balance)
         self.stop_loss_system = AdvancedStopLossSystem()
-        self.parallel_engine = ParallelPredictionEngine()
+        self.parallel_engine = shared.get("parallel_engine") or ParallelPredictionEngine()
         self.qfm_engine = QuantumFusionMomentumEngine()
         # QFM analytics must be per-trader (multi-user safe) and always initialized.
         self.initialize_performance_analytics()
         # NEW: CRT Module
-        self.crt_generator = CRTSignalGenerator()
+        self.crt_generator = shared.get("crt_generator") or CRTSignalGenerator()
         self.symbol_min_notional_cache = {}
         self.real_equity_baseline = None
         self.auto_take_profit_state = {}
+        # Guards auto_take_profit_state against the user-data-stream thread.
+        self._take_profit_lock = threading.RLock()
+        self.order_tracker = OrderStateTracker(
+            on_update=self._on_take_profit_order_update
+        )
+        self.user_data_stream = None
+        self._user_data_stream_attempted_at = 0.0
+        self._take_profit_reconciled_at = 0.0
         self.futures_trader = None
         self.futures_trading_enabled = False
 
@@ -9302,7 +9114,8 @@ class UltimateAIAutoTrader:
         }
 
         self.positions.clear()
-        self.auto_take_profit_state.clear()
+        with self._take_profit_lock:
+            self.auto_take_profit_state.clear()
 
         if hasattr(self.trade_history, "log_journal_event"):
             self.trade_history.log_journal_event("REAL_TRADING_POSITION_RESET", summary)
@@ -10277,8 +10090,7 @@ class UltimateAIAutoTrader:
             return
 
         # Cancel any existing take-profit for this symbol to prevent duplicates
-        if symbol in self.auto_take_profit_state:
-            self._cancel_auto_take_profit(symbol)
+        self._cancel_auto_take_profit(symbol)
 
         adjusted_quantity = quantity
         if (
@@ -10324,7 +10136,7 @@ class UltimateAIAutoTrader:
             )
             return
 
-        self.auto_take_profit_state[symbol] = {
+        state = {
             "order_id": response.get("orderId") if isinstance(response, dict) else None,
             "client_order_id": response.get("clientOrderId")
             if isinstance(response, dict)
@@ -10338,6 +10150,12 @@ class UltimateAIAutoTrader:
             "last_checked": time.time(),
             "percent": percent,
         }
+        with self._take_profit_lock:
+            self.auto_take_profit_state[symbol] = state
+            self.order_tracker.track(
+                symbol, response, side="SELL", price=desired_price, quantity=normalized_qty
+            )
+        self._ensure_user_data_stream()
 
         log_component_event(
             "AUTO_TAKE_PROFIT",
@@ -10346,16 +10164,18 @@ class UltimateAIAutoTrader:
             details={
                 "symbol": symbol,
                 "entry_price": entry_price,
-                "target_price": self.auto_take_profit_state[symbol]["target_price"],
+                "target_price": state["target_price"],
                 "quantity": normalized_qty,
-                "order_id": self.auto_take_profit_state[symbol]["order_id"],
+                "order_id": state["order_id"],
             },
         )
 
     def _cancel_auto_take_profit(self, symbol):
-        state = self.auto_take_profit_state.pop(symbol, None)
-        if not state:
-            return
+        with self._take_profit_lock:
+            state = self.auto_take_profit_state.pop(symbol, None)
+            if not state:
+                return
+            self.order_tracker.forget(state.get("order_id"), state.get("client_order_id"))
         if not (
             self.real_trading_enabled
             and self.real_trader
@@ -10368,6 +10188,80 @@ class UltimateAIAutoTrader:
             client_order_id=state.get("client_order_id"),
         )
 
+    def _ensure_user_data_stream(self):
+        """Start the execution-report stream once; retried at most every 5 minutes."""
+        stream = self.user_data_stream
+        if stream is not None and stream.connected:
+            return stream
+        now = time.time()
+        if now - self._user_data_stream_attempted_at < 300:
+            return stream
+        self._user_data_stream_attempted_at = now
+        trader = self.real_trader
+        if stream is None:
+            if not (trader and getattr(trader, "api_key", None) and getattr(trader, "api_secret", None)):
+                return None
+            stream = BinanceUserDataStream(
+                trader.api_key, trader.api_secret, testnet=getattr(trader, "testnet", True)
+            )
+            self.user_data_stream = stream
+        stream.start(self.order_tracker.apply_event)
+        return stream
+
+    def _on_take_profit_order_update(self, order):
+        """Apply an execution report (or reconciliation) to the take-profit state.
+
+        Runs on the user-data-stream thread. Reports for an order that is
+        being repriced are ignored: its CANCELED report must not drop the
+        state the replacement order is about to be recorded in.
+        """
+        with self._take_profit_lock:
+            state = self.auto_take_profit_state.get(order.symbol)
+            if not state or state.get("repricing") or (
+                state.get("order_id") != order.order_id
+                and state.get("client_order_id") != order.client_order_id
+            ):
+                return
+            if not (order.is_terminal or order.remaining <= 0):
+                state["quantity"] = order.remaining
+                return
+            self.auto_take_profit_state.pop(order.symbol, None)
+            self.order_tracker.forget(order.order_id, order.client_order_id)
+        log_component_event(
+                "AUTO_TAKE_PROFIT",
+            "Take-profit order closed",
+            level=logging.INFO,
+            details={
+                "symbol": order.symbol,
+                "status": order.status,
+                "executed_qty": order.executed_qty,
+                "price": order.price,
+            },
+        )
+
+    def _reconcile_auto_take_profit_orders(self, config):
+        """One batched open-orders snapshot instead of a get_order per symbol.
+
+        Runs every ``auto_take_profit_reconcile_interval`` seconds while the
+        user data stream is up, and every ``auto_take_profit_adjust_interval``
+        seconds when it is not.
+        """
+        stream = self._ensure_user_data_stream()
+        if stream is not None and stream.connected:
+            interval = config.get("auto_take_profit_reconcile_interval", 300)
+        else:
+            interval = config.get("auto_take_profit_adjust_interval", 30)
+        requested_at = time.time()
+        if requested_at - self._take_profit_reconciled_at < interval:
+            return
+        self._take_profit_reconciled_at = requested_at
+        open_orders = self.real_trader.get_open_orders()
+        if open_orders is None:
+            return
+        with self._take_profit_lock:
+            symbols = list(self.auto_take_profit_state)
+        self.order_tracker.reconcile(open_orders, as_of=requested_at, symbols=symbols)
+
     def update_auto_take_profit_orders(self, market_data=None):
         if not self.auto_take_profit_state:
             return
@@ -10383,50 +10277,42 @@ class UltimateAIAutoTrader:
         reprice_threshold = config.get("auto_take_profit_reprice_threshold", 0.003)
         spread_margin = config.get("auto_take_profit_spread_margin", 0.0) or 0.0
 
-        for symbol in list(self.auto_take_profit_state.keys()):
-            state = self.auto_take_profit_state.get(symbol)
-            if not state:
-                continue
+        self._reconcile_auto_take_profit_orders(config)
 
-            last_checked = state.get("last_checked")
-            if last_checked and (time.time() - last_checked) < interval:
+        with self._take_profit_lock:
+            symbols = list(self.auto_take_profit_state.keys())
+        for symbol in symbols:
+            with self._take_profit_lock:
+                state = self.auto_take_profit_state.get(symbol)
+            if not state:
                 continue
 
-            state["last_checked"] = time.time()
-
-            order_info = self.real_trader.get_order(
-                symbol,
-                order_id=state.get("order_id"),
-                client_order_id=state.get("client_order_id"),
+            order = self.order_tracker.get(
+                state.get("order_id"), state.get("client_order_id")
             )
-
-            if not order_info:
-                self.auto_take_profit_state.pop(symbol, None)
-                continue
-
-            status = str(order_info.get("status", "")).upper()
-            if status in {"FILLED", "CANCELED", "REJECTED", "EXPIRED"}:
-                self.auto_take_profit_state.pop(symbol, None)
+            if order is None:
+                order = self.order_tracker.track(
+                    symbol,
+                    {
+                        "orderId": state.get("order_id"),
+                        "clientOrderId": state.get("client_order_id"),
+                    },
+                    price=state.get("target_price"),
+                    quantity=state.get("quantity"),
+                )
+            if order is None or order.is_terminal or order.remaining <= 0:
+                with self._take_profit_lock:
+                    if self.auto_take_profit_state.get(symbol) is state:
+                        self.auto_take_profit_state.pop(symbol, None)
+                if order is not None:
+                    self.order_tracker.forget(order.order_id, order.client_order_id)
                 continue
 
-            try:
-                orig_qty = float(order_info.get("origQty", state.get("quantity", 0)))
-                executed_qty = float(order_info.get("executedQty", 0))
-            except Exception:
-                orig_qty = state.get("quantity", 0)
-                executed_qty = 0
-
-            remaining_qty = max(0.0, orig_qty - executed_qty)
-            if remaining_qty <= 0:
-                self.auto_take_profit_state.pop(symbol, None)
+            # Reprices are rate-limited per symbol; fill tracking is not.
+            last_checked = state.get("last_checked")
+            if last_checked and (time.time() - last_checked) < interval:
                 continue
 
-            current_order_price = None
-            try:
-                current_order_price = float(order_info.get("price"))
-            except Exception:
-                current_order_price = state.get("target_price")
-
             market_price = None
             if (
                 market_data
@@ -10439,9 +10325,24 @@ class UltimateAIAutoTrader:
             if not entry_price:
                 continue
 
-            desired_price = entry_price * (
+            current_order_price = order.price or state.get("target_price")
+            target_price = entry_price * (
                 1 + state.get("percent", config.get("auto_take_profit_percent", 0.05))
             )
+            if not current_order_price:
+                continue
+
+            # Cheap check on the cycle's price first; only a crossing costs REST calls.
+            estimate = target_price
+            try:
+                if market_price:
+                    estimate = max(target_price, float(market_price) * (1 + spread_margin))
+            except (TypeError, ValueError):
+                pass
+            if abs(estimate - current_order_price) / current_order_price < reprice_threshold:
+                continue
+
+            desired_price = target_price
             order_book = self.real_trader.get_order_book(symbol, limit=5)
             if order_book and isinstance(order_book, dict):
                 asks = order_book.get("asks") or []
@@ -10455,8 +10356,7 @@ class UltimateAIAutoTrader:
                         pass
 
             desired_price = self.real_trader.normalize_price(symbol, desired_price)
-            if not current_order_price:
-                current_order_price = desired_price
+            state["last_checked"] = time.time()
 
             price_diff = abs(desired_price - current_order_price)  # type: ignore
             price_diff_pct = (
@@ -10466,53 +10366,83 @@ class UltimateAIAutoTrader:
             if price_diff_pct < reprice_threshold:
                 continue
 
-            cancel_result = self.real_trader.cancel_order(
-                symbol,
-                order_id=state.get("order_id"),
-                client_order_id=state.get("client_order_id"),
-            )
+            with self._take_profit_lock:
+                if self.auto_take_profit_state.get(symbol) is not state:
+                    continue
+                state["repricing"] = True
+            try:
+                self._reprice_auto_take_profit(
+                    symbol, state, order, desired_price, entry_price, current_order_price, config
+                )
+            finally:
+                state.pop("repricing", None)
 
-            if cancel_result is None:
-                continue
+    def _reprice_auto_take_profit(
+        self, symbol, state, order, desired_price, entry_price, current_order_price, config
+    ):
+        """Replace a take-profit order; ``state`` is marked ``repricing`` by the caller."""
+        cancel_result = self.real_trader.cancel_order(
+            symbol,
+            order_id=state.get("order_id"),
+            client_order_id=state.get("client_order_id"),
+        )
+        if cancel_result is None:
+            return
+        self.order_tracker.forget(order.order_id, order.client_order_id)
+        remaining_qty = order.remaining
+
+        new_order = self.real_trader.place_limit_order(
+            symbol,
+            "SELL",
+            remaining_qty,
+            price=desired_price,
+            time_in_force=config.get("auto_take_profit_time_in_force", "GTC"),
+        )
 
-            new_order = self.real_trader.place_limit_order(
+        with self._take_profit_lock:
+            if not new_order:
+                if self.auto_take_profit_state.get(symbol) is state:
+                    self.auto_take_profit_state.pop(symbol, None)
+                return
+            state["order_id"] = (
+                new_order.get("orderId") if isinstance(new_order, dict) else None
+            )
+            state["client_order_id"] = (
+                new_order.get("clientOrderId") if isinstance(new_order, dict) else None
+            )
+            state["target_price"] = (
+                float(new_order.get("price", desired_price))
+                if isinstance(new_order, dict)
+                else desired_price
+            )
+            state["quantity"] = remaining_qty
+            state["entry_price"] = entry_price
+            state["last_checked"] = time.time()
+            # A take-profit placed for a new position while this one was
+            # being replaced wins; the replacement is cancelled below.
+            current = self.auto_take_profit_state.setdefault(symbol, state)
+            if current is state:
+                self.order_tracker.track(
+                    symbol, new_order, price=state["target_price"], quantity=remaining_qty
+                )
+        if current is not state:
+            self.real_trader.cancel_order(
                 symbol,
-                "SELL",
-                remaining_qty,
-                price=desired_price,
-                time_in_force=config.get("auto_take_profit_time_in_force", "GTC"),
+                order_id=state.get("order_id"),
+                client_order_id=state.get("client_order_id"),
             )
-
-            if new_order:
-                state["order_id"] = (
-                    new_order.get("orderId") if isinstance(new_order, dict) else None
-                )
-                state["client_order_id"] = (
-                    new_order.get("clientOrderId")
-                    if isinstance(new_order, dict)
-                    else None
-                )
-                state["target_price"] = (
-                    float(new_order.get("price", desired_price))
-                    if isinstance(new_order, dict)
-                    else desired_price
-                )
-                state["quantity"] = remaining_qty
-                state["entry_price"] = entry_price
-                state["last_checked"] = time.time()
-                log_component_event(
-                    "AUTO_TAKE_PROFIT",
-                    "Take-profit order repriced",
-                    level=logging.INFO,
-                    details={
-                        "symbol": symbol,
-                        "new_price": state["target_price"],
-                        "remaining_qty": remaining_qty,
-                        "previous_price": current_order_price,
-                    },
-                )
-            else:
-                self.auto_take_profit_state.pop(symbol, None)
+            return
+        log_component_event(
+            "AUTO_TAKE_PROFIT",
+            "Take-profit order repriced",
+            level=logging.INFO,
+            details={
+                "symbol": symbol,
+                "new_price": state["target_price"],
+                "remaining_qty": remaining_qty,
+                "previous_price": current_order_price,
+            },
+        )
 
     def calculate_ultimate_position_size(
         self,
@@ -10681,8 +10611,8 @@ class UltimateAIAutoTrader:
         crt_signal = None
         if market_data and historical_prices and hasattr(self, "crt_generator"):
             try:
-                crt_signal = self.crt_generator.generate_crt_signals(
-                    symbol, market_data, historical_prices
+                crt_signal = get_signal_context().crt_signals(
+                    self.crt_generator, symbol, market_data, historical_prices
                 )
                 log_component_debug(
                     "TRADE_DECISION",
@@ -11170,29 +11100,11 @@ class UltimateAIAutoTrader:
         ensemble_signal=None,
     ):
         """Execute ultimate trade with all advanced systems"""
-        # Refresh the in-memory toggle from persisted state so the trade executor
-        # honors the LIVE dashboard switch even if this instance was initialized
-        # with a different env value.
+        # Dashboard toggles reach this trader through the shared control-state
+        # bus (including toggles made in other workers), so the hot path only
+        # reads self.trading_enabled below.
         try:
-            profile = getattr(self, "persistence_profile", None) or "default"
-            candidate_files = [
-                os.path.join("bot_persistence", str(profile), str(profile), "bot_state.json"),
-                os.path.join("bot_persistence", str(profile), "bot_state.json"),
-            ]
-            state_file = next((p for p in candidate_files if os.path.exists(p)), None)
-            if state_file:
-                with open(state_file, "r") as handle:
-                    state = json.load(handle)
-                trader_state = state.get("trader_state") or {}
-                persisted_enabled = trader_state.get("trading_enabled")
-                if isinstance(persisted_enabled, bool):
-                    global_breaker_active = bool(
-                        getattr(getattr(self, "safety_manager", None), "global_breaker_active", False)
-                    )
-                    if persisted_enabled is False:
-                        self.trading_enabled = False
-                    elif not global_breaker_active:
-                        self.trading_enabled = True
+            get_control_state_bus().ensure_bound(self)
         except Exception:
             pass
         log_component_event(
@@ -11257,9 +11169,9 @@ class UltimateAIAutoTrader:
             },
         )
 
-        # NEW: Generate CRT signals
-        crt_signal = self.crt_generator.generate_crt_signals(
-            symbol, market_data, historical_prices
+        # NEW: Generate CRT signals (shared per cycle across all traders)
+        crt_signal = get_signal_context().crt_signals(
+            self.crt_generator, symbol, market_data, historical_prices
         )
 
         # Make ultimate trading decision
@@ -11939,11 +11851,23 @@ class UltimateAIAutoTrader:
 
     def generate_technical_signals(self, symbol, market_data, historical_prices):
         """Enhanced technical signals with multiple timeframes"""
-        signals = []
-
         if len(historical_prices) < 20:
-            return signals
+            return []
+
+        # RSI/MACD only depend on market inputs: compute once per cycle for
+        # all traders, then add this trader's own QFM signal.
+        signals = get_signal_context().technical_signals(
+            symbol,
+            market_data,
+            historical_prices,
+            self._compute_market_technical_signals,
+        )
+        self._append_qfm_signal(signals, symbol, market_data, historical_prices)
+        return signals
 
+    def _compute_market_technical_signals(self, symbol, market_data, historical_prices):
+        """Multi-timeframe RSI and MACD signals (no per-trader state)."""
+        signals = []
         prices = np.array(historical_prices)
         current_price = market_data["price"]
 
@@ -12176,6 +12100,11 @@ class UltimateAIAutoTrader:
             )
             bot_logger.exception("MACD calculation error for %s", symbol)
 
+        return signals
+
+    def _append_qfm_signal(self, signals, symbol, market_data, historical_prices):
+        """Append this trader's QFM signal (per-user engine state)."""
+        current_price = market_data["price"]
         if getattr(self, "qfm_engine", None):
             try:
                 self.qfm_engine.compute_realtime_features(
@@ -12251,11 +12180,19 @@ class UltimateAIAutoTrader:
 
         return signals
 
-    def check_advanced_stop_loss(self, current_prices):
-        """Check and execute advanced stop-loss mechanisms"""
+    def check_advanced_stop_loss(self, current_prices, symbols=None):
+        """Check and execute advanced stop-loss mechanisms
+
+        Only positions whose indexed trigger level was crossed are visited;
+        ``symbols`` lets a caller pass the result of a shared
+        ``PriceTriggerBook.fan_out`` instead of querying the book again.
+        """
         closed_positions = []
-        for symbol, position in list(self.positions.items()):
-            if symbol in current_prices:
+        if symbols is None:
+            symbols = get_price_trigger_book().fan_out(current_prices).get(self, [])
+        for symbol in symbols:
+            position = self.positions.get(symbol)
+            if position is not None and symbol in current_prices:
                 current_price = current_prices[symbol]
 
                 # Check traditional stop-loss first
@@ -12812,12 +12749,12 @@ class UltimateAIAutoTrader:
 
 # ==================== OPTIMIZED AI TRADER ====================
 class OptimizedAIAutoTrader(UltimateAIAutoTrader):
-    def __init__(self, initial_balance=10000):
+    def __init__(self, initial_balance=10000, shared_engines=None):
         self.profile_prefix = "OPTIMIZED"
         self.trade_type_label = "OPTIMIZED_TRADE"
         self.strategy_label = "20_INDICATORS_OPTIMIZED"
         self.indicator_block_key = "optimized_ensemble"
-        super().__init__(initial_balance=initial_balance)
+        super().__init__(initial_balance=initial_balance, shared_engines=shared_engines)
         self.trade_history = ComprehensiveTradeHistory(
             data_dir="optimized_trade_data",
             log_callback=log_component_event,
@@ -13056,22 +12993,24 @@ def _initialize_binance_market_helper() -> None:
 
 
 # ==================== INITIALIZE ULTIMATE COMPONENTS ====================
-ml_services = build_ml_runtime_services(
-    ultimate_factory=UltimateMLTrainingSystem,
-    optimized_factory=OptimizedMLTrainingSystem,
-    futures_factory=FuturesMLTrainingSystem,
-)
+with startup_stage("ml_runtime"):
+    ml_services = build_ml_runtime_services(
+        ultimate_factory=UltimateMLTrainingSystem,
+        optimized_factory=OptimizedMLTrainingSystem,
+        futures_factory=FuturesMLTrainingSystem,
+    )
 
 
-trading_runtime = build_trading_runtime_services(
-    ml_bundle=ml_services,
-    trade_history_factory=lambda: ComprehensiveTradeHistory(
-        log_callback=log_component_event
-    ),
-    ultimate_trader_factory=lambda: UltimateAIAutoTrader(initial_balance=1000),
-    optimized_trader_factory=lambda: OptimizedAIAutoTrader(initial_balance=1000),
-    parallel_engine_factory=ParallelPredictionEngine,
-)
+with startup_stage("trading_runtime"):
+    trading_runtime = build_trading_runtime_services(
+        ml_bundle=ml_services,
+        trade_history_factory=lambda: ComprehensiveTradeHistory(
+            log_callback=log_component_event
+        ),
+        ultimate_trader_factory=lambda: UltimateAIAutoTrader(initial_balance=1000),
+        optimized_trader_factory=lambda: OptimizedAIAutoTrader(initial_balance=1000),
+        parallel_engine_factory=ParallelPredictionEngine,
+    )
 trading_services = trading_runtime.trading_services
 
 trade_history = trading_services.trade_history  # NEW: Use ComprehensiveTradeHistory
@@ -13187,20 +13126,21 @@ def _disable_logger(logger):
         pass
 
 
-persistence_runtime = build_persistence_runtime(
-    market_cap_weights_provider=lambda: MARKET_CAP_WEIGHTS,
-    futures_settings_getter=_get_futures_manual_settings,
-    futures_settings_setter=_set_futures_manual_settings,
-    ultimate_trader=ultimate_trader,
-    optimized_trader=optimized_trader,
-    futures_manual_lock=futures_manual_lock,
-    futures_manual_settings=futures_manual_settings,
-    coerce_bool=_coerce_bool,
-    log_event=log_component_event,
-    log_debug=log_component_debug,
-    logger_factory=setup_application_logging,
-    bot_profile=BOT_PROFILE,
-)
+with startup_stage("persistence_runtime"):
+    persistence_runtime = build_persistence_runtime(
+        market_cap_weights_provider=lambda: MARKET_CAP_WEIGHTS,
+        futures_settings_getter=_get_futures_manual_settings,
+        futures_settings_setter=_set_futures_manual_settings,
+        ultimate_trader=ultimate_trader,
+        optimized_trader=optimized_trader,
+        futures_manual_lock=futures_manual_lock,
+        futures_manual_settings=futures_manual_settings,
+        coerce_bool=_coerce_bool,
+        log_event=log_component_event,
+        log_debug=log_component_debug,
+        logger_factory=setup_application_logging,
+        bot_profile=BOT_PROFILE,
+    )
 persistence_manager = persistence_runtime.persistence_manager
 persistence_scheduler = persistence_runtime.persistence_scheduler
 bot_logger = persistence_runtime.bot_logger
@@ -13220,22 +13160,26 @@ elif MISSING_TALIB_FUNCTIONS:
         "TA-Lib missing functions %s; using fallback implementations",
         ", ".join(sorted(set(MISSING_TALIB_FUNCTIONS))),
     )
-backtest_manager = BacktestManager(
-    symbol_normalizer=_normalize_symbol,
-    active_universe_provider=lambda: get_active_trading_universe(),
-    top_symbols_provider=lambda: list(TOP_SYMBOLS),
-    resolve_profile_path=resolve_profile_path,
-    ultimate_system_factory=UltimateMLTrainingSystem,
-    optimized_system_factory=OptimizedMLTrainingSystem,
-    ultimate_live_system=ultimate_ml_system,
-    optimized_live_system=optimized_ml_system,
+backtest_manager = LazyService(
+    "backtest_manager",
+    lambda: BacktestManager(
+        symbol_normalizer=_normalize_symbol,
+        active_universe_provider=lambda: get_active_trading_universe(),
+        top_symbols_provider=lambda: list(TOP_SYMBOLS),
+        resolve_profile_path=resolve_profile_path,
+        ultimate_system_factory=UltimateMLTrainingSystem,
+        optimized_system_factory=OptimizedMLTrainingSystem,
+        ultimate_live_system=ultimate_ml_system,
+        optimized_live_system=optimized_ml_system,
+    ),
 )
 
-binance_credential_service.initialize_all()
-binance_credential_snapshot = persistence_runtime.snapshot_credentials(
-    include_connection=True,
-    include_logs=True,
-)
+with startup_stage("binance_credentials"):
+    binance_credential_service.initialize_all()
+    binance_credential_snapshot = persistence_runtime.snapshot_credentials(
+        include_connection=True,
+        include_logs=True,
+    )
 
 health_data_lock = threading.Lock()
 health_report_service = None
@@ -13414,38 +13358,36 @@ health_report_service = HealthReportService(
     lock=health_data_lock,
 )
 
-service_runtime = build_service_runtime(
-    dashboard_data=dashboard_data,
-    indicator_selection_manager=indicator_selection_manager,
-    trading_config=TRADING_CONFIG,
-    ultimate_trader=ultimate_trader,
-    optimized_trader=optimized_trader,
-    ultimate_ml_system=ultimate_ml_system,
-    optimized_ml_system=optimized_ml_system,
-    futures_ml_system=futures_ml_system,
-    parallel_engine=parallel_engine,
-    futures_manual_settings=futures_manual_settings,
-    binance_credential_service=binance_credential_service,
-    get_active_trading_universe=get_active_trading_universe,
-    get_real_market_data=get_real_market_data,
-    get_trending_pairs=get_trending_pairs,
-    refresh_symbol_counters=refresh_symbol_counters,
-    handle_manual_futures_trading=_handle_manual_futures_trading,
-    futures_dashboard_state=futures_dashboard_state,
-    futures_symbols=FUTURES_SYMBOLS,
-    futures_data_lock=futures_data_lock,
-    socketio=socketio,
-    safe_float=_safe_float,
-    bot_logger=bot_logger,
-    persistence_manager=persistence_manager,
-    symbols_for_persistence=get_active_trading_universe(),
-    auto_user_id_provider=lambda: sorted(
-        set(_get_auto_user_ids_from_db())
-        & set(getattr(binance_credentials_store, "list_user_ids", lambda: [])() or [])
+with startup_stage("service_runtime"):
+    service_runtime = build_service_runtime(
+        dashboard_data=dashboard_data,
+        indicator_selection_manager=indicator_selection_manager,
+        trading_config=TRADING_CONFIG,
+        ultimate_trader=ultimate_trader,
+        optimized_trader=optimized_trader,
+        ultimate_ml_system=ultimate_ml_system,
+        optimized_ml_system=optimized_ml_system,
+        futures_ml_system=futures_ml_system,
+        parallel_engine=parallel_engine,
+        futures_manual_settings=futures_manual_settings,
+        binance_credential_service=binance_credential_service,
+        get_active_trading_universe=get_active_trading_universe,
+        get_real_market_data=get_real_market_data,
+        get_trending_pairs=get_trending_pairs,
+        refresh_symbol_counters=refresh_symbol_counters,
+        handle_manual_futures_trading=_handle_manual_futures_trading,
+        futures_dashboard_state=futures_dashboard_state,
+        futures_symbols=FUTURES_SYMBOLS,
+        futures_data_lock=futures_data_lock,
+        socketio=socketio,
+        safe_float=_safe_float,
+        bot_logger=bot_logger,
+        persistence_manager=persistence_manager,
+        symbols_for_persistence=get_active_trading_universe(),
+        auto_user_id_provider=lambda: get_eligibility_index().resolve_auto_user_ids(
+            binance_credentials_store
+        ),
     )
-    or sorted(_get_auto_user_ids_from_db())
-    or sorted(getattr(binance_credentials_store, "list_user_ids", lambda: [])() or []),
-)
 
 historical_data = service_runtime.historical_data
 refresh_indicator_dashboard_state = service_runtime.refresh_indicator_dashboard_state
@@ -13495,6 +13437,10 @@ def _persist_multiuser_states_on_shutdown() -> int:
 
 def graceful_shutdown():
     """Save state on application shutdown"""
+    if multiprocessing.parent_process() is not None:
+        # A child that re-imported this module must not overwrite the
+        # parent's state with its own freshly loaded copy.
+        return
     print("\n🛑 Shutdown detected - saving bot state...")
     _ensure_logger_handlers_open(bot_logger)
     _disable_logger(bot_logger)
@@ -13842,21 +13788,22 @@ def update_live_portfolio_pnl(user_id=None):
         }
 
 
-background_runtime = build_background_runtime(
-    update_callback=update_live_portfolio_pnl,
-    bot_logger=bot_logger,
-    market_data_service=market_data_service,
-    futures_market_data_service=futures_market_data_service,
-    futures_safety_service=futures_safety_service,
-    realtime_update_service=realtime_update_service,
-    persistence_scheduler=persistence_scheduler,
-    self_improvement_worker=self_improvement_worker,
-    model_training_worker=model_training_worker,
-    trading_config=TRADING_CONFIG,
-    flask_app=app,
-    update_interval_seconds=30,
-    tick_interval_seconds=10,
-)
+with startup_stage("background_runtime"):
+    background_runtime = build_background_runtime(
+        update_callback=update_live_portfolio_pnl,
+        bot_logger=bot_logger,
+        market_data_service=market_data_service,
+        futures_market_data_service=futures_market_data_service,
+        futures_safety_service=futures_safety_service,
+        realtime_update_service=realtime_update_service,
+        persistence_scheduler=persistence_scheduler,
+        self_improvement_worker=self_improvement_worker,
+        model_training_worker=model_training_worker,
+        trading_config=TRADING_CONFIG,
+        flask_app=app,
+        update_interval_seconds=30,
+        tick_interval_seconds=10,
+    )
 live_portfolio_scheduler = background_runtime.live_portfolio_scheduler
 background_task_manager = background_runtime.background_task_manager
 
@@ -13866,6 +13813,15 @@ background_task_manager = background_runtime.background_task_manager
 def handle_connect():
     """Handle client connection for real-time updates"""
     print(f"Client connected: {request.sid}")  # type: ignore
+    user_id = (
+        getattr(current_user, "id", None)
+        if getattr(current_user, "is_authenticated", False)
+        else None
+    )
+    join_room(DASHBOARD_ROOM)
+    if user_id is not None:
+        join_room(user_room(user_id))
+    realtime_update_service.register_client(request.sid, user_id)  # type: ignore
     emit(
         "connected",
         {"status": "success", "message": "Connected to real-time dashboard"},
@@ -13876,6 +13832,7 @@ def handle_connect():
 def handle_disconnect():
     """Handle client disconnection"""
     print(f"Client disconnected: {request.sid}")  # type: ignore
+    realtime_update_service.unregister_client(request.sid)  # type: ignore
 
 
 @socketio.on("subscribe_portfolio")
@@ -13978,6 +13935,15 @@ def get_user_portfolio_data(user_id):
         return {}
 
 
+def _realtime_user_sections(user_id):
+    """Per-user sections pushed to the user's Socket.IO room."""
+    with app.app_context():
+        return {"user_portfolio": get_user_portfolio_data(user_id)}
+
+
+realtime_update_service.set_user_sections(_realtime_user_sections)
+
+
 # ==================== POLLING FALLBACK ENDPOINTS ====================
 # REST API endpoints for browsers that don't support WebSocket
 
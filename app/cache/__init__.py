@@ -1,5 +1,5 @@
 """Caching layer for trading bot performance optimization."""
 
-from .trading_cache import TradingCache
+from .trading_cache import CacheSerializer, LocalLRUCache, TradingCache
 
-__all__ = ["TradingCache"]
\ No newline at end of file
+__all__ = ["CacheSerializer", "LocalLRUCache", "TradingCache"]
@@ -5,8 +5,11 @@ from __future__ import annotations
 import logging
 import os
 import pickle
+import sys
+import threading
 import time
-from typing import Any, Dict, Optional
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional
 
 try:
     import redis
@@ -15,8 +18,261 @@ except ImportError:
     redis = None
     REDIS_AVAILABLE = False
 
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard as zstd
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstd = None
+    ZSTD_AVAILABLE = False
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy ships with the bot
+    np = None
+
 logger = logging.getLogger(__name__)
 
+# Payload header: magic byte, codec, compression.
+_MAGIC = 0xC7
+_CODEC_PICKLE = ord("P")
+_CODEC_MSGPACK = ord("M")
+_COMPRESS_NONE = ord("N")
+_COMPRESS_ZSTD = ord("Z")
+_MSGPACK_NDARRAY = 1
+
+
+def _estimate_size(value: Any, _depth: int = 0) -> int:
+    """Rough in-memory footprint used for local cache size accounting."""
+    if np is not None and isinstance(value, np.ndarray):
+        return int(value.nbytes) + 112
+    if isinstance(value, (bytes, bytearray, str)):
+        return sys.getsizeof(value)
+    if _depth > 4:
+        return sys.getsizeof(value)
+    if isinstance(value, Mapping):
+        return sys.getsizeof(value) + sum(
+            _estimate_size(k, _depth + 1) + _estimate_size(v, _depth + 1)
+            for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(_estimate_size(v, _depth + 1) for v in value)
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, (int, float)):
+        return int(nbytes)
+    return sys.getsizeof(value)
+
+
+class CacheSerializer:
+    """Encode cache values for Redis.
+
+    ``codec`` is ``"pickle"`` (default, handles any object) or ``"msgpack"``
+    (compact; NumPy arrays are stored as raw buffers). Values msgpack cannot
+    represent fall back to pickle per value. With ``compression="zstd"``
+    payloads of at least ``compress_min_bytes`` are zstd-compressed. Legacy
+    raw pickle payloads written by older versions are still readable.
+    """
+
+    def __init__(
+        self,
+        codec: str = "pickle",
+        compression: Optional[str] = None,
+        *,
+        compress_min_bytes: int = 1024,
+        compression_level: int = 3,
+    ):
+        codec = (codec or "pickle").lower()
+        if codec == "msgpack" and not MSGPACK_AVAILABLE:
+            logger.warning("msgpack not installed; TradingCache falls back to pickle")
+            codec = "pickle"
+        if codec not in {"pickle", "msgpack"}:
+            raise ValueError(f"Unsupported cache codec: {codec}")
+        compression = (compression or "").lower() or None
+        if compression == "zstd" and not ZSTD_AVAILABLE:
+            logger.warning("zstandard not installed; TradingCache compression disabled")
+            compression = None
+        if compression not in {None, "zstd"}:
+            raise ValueError(f"Unsupported cache compression: {compression}")
+
+        self.codec = codec
+        self.compression = compression
+        self.compress_min_bytes = max(0, int(compress_min_bytes))
+        self._level = int(compression_level)
+        self._local = threading.local()
+
+    # zstd contexts are not thread-safe; keep one per thread.
+    def _compressor(self):
+        cctx = getattr(self._local, "cctx", None)
+        if cctx is None:
+            cctx = zstd.ZstdCompressor(level=self._level)
+            self._local.cctx = cctx
+        return cctx
+
+    def _decompressor(self):
+        dctx = getattr(self._local, "dctx", None)
+        if dctx is None:
+            dctx = zstd.ZstdDecompressor()
+            self._local.dctx = dctx
+        return dctx
+
+    def dumps(self, value: Any) -> bytes:
+        codec = _CODEC_PICKLE
+        body: Optional[bytes] = None
+        if self.codec == "msgpack":
+            try:
+                body = msgpack.packb(value, default=self._msgpack_default, use_bin_type=True)
+                codec = _CODEC_MSGPACK
+            except (TypeError, ValueError, OverflowError):
+                body = None
+        if body is None:
+            body = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            codec = _CODEC_PICKLE
+
+        compression = _COMPRESS_NONE
+        if self.compression == "zstd" and len(body) >= self.compress_min_bytes:
+            body = self._compressor().compress(body)
+            compression = _COMPRESS_ZSTD
+        return bytes((_MAGIC, codec, compression)) + body
+
+    def loads(self, payload: bytes) -> Any:
+        if not payload or len(payload) < 3 or payload[0] != _MAGIC:
+            # Written before the header existed.
+            return pickle.loads(payload)
+        codec, compression = payload[1], payload[2]
+        body = payload[3:]
+        if compression == _COMPRESS_ZSTD:
+            body = self._decompressor().decompress(body)
+        if codec == _CODEC_MSGPACK:
+            return msgpack.unpackb(body, ext_hook=self._msgpack_ext, raw=False, strict_map_key=False)
+        return pickle.loads(body)
+
+    @staticmethod
+    def _msgpack_default(value: Any) -> Any:
+        if np is not None:
+            if isinstance(value, np.ndarray) and value.dtype.kind in "biufc":
+                array = np.ascontiguousarray(value)
+                header = msgpack.packb([array.dtype.str, list(array.shape)], use_bin_type=True)
+                return msgpack.ExtType(
+                    _MSGPACK_NDARRAY, len(header).to_bytes(4, "little") + header + array.tobytes()
+                )
+            if isinstance(value, np.generic):
+                return value.item()
+        raise TypeError(f"Cannot msgpack {type(value).__name__}")
+
+    @staticmethod
+    def _msgpack_ext(code: int, data: bytes) -> Any:
+        if code == _MSGPACK_NDARRAY and np is not None:
+            header_len = int.from_bytes(data[:4], "little")
+            dtype, shape = msgpack.unpackb(data[4 : 4 + header_len], raw=False)
+            return np.frombuffer(data[4 + header_len :], dtype=np.dtype(dtype)).reshape(shape)
+        return msgpack.ExtType(code, data)
+
+
+class LocalLRUCache:
+    """Thread-safe LRU with per-entry TTL and entry/byte bounds."""
+
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        max_bytes: Optional[int] = 64 * 1024 * 1024,
+        default_ttl: float = 300.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = int(max_bytes) if max_bytes else None
+        self.default_ttl = float(default_ttl)
+        self._clock = clock
+        self._lock = threading.RLock()
+        # key -> (value, stored_at, expires_at, size)
+        self._entries: "OrderedDict[str, tuple[Any, float, float, int]]" = OrderedDict()
+        self.current_bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            return self._live_entry(key) is not None  # type: ignore[arg-type]
+
+    def keys(self) -> list[str]:
+        with self._lock:
+            return list(self._entries.keys())
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._live_entry(key)
+            if entry is None:
+                return default
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def stored_at(self, key: str) -> Optional[float]:
+        with self._lock:
+            entry = self._live_entry(key)
+            return entry[1] if entry is not None else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, size: Optional[int] = None) -> None:
+        now = self._clock()
+        ttl = self.default_ttl if ttl is None else float(ttl)
+        size = int(size) if size is not None else _estimate_size(value)
+        with self._lock:
+            self._pop(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                # Never let one oversized value flush the whole tier.
+                self.evictions += 1
+                return
+            self._entries[key] = (value, now, now + ttl if ttl > 0 else float("inf"), size)
+            self.current_bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self.current_bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._pop(oldest)
+                self.evictions += 1
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._pop(key)
+
+    def delete_prefix(self, prefix: str) -> int:
+        with self._lock:
+            keys = [k for k in self._entries if k.startswith(prefix)]
+            for key in keys:
+                self._pop(key)
+            return len(keys)
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self.current_bytes = 0
+            return count
+
+    def _live_entry(self, key: str) -> Optional[tuple[Any, float, float, int]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[2] <= self._clock():
+            self._pop(key)
+            self.expirations += 1
+            return None
+        return entry
+
+    def _pop(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self.current_bytes -= entry[3]
+        return True
+
 
 class TradingCache:
     """
@@ -24,9 +280,11 @@ class TradingCache:
 
     Features:
     - Redis backend for cross-process persistence
-    - Local LRU cache for ultra-fast access
+    - Bounded local LRU/TTL tier (entry and byte limits) for ultra-fast access
+    - Batched ``get_many``/``set_many`` via MGET and pipelines
+    - Compact serialization (pickle or msgpack with NumPy buffers, optional zstd)
+    - Hit/miss/eviction/latency statistics
     - Automatic cache invalidation on new data
-    - TTL-based expiration
     - Graceful fallback when Redis unavailable
     """
 
@@ -36,19 +294,60 @@ class TradingCache:
         redis_port: Optional[int] = None,
         redis_db: int = 0,
         redis_password: Optional[str] = None,
-        enable_redis: bool = True
+        enable_redis: bool = True,
+        *,
+        redis_client: Any = None,
+        local_max_entries: Optional[int] = None,
+        local_max_bytes: Optional[int] = None,
+        local_ttl_seconds: float = 300.0,
+        serializer: Optional[str] = None,
+        compression: Optional[str] = None,
+        compress_min_bytes: int = 1024,
+        latency_window: int = 1024,
     ):
         # Use environment variables if not provided
         if redis_host is None:
             redis_host = os.getenv("REDIS_HOST", "localhost")
         if redis_port is None:
             redis_port = int(os.getenv("REDIS_PORT", "6379"))
-        self.enable_redis = enable_redis and REDIS_AVAILABLE
+        if local_max_entries is None:
+            local_max_entries = int(os.getenv("TRADING_CACHE_LOCAL_MAX_ENTRIES", "4096"))
+        if local_max_bytes is None:
+            local_max_bytes = int(os.getenv("TRADING_CACHE_LOCAL_MAX_BYTES", str(64 * 1024 * 1024)))
+
+        self.local_cache = LocalLRUCache(
+            max_entries=local_max_entries,
+            max_bytes=local_max_bytes,
+            default_ttl=local_ttl_seconds,
+        )
+        self.serializer = CacheSerializer(
+            serializer or os.getenv("TRADING_CACHE_SERIALIZER", "pickle"),
+            compression if compression is not None else os.getenv("TRADING_CACHE_COMPRESSION"),
+            compress_min_bytes=compress_min_bytes,
+        )
+
+        self._stats_lock = threading.Lock()
+        self._counters: Dict[str, int] = {
+            "local_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "redis_round_trips": 0,
+            "redis_errors": 0,
+            "bytes_written": 0,
+            "bytes_read": 0,
+        }
+        self._latencies: Dict[str, deque] = {
+            "get": deque(maxlen=max(16, int(latency_window))),
+            "set": deque(maxlen=max(16, int(latency_window))),
+        }
+
+        self.enable_redis = enable_redis and (REDIS_AVAILABLE or redis_client is not None)
         self.redis_client = None
-        self.local_cache: Dict[str, Dict[str, Any]] = {}
-        self.cache_timestamps: Dict[str, float] = {}
 
-        if self.enable_redis:
+        if redis_client is not None and enable_redis:
+            self.redis_client = redis_client
+        elif self.enable_redis:
             try:
                 if redis is None:
                     raise ImportError("Redis module not available")
@@ -72,6 +371,163 @@ class TradingCache:
         else:
             logger.info("ℹ️ Redis disabled. Using local cache only.")
 
+    @property
+    def cache_timestamps(self) -> Dict[str, float]:
+        """Store time of every live local entry (kept for older callers)."""
+        stamps: Dict[str, float] = {}
+        for key in self.local_cache.keys():
+            stored = self.local_cache.stored_at(key)
+            if stored is not None:
+                stamps[key] = stored
+        return stamps
+
+    # ------------------------------------------------------------------
+    # Generic key/value API
+    # ------------------------------------------------------------------
+    def get(self, key: str) -> Any:
+        """
+        Get a cached value, checking the local tier before Redis.
+
+        Returns:
+            The cached value or None on a miss
+        """
+        started = time.perf_counter()
+        try:
+            value = self.local_cache.get(key)
+            if value is not None:
+                self._count("local_hits")
+                return value
+
+            if self._redis_ready():
+                try:
+                    self._count("redis_round_trips")
+                    payload = self.redis_client.get(key)
+                except Exception as e:
+                    self._count("redis_errors")
+                    logger.warning(f"Redis cache read error for {key}: {e}")
+                    payload = None
+                value = self._decode_and_fill(key, payload)
+                if value is not None:
+                    self._count("redis_hits")
+                    return value
+
+            self._count("misses")
+            return None
+        finally:
+            self._observe("get", started)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Get several keys with at most one Redis round trip (MGET).
+
+        Returns:
+            Mapping of found keys to values; missing keys are omitted
+        """
+        started = time.perf_counter()
+        found: Dict[str, Any] = {}
+        missing: list[str] = []
+        try:
+            for key in dict.fromkeys(keys):
+                value = self.local_cache.get(key)
+                if value is not None:
+                    found[key] = value
+                    self._count("local_hits")
+                else:
+                    missing.append(key)
+
+            if missing and self._redis_ready():
+                try:
+                    self._count("redis_round_trips")
+                    payloads = self.redis_client.mget(missing)
+                except Exception as e:
+                    self._count("redis_errors")
+                    logger.warning(f"Redis cache MGET error: {e}")
+                    payloads = [None] * len(missing)
+                still_missing = []
+                for key, payload in zip(missing, payloads):
+                    value = self._decode_and_fill(key, payload)
+                    if value is not None:
+                        found[key] = value
+                        self._count("redis_hits")
+                    else:
+                        still_missing.append(key)
+                missing = still_missing
+
+            if missing:
+                self._count("misses", len(missing))
+            return found
+        finally:
+            self._observe("get", started)
+
+    def set(self, key: str, value: Any, ttl_seconds: int = 300) -> bool:
+        """
+        Cache a value locally and in Redis with TTL.
+
+        Returns:
+            True if successfully cached, False otherwise
+        """
+        return self.set_many({key: value}, ttl_seconds=ttl_seconds)
+
+    def set_many(self, items: Mapping[str, Any], ttl_seconds: int = 300) -> bool:
+        """
+        Cache several values; Redis writes go through one pipeline.
+
+        The batch is all-or-nothing: every value is serialized and written to
+        Redis before any of them enters the local tier, so a failure leaves
+        neither tier holding part of the batch.
+
+        Returns:
+            True if every value was cached, False otherwise (nothing cached)
+        """
+        if not items:
+            return True
+        started = time.perf_counter()
+        try:
+            encoded: Dict[str, bytes] = {}
+            if self._redis_ready():
+                for key, value in items.items():
+                    try:
+                        encoded[key] = self.serializer.dumps(value)
+                    except Exception as e:
+                        logger.error(f"Error serializing cache value for {key}: {e}")
+                        return False
+
+            if encoded:
+                try:
+                    pipe = self.redis_client.pipeline(transaction=False)
+                    for key, payload in encoded.items():
+                        pipe.setex(key, int(ttl_seconds), payload)
+                    self._count("redis_round_trips")
+                    pipe.execute()
+                    self._count("bytes_written", sum(len(p) for p in encoded.values()))
+                    logger.debug(f"💾 Cached {len(encoded)} keys (TTL: {ttl_seconds}s)")
+                except Exception as e:
+                    self._count("redis_errors")
+                    logger.warning(f"Redis cache write error: {e}")
+                    return False
+
+            ttl = min(float(ttl_seconds), self.local_cache.default_ttl)
+            for key, value in items.items():
+                stored = value.copy() if isinstance(value, dict) else value
+                self.local_cache.set(key, stored, ttl=ttl)
+            self._count("sets", len(items))
+            return True
+        finally:
+            self._observe("set", started)
+
+    def delete(self, *keys: str) -> int:
+        """Delete keys from both tiers; returns how many keys existed in either."""
+        keys = tuple(dict.fromkeys(keys))
+        removed = {key for key in keys if self.local_cache.delete(key)}
+        return len(removed | self._delete_redis_keys(keys))
+
+    # ------------------------------------------------------------------
+    # Technical indicators
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _indicator_key(symbol: str, timeframe: str) -> str:
+        return f"indicators:{symbol}:{timeframe}"
+
     def get_technical_indicators(
         self,
         symbol: str,
@@ -89,40 +545,27 @@ class TradingCache:
         Returns:
             Dictionary of technical indicators or None if not available
         """
-        cache_key = f"indicators:{symbol}:{timeframe}"
+        cache_key = self._indicator_key(symbol, timeframe)
 
         # Check if we need to force refresh
         if force_refresh:
             self._invalidate_cache_key(cache_key)
             return None
 
-        # Try local cache first (fastest)
-        if cache_key in self.local_cache:
-            cached_data = self.local_cache[cache_key]
-            if self._is_cache_valid(cache_key):
-                logger.debug(f"📋 Local cache hit for {cache_key}")
-                return cached_data
-            else:
-                # Cache expired, remove it
-                del self.local_cache[cache_key]
-                del self.cache_timestamps[cache_key]
-
-        # Try Redis cache
-        if self.enable_redis and self.redis_client:
-            try:
-                cached_data = self.redis_client.get(cache_key)
-                if cached_data and isinstance(cached_data, bytes):
-                    indicators = pickle.loads(cached_data)
-                    # Store in local cache for faster future access
-                    self.local_cache[cache_key] = indicators
-                    self.cache_timestamps[cache_key] = time.time()
-                    logger.debug(f"🔴 Redis cache hit for {cache_key}")
-                    return indicators
-            except Exception as e:
-                logger.warning(f"Redis cache read error for {cache_key}: {e}")
+        return self.get(cache_key)
 
-        logger.debug(f"❌ Cache miss for {cache_key}")
-        return None
+    def get_many_technical_indicators(
+        self, symbols: Iterable[str], timeframe: str
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get cached indicators for many symbols in one batch.
+
+        Returns:
+            Mapping of symbol to indicators for every cached symbol
+        """
+        keys = {self._indicator_key(symbol, timeframe): symbol for symbol in symbols}
+        found = self.get_many(keys)
+        return {keys[key]: value for key, value in found.items()}
 
     def set_technical_indicators(
         self,
@@ -143,29 +586,32 @@ class TradingCache:
         Returns:
             True if successfully cached, False otherwise
         """
-        cache_key = f"indicators:{symbol}:{timeframe}"
-
         try:
-            # Store in local cache
-            self.local_cache[cache_key] = indicators.copy()
-            self.cache_timestamps[cache_key] = time.time()
-
-            # Store in Redis with TTL
-            if self.enable_redis and self.redis_client:
-                try:
-                    serialized_data = pickle.dumps(indicators)
-                    self.redis_client.setex(cache_key, ttl_seconds, serialized_data)
-                    logger.debug(f"💾 Cached indicators for {cache_key} (TTL: {ttl_seconds}s)")
-                except Exception as e:
-                    logger.warning(f"Redis cache write error for {cache_key}: {e}")
-                    return False
-
-            return True
-
+            return self.set(self._indicator_key(symbol, timeframe), indicators, ttl_seconds)
         except Exception as e:
-            logger.error(f"Error caching indicators for {cache_key}: {e}")
+            logger.error(f"Error caching indicators for {symbol}:{timeframe}: {e}")
             return False
 
+    def set_many_technical_indicators(
+        self,
+        indicators_by_symbol: Mapping[str, Dict[str, Any]],
+        timeframe: str,
+        ttl_seconds: int = 300,
+    ) -> bool:
+        """
+        Cache indicators for many symbols with a single Redis pipeline.
+
+        Returns:
+            True if every entry was cached, False otherwise
+        """
+        return self.set_many(
+            {
+                self._indicator_key(symbol, timeframe): indicators
+                for symbol, indicators in indicators_by_symbol.items()
+            },
+            ttl_seconds=ttl_seconds,
+        )
+
     def invalidate_on_new_data(self, symbol: str, timeframe: Optional[str] = None) -> int:
         """
         Invalidate cache when new market data arrives.
@@ -181,28 +627,18 @@ class TradingCache:
 
         if timeframe:
             # Invalidate specific symbol/timeframe
-            cache_key = f"indicators:{symbol}:{timeframe}"
+            cache_key = self._indicator_key(symbol, timeframe)
             invalidated_count += self._invalidate_cache_key(cache_key)
         else:
-            # Invalidate all timeframes for this symbol
-            pattern = f"indicators:{symbol}:*"
-
-            # Clear local cache
-            keys_to_remove = [k for k in self.local_cache.keys() if k.startswith(f"indicators:{symbol}:")]
-            for key in keys_to_remove:
-                del self.local_cache[key]
-                if key in self.cache_timestamps:
-                    del self.cache_timestamps[key]
-                invalidated_count += 1
-
-            # Clear Redis cache
-            if self.enable_redis and self.redis_client:
-                try:
-                    for key in self.redis_client.scan_iter(match=pattern):
-                        self.redis_client.delete(key)
-                        invalidated_count += 1
-                except Exception as e:
-                    logger.warning(f"Redis cache invalidation error: {e}")
+            # Invalidate all timeframes for this symbol; a key held by both
+            # tiers counts once.
+            prefix = f"indicators:{symbol}:"
+            local = {
+                key
+                for key in self.local_cache.keys()
+                if key.startswith(prefix) and self.local_cache.delete(key)
+            }
+            invalidated_count += len(local | self._delete_redis_pattern(f"{prefix}*"))
 
         if invalidated_count > 0:
             logger.info(f"🗑️ Invalidated {invalidated_count} cache entries for {symbol}")
@@ -218,23 +654,9 @@ class TradingCache:
         Returns:
             Number of entries cleared
         """
-        total_cleared = 0
-
-        # Clear local cache
-        local_count = len(self.local_cache)
+        local = set(self.local_cache.keys())
         self.local_cache.clear()
-        self.cache_timestamps.clear()
-        total_cleared += local_count
-
-        # Clear Redis cache
-        if self.enable_redis and self.redis_client:
-            try:
-                redis_keys = list(self.redis_client.scan_iter(match="indicators:*"))
-                if redis_keys:
-                    self.redis_client.delete(*redis_keys)
-                    total_cleared += len(redis_keys)
-            except Exception as e:
-                logger.warning(f"Redis cache clear error: {e}")
+        total_cleared = len(local | self._delete_redis_pattern("indicators:*"))
 
         logger.info(f"🧹 Cleared {total_cleared} total cache entries")
         return total_cleared
@@ -246,13 +668,38 @@ class TradingCache:
         Returns:
             Dictionary with cache statistics
         """
-        stats = {
+        with self._stats_lock:
+            counters = dict(self._counters)
+            latencies = {name: sorted(values) for name, values in self._latencies.items()}
+
+        lookups = counters["local_hits"] + counters["redis_hits"] + counters["misses"]
+        stats: Dict[str, Any] = {
             "local_cache_entries": len(self.local_cache),
+            "local_cache_bytes": self.local_cache.current_bytes,
+            "local_cache_max_entries": self.local_cache.max_entries,
+            "local_cache_max_bytes": self.local_cache.max_bytes,
+            "evictions": self.local_cache.evictions,
+            "expirations": self.local_cache.expirations,
+            "hit_rate": (
+                (counters["local_hits"] + counters["redis_hits"]) / lookups if lookups else 0.0
+            ),
+            "serializer": self.serializer.codec,
+            "compression": self.serializer.compression,
             "redis_enabled": self.enable_redis,
-            "redis_available": self.redis_client is not None if REDIS_AVAILABLE else False,
+            "redis_available": self.redis_client is not None,
+            **counters,
         }
-
-        if self.enable_redis and self.redis_client:
+        for name, values in latencies.items():
+            stats[f"{name}_latency_ms"] = {
+                "samples": len(values),
+                "p50": round(values[len(values) // 2] * 1000.0, 4) if values else 0.0,
+                "p95": round(values[min(len(values) - 1, int(len(values) * 0.95))] * 1000.0, 4)
+                if values
+                else 0.0,
+                "max": round(values[-1] * 1000.0, 4) if values else 0.0,
+            }
+
+        if self._redis_ready():
             try:
                 # Get Redis memory info
                 info = self.redis_client.info("memory")
@@ -260,7 +707,6 @@ class TradingCache:
                     stats.update({
                         "redis_used_memory": info.get("used_memory_human", "unknown"),
                         "redis_total_keys": self.redis_client.dbsize(),
-                        "indicators_keys": len(list(self.redis_client.scan_iter(match="indicators:*"))),
                     })
             except Exception as e:
                 logger.warning(f"Error getting Redis stats: {e}")
@@ -270,32 +716,77 @@ class TradingCache:
 
     def _invalidate_cache_key(self, cache_key: str) -> int:
         """Invalidate a specific cache key from both local and Redis cache."""
-        invalidated = 0
-
-        # Remove from local cache
-        if cache_key in self.local_cache:
-            del self.local_cache[cache_key]
-            invalidated += 1
-        if cache_key in self.cache_timestamps:
-            del self.cache_timestamps[cache_key]
-
-        # Remove from Redis
-        if self.enable_redis and self.redis_client:
-            try:
-                if self.redis_client.delete(cache_key):
-                    invalidated += 1
-            except Exception as e:
-                logger.warning(f"Redis delete error for {cache_key}: {e}")
-
-        return invalidated
+        return self.delete(cache_key)
 
     def _is_cache_valid(self, cache_key: str, max_age_seconds: int = 300) -> bool:
         """Check if a cache entry is still valid."""
-        if cache_key not in self.cache_timestamps:
+        stored = self.local_cache.stored_at(cache_key)
+        if stored is None:
             return False
+        return time.time() - stored < max_age_seconds
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _redis_ready(self) -> bool:
+        return bool(self.enable_redis and self.redis_client is not None)
+
+    def _decode_and_fill(self, key: str, payload: Any) -> Any:
+        if not payload or not isinstance(payload, (bytes, bytearray)):
+            return None
+        try:
+            value = self.serializer.loads(bytes(payload))
+        except Exception as e:
+            logger.warning(f"Cache decode error for {key}: {e}")
+            return None
+        self._count("bytes_read", len(payload))
+        # Store in local cache for faster future access
+        self.local_cache.set(key, value, size=len(payload))
+        return value
+
+    def _delete_redis_keys(self, keys: Iterable[str]) -> set[str]:
+        """Delete ``keys`` from Redis in one pipeline; returns those that existed."""
+        keys = list(keys)
+        if not keys or not self._redis_ready():
+            return set()
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key in keys:
+                pipe.delete(key)
+            self._count("redis_round_trips")
+            results = pipe.execute()
+        except Exception as e:
+            self._count("redis_errors")
+            logger.warning(f"Redis delete error for {len(keys)} keys: {e}")
+            return set()
+        return {key for key, result in zip(keys, results) if result}
+
+    def _delete_redis_pattern(self, pattern: str) -> set[str]:
+        """Delete every Redis key matching ``pattern``; returns the deleted keys."""
+        if not self._redis_ready():
+            return set()
+        deleted: set[str] = set()
+        try:
+            batch: list[str] = []
+            for key in self.redis_client.scan_iter(match=pattern, count=500):
+                batch.append(key.decode() if isinstance(key, bytes) else str(key))
+                if len(batch) >= 500:
+                    deleted |= self._delete_redis_keys(batch)
+                    batch = []
+            if batch:
+                deleted |= self._delete_redis_keys(batch)
+        except Exception as e:
+            self._count("redis_errors")
+            logger.warning(f"Redis cache invalidation error: {e}")
+        return deleted
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
 
-        age = time.time() - self.cache_timestamps[cache_key]
-        return age < max_age_seconds
+    def _observe(self, op: str, started: float) -> None:
+        with self._stats_lock:
+            self._latencies[op].append(time.perf_counter() - started)
 
     def preload_common_indicators(self, symbols: list[str], timeframes: list[str]) -> int:
         """
@@ -306,16 +797,15 @@ class TradingCache:
             timeframes: List of timeframes to cache
 
         Returns:
-            Number of indicator sets preloaded
+            Number of indicator sets available in cache after the preload
         """
         preloaded = 0
 
-        for symbol in symbols:
-            for timeframe in timeframes:
-                # This will trigger calculation if not cached
-                # In a real implementation, you'd call your indicator calculation function here
-                logger.debug(f"Preloading indicators for {symbol} {timeframe}")
-                preloaded += 1
+        for timeframe in timeframes:
+            # One MGET per timeframe pulls every symbol into the local tier.
+            found = self.get_many_technical_indicators(symbols, timeframe)
+            preloaded += len(found)
+            logger.debug(f"Preloaded {len(found)}/{len(symbols)} indicator sets for {timeframe}")
 
         logger.info(f"📦 Preloaded {preloaded} indicator sets")
         return preloaded
@@ -335,4 +825,4 @@ class TradingCache:
         stats["preloaded_sets"] = preloaded
 
         logger.info(f"✅ Cache warmup complete: {stats}")
-        return stats
\ No newline at end of file
+        return stats
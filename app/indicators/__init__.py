@@ -1,5 +1,13 @@
 """Indicator calculation and management package."""
 
-from .calculator import IncrementalIndicatorCalculator
+from .calculator import IncrementalIndicatorCalculator, IndicatorBank
+from .crt import IncrementalCRTEngine, IncrementalCRTState
+from .regime import IncrementalRegimeIndicators
 
-__all__ = ["IncrementalIndicatorCalculator"]
\ No newline at end of file
+__all__ = [
+    "IncrementalCRTEngine",
+    "IncrementalCRTState",
+    "IncrementalIndicatorCalculator",
+    "IncrementalRegimeIndicators",
+    "IndicatorBank",
+]
@@ -1,10 +1,26 @@
-"""Incremental indicator calculator for efficient real-time updates."""
+"""Incremental indicator calculators for efficient real-time updates.
+
+The per-indicator classes (``SMACalculator`` and friends) keep state for a
+single stream. ``IndicatorBank`` holds the same SMA/EMA/RSI/MACD/Bollinger
+state for every symbol in contiguous numpy arrays (one row per symbol, with
+a ring buffer of recent closes for the windowed indicators), so one bar for
+the whole universe is a single vectorised ``update`` instead of a Python
+loop over symbols and indicators.
+
+``IndicatorBank.calculate_all_indicators`` backfills from a wide frame of
+closes by feeding it through the very same ``update`` one timestamp at a
+time (vectorised across symbols), which is what keeps the batch output
+bit-for-bit identical to streaming. Windowed values are summed over the
+ring in chronological order on every bar rather than kept as running sums,
+so they never drift. ``IncrementalIndicatorCalculator`` is the
+single-stream view of a bank.
+"""
 
 from __future__ import annotations
 
 import logging
 from collections import deque
-from typing import Any, Dict, Optional, Protocol, Union
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Protocol, Tuple, Union
 
 import numpy as np
 import pandas as pd
@@ -197,30 +213,239 @@ class BollingerBandsCalculator:
         self.sma_calc.reset()
 
 
-class IncrementalIndicatorCalculator:
-    """Efficient incremental indicator calculator that updates based on new candles only."""
-
-    def __init__(self):
-        self.indicators: Dict[str, IndicatorCalculator] = {}
-        self.indicator_values: Dict[str, Any] = {}
-        self._initialize_indicators()
+# Output columns of an ``IndicatorBank`` with its default periods.
+FIELDS = (
+    "close",
+    "sma_20",
+    "sma_50",
+    "ema_12",
+    "ema_26",
+    "rsi_14",
+    "macd_line",
+    "macd_signal",
+    "macd_hist",
+    "bb_upper",
+    "bb_middle",
+    "bb_lower",
+    "bb_percent_b",
+    "ema_cross_12_26",
+    "price_momentum",
+)
+
+
+class IndicatorBank:
+    """SMA/EMA/RSI/MACD/Bollinger state for many symbols, updated per bar.
+
+    Warm-up follows the single-stream calculators: SMAs average the closes
+    seen so far, EMAs seed with the first close, RSI reports 50 on the first
+    bar and averages gains/losses until ``rsi_period`` bars before switching
+    to Wilder smoothing, and Bollinger bands collapse onto the close (with
+    ``%b`` 0.5) until ``bb_period`` closes are available.
+    """
+
+    def __init__(
+        self,
+        symbols: Iterable[str] = (),
+        *,
+        sma_periods: Tuple[int, int] = (20, 50),
+        ema_periods: Tuple[int, int] = (12, 26),
+        rsi_period: int = 14,
+        macd_signal_period: int = 9,
+        bb_period: int = 20,
+        bb_std: float = 2.0,
+        capacity: int = 16,
+    ) -> None:
+        self.sma_periods = tuple(int(p) for p in sma_periods)
+        self.ema_periods = tuple(int(p) for p in ema_periods)
+        self.rsi_period = int(rsi_period)
+        self.macd_signal_period = int(macd_signal_period)
+        self.bb_period = int(bb_period)
+        self.bb_std = float(bb_std)
+        fast, slow = self.ema_periods
+        self.fields = (
+            "close",
+            *(f"sma_{p}" for p in self.sma_periods),
+            *(f"ema_{p}" for p in self.ema_periods),
+            f"rsi_{self.rsi_period}",
+            *FIELDS[6:13],
+            f"ema_cross_{fast}_{slow}",
+            "price_momentum",
+        )
+        self.window = max(self.sma_periods + (self.bb_period,))
+        # Ages of the ring columns once gathered oldest -> newest.
+        self._ages = np.arange(self.window - 1, -1, -1)
+        self._index: Dict[str, int] = {}
+        self._symbols: List[str] = []
+        self._allocate(max(1, int(capacity)))
+
+    # ------------------------------------------------------------------ state
+    def _allocate(self, capacity: int) -> None:
+        def grow(old: Optional[np.ndarray], shape: Tuple[int, ...], fill: float, dtype=float) -> np.ndarray:
+            new = np.full(shape, fill, dtype=dtype)
+            if old is not None:
+                new[: old.shape[0]] = old
+            return new
+
+        get = self.__dict__.get
+        self._count = grow(get("_count"), (capacity,), 0, np.int64)
+        self._ring = grow(get("_ring"), (capacity, self.window), 0.0)
+        self._prev_close = grow(get("_prev_close"), (capacity,), np.nan)
+        self._ema = {p: grow(get("_ema", {}).get(p), (capacity,), np.nan) for p in self.ema_periods}
+        self._signal = grow(get("_signal"), (capacity,), np.nan)
+        self._avg_gain = grow(get("_avg_gain"), (capacity,), 0.0)
+        self._avg_loss = grow(get("_avg_loss"), (capacity,), 0.0)
+        self._rsi_n = grow(get("_rsi_n"), (capacity,), 0, np.int64)
+        self._values = grow(get("_values"), (capacity, len(self.fields)), np.nan)
+
+    def _rows(self, symbols: Iterable[str]) -> np.ndarray:
+        rows = []
+        for symbol in symbols:
+            row = self._index.get(symbol)
+            if row is None:
+                row = self._index[symbol] = len(self._symbols)
+                self._symbols.append(symbol)
+            rows.append(row)
+        if len(self._symbols) > self._count.shape[0]:
+            self._allocate(max(len(self._symbols), self._count.shape[0] * 2))
+        return np.asarray(rows, dtype=np.intp)
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._symbols)
+
+    # ---------------------------------------------------------------- updates
+    def update(self, closes: Mapping[str, float]) -> np.ndarray:
+        """Fold one bar of closes into every listed symbol; returns their rows.
+
+        Non-finite closes skip the bar for that symbol, exactly like NaN
+        cells in ``calculate_all_indicators``, so a missing print never
+        poisons the recursive EMA/RSI/signal state.
+        """
+        rows = self._rows(closes.keys())
+        close = np.fromiter((float(v) for v in closes.values()), dtype=float, count=len(rows))
+        present = np.isfinite(close)
+        if present.all():
+            self._step(rows, close)
+        elif present.any():
+            self._step(rows[present], close[present])
+        return rows
+
+    def _step(self, rows: np.ndarray, close: np.ndarray) -> None:
+        count = self._count[rows] + 1
+        self._count[rows] = count
+        self._ring[rows, (count - 1) % self.window] = close
+        ring_cols = (((count - 1) % self.window)[:, None] - self._ages[None, :]) % self.window
+        recent = np.where(
+            self._ages[None, :] < count[:, None], self._ring[rows[:, None], ring_cols], 0.0
+        )
+        out = np.empty((len(rows), len(self.fields)))
+        out[:, 0] = close
+
+        sma = {}
+        for period in self.sma_periods:
+            sma[period] = recent[:, -period:].sum(axis=1) / np.minimum(count, period)
+        out[:, 1], out[:, 2] = sma[self.sma_periods[0]], sma[self.sma_periods[1]]
+
+        emas = []
+        for period in self.ema_periods:
+            alpha = 2 / (period + 1)
+            previous = self._ema[period][rows]
+            ema = np.where(np.isnan(previous), close, (close * alpha) + (previous * (1 - alpha)))
+            self._ema[period][rows] = ema
+            emas.append(ema)
+        out[:, 3], out[:, 4] = emas
+
+        previous_close = self._prev_close[rows]
+        first = np.isnan(previous_close)
+        change = np.where(first, 0.0, close - previous_close)
+        n = np.where(first, self._rsi_n[rows], np.minimum(self._rsi_n[rows] + 1, self.rsi_period))
+        safe_n = np.maximum(n, 1)
+        avg_gain = np.where(
+            first, self._avg_gain[rows], (self._avg_gain[rows] * (safe_n - 1) + np.maximum(change, 0.0)) / safe_n
+        )
+        avg_loss = np.where(
+            first, self._avg_loss[rows], (self._avg_loss[rows] * (safe_n - 1) + np.maximum(-change, 0.0)) / safe_n
+        )
+        self._rsi_n[rows] = n
+        self._avg_gain[rows] = avg_gain
+        self._avg_loss[rows] = avg_loss
+        self._prev_close[rows] = close
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = np.where(avg_loss == 0, 100.0, 100 - (100 / (1 + avg_gain / avg_loss)))
+        out[:, 5] = np.where(first, 50.0, rsi)
+
+        macd_line = emas[0] - emas[1]
+        alpha = 2 / (self.macd_signal_period + 1)
+        previous_signal = self._signal[rows]
+        signal = np.where(
+            np.isnan(previous_signal), macd_line, (macd_line * alpha) + (previous_signal * (1 - alpha))
+        )
+        self._signal[rows] = signal
+        out[:, 6], out[:, 7], out[:, 8] = macd_line, signal, macd_line - signal
+
+        tail = recent[:, -self.bb_period:]
+        middle = tail.sum(axis=1) / self.bb_period
+        std = np.sqrt(((tail - middle[:, None]) ** 2).sum(axis=1) / self.bb_period)
+        full = count >= self.bb_period
+        upper = np.where(full, middle + std * self.bb_std, close)
+        lower = np.where(full, middle - std * self.bb_std, close)
+        width = upper - lower
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percent_b = np.where(width != 0, (close - lower) / width, 0.5)
+        out[:, 9], out[:, 10], out[:, 11], out[:, 12] = upper, np.where(full, middle, close), lower, percent_b
+
+        out[:, 13] = np.where(emas[0] > emas[1], 1.0, -1.0)
+        base = sma[self.sma_periods[0]]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[:, 14] = np.where(base > 0, (close - base) / base, 0.0)
+        self._values[rows] = out
+
+    # ---------------------------------------------------------------- queries
+    def latest(self, symbol: str) -> Dict[str, float]:
+        row = self._index.get(symbol)
+        if row is None or not self._count[row]:
+            return {}
+        return dict(zip(self.fields, self._values[row].tolist()))
+
+    def frame(self) -> pd.DataFrame:
+        """Latest values of every symbol, one row per symbol."""
+        size = len(self._symbols)
+        return pd.DataFrame(self._values[:size], index=list(self._symbols), columns=list(self.fields))
+
+    # ---------------------------------------------------------------- backfill
+    def calculate_all_indicators(self, closes: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        """Backfill from closes (rows: bars, columns: symbols); NaN/inf skips a bar.
+
+        Returns ``{symbol: DataFrame(bars x fields)}`` and leaves the bank
+        primed at the last bar, ready for streaming ``update`` calls.
+        """
+        symbols = [str(column) for column in closes.columns]
+        rows = self._rows(symbols)
+        matrix = closes.to_numpy(dtype=float)
+        history = np.full((matrix.shape[0], len(symbols), len(self.fields)), np.nan)
+        for t, bar in enumerate(matrix):
+            present = np.isfinite(bar)
+            if present.all():
+                self._step(rows, bar)
+                history[t] = self._values[rows]
+            elif present.any():
+                self._step(rows[present], bar[present])
+                history[t, present] = self._values[rows[present]]
+        return {
+            symbol: pd.DataFrame(history[:, i, :], index=closes.index, columns=list(self.fields))
+            for i, symbol in enumerate(symbols)
+        }
 
-    def _initialize_indicators(self):
-        """Initialize all indicator calculators."""
-        # Moving Averages
-        self.indicators["sma_20"] = SMACalculator(20)
-        self.indicators["sma_50"] = SMACalculator(50)
-        self.indicators["ema_12"] = EMACalculator(12)
-        self.indicators["ema_26"] = EMACalculator(26)
 
-        # Momentum Indicators
-        self.indicators["rsi_14"] = RSICalculator(14)
+class IncrementalIndicatorCalculator:
+    """Single-stream view of an ``IndicatorBank``."""
 
-        # MACD
-        self.indicators["macd"] = MACDCalculator()
+    _SYMBOL = "_"
 
-        # Bollinger Bands
-        self.indicators["bb"] = BollingerBandsCalculator()
+    def __init__(self, **bank_options: Any):
+        self._bank_options = bank_options
+        self.bank = IndicatorBank([self._SYMBOL], capacity=1, **bank_options)
+        self.indicator_values: Dict[str, Any] = {}
 
     def update_indicators(self, new_candle: dict) -> Dict[str, Any]:
         """
@@ -233,64 +458,13 @@ class IncrementalIndicatorCalculator:
             Dictionary of current indicator values
         """
         try:
-            # Update each indicator incrementally
-            for indicator_name, calculator in self.indicators.items():
-                try:
-                    if indicator_name == "macd":
-                        macd_result = calculator.update(new_candle)
-                        if isinstance(macd_result, dict):
-                            macd_data = macd_result
-                            self.indicator_values.update({
-                                "macd_line": macd_data["macd_line"],
-                                "macd_signal": macd_data["signal_line"],
-                                "macd_hist": macd_data["histogram"],
-                            })
-                    elif indicator_name == "bb":
-                        bb_result = calculator.update(new_candle)
-                        if isinstance(bb_result, dict):
-                            bb_data = bb_result
-                            self.indicator_values.update({
-                                "bb_upper": bb_data["upper"],
-                                "bb_middle": bb_data["middle"],
-                                "bb_lower": bb_data["lower"],
-                                "bb_percent_b": bb_data["percent_b"],
-                            })
-                    else:
-                        value = calculator.update(new_candle)
-                        if isinstance(value, float):
-                            self.indicator_values[indicator_name] = value
-
-                except Exception as e:
-                    logger.warning(f"Failed to update indicator {indicator_name}: {e}")
-                    continue
-
-            # Calculate derived indicators
-            self._calculate_derived_indicators()
-
-            return self.indicator_values.copy()
-
+            price = float(new_candle.get("close", new_candle.get("price", 0)))
+            self.bank.update({self._SYMBOL: price})
+            self.indicator_values = self.bank.latest(self._SYMBOL)
+            self.indicator_values["current_price"] = self.indicator_values.pop("close")
         except Exception as e:
             logger.error(f"Error updating indicators: {e}")
-            return self.indicator_values.copy()
-
-    def _calculate_derived_indicators(self):
-        """Calculate indicators derived from base indicators."""
-        try:
-            # EMA crossover signal
-            ema_12 = self.indicator_values.get("ema_12", 0)
-            ema_26 = self.indicator_values.get("ema_26", 0)
-            self.indicator_values["ema_cross_12_26"] = 1 if ema_12 > ema_26 else -1
-
-            # Price momentum (simplified)
-            sma_20 = self.indicator_values.get("sma_20", 0)
-            current_price = self.indicator_values.get("current_price", 0)
-            if sma_20 > 0:
-                self.indicator_values["price_momentum"] = (current_price - sma_20) / sma_20
-            else:
-                self.indicator_values["price_momentum"] = 0
-
-        except Exception as e:
-            logger.warning(f"Error calculating derived indicators: {e}")
+        return self.indicator_values.copy()
 
     def get_indicator_value(self, indicator_name: str) -> Any:
         """Get current value of a specific indicator."""
@@ -302,24 +476,37 @@ class IncrementalIndicatorCalculator:
 
     def reset(self):
         """Reset all indicators to initial state."""
+        self.bank = IndicatorBank([self._SYMBOL], capacity=1, **self._bank_options)
         self.indicator_values.clear()
-        for calculator in self.indicators.values():
-            calculator.reset()
 
     def calculate_all_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """
-        LEGACY METHOD: Calculate all indicators on entire DataFrame.
-        This is kept for backwards compatibility but is inefficient.
-        Use update_indicators() for real-time updates instead.
+        Calculate all indicators on an entire OHLCV DataFrame.
+
+        Runs the same per-bar update as ``update_indicators`` on a fresh
+        bank, so the columns match what streaming the rows would produce.
 
         Args:
-            df: DataFrame with OHLCV data
+            df: DataFrame with a ``close`` (or ``price``) column
 
         Returns:
             DataFrame with indicators added
         """
-        logger.warning("Using legacy calculate_all_indicators method. Consider using IncrementalIndicatorCalculator for better performance.")
-
-        # This would be the old inefficient way - recalculating everything
-        # Implementation would go here for backwards compatibility
-        return df
\ No newline at end of file
+        column = "close" if "close" in df.columns else "price"
+        bank = IndicatorBank(capacity=1, **self._bank_options)
+        closes = pd.DataFrame({self._SYMBOL: pd.to_numeric(df[column], errors="coerce")})
+        indicators = bank.calculate_all_indicators(closes)[self._SYMBOL]
+        return df.join(indicators.drop(columns="close"))
+
+
+__all__ = [
+    "BollingerBandsCalculator",
+    "EMACalculator",
+    "FIELDS",
+    "IncrementalIndicatorCalculator",
+    "IndicatorBank",
+    "IndicatorCalculator",
+    "MACDCalculator",
+    "RSICalculator",
+    "SMACalculator",
+]
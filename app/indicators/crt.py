@@ -0,0 +1,601 @@
+"""Streaming state behind the Composite Rhythm Trading (CRT) analyses.
+
+``CRTSignalGenerator`` used to rerun RSI/MACD/SMA/STOCH/ADX, a linear
+regression and six TA-Lib candlestick scans over the whole price list on
+every call, on OHLC arrays synthesised from closes (``p * 0.998`` opens and
+so on). ``IncrementalCRTState`` keeps the moving averages, momentum
+oscillators, regression sums and swing points for one symbol and folds each
+new bar in O(1), so a tick costs the same whether the symbol has 60 or 6000
+bars behind it. Pattern recognition and swing points use the bars'
+open/high/low/close (see ``app.services.bar_store``).
+
+Semantics of the streaming analyses:
+
+* RSI(14), MACD(12, 26, 9) and the SMAs are seeded the way TA-Lib seeds them
+  (simple average of the first period) and then updated recursively over the
+  full stream rather than over a trailing slice.
+* Each multi-timeframe window (20/50/100 bars) reports a Cutler RSI (rolling
+  sums of gains and losses over the window) and the window's price trend;
+  MACD and the SMA(20)/SMA(50) alignment are shared across windows.
+* The trend regression runs over a sliding window with O(1) sum updates and
+  a periodic exact resync to bound floating-point drift.
+* Candlestick shapes follow simplified TA-Lib definitions (body sizes are
+  compared against the trailing 10-bar average body).
+* Bars built from a single observed price (``ticks == 1``: one-tick store
+  bars and bars made from a bare price list) have no wicks and open at the
+  previous close. Wick-based shapes (hammer / hanging man) are skipped for
+  them, and because every direction change with a larger body would count
+  as "engulfing" on gapless bars, engulfing there additionally needs the
+  prevailing trend against it, a prior body of at least half the average
+  and a body of at least twice the prior one and 1.5x the average.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections import deque
+from typing import Any, Iterable, Optional, Sequence
+
+from .regime import IncrementalRegimeIndicators
+
+MTF_WINDOWS = {"short_term": 20, "medium_term": 50, "long_term": 100}
+BULLISH_PATTERNS = ("HAMMER", "BULLISH_ENGULFING", "MORNING_STAR")
+BEARISH_PATTERNS = ("HANGING_MAN", "BEARISH_ENGULFING", "EVENING_STAR")
+
+# How many trailing closes identify a position in a caller's price list.
+_TAIL = 8
+
+
+class _SeededEMA:
+    """EMA seeded with the SMA of the first ``period`` values (TA-Lib style)."""
+
+    __slots__ = ("period", "alpha", "value", "_seed_sum", "_seed_count")
+
+    def __init__(self, period: int) -> None:
+        self.period = int(period)
+        self.alpha = 2.0 / (self.period + 1)
+        self.value: Optional[float] = None
+        self._seed_sum = 0.0
+        self._seed_count = 0
+
+    def update(self, x: float) -> Optional[float]:
+        if self.value is None:
+            self._seed_sum += x
+            self._seed_count += 1
+            if self._seed_count == self.period:
+                self.value = self._seed_sum / self.period
+            return self.value
+        self.value += self.alpha * (x - self.value)
+        return self.value
+
+
+class _RollingMean:
+    __slots__ = ("window", "values", "total")
+
+    def __init__(self, window: int) -> None:
+        self.window = int(window)
+        self.values: deque[float] = deque()
+        self.total = 0.0
+
+    def update(self, x: float) -> Optional[float]:
+        self.values.append(x)
+        self.total += x
+        if len(self.values) > self.window:
+            self.total -= self.values.popleft()
+        return self.value
+
+    @property
+    def value(self) -> Optional[float]:
+        if len(self.values) < self.window:
+            return None
+        return self.total / self.window
+
+
+class _WilderRSI:
+    """RSI with TA-Lib's seeding: average of the first ``period`` changes."""
+
+    __slots__ = ("period", "avg_gain", "avg_loss", "_seed_gain", "_seed_loss", "_changes", "_prev")
+
+    def __init__(self, period: int = 14) -> None:
+        self.period = int(period)
+        self.avg_gain: Optional[float] = None
+        self.avg_loss: Optional[float] = None
+        self._seed_gain = 0.0
+        self._seed_loss = 0.0
+        self._changes = 0
+        self._prev: Optional[float] = None
+
+    def update(self, close: float) -> Optional[float]:
+        prev, self._prev = self._prev, close
+        if prev is None:
+            return None
+        change = close - prev
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        if self.avg_gain is None:
+            self._seed_gain += gain
+            self._seed_loss += loss
+            self._changes += 1
+            if self._changes == self.period:
+                self.avg_gain = self._seed_gain / self.period
+                self.avg_loss = self._seed_loss / self.period
+        else:
+            n = self.period
+            self.avg_gain = (self.avg_gain * (n - 1) + gain) / n
+            self.avg_loss = (self.avg_loss * (n - 1) + loss) / n
+        return self.value
+
+    @property
+    def value(self) -> Optional[float]:
+        if self.avg_gain is None or self.avg_loss is None:
+            return None
+        total = self.avg_gain + self.avg_loss
+        return 50.0 if total == 0 else 100.0 * self.avg_gain / total
+
+
+class _WindowRSI:
+    """Cutler RSI over the changes inside a trailing window of closes."""
+
+    __slots__ = ("window", "changes", "gains", "losses")
+
+    def __init__(self, window: int) -> None:
+        self.window = int(window)
+        self.changes: deque[float] = deque()
+        self.gains = 0.0
+        self.losses = 0.0
+
+    def update(self, change: float) -> None:
+        self.changes.append(change)
+        self.gains += max(change, 0.0)
+        self.losses += max(-change, 0.0)
+        if len(self.changes) > self.window - 1:
+            old = self.changes.popleft()
+            self.gains -= max(old, 0.0)
+            self.losses -= max(-old, 0.0)
+
+    @property
+    def value(self) -> float:
+        total = self.gains + self.losses
+        if total <= 1e-12:
+            return 50.0
+        return 100.0 * max(self.gains, 0.0) / total
+
+
+class _SlidingRegression:
+    """Least-squares fit of ``y`` against bar index over a sliding window."""
+
+    __slots__ = ("window", "values", "sy", "sxy", "syy", "_since_resync")
+
+    def __init__(self, window: int) -> None:
+        self.window = max(3, int(window))
+        self.values: deque[float] = deque()
+        self.sy = 0.0
+        self.sxy = 0.0
+        self.syy = 0.0
+        self._since_resync = 0
+
+    def update(self, y: float) -> None:
+        if len(self.values) == self.window:
+            out = self.values.popleft()
+            # Every remaining point shifts one index to the left.
+            self.sy -= out
+            self.sxy -= self.sy
+            self.syy -= out * out
+        self.values.append(y)
+        self.sxy += (len(self.values) - 1) * y
+        self.sy += y
+        self.syy += y * y
+        self._since_resync += 1
+        if self._since_resync >= self.window:
+            self._resync()
+
+    def _resync(self) -> None:
+        self.sy = math.fsum(self.values)
+        self.sxy = math.fsum(i * v for i, v in enumerate(self.values))
+        self.syy = math.fsum(v * v for v in self.values)
+        self._since_resync = 0
+
+    def fit(self) -> tuple[float, float]:
+        """Return ``(slope, r_value)`` for the current window."""
+        n = len(self.values)
+        if n < 2:
+            return 0.0, 0.0
+        sx = n * (n - 1) / 2.0
+        sxx = (n - 1) * n * (2 * n - 1) / 6.0
+        var_x = n * sxx - sx * sx
+        cov = n * self.sxy - sx * self.sy
+        var_y = n * self.syy - self.sy * self.sy
+        slope = cov / var_x if var_x else 0.0
+        if var_x <= 0 or var_y <= 1e-18:
+            return slope, 0.0
+        r_value = cov / math.sqrt(var_x * var_y)
+        return slope, max(-1.0, min(1.0, r_value))
+
+
+def _candle(bar: Any) -> tuple[float, float, float, float]:
+    return float(bar.open), float(bar.high), float(bar.low), float(bar.close)
+
+
+def _has_range(bar: Any) -> bool:
+    """False for bars built from a single price, which carry no wicks."""
+    ticks = getattr(bar, "ticks", None)
+    return ticks is None or int(ticks) > 1
+
+
+class IncrementalCRTState:
+    """All CRT analysis state for a single symbol."""
+
+    def __init__(self, *, trend_window: int = 100, pattern_body_window: int = 10) -> None:
+        self.bars = 0
+        self.last_seq = -1
+        self.trend_window = int(trend_window)
+        keep = max(max(MTF_WINDOWS.values()), 20)
+        self.closes: deque[float] = deque(maxlen=keep)
+        self.candles: deque[tuple[float, float, float, float]] = deque(maxlen=5)
+        self.last_has_range = True
+        self.rsi = _WilderRSI(14)
+        self.ema_fast = _SeededEMA(12)
+        self.ema_slow = _SeededEMA(26)
+        self.macd_signal = _SeededEMA(9)
+        self.macd_hist: Optional[float] = None
+        self.sma_20 = _RollingMean(20)
+        self.sma_50 = _RollingMean(50)
+        self.stoch_k_window: deque[tuple[float, float, float]] = deque(maxlen=5)
+        self.slowk = _RollingMean(3)
+        self.slowk_value: Optional[float] = None
+        self.window_rsi = {name: _WindowRSI(window) for name, window in MTF_WINDOWS.items()}
+        self.regression = _SlidingRegression(self.trend_window)
+        self.regime = IncrementalRegimeIndicators()
+        self.body_avg = _RollingMean(pattern_body_window)
+        self._prev_body_avg: Optional[float] = None
+        self.patterns: list[str] = []
+        self.supports: deque[tuple[int, float]] = deque()
+        self.resistances: deque[tuple[int, float]] = deque()
+
+    # ------------------------------------------------------------------ update
+
+    def update(self, bar: Any) -> None:
+        """Fold one closed bar (anything with open/high/low/close)."""
+        o, h, l, c = _candle(bar)
+        h = max(h, o, c)
+        l = min(l, o, c)
+        prev_close = self.closes[-1] if self.closes else None
+        self.closes.append(c)
+        self.candles.append((o, h, l, c))
+        self.last_has_range = _has_range(bar)
+        self.last_seq = int(getattr(bar, "seq", self.last_seq + 1))
+        self.bars += 1
+
+        self.rsi.update(c)
+        fast = self.ema_fast.update(c)
+        slow = self.ema_slow.update(c)
+        if fast is not None and slow is not None:
+            signal = self.macd_signal.update(fast - slow)
+            if signal is not None:
+                self.macd_hist = (fast - slow) - signal
+        self.sma_20.update(c)
+        self.sma_50.update(c)
+
+        self.stoch_k_window.append((h, l, c))
+        if len(self.stoch_k_window) == self.stoch_k_window.maxlen:
+            highest = max(item[0] for item in self.stoch_k_window)
+            lowest = min(item[1] for item in self.stoch_k_window)
+            span = highest - lowest
+            fastk = 0.0 if span <= 0 else 100.0 * (c - lowest) / span
+            self.slowk_value = self.slowk.update(fastk)
+
+        if prev_close is not None:
+            change = c - prev_close
+            for window_rsi in self.window_rsi.values():
+                window_rsi.update(change)
+        self.regression.update(c)
+        self.regime.update(h, l, c)
+
+        self._prev_body_avg = self.body_avg.value
+        self._update_patterns()
+        self.body_avg.update(abs(c - o))
+        self._update_swings()
+
+    def _update_patterns(self) -> None:
+        found: list[str] = []
+        body_avg = self._prev_body_avg
+        if body_avg is None or len(self.closes) < 7:
+            self.patterns = found
+            return
+        o, h, l, c = self.candles[-1]
+        body = abs(c - o)
+        rng = h - l
+        upper = h - max(o, c)
+        lower = min(o, c) - l
+        downtrend = self.closes[-2] < self.closes[-7]
+        uptrend = self.closes[-2] > self.closes[-7]
+
+        has_range = self.last_has_range
+
+        wick_shape = rng > 0 and body <= body_avg and lower >= 2 * body and lower >= 0.6 * rng and upper <= 0.1 * rng
+        if has_range and wick_shape:
+            if downtrend:
+                found.append("HAMMER")
+            elif uptrend:
+                found.append("HANGING_MAN")
+
+        po, _ph, _pl, pc = self.candles[-2]
+        prev_body = abs(pc - po)
+        if has_range:
+            engulfs = body > prev_body
+            bull_context = bear_context = True
+        else:
+            engulfs = prev_body >= 0.5 * body_avg and body >= 2 * prev_body and body >= 1.5 * body_avg
+            bull_context, bear_context = downtrend, uptrend
+        if engulfs and bull_context and pc < po and c > o and o <= pc and c >= po:
+            found.append("BULLISH_ENGULFING")
+        elif engulfs and bear_context and pc > po and c < o and o >= pc and c <= po:
+            found.append("BEARISH_ENGULFING")
+
+        if len(self.candles) >= 3 and body_avg > 0:
+            fo, _fh, _fl, fc = self.candles[-3]
+            first_body = abs(fc - fo)
+            star_small = prev_body <= 0.5 * body_avg
+            midpoint = (fo + fc) / 2.0
+            if fc < fo and first_body > body_avg and star_small and max(po, pc) <= fc and c > o and c > midpoint:
+                found.append("MORNING_STAR")
+            if fc > fo and first_body > body_avg and star_small and min(po, pc) >= fc and c < o and c < midpoint:
+                found.append("EVENING_STAR")
+        self.patterns = found
+
+    def _update_swings(self) -> None:
+        # A pivot needs two bars either side, so bar[-3] is confirmed now.
+        if len(self.candles) == self.candles.maxlen:
+            lows = [candle[2] for candle in self.candles]
+            highs = [candle[1] for candle in self.candles]
+            pivot_seq = self.last_seq - 2
+            if all(lows[2] < lows[i] for i in (0, 1, 3, 4)):
+                self.supports.append((pivot_seq, lows[2]))
+            if all(highs[2] > highs[i] for i in (0, 1, 3, 4)):
+                self.resistances.append((pivot_seq, highs[2]))
+        # Same lookback as the batch version: pivots inside the last 20 bars.
+        oldest = self.last_seq - 17
+        for levels in (self.supports, self.resistances):
+            while levels and levels[0][0] < oldest:
+                levels.popleft()
+
+    # ---------------------------------------------------------------- analyses
+
+    def multi_timeframe(self) -> dict[str, Any]:
+        analysis: dict[str, Any] = {}
+        closes = self.closes
+        macd_trend = "BULLISH" if (self.macd_hist or 0.0) > 0 else "BEARISH"
+        sma_20, sma_50 = self.sma_20.value, self.sma_50.value
+        if sma_20 is None or sma_50 is None:
+            ma_trend = "NEUTRAL"
+        else:
+            ma_trend = "BULLISH" if sma_20 > sma_50 else "BEARISH"
+        for name, window in MTF_WINDOWS.items():
+            if self.bars < window:
+                continue
+            rsi = self.window_rsi[name].value
+            analysis[name] = {
+                "rsi": float(rsi),
+                "rsi_signal": "BULLISH" if rsi > 50 else "BEARISH" if rsi < 50 else "NEUTRAL",
+                "macd_trend": macd_trend,
+                "ma_trend": ma_trend,
+                "price_trend": "BULLISH" if closes[-1] > closes[-window] else "BEARISH",
+            }
+        return analysis
+
+    def momentum_composite(self) -> dict[str, Any]:
+        score = 0.0
+        count = 0
+        rsi = self.rsi.value
+        if rsi is not None:
+            score += (rsi - 50) / 50
+            count += 1
+        if self.macd_hist is not None:
+            score += math.tanh(self.macd_hist * 10)
+            count += 1
+        if self.slowk_value is not None:
+            score += (self.slowk_value - 50) / 50
+            count += 1
+        avg = score / count if count else 0.0
+        return {
+            "momentum_score": float(avg),
+            "strength": "STRONG" if abs(avg) > 0.3 else "MODERATE" if abs(avg) > 0.1 else "WEAK",
+            "direction": "BULLISH" if avg > 0 else "BEARISH",
+        }
+
+    def trend(self) -> dict[str, Any]:
+        if self.bars < 20:
+            return {"trend": "SIDEWAYS", "strength": 0, "direction": 0}
+        slope, r_value = self.regression.fit()
+        adx_strength = (self.regime.last_adx or 0.0) / 100
+        trend_strength = (abs(slope) * 1000 + adx_strength + 1) / 3
+        return {
+            "trend": "UPTREND" if slope > 0 else "DOWNTREND",
+            "strength": float(trend_strength),
+            "slope": float(slope),
+            "r_squared": float(r_value**2),
+            "adx_strength": float(adx_strength),
+        }
+
+    def pattern_recognition(self) -> dict[str, Any]:
+        found = list(self.patterns)
+        bullish = sum(1 for name in found if name in BULLISH_PATTERNS)
+        bearish = sum(1 for name in found if name in BEARISH_PATTERNS)
+        return {
+            "patterns_detected": found,
+            "pattern_count": len(found),
+            "signal": "BULLISH" if bullish > bearish else "BEARISH" if bearish > bullish else "NEUTRAL",
+        }
+
+    def market_structure(self) -> dict[str, Any]:
+        if self.bars < 20:
+            return {"support_levels": [], "resistance_levels": [], "market_structure": "UNKNOWN"}
+        current = self.closes[-1]
+        supports = [float(level) for _seq, level in self.supports]
+        resistances = [float(level) for _seq, level in self.resistances]
+        nearest_support = min(supports, key=lambda x: abs(x - current)) if supports else 0
+        nearest_resistance = min(resistances, key=lambda x: abs(x - current)) if resistances else 0
+        return {
+            "support_levels": supports[:3],
+            "resistance_levels": resistances[:3],
+            "nearest_support": float(nearest_support),
+            "nearest_resistance": float(nearest_resistance),
+            "market_structure": "UPTREND" if current > nearest_support else "DOWNTREND",
+        }
+
+    def analyses(self) -> dict[str, Any]:
+        """The bar-driven CRT analyses, keyed like ``CRTSignalGenerator`` expects."""
+        return {
+            "multi_timeframe": self.multi_timeframe(),
+            "momentum_composite": self.momentum_composite(),
+            "trend_analysis": self.trend(),
+            "pattern_recognition": self.pattern_recognition(),
+            "market_structure": self.market_structure(),
+        }
+
+
+class _CloseBar:
+    """Bar built from consecutive closes when only a price list is available."""
+
+    __slots__ = ("seq", "open", "high", "low", "close")
+
+    ticks = 1
+
+    def __init__(self, seq: int, open_: float, close: float) -> None:
+        self.seq = seq
+        self.open = open_
+        self.close = close
+        self.high = max(open_, close)
+        self.low = min(open_, close)
+
+
+class IncrementalCRTEngine:
+    """Per-symbol ``IncrementalCRTState`` kept in step with a bar source.
+
+    ``sync`` prefers the shared bar store (observed OHLC, ``seq``-addressed) when
+    the caller's price list is the live stream for that symbol, and otherwise
+    follows the caller's price list itself by matching its tail against the
+    closes already folded in, so only appended prices are processed.
+    """
+
+    def __init__(self, *, trend_window: int = 100, max_symbols: int = 512) -> None:
+        self.trend_window = int(trend_window)
+        self.max_symbols = max(1, int(max_symbols))
+        self._lock = threading.RLock()
+        self._states: dict[tuple[str, str], IncrementalCRTState] = {}
+        self._tails: dict[tuple[str, str], deque[float]] = {}
+        self.stats = {"bars_folded": 0, "rebuilds": 0}
+
+    def _new_state(self, key: tuple[str, str]) -> IncrementalCRTState:
+        if key not in self._states and len(self._states) >= self.max_symbols:
+            evicted = next(iter(self._states))
+            self._states.pop(evicted)
+            self._tails.pop(evicted, None)
+        state = IncrementalCRTState(trend_window=self.trend_window)
+        self._states[key] = state
+        self._tails[key] = deque(maxlen=_TAIL)
+        self.stats["rebuilds"] += 1
+        return state
+
+    def state(self, symbol: str, source: str = "store") -> Optional[IncrementalCRTState]:
+        return self._states.get((str(symbol).upper(), source))
+
+    def sync(self, symbol: str, historical_prices: Sequence[Any], *, store: Any = None) -> IncrementalCRTState:
+        symbol = str(symbol).upper()
+        with self._lock:
+            if store is not None and self._store_matches(store, symbol, historical_prices):
+                return self._sync_store(symbol, store)
+            return self._sync_prices(symbol, historical_prices)
+
+    def analyze(
+        self, symbol: str, historical_prices: Sequence[Any], *, store: Any = None
+    ) -> tuple[int, dict[str, Any]]:
+        """Sync, then return ``(bars_folded, analyses)`` as one consistent read."""
+        with self._lock:
+            state = self.sync(symbol, historical_prices, store=store)
+            return state.bars, state.analyses()
+
+    @staticmethod
+    def _store_matches(store: Any, symbol: str, historical_prices: Sequence[Any]) -> bool:
+        try:
+            last = store.last_bar(symbol)
+            if last is None or not len(historical_prices):
+                return False
+            return math.isclose(float(last.close), float(historical_prices[-1]), rel_tol=1e-12)
+        except Exception:
+            return False
+
+    def _sync_store(self, symbol: str, store: Any) -> IncrementalCRTState:
+        key = (symbol, "store")
+        state = self._states.get(key)
+        if state is None:
+            state = self._new_state(key)
+        new_bars = store.bars(symbol, since_seq=state.last_seq)
+        if new_bars and new_bars[0].seq != state.last_seq + 1 and state.bars:
+            # The store evicted bars we never saw; start over from what it holds.
+            state = self._new_state(key)
+            new_bars = store.bars(symbol)
+        self._fold(state, new_bars)
+        return state
+
+    def _sync_prices(self, symbol: str, historical_prices: Sequence[Any]) -> IncrementalCRTState:
+        key = (symbol, "prices")
+        prices = [float(p) for p in historical_prices]
+        state = self._states.get(key)
+        appended = None if state is None else self._appended_count(self._tails[key], prices)
+        if appended is None:
+            state = self._new_state(key)
+            appended = len(prices)
+        if appended:
+            start = len(prices) - appended
+            prev = prices[start - 1] if start > 0 else prices[start]
+            bars = []
+            seq = state.last_seq
+            for price in prices[start:]:
+                seq += 1
+                bars.append(_CloseBar(seq, prev, price))
+                prev = price
+            self._fold(state, bars)
+            self._tails[key].extend(prices[start:])
+        return state
+
+    @staticmethod
+    def _appended_count(tail: deque[float], prices: list[float]) -> Optional[int]:
+        """How many prices were appended since ``tail`` was recorded, if known."""
+        if not tail:
+            return None
+        known = list(tail)
+        m = len(known)
+        for appended in range(0, min(len(prices), 4 * _TAIL) + 1):
+            end = len(prices) - appended
+            if end < m:
+                break
+            if prices[end - m : end] == known:
+                return appended
+        return None
+
+    def _fold(self, state: IncrementalCRTState, bars: Iterable[Any]) -> None:
+        count = 0
+        for bar in bars:
+            state.update(bar)
+            count += 1
+        self.stats["bars_folded"] += count
+
+    def reset(self, symbol: Optional[str] = None) -> None:
+        with self._lock:
+            if symbol is None:
+                self._states.clear()
+                self._tails.clear()
+                return
+            for key in [k for k in self._states if k[0] == str(symbol).upper()]:
+                self._states.pop(key, None)
+                self._tails.pop(key, None)
+
+
+__all__ = [
+    "BEARISH_PATTERNS",
+    "BULLISH_PATTERNS",
+    "IncrementalCRTEngine",
+    "IncrementalCRTState",
+    "MTF_WINDOWS",
+]
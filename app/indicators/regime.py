@@ -0,0 +1,146 @@
+"""Streaming ATR% / ADX state used by the futures regime gate.
+
+The recursions mirror ``pandas.Series.ewm(alpha=1 / n, adjust=False).mean()``
+(including its NaN handling) so that folding candles one at a time yields the
+same values as the batch computation in ``FuturesSafetyService``.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field, replace
+from typing import Any, Optional
+
+
+def _is_nan(value: Optional[float]) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+@dataclass
+class _EwmState:
+    """Single ``adjust=False`` exponentially weighted mean."""
+
+    alpha: float
+    weighted: float = math.nan
+    old_wt: float = 1.0
+
+    def update(self, value: Optional[float]) -> float:
+        is_obs = not _is_nan(value)
+        if not math.isnan(self.weighted):
+            # ignore_na=False: gaps still decay the previous weight.
+            self.old_wt *= 1.0 - self.alpha
+            if is_obs:
+                cur = float(value)  # type: ignore[arg-type]
+                if self.weighted != cur:
+                    self.weighted = (self.old_wt * self.weighted + self.alpha * cur) / (
+                        self.old_wt + self.alpha
+                    )
+                self.old_wt = 1.0
+        elif is_obs:
+            self.weighted = float(value)  # type: ignore[arg-type]
+        return self.weighted
+
+
+@dataclass
+class IncrementalRegimeIndicators:
+    """Wilder-smoothed ATR% and ADX updated one closed candle at a time."""
+
+    atr_period: int = 14
+    adx_period: int = 14
+    bars: int = 0
+    prev_high: Optional[float] = None
+    prev_low: Optional[float] = None
+    prev_close: Optional[float] = None
+    last_open_time: Optional[float] = None
+    last_atr_pct: Optional[float] = None
+    last_adx: Optional[float] = None
+    _atr: _EwmState = field(init=False)
+    _tr: _EwmState = field(init=False)
+    _plus_dm: _EwmState = field(init=False)
+    _minus_dm: _EwmState = field(init=False)
+    _adx: _EwmState = field(init=False)
+
+    def __post_init__(self) -> None:
+        n_atr = max(2, int(self.atr_period))
+        n_adx = max(2, int(self.adx_period))
+        self._atr = _EwmState(alpha=1.0 / n_atr)
+        self._tr = _EwmState(alpha=1.0 / n_adx)
+        self._plus_dm = _EwmState(alpha=1.0 / n_adx)
+        self._minus_dm = _EwmState(alpha=1.0 / n_adx)
+        self._adx = _EwmState(alpha=1.0 / n_adx)
+
+    def copy(self) -> "IncrementalRegimeIndicators":
+        clone = replace(self)
+        clone._atr = replace(self._atr)
+        clone._tr = replace(self._tr)
+        clone._plus_dm = replace(self._plus_dm)
+        clone._minus_dm = replace(self._minus_dm)
+        clone._adx = replace(self._adx)
+        return clone
+
+    def update(
+        self, high: float, low: float, close: float, open_time: Optional[float] = None
+    ) -> dict[str, float]:
+        """Fold one closed candle into the state and return current metrics."""
+        high_f, low_f, close_f = float(high), float(low), float(close)
+
+        true_range = abs(high_f - low_f)
+        if self.prev_close is not None:
+            true_range = max(
+                true_range,
+                abs(high_f - self.prev_close),
+                abs(low_f - self.prev_close),
+            )
+
+        plus_dm = 0.0
+        minus_dm = 0.0
+        if self.prev_high is not None and self.prev_low is not None:
+            up_move = high_f - self.prev_high
+            down_move = self.prev_low - low_f
+            if up_move > down_move and up_move > 0:
+                plus_dm = up_move
+            if down_move > up_move and down_move > 0:
+                minus_dm = down_move
+
+        atr = self._atr.update(true_range)
+        if close_f != 0 and not math.isnan(atr):
+            self.last_atr_pct = atr / close_f * 100.0
+
+        tr_s = self._tr.update(true_range)
+        plus_s = self._plus_dm.update(plus_dm)
+        minus_s = self._minus_dm.update(minus_dm)
+        dx = math.nan
+        if tr_s != 0 and not math.isnan(tr_s):
+            plus_di = 100.0 * plus_s / tr_s
+            minus_di = 100.0 * minus_s / tr_s
+            if plus_di + minus_di != 0:
+                dx = 100.0 * abs(plus_di - minus_di) / (plus_di + minus_di)
+        adx = self._adx.update(dx)
+        if not math.isnan(adx):
+            self.last_adx = adx
+
+        self.prev_high, self.prev_low, self.prev_close = high_f, low_f, close_f
+        if open_time is not None:
+            self.last_open_time = float(open_time)
+        self.bars += 1
+        return self.metrics()
+
+    def peek(self, high: float, low: float, close: float) -> dict[str, float]:
+        """Metrics as if an (unclosed) candle were appended, without mutating."""
+        return self.copy().update(high, low, close)
+
+    def metrics(self) -> dict[str, float]:
+        return {
+            "atr_pct": round(float(self.last_atr_pct or 0.0), 4),
+            "adx": round(float(self.last_adx or 0.0), 4),
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "bars": self.bars,
+            "last_open_time": self.last_open_time,
+            **self.metrics(),
+        }
+
+
+__all__ = ["IncrementalRegimeIndicators"]
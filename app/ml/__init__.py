@@ -1,10 +1,11 @@
 """Machine learning modules for the trading bot."""
 
-from .feature_store import FeatureStore
+from .feature_store import FeaturePipeline, FeatureStore
 from .memory_efficient_loader import ChunkedDataLoader
 from .trainer import EfficientMLTrainer
 
 __all__ = [
+    "FeaturePipeline",
     "FeatureStore",
     "ChunkedDataLoader",
     "EfficientMLTrainer",
@@ -1,47 +1,380 @@
-"""Precomputed ML feature store for high-performance trading."""
+"""Persistent ML feature store backed by local candles.
+
+``FeatureStore`` used to feed precomputation with random mock frames from
+``_load_market_data``, recomputed pandas rolling windows from scratch for
+every (symbol, timeframe), kept only the last row in the trading cache and
+cached ``_mock_predict`` output as if it were a model prediction. Nothing
+survived a restart, and training and inference processes each recomputed
+the same indicators.
+
+Candles now come from the ``KlineStore`` (``<SYMBOL>/<interval>.npy``
+memory maps), which the ML training downloads fill through
+``KlineStore.merge``; a ``kline_fetcher`` can be given to download a series
+the store does not hold yet. A ``FeaturePipeline`` turns them into a float64 matrix: the
+``IndicatorBank`` columns, volume, simple returns and rolling return
+volatility. Its ``version`` is a hash of the pipeline's parameters and
+``FEATURE_REVISION``, and every version gets its own directory::
+
+    <root>/<version>/pipeline.json           columns and parameters
+    <root>/<version>/<SYMBOL>/<interval>.npy  (n, len(columns)), open_time first
+    <root>/<version>/<SYMBOL>/<interval>.state.pkl  bank state after row n
+
+``materialize`` only computes rows for candles appended since the last run:
+the recursive indicators resume from the pickled bank state and the
+windowed ones read just ``lookback`` earlier candles, so appending is
+bit-for-bit equal to recomputing the full history. The matrix is rewritten
+atomically with ``os.replace`` and readers open it with
+``np.load(mmap_mode="r")``, so any number of processes share one copy in the
+page cache. If the stored rows no longer line up with the candles (history
+rewritten, state missing) the series is rebuilt from scratch.
+
+Predictions are only precomputed for models registered with
+``register_model``; there is no mock predictor.
+"""
 
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
+import os
 import pickle
+import threading
 import time
 from concurrent.futures import ThreadPoolExecutor
-from typing import Any, Dict, List, Optional, Union
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
 
 from ..cache.trading_cache import TradingCache
+from ..indicators.calculator import IndicatorBank
+from ..trading.kline_replay import COLUMNS as KLINE_COLUMNS, KlineStore, candles_from_frame
 
 logger = logging.getLogger(__name__)
 
+# Bump when the feature computation changes without a parameter change.
+FEATURE_REVISION = 1
+
+Predictor = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+
+def default_feature_root() -> Path:
+    env_path = os.getenv("FEATURE_STORE_DIR")
+    if env_path:
+        return Path(env_path)
+    from app.services.pathing import PROJECT_ROOT_PATH
+
+    return PROJECT_ROOT_PATH / "data" / "features"
+
+
+class FeaturePipeline:
+    """Candles ``(n, 6)`` -> feature rows, resumable from a bank state."""
+
+    _SYMBOL = "_"
+
+    def __init__(self, *, volatility_window: int = 20, **bank_options: Any) -> None:
+        self.volatility_window = max(2, int(volatility_window))
+        self.bank_options = dict(sorted(bank_options.items()))
+        fields = self.new_bank().fields
+        self.columns: Tuple[str, ...] = (
+            "open_time",
+            *fields,
+            "volume",
+            "returns",
+            "volatility",
+        )
+        spec = {
+            "revision": FEATURE_REVISION,
+            "bank": self.bank_options,
+            "volatility_window": self.volatility_window,
+            "columns": self.columns,
+        }
+        self.spec = json.loads(json.dumps(spec))
+        digest = hashlib.sha1(json.dumps(self.spec, sort_keys=True).encode("utf-8"))
+        self.version = f"fp{FEATURE_REVISION}-{digest.hexdigest()[:12]}"
+
+    @property
+    def lookback(self) -> int:
+        """Earlier candles the windowed features need before the first new row."""
+        return self.volatility_window
+
+    def new_bank(self) -> IndicatorBank:
+        return IndicatorBank([self._SYMBOL], capacity=1, **self.bank_options)
+
+    def compute(self, candles: np.ndarray, start: int, bank: IndicatorBank) -> np.ndarray:
+        """Feature rows for ``candles[start:]``; ``bank`` must be primed at ``start``."""
+        candles = np.asarray(candles, dtype=np.float64)
+        stop = len(candles)
+        closes = candles[:, 4]
+        indicators = bank.calculate_all_indicators(
+            pd.DataFrame({self._SYMBOL: closes[start:stop]})
+        )[self._SYMBOL].to_numpy()
+
+        window = self.volatility_window
+        first = max(0, start - self.lookback)
+        context = closes[first:stop]
+        previous = np.empty_like(context)
+        previous[0] = closes[first - 1] if first > 0 else np.nan
+        previous[1:] = context[:-1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = context / previous - 1.0
+        volatility = np.full(len(context), np.nan)
+        if len(context) >= window:
+            windows = np.lib.stride_tricks.sliding_window_view(returns, window)
+            volatility[window - 1 :] = windows.std(axis=1, ddof=1)
+
+        offset = start - first
+        rows = np.empty((stop - start, len(self.columns)))
+        rows[:, 0] = candles[start:stop, 0]
+        rows[:, 1 : 1 + indicators.shape[1]] = indicators
+        rows[:, -3] = candles[start:stop, 5]
+        rows[:, -2] = returns[offset:]
+        rows[:, -1] = volatility[offset:]
+        return rows
+
 
 class FeatureStore:
     """
     Precomputed ML feature store for high-performance trading.
 
     Features:
-    - Precompute features during off-peak hours
-    - Cache features and predictions in Redis
+    - Incremental feature matrices persisted per pipeline version
+    - Memory-mapped reads shared across processes
+    - Latest rows and predictions cached in Redis
     - Parallel processing for multiple symbols/timeframes
-    - Feature versioning and invalidation
-    - Performance monitoring and optimization
+    - Hit/miss and compute-time metrics
     """
 
-    def __init__(self, trading_cache: Optional[TradingCache] = None):
+    def __init__(
+        self,
+        trading_cache: Optional[TradingCache] = None,
+        *,
+        kline_store: Optional[KlineStore] = None,
+        root: Union[os.PathLike, str, None] = None,
+        pipeline: Optional[FeaturePipeline] = None,
+        kline_fetcher: Optional[Callable[[str, str, int], Any]] = None,
+        fetch_bars: int = 1000,
+    ):
         self.trading_cache = trading_cache or TradingCache()
+        self.klines = kline_store or KlineStore()
+        # ``(symbol, interval, bars)`` -> downloads candles into ``self.klines``.
+        self.kline_fetcher = kline_fetcher
+        self.fetch_bars = int(fetch_bars)
+        self.root = Path(root) if root is not None else default_feature_root()
+        self.pipeline = pipeline or FeaturePipeline()
         self.feature_cache: Dict[str, Dict[str, Any]] = {}
         self.prediction_cache: Dict[str, Dict[str, Any]] = {}
         self.feature_versions: Dict[str, str] = {}  # Track feature versions
+        self.predictors: Dict[str, Predictor] = {}
         self.executor = ThreadPoolExecutor(max_workers=4)
+        self._lock = threading.Lock()
+        self._series_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._arrays: Dict[Tuple[str, str], Tuple[Any, np.ndarray]] = {}
         self.metrics: Dict[str, Union[int, float]] = {
             "features_precomputed": 0,
             "predictions_precomputed": 0,
             "cache_hits": 0,
             "cache_misses": 0,
             "computation_time": 0.0,
+            "store_hits": 0,
+            "store_misses": 0,
+            "bars_computed": 0,
+            "full_rebuilds": 0,
+            "feature_compute_time": 0.0,
+        }
+
+    # ------------------------------------------------------------ persistence
+    @property
+    def version_dir(self) -> Path:
+        return self.root / self.pipeline.version
+
+    def path(self, symbol: str, timeframe: str, suffix: str = ".npy") -> Path:
+        return self.version_dir / symbol.upper() / f"{timeframe}{suffix}"
+
+    def load(self, symbol: str, timeframe: str) -> Optional[np.ndarray]:
+        """The persisted feature matrix (memory-mapped, read-only), or ``None``."""
+        key = (symbol.upper(), timeframe)
+        path = self.path(symbol, timeframe)
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._arrays.get(key)
+            if cached is not None and cached[0] == signature:
+                return cached[1]
+        try:
+            data = np.load(path, mmap_mode="r")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable feature file {path}: {e}")
+            return None
+        if data.ndim != 2 or data.shape[1] != len(self.pipeline.columns):
+            return None
+        with self._lock:
+            self._arrays[key] = (signature, data)
+        return data
+
+    def frame(self, symbol: str, timeframe: str) -> Optional[pd.DataFrame]:
+        """Persisted features as a DataFrame viewing the memory map."""
+        data = self.load(symbol, timeframe)
+        if data is None:
+            return None
+        return pd.DataFrame(data, columns=list(self.pipeline.columns), copy=False)
+
+    def latest(self, symbol: str, timeframe: str) -> Optional[Dict[str, Any]]:
+        data = self.load(symbol, timeframe)
+        if data is None or not len(data):
+            return None
+        return self._row_dict(data[-1])
+
+    def materialize(
+        self,
+        symbol: str,
+        timeframe: str,
+        candles: Optional[np.ndarray] = None,
+        *,
+        rebuild: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Bring the persisted features up to date with the candles.
+
+        Args:
+            symbol: Trading symbol
+            timeframe: Timeframe
+            candles: ``(n, 6)`` candles sorted by open time (defaults to the
+                full ``KlineStore`` history)
+            rebuild: Ignore the stored state and recompute every row
+
+        Returns:
+            ``rows`` stored, ``computed`` new rows and whether it ``rebuilt``
+        """
+        if candles is None:
+            candles = self.klines.array(symbol, timeframe)
+        result = {"rows": 0, "computed": 0, "rebuilt": False}
+        if candles is None or not len(candles):
+            return result
+
+        with self._series_lock(symbol, timeframe):
+            existing = self.load(symbol, timeframe)
+            state = None if rebuild else self._read_state(symbol, timeframe)
+            start, bank = 0, None
+            if self._resumable(existing, state, candles):
+                start, bank = len(existing), state["bank"]
+            if start == len(candles):
+                self._count(store_hits=1)
+                result["rows"] = start
+                return result
+
+            started = time.perf_counter()
+            if bank is None:
+                bank = self.pipeline.new_bank()
+            rows = self.pipeline.compute(candles, start, bank)
+            matrix = np.concatenate([existing[:start], rows]) if start else rows
+            self._write(symbol, timeframe, matrix, bank)
+            elapsed = time.perf_counter() - started
+
+        result.update(rows=len(matrix), computed=len(rows), rebuilt=start == 0)
+        self._count(
+            store_misses=1,
+            bars_computed=len(rows),
+            full_rebuilds=int(start == 0),
+            feature_compute_time=elapsed,
+        )
+        return result
+
+    def register_model(self, model_name: str, predictor: Predictor) -> None:
+        """Precompute ``predictor(features)`` for every materialised series."""
+        self.predictors[model_name] = predictor
+
+    def _series_lock(self, symbol: str, timeframe: str) -> threading.Lock:
+        with self._lock:
+            return self._series_locks.setdefault((symbol.upper(), timeframe), threading.Lock())
+
+    def _read_state(self, symbol: str, timeframe: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path(symbol, timeframe, ".state.pkl"), "rb") as handle:
+                state = pickle.load(handle)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding feature state for {symbol} {timeframe}: {e}")
+            return None
+        return state if isinstance(state, dict) else None
+
+    @staticmethod
+    def _resumable(
+        existing: Optional[np.ndarray],
+        state: Optional[Dict[str, Any]],
+        candles: np.ndarray,
+    ) -> bool:
+        """Stored rows are a prefix of ``candles`` and the state sits at their end.
+
+        A revised close on the last stored candle (it was still open when it
+        was stored) also fails the check and costs a rebuild.
+        """
+        if existing is None or state is None or not len(existing):
+            return False
+        done = len(existing)
+        return (
+            state.get("rows") == done
+            and state.get("open_time") == existing[-1, 0]
+            and isinstance(state.get("bank"), IndicatorBank)
+            and done <= len(candles)
+            # open_time and close of the first and last stored rows
+            and np.array_equal(candles[[0, done - 1]][:, [0, 4]], existing[[0, -1]][:, :2])
+        )
+
+    def _write(self, symbol: str, timeframe: str, matrix: np.ndarray, bank: IndicatorBank) -> None:
+        target = self.path(symbol, timeframe)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        manifest = self.version_dir / "pipeline.json"
+        if not manifest.exists():
+            self._replace(manifest, lambda tmp: tmp.write_text(json.dumps(self.pipeline.spec, indent=2)))
+        # Features first: a state that lags its matrix only forces a rebuild.
+        self._replace(target, lambda tmp: np.save(tmp, np.ascontiguousarray(matrix)))
+        state = {"rows": len(matrix), "open_time": float(matrix[-1, 0]), "bank": bank}
+        self._replace(
+            self.path(symbol, timeframe, ".state.pkl"),
+            lambda tmp: tmp.write_bytes(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)),
+        )
+        with self._lock:
+            self._arrays.pop((symbol.upper(), timeframe), None)
+
+    @staticmethod
+    def _replace(target: Path, write: Callable[[Path], Any]) -> None:
+        tmp = target.with_name(f"{target.name}.tmp.{os.getpid()}.{threading.get_ident()}{target.suffix}")
+        try:
+            write(tmp)
+            os.replace(tmp, target)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def _count(self, **deltas: Union[int, float]) -> None:
+        with self._lock:
+            for name, delta in deltas.items():
+                self.metrics[name] += delta
+
+    def _row_dict(self, row: np.ndarray) -> Dict[str, Any]:
+        """Finite values of one feature row; warm-up NaNs are left out."""
+        return {
+            name: value
+            for name, value in zip(self.pipeline.columns, row.tolist())
+            if np.isfinite(value)
         }
 
+    @staticmethod
+    def _candles(market_data: pd.DataFrame) -> np.ndarray:
+        """``(n, 6)`` candles in ``KlineStore`` column order from an OHLCV frame."""
+        frame = market_data
+        if list(frame.columns) == list(KLINE_COLUMNS):
+            return frame.to_numpy(dtype=np.float64, copy=False)
+        if not {"open_time", "timestamp", "date"} & set(frame.columns):
+            frame = frame.assign(open_time=np.arange(len(frame), dtype=np.float64))
+        return candles_from_frame(frame)
+
     def precompute_features(
         self,
         symbols: List[str],
@@ -130,19 +463,25 @@ class FeatureStore:
         """
         cache_key = f"features:{symbol}:{timeframe}"
 
-        # Check version compatibility
-        if feature_version and self.feature_versions.get(cache_key) != feature_version:
-            logger.debug(f"Version mismatch for {cache_key}: requested {feature_version}, have {self.feature_versions.get(cache_key)}")
-            return None
-
-        # Try cache first
-        cached = self.trading_cache.get_technical_indicators(symbol, timeframe)
-        if cached:
-            self.metrics["cache_hits"] += 1
-            return cached
+        # Check version compatibility; the pipeline's own version is on disk
+        cached_version = self.feature_versions.get(cache_key)
+        if feature_version and cached_version != feature_version:
+            if feature_version != self.pipeline.version:
+                logger.debug(f"Version mismatch for {cache_key}: requested {feature_version}, have {cached_version}")
+                return None
+        else:
+            # Try cache first
+            cached = self.trading_cache.get_technical_indicators(symbol, timeframe)
+            if cached:
+                self.metrics["cache_hits"] += 1
+                return cached
 
         self.metrics["cache_misses"] += 1
-        return None
+
+        # Fall back to the last persisted row
+        latest = self.latest(symbol, timeframe)
+        self._count(**{"store_hits" if latest else "store_misses": 1})
+        return latest
 
     def get_predictions(
         self,
@@ -174,7 +513,7 @@ class FeatureStore:
         except Exception as e:
             logger.warning(f"Redis prediction cache error: {e}")
 
-        return None
+        return self.prediction_cache.get(cache_key)
 
     def invalidate_features(self, symbol: Optional[str] = None, timeframe: Optional[str] = None) -> int:
         """
@@ -219,6 +558,8 @@ class FeatureStore:
             "metrics": self.metrics.copy(),
             "cache_stats": self.trading_cache.get_cache_stats() if self.trading_cache else {},
             "feature_versions": self.feature_versions.copy(),
+            "pipeline_version": self.pipeline.version,
+            "feature_root": str(self.version_dir),
         }
 
         # Calculate cache efficiency
@@ -228,6 +569,15 @@ class FeatureStore:
         else:
             status["cache_efficiency"] = 0
 
+        store_requests = status["metrics"]["store_hits"] + status["metrics"]["store_misses"]
+        status["store_efficiency"] = (
+            status["metrics"]["store_hits"] / store_requests if store_requests else 0
+        )
+        computed = status["metrics"]["bars_computed"]
+        status["compute_ms_per_bar"] = (
+            status["metrics"]["feature_compute_time"] * 1000 / computed if computed else 0
+        )
+
         return status
 
     def _precompute_symbol_timeframe(
@@ -250,10 +600,11 @@ class FeatureStore:
         }
 
         try:
-            # Check if already cached and not forcing refresh
+            # Skip when the cached row already covers the last stored candle
             if not force_refresh:
-                existing_features = self.get_features(symbol, timeframe)
-                if existing_features:
+                cached = self.trading_cache.get_technical_indicators(symbol, timeframe)
+                bounds = self.klines.bounds(symbol, timeframe)
+                if cached and bounds and cached.get("open_time") == bounds[1]:
                     result["cache_hit"] = 1
                     return result
 
@@ -263,8 +614,10 @@ class FeatureStore:
                 result["error"] = "Insufficient market data"
                 return result
 
-            # Compute features
-            features = self._calculate_all_features(market_data)
+            # Compute (only the new bars) and persist features
+            features = self._calculate_all_features(
+                market_data, symbol, timeframe, rebuild=force_refresh
+            )
             if features:
                 # Cache features
                 success = self.trading_cache.set_technical_indicators(
@@ -274,7 +627,7 @@ class FeatureStore:
                     result["features_computed"] = 1
                     self.feature_versions[f"features:{symbol}:{timeframe}"] = self._get_feature_version()
 
-            # Precompute predictions for common models
+            # Precompute predictions for registered models
             predictions_computed = self._precompute_predictions(symbol, timeframe, features)
             result["predictions_computed"] = predictions_computed
 
@@ -286,57 +639,49 @@ class FeatureStore:
 
     def _load_market_data(self, symbol: str, timeframe: str) -> Optional[pd.DataFrame]:
         """
-        Load market data for feature computation.
+        Load stored candles for feature computation.
 
-        In a real implementation, this would load from database or API.
+        The frame views the ``KlineStore`` memory map. A series the store
+        does not hold is downloaded through ``kline_fetcher`` when one is
+        set; ``None`` when there are still no candles on disk.
         """
         try:
-            # Placeholder - in real implementation, load from database
-            # For now, return mock data structure
-            return pd.DataFrame({
-                'timestamp': pd.date_range('2024-01-01', periods=100, freq='1H'),
-                'open': np.random.uniform(40000, 50000, 100),
-                'high': np.random.uniform(40000, 50000, 100),
-                'low': np.random.uniform(40000, 50000, 100),
-                'close': np.random.uniform(40000, 50000, 100),
-                'volume': np.random.uniform(100, 1000, 100),
-            })
+            data = self.klines.array(symbol, timeframe)
+            if (data is None or not len(data)) and self.kline_fetcher is not None:
+                self.kline_fetcher(symbol, timeframe, self.fetch_bars)
+                data = self.klines.array(symbol, timeframe)
+            if data is None or not len(data):
+                return None
+            return pd.DataFrame(data, columns=list(KLINE_COLUMNS), copy=False)
         except Exception as e:
             logger.error(f"Error loading market data for {symbol} {timeframe}: {e}")
             return None
 
-    def _calculate_all_features(self, market_data: pd.DataFrame) -> Dict[str, Any]:
+    def _calculate_all_features(
+        self,
+        market_data: pd.DataFrame,
+        symbol: Optional[str] = None,
+        timeframe: Optional[str] = None,
+        *,
+        rebuild: bool = False,
+    ) -> Dict[str, Any]:
         """
-        Calculate all technical features from market data.
+        Calculate the latest feature row from OHLCV market data.
 
-        This is a simplified version - in practice, this would use
-        the IncrementalIndicatorCalculator for efficiency.
+        With ``symbol`` and ``timeframe`` the persisted series is brought up
+        to date through ``materialize`` (computing only new bars unless
+        ``rebuild``); without them the pipeline runs over ``market_data``
+        without touching disk.
         """
         try:
-            features = {}
-
-            # Basic price features
-            features['close'] = market_data['close'].iloc[-1]
-            features['volume'] = market_data['volume'].iloc[-1]
-            features['returns'] = market_data['close'].pct_change().iloc[-1]
-
-            # Simple moving averages
-            for period in [5, 10, 20, 50]:
-                if len(market_data) >= period:
-                    features[f'sma_{period}'] = market_data['close'].rolling(period).mean().iloc[-1]
-
-            # RSI (simplified)
-            if len(market_data) >= 14:
-                delta = market_data['close'].diff()
-                gain = (delta.where(delta > 0, 0)).rolling(14).mean()
-                loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-                rs = gain / loss
-                features['rsi_14'] = 100 - (100 / (1 + rs)).iloc[-1]
-
-            # Volatility
-            features['volatility'] = market_data['close'].pct_change().rolling(20).std().iloc[-1]
-
-            return features
+            candles = self._candles(market_data)
+            if not len(candles):
+                return {}
+            if symbol and timeframe:
+                self.materialize(symbol, timeframe, candles, rebuild=rebuild)
+                return self.latest(symbol, timeframe) or {}
+            rows = self.pipeline.compute(candles, 0, self.pipeline.new_bank())
+            return self._row_dict(rows[-1])
 
         except Exception as e:
             logger.error(f"Error calculating features: {e}")
@@ -349,59 +694,37 @@ class FeatureStore:
         features: Dict[str, Any]
     ) -> int:
         """
-        Precompute predictions for common models.
+        Precompute predictions for the registered models.
 
         Returns:
             Number of predictions computed
         """
-        if not features:
+        if not features or not self.predictors:
             return 0
 
         computed = 0
-        model_names = ['rf', 'gb', 'ensemble']
-
-        for model_name in model_names:
+        for model_name, predictor in list(self.predictors.items()):
             try:
-                # Mock prediction - in real implementation, load actual models
-                prediction = self._mock_predict(model_name, features)
+                prediction = predictor(features)
+                prediction.setdefault("model", model_name)
+                prediction.setdefault("open_time", features.get("open_time"))
 
                 # Cache prediction
                 cache_key = f"pred:{model_name}:{symbol}:{timeframe}"
+                self.prediction_cache[cache_key] = prediction
+                computed += 1
                 if hasattr(self.trading_cache, 'redis_client') and self.trading_cache.redis_client:
                     serialized = pickle.dumps(prediction)
                     self.trading_cache.redis_client.setex(cache_key, 300, serialized)  # 5 minutes
-                    computed += 1
 
             except Exception as e:
                 logger.warning(f"Prediction precomputation failed for {model_name}: {e}")
 
         return computed
 
-    def _mock_predict(self, model_name: str, features: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Mock prediction function.
-
-        In real implementation, this would load and use actual ML models.
-        """
-        # Generate mock prediction based on features
-        base_signal = np.random.random()
-
-        # Bias based on some features
-        if features.get('rsi_14', 50) < 30:
-            base_signal += 0.3  # Oversold bias
-        elif features.get('rsi_14', 50) > 70:
-            base_signal -= 0.3  # Overbought bias
-
-        return {
-            'signal': 'BUY' if base_signal > 0.6 else 'SELL' if base_signal < 0.4 else 'HOLD',
-            'confidence': min(abs(base_signal - 0.5) * 2, 1.0),
-            'timestamp': time.time(),
-            'model': model_name,
-        }
-
     def _get_feature_version(self) -> str:
         """Get current feature version for cache invalidation."""
-        return "v1.0"  # In real implementation, this would be dynamic
+        return self.pipeline.version
 
     def _update_metrics(self, results: Dict[str, Any]):
         """Update internal metrics."""
@@ -426,4 +749,11 @@ class FeatureStore:
         # In a real implementation, this would integrate with a scheduler
         # For now, just log the schedule
         logger.info(f"📅 Precomputation scheduled for {schedule_time} daily: "
-                   f"{len(symbols)} symbols × {len(timeframes)} timeframes")
\ No newline at end of file
+                   f"{len(symbols)} symbols × {len(timeframes)} timeframes")
+
+__all__ = [
+    "FEATURE_REVISION",
+    "FeaturePipeline",
+    "FeatureStore",
+    "default_feature_root",
+]
@@ -163,6 +163,49 @@ class UserPortfolio(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 
+ACTIVE_SUBSCRIPTION_STATUSES = frozenset({"trialing", "active"})
+
+
+def compute_subscription_status(
+    status: str | None,
+    *,
+    trial_end: datetime | None = None,
+    current_period_end: datetime | None = None,
+    cancel_at_period_end: bool | None = False,
+    auto_renew: bool | None = True,
+    canceled_at: datetime | None = None,
+    plan_type: str | None = None,
+    now: datetime | None = None,
+) -> str:
+    """Effective subscription status from raw column values.
+
+    Shared by ``UserSubscription.computed_status`` and queries that select the
+    columns directly (e.g. the auto-trading eligibility index) so both agree.
+    """
+    now = now or datetime.utcnow()
+    status = status or "trialing"
+
+    if status == "trialing" and trial_end:
+        if now >= trial_end:
+            if plan_type == "trial":
+                status = "expired"
+            else:
+                status = "active"
+
+    if status in ACTIVE_SUBSCRIPTION_STATUSES and cancel_at_period_end and current_period_end:
+        if now >= current_period_end:
+            status = "canceled"
+
+    if status == "active" and current_period_end and not auto_renew:
+        if now >= current_period_end:
+            status = "expired"
+
+    if canceled_at and status not in {"expired", "canceled"}:
+        status = "canceled"
+
+    return status
+
+
 class SubscriptionPlan(db.Model):
     __tablename__ = "subscription_plan"
 
@@ -227,31 +270,20 @@ class UserSubscription(db.Model):
     @property
     def computed_status(self) -> str:
         now = datetime.utcnow()
-        status = self.status or "trialing"
-
-        if status == "trialing" and self.trial_end:
-            if now >= self.trial_end:
-                if self.plan and self.plan.plan_type == "trial":
-                    status = "expired"
-                else:
-                    status = "active"
-
-        if (
-            status in {"trialing", "active"}
-            and self.cancel_at_period_end
-            and self.current_period_end
-        ):
-            if now >= self.current_period_end:
-                status = "canceled"
-
-        if status == "active" and self.current_period_end and not self.auto_renew:
-            if now >= self.current_period_end:
-                status = "expired"
-
-        if self.canceled_at and status not in {"expired", "canceled"}:
-            status = "canceled"
-
-        return status
+        plan_type = None
+        if self.trial_end and now >= self.trial_end and self.plan:
+            # Only an elapsed trial depends on the plan; skip the lazy load otherwise.
+            plan_type = self.plan.plan_type
+        return compute_subscription_status(
+            self.status,
+            trial_end=self.trial_end,
+            current_period_end=self.current_period_end,
+            cancel_at_period_end=self.cancel_at_period_end,
+            auto_renew=self.auto_renew,
+            canceled_at=self.canceled_at,
+            plan_type=plan_type,
+            now=now,
+        )
 
     @property
     def is_trial(self) -> bool:
@@ -259,7 +291,7 @@ class UserSubscription(db.Model):
 
     @property
     def is_active(self) -> bool:
-        return self.computed_status in {"trialing", "active"}
+        return self.computed_status in ACTIVE_SUBSCRIPTION_STATUSES
 
     def to_dict(self):
         return {
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import random
+import threading
 import time
 from typing import Any, Optional
 
@@ -11,6 +12,7 @@ import json
 from flask import (
     Blueprint,
     current_app,
+    has_request_context,
     jsonify,
     make_response,
     redirect,
@@ -18,7 +20,13 @@ from flask import (
     request,
     url_for,
 )
-from flask_login import current_user, login_required
+from flask_login import current_user, login_required, login_user
+
+from app.services.dashboard_snapshots import (
+    CredentialStatusCache,
+    ensure_dashboard_snapshots,
+    supported_encodings,
+)
 
 
 dashboard_bp = Blueprint("dashboard_bp", __name__)
@@ -516,33 +524,51 @@ def api_real_trading_status():
     )
 
 
-@dashboard_bp.route("/api/dashboard", endpoint="api_dashboard_overview")
-@login_required
-def api_dashboard_overview():
-    ctx = _get_ai_bot_context()
+def _credential_status_cache(ctx: dict[str, Any]) -> CredentialStatusCache | None:
+    status_fn = ctx.get("get_binance_credential_status")
+    if not callable(status_fn):
+        return None
+    app = current_app._get_current_object()
+    cache = app.extensions.get("dashboard_credential_status")
+    if cache is None or cache.status_fn is not status_fn:
+        store = ensure_dashboard_snapshots(app)
+
+        def _runner(job):
+            def _in_app_context():
+                with app.app_context():
+                    job()
+
+            threading.Thread(
+                target=_in_app_context, name="CredentialStatusRefresh", daemon=True
+            ).start()
+
+        cache = CredentialStatusCache(
+            status_fn,
+            interval=app.config.get("DASHBOARD_CREDENTIAL_REFRESH_SECONDS", 60.0),
+            on_update=store.invalidate,
+            runner=_runner,
+        )
+        app.extensions["dashboard_credential_status"] = cache
+    return cache
+
+
+def _build_overview_payload(
+    ctx: dict[str, Any], user_id: int, user_info: dict[str, Any]
+) -> dict[str, Any]:
     dashboard_data = _get_dashboard_data(ctx)
     indicator_options = ctx.get("indicator_signal_options", [])
 
     get_all_selections = ctx.get("get_all_indicator_selections")
     indicator_selections = get_all_selections() if callable(get_all_selections) else {}
 
+    # The connection check can hit the exchange, so it is refreshed in the
+    # background and served from memory here.
     binance_logs: list[dict[str, Any]] = []
     binance_credentials: dict[str, Any] = {}
-    status_fn = ctx.get("get_binance_credential_status")
-    if callable(status_fn):
+    status_cache = _credential_status_cache(ctx)
+    if status_cache is not None:
         try:
-            try:
-                status = status_fn(
-                    include_connection=True,
-                    include_logs=True,
-                    user_id=getattr(current_user, "id", None),
-                )
-            except TypeError:
-                status = status_fn(
-                    include_logs=True,
-                    user_id=getattr(current_user, "id", None),
-                )
-
+            status = status_cache.get(user_id or None)
             if isinstance(status, dict):
                 binance_credentials = status
                 raw_logs = status.get("logs", [])
@@ -557,10 +583,6 @@ def api_dashboard_overview():
     # sensitive dashboard sections from the current user's trader instances.
     ultimate_trader = None
     optimized_trader = None
-    try:
-        user_id = int(getattr(current_user, "id", 0) or 0)
-    except Exception:
-        user_id = 0
     if user_id:
         ultimate_trader, optimized_trader = _get_user_traders_from_market_service(
             ctx, user_id
@@ -593,39 +615,129 @@ def api_dashboard_overview():
             optimized_trader, ctx=ctx, dashboard_data=dashboard_data
         )
 
-    return jsonify(
-        {
-            "user": {
-                "username": getattr(current_user, "username", "unknown"),
-                "is_admin": getattr(current_user, "is_admin", False),
-            },
-            "system_status": system_status,
-            "performance": performance,
-            "portfolio": portfolio,
-            "last_update": dashboard_data.get("last_update"),
-            "optimized_system_status": optimized_system_status,
-            "optimized_performance": optimized_performance,
-            "optimized_portfolio": optimized_portfolio,
-            "safety_status": dashboard_data.get("safety_status", {}),
-            "optimized_safety_status": dashboard_data.get(
-                "optimized_safety_status", {}
-            ),
-            "real_trading_status": dashboard_data.get("real_trading_status", {}),
-            "optimized_real_trading_status": dashboard_data.get(
-                "optimized_real_trading_status", {}
-            ),
-            "backtest_results": dashboard_data.get("backtest_results", {}),
-            "journal_events": journal_events,
-            "futures_dashboard": dashboard_data.get("futures_dashboard", {}),
-            "futures_manual": dashboard_data.get("futures_manual", {}),
-            "indicator_options": indicator_options,
-            "indicator_selections": indicator_selections,
-            "binance_credentials": binance_credentials,
-            "binance_logs": binance_logs,
-            "ml_telemetry": dashboard_data.get("ml_telemetry", {}),
-            "health_report": dashboard_data.get("health_report", {}),
-        }
-    )
+    return {
+        "user": {
+            "username": user_info.get("username", "unknown"),
+            "is_admin": user_info.get("is_admin", False),
+        },
+        "system_status": system_status,
+        "performance": performance,
+        "portfolio": portfolio,
+        "last_update": dashboard_data.get("last_update"),
+        "optimized_system_status": optimized_system_status,
+        "optimized_performance": optimized_performance,
+        "optimized_portfolio": optimized_portfolio,
+        "safety_status": dashboard_data.get("safety_status", {}),
+        "optimized_safety_status": dashboard_data.get(
+            "optimized_safety_status", {}
+        ),
+        "real_trading_status": dashboard_data.get("real_trading_status", {}),
+        "optimized_real_trading_status": dashboard_data.get(
+            "optimized_real_trading_status", {}
+        ),
+        "backtest_results": dashboard_data.get("backtest_results", {}),
+        "journal_events": journal_events,
+        "futures_dashboard": dashboard_data.get("futures_dashboard", {}),
+        "futures_manual": dashboard_data.get("futures_manual", {}),
+        "indicator_options": indicator_options,
+        "indicator_selections": indicator_selections,
+        "binance_credentials": binance_credentials,
+        "binance_logs": binance_logs,
+        "ml_telemetry": dashboard_data.get("ml_telemetry", {}),
+        "health_report": dashboard_data.get("health_report", {}),
+    }
+
+
+def _snapshot_builder(app: Any):
+    """Builder for ``DashboardSnapshotStore`` bound to ``app``.
+
+    User-scoped context helpers (indicator selections, ...) resolve the user
+    through ``current_user``, so builds outside the user's own request (the
+    market cycle republishing snapshots) run in a request context with that
+    user loaded.
+    """
+
+    def _build(user_id: int, user_info: dict[str, Any]) -> dict[str, Any]:
+        if has_request_context() and getattr(current_user, "id", None) == user_id:
+            return _build_overview_payload(_get_ai_bot_context(), user_id, user_info)
+        loader = getattr(getattr(app, "login_manager", None), "user_callback", None)
+        if not callable(loader):
+            raise RuntimeError("No user loader to build dashboard snapshots")
+        with app.test_request_context("/api/dashboard"):
+            user = loader(str(user_id))
+            if user is None or not login_user(user, remember=False):
+                raise LookupError(f"user {user_id} not found or inactive")
+            return _build_overview_payload(_get_ai_bot_context(), user_id, user_info)
+
+    return _build
+
+
+@dashboard_bp.after_app_request
+def _invalidate_snapshot_after_write(response):
+    # A successful write by a user (toggles, selections, credentials, ...)
+    # must show up on that user's next dashboard poll; admin writes may
+    # affect anyone.
+    if request.method in ("GET", "HEAD", "OPTIONS") or response.status_code >= 400:
+        return response
+    store = current_app.extensions.get("dashboard_snapshots")
+    if store is None or not getattr(current_user, "is_authenticated", False):
+        return response
+    try:
+        if getattr(current_user, "is_admin", False):
+            store.invalidate()
+        else:
+            store.invalidate(int(current_user.id))
+    except Exception:
+        pass
+    return response
+
+
+def _negotiate_encoding(snapshot: Any, store: Any) -> str | None:
+    if len(snapshot.body) < store.compress_min_bytes:
+        return None
+    accepted = {
+        item.split(";", 1)[0].strip().lower()
+        for item in (request.headers.get("Accept-Encoding") or "").split(",")
+    }
+    for encoding in supported_encodings():
+        if encoding in accepted:
+            return encoding
+    return None
+
+
+@dashboard_bp.route("/api/dashboard", endpoint="api_dashboard_overview")
+@login_required
+def api_dashboard_overview():
+    ctx = _get_ai_bot_context()
+    try:
+        user_id = int(getattr(current_user, "id", 0) or 0)
+    except Exception:
+        user_id = 0
+    user_info = {
+        "username": getattr(current_user, "username", "unknown"),
+        "is_admin": getattr(current_user, "is_admin", False),
+    }
+
+    app = current_app._get_current_object()
+    store = ensure_dashboard_snapshots(app)
+    if not store.has_builder:
+        store.set_builder(_snapshot_builder(app))
+    snapshot = store.get_or_build(user_id, user_info) if user_id else None
+    if snapshot is None:
+        return jsonify(_build_overview_payload(ctx, user_id, user_info))
+
+    response = current_app.response_class(snapshot.body, mimetype="application/json")
+    response.set_etag(snapshot.etag)
+    response.headers["X-Dashboard-Version"] = str(snapshot.version)
+    response.headers["Vary"] = "Accept-Encoding, Cookie"
+    response = response.make_conditional(request)
+    if response.status_code == 200:
+        encoding = _negotiate_encoding(snapshot, store)
+        encoded = snapshot.encoded(encoding) if encoding else None
+        if encoded is not None:
+            response.set_data(encoded)
+            response.headers["Content-Encoding"] = encoding
+    return response
 
 
 @dashboard_bp.route("/api/phases", endpoint="api_phases")
@@ -655,17 +767,36 @@ def api_phases():
 
     # Optional: filter to the current user's trading universe when available.
     # (Best-effort only; fall back to returning all phases.)
+    universe: set[str] | None = None
     if getattr(current_user, "is_authenticated", False) and phases:
         get_universe = ctx.get("get_user_trading_universe")
         if callable(get_universe):
             try:
-                universe = set(get_universe(current_user) or [])
+                universe = set(get_universe(current_user) or []) or None
                 if universe:
                     phases = {sym: payload for sym, payload in phases.items() if sym in universe}
             except Exception:
-                pass
+                universe = None
 
-    return jsonify({"phase_order": phase_order, "phases": phases, "timestamp": time.time()})
+    # Rolling p50/p95/p99 wall times per phase, per symbol and per cycle.
+    timings: dict[str, Any] = {}
+    timings_fn = getattr(market_service, "get_phase_timings", None)
+    if callable(timings_fn):
+        try:
+            timings = timings_fn(symbols=universe) or {}
+        except Exception:
+            timings = {}
+        if not isinstance(timings, dict):
+            timings = {}
+
+    return jsonify(
+        {
+            "phase_order": phase_order,
+            "phases": phases,
+            "timings": timings,
+            "timestamp": time.time(),
+        }
+    )
 
 
 @dashboard_bp.route("/api/performance", endpoint="api_performance_metrics")
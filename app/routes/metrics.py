@@ -1,8 +1,9 @@
 """Analytic endpoints for journal, backtests, and market data."""
 from __future__ import annotations
 
+import hashlib
+import json
 import time
-from datetime import datetime
 from typing import Any, Iterable
 
 from flask import Blueprint, current_app, jsonify, request, session
@@ -12,7 +13,15 @@ from app.auth.decorators import subscription_required
 
 from app.models import User, UserTrade
 from app.runtime import symbols
-from app.services.pathing import resolve_profile_path, safe_parse_datetime
+from app.services.pathing import resolve_profile_path
+from app.services.trade_pages import (
+    OrderedTradeIndex,
+    TradeKey,
+    clamp_page_size,
+    count_user_trades,
+    merge_pages,
+    user_trade_stream,
+)
 from pathlib import Path
 
 
@@ -350,10 +359,15 @@ def api_trades():
     if not trader:
         return jsonify({"error": f"Trader for mode '{mode}' is unavailable"}), 503
 
-    page = request.args.get("page", 1, type=int)
+    page = max(1, request.args.get("page", 1, type=int) or 1)
+    per_page = clamp_page_size(request.args.get("per_page"))
     symbol = request.args.get("symbol")
     days = request.args.get("days", type=int)
     execution_mode = request.args.get("execution_mode")
+    try:
+        after = TradeKey.decode(request.args.get("cursor"))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
 
     filters: dict[str, Any] = {}
     if symbol:
@@ -366,20 +380,6 @@ def api_trades():
     elif default_real_only:
         filters["execution_mode"] = "real"
 
-    try:
-        trades = trader.trade_history.get_trade_history(filters)
-    except Exception as exc:  # pragma: no cover - runtime defensive log
-        print(f"❌ Error fetching trade history: {exc}")
-        return jsonify({"error": str(exc)}), 500
-
-    # Ensure consistent ordering using parsed datetimes (service also sorts,
-    # but apply here defensively in case merged logic altered ordering).
-    trades.sort(key=lambda x: (safe_parse_datetime(x.get("timestamp")) or datetime.min), reverse=True)
-
-    per_page = 20
-    start_idx = (page - 1) * per_page
-    paginated = trades[start_idx : start_idx + per_page]
-
     # Optional: merge DB `UserTrade` rows into the response for admin users
     merge_db = str(request.args.get("merge_db", "")).lower() in ("1", "true", "yes")
     try:
@@ -434,54 +434,56 @@ def api_trades():
         if not user or not getattr(user, "is_admin", False):
             return jsonify({"error": "Admin privileges required for merged view"}), 403
 
-        db_trades = []
-        q = UserTrade.query
-        if symbol:
-            q = q.filter_by(symbol=symbol)
-        for ut in q.order_by(UserTrade.timestamp.desc()).limit(200).all():
-            db_trades.append(
-                {
-                    "db_id": ut.id,
-                    "symbol": ut.symbol,
-                    "side": ut.side,
-                    "quantity": ut.quantity,
-                    "price": ut.entry_price,
-                    "type": ut.trade_type,
-                    "status": ut.status,
-                    "signal": ut.signal_source,
-                    "confidence": ut.confidence_score,
-                    "timestamp": ut.timestamp.isoformat() if ut.timestamp else None,
-                    "source": "db",
-                    "user_id": ut.user_id,
-                }
-            )
-
-        # Combine and re-paginate
-        combined = trades + db_trades
-        combined.sort(key=lambda x: (safe_parse_datetime(x.get("timestamp")) or datetime.min), reverse=True)
-        start_idx = (page - 1) * per_page
-        paginated = combined[start_idx : start_idx + per_page]
+    # Filtering and ordering happen in the storage layer: the journal index
+    # keeps trades sorted and the DB query carries the keyset condition, so a
+    # page costs O(page) instead of re-sorting the whole history.
+    history = trader.trade_history
+    try:
+        build_index = getattr(history, "trade_index", None)
+        if callable(build_index):
+            index = build_index()
+        else:
+            index = OrderedTradeIndex(history.get_trade_history(filters))
+        streams = [index.stream(filters, after=after)]
+        total_trades = index.count(filters)
+        if merge_db:
+            streams.append(user_trade_stream(filters, after=after, batch_size=per_page + 1))
+            total_trades += count_user_trades(filters)
+        offset = 0 if after is not None else (page - 1) * per_page
+        paginated, last_key, has_more = merge_pages(streams, limit=per_page, offset=offset)
+    except Exception as exc:  # pragma: no cover - runtime defensive log
+        print(f"❌ Error fetching trade history: {exc}")
+        return jsonify({"error": str(exc)}), 500
 
     for trade in paginated:
         for key, value in list(trade.items()):
             if isinstance(value, float):
                 trade[key] = round(value, 4)
 
-    return jsonify(
-        {
-            "trades": paginated,
-            "total_trades": len(trades),
-            "current_page": page,
-            "total_pages": max(1, (len(trades) + per_page - 1) // per_page),
-            "per_page": per_page,
-            "mode": mode,
-            "execution_mode": filters.get(
-                "execution_mode", "all" if not default_real_only else "real"
-            ),
-            "real_only_default": default_real_only,
-            "timestamp": time.time(),
-        }
-    )
+    body = {
+        "trades": paginated,
+        "total_trades": total_trades,
+        "current_page": page,
+        "total_pages": max(1, (total_trades + per_page - 1) // per_page),
+        "per_page": per_page,
+        "next_cursor": last_key.encode() if has_more and last_key is not None else None,
+        "has_more": has_more,
+        "mode": mode,
+        "execution_mode": filters.get(
+            "execution_mode", "all" if not default_real_only else "real"
+        ),
+        "real_only_default": default_real_only,
+    }
+    response = jsonify({**body, "timestamp": time.time()})
+    # The ETag covers the page content only (not the response timestamp), so
+    # pollers get a 304 while nothing on their page changed.
+    response.set_etag(_payload_etag(body))
+    return response.make_conditional(request)
+
+
+def _payload_etag(payload: Any) -> str:
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha1(encoded).hexdigest()
 
 
 @metrics_bp.route("/api/debug/merged_auth")
@@ -528,8 +530,6 @@ def api_debug_trade_files():
             if not fpath.exists():
                 return 0
             try:
-                import json
-
                 with fpath.open("r", encoding="utf-8") as fh:
                     data = json.load(fh)
                     if isinstance(data, list):
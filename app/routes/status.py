@@ -1,19 +1,17 @@
 """Status and health endpoints."""
 from __future__ import annotations
 
-import shutil
 import time
 from copy import deepcopy
 from datetime import datetime, timezone
 
-import requests
 from flask import Blueprint, current_app, jsonify, Response, render_template
 from flask_login import login_required
 import os
 import json
 from prometheus_client import generate_latest
 
-from app.extensions import db
+from app.services.health_probe import ensure_health_prober
 from app.services.pathing import resolve_profile_path
 
 
@@ -71,39 +69,10 @@ def health_check():
         ctx = None
         version = "TEST_MODE_AI_TRADER_V4.0"
 
-    # Check Binance API latency
-    binance_status = "error"
-    binance_latency_ms = None
-    binance_testnet_status = "error"
-    binance_testnet_latency_ms = None
-
-    try:
-        # Check mainnet API
-        start_time = time.time()
-        response = requests.get("https://api.binance.com/api/v3/time", timeout=5)
-        if response.status_code == 200:
-            binance_status = "ok"
-            binance_latency_ms = round((time.time() - start_time) * 1000, 2)
-    except Exception:
-        pass
-
-    try:
-        # Check testnet API
-        start_time = time.time()
-        response = requests.get("https://testnet.binance.vision/api/v3/time", timeout=5)
-        if response.status_code == 200:
-            binance_testnet_status = "ok"
-            binance_testnet_latency_ms = round((time.time() - start_time) * 1000, 2)
-    except Exception:
-        pass
-
-    # Check database connection pool status
-    db_status = "error"
-    try:
-        db.session.execute(db.text("SELECT 1"))
-        db_status = "ok"
-    except Exception:
-        pass
+    # Dependency checks come from the background prober's cached snapshot,
+    # so this handler never waits on the exchange, the database or psutil.
+    prober = ensure_health_prober(current_app._get_current_object())
+    dependencies = prober.snapshot()
 
     # Check background worker heartbeat with more detail
     try:
@@ -130,91 +99,67 @@ def health_check():
             pass
         worker_status = f"error:{type(exc).__name__}"
 
-    # Check available disk space
-    disk_status = "error"
-    disk_free_gb = None
-    try:
-        total, used, free = shutil.disk_usage("/")
-        disk_free_gb = round(free / (1024**3), 2)
-        disk_status = "ok" if free > 1024**3 else "low"  # Low if less than 1GB
-    except Exception:
-        pass
-
-    # Check memory usage
-    memory_status = "ok"
-    memory_usage_percent = None
-    try:
-        import psutil
-
-        memory = psutil.virtual_memory()
-        memory_usage_percent = round(memory.percent, 1)
-        memory_status = "high" if memory.percent > 90 else "ok"
-    except ImportError:
-        memory_status = "unknown"
-    except Exception:
-        memory_status = "error"
-
-    # Check CPU usage
-    cpu_status = "ok"
-    cpu_usage_percent = None
-    try:
-        import psutil
-
-        cpu_usage_percent = round(psutil.cpu_percent(interval=1), 1)
-        cpu_status = "high" if cpu_usage_percent > 95 else "ok"
-    except ImportError:
-        cpu_status = "unknown"
-    except Exception:
-        cpu_status = "error"
-
-    # Determine overall status
-    checks = [
-        binance_status,
-        db_status,
-        worker_status,
-        disk_status,
-        memory_status,
-        cpu_status,
+    checks = {
+        name: dependencies.get(name, {"status": "pending"})
+        for name in (
+            "binance_api",
+            "binance_testnet_api",
+            "database",
+        )
+    }
+    checks["background_worker"] = {"status": worker_status}
+    for name in ("disk_space", "memory", "cpu"):
+        checks[name] = dependencies.get(name, {"status": "pending"})
+
+    # Determine overall status (testnet reachability is informational only)
+    statuses = [
+        checks[name]["status"]
+        for name in (
+            "binance_api",
+            "database",
+            "background_worker",
+            "disk_space",
+            "memory",
+            "cpu",
+        )
     ]
-    overall_status = (
-        "healthy"
-        if all(status in ("ok", "unknown") for status in checks)
-        else "unhealthy"
-    )
+    # A dependency the prober has not reached yet is unverified, not healthy:
+    # report "starting" until every required check has a real result.
+    if any(status not in ("ok", "unknown", "pending") for status in statuses):
+        overall_status = "unhealthy"
+    elif "pending" in statuses:
+        overall_status = "starting"
+    else:
+        overall_status = "healthy"
 
     return jsonify(
         {
             "status": overall_status,
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "version": version,
-            "checks": {
-                "binance_api": {
-                    "status": binance_status,
-                    "latency_ms": binance_latency_ms,
-                },
-                "binance_testnet_api": {
-                    "status": binance_testnet_status,
-                    "latency_ms": binance_testnet_latency_ms,
-                },
-                "database": {
-                    "status": db_status,
-                },
-                "background_worker": {
-                    "status": worker_status,
-                },
-                "disk_space": {
-                    "status": disk_status,
-                    "free_gb": disk_free_gb,
-                },
-                "memory": {
-                    "status": memory_status,
-                    "usage_percent": memory_usage_percent,
-                },
-                "cpu": {
-                    "status": cpu_status,
-                    "usage_percent": cpu_usage_percent,
-                },
-            },
+            "stale_checks": sorted(
+                name for name, check in checks.items() if check.get("stale")
+            ),
+            "pending_checks": sorted(
+                name
+                for name, check in checks.items()
+                if check.get("status") == "pending"
+            ),
+            "checks": checks,
+        }
+    )
+
+
+@status_bp.route("/health/live")
+def health_live():
+    """Liveness probe: answers as long as the process serves requests."""
+    prober = current_app.extensions.get("health_prober")
+    return jsonify(
+        {
+            "status": "alive",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "uptime_seconds": prober.uptime_seconds() if prober is not None else None,
+            "prober_running": bool(prober is not None and prober.running),
         }
     )
 
@@ -229,6 +174,22 @@ def api_health_dashboard():
 
     with health_lock:
         payload = deepcopy(dashboard_data.get("health_report", {}))
+
+    report_age = None
+    last_refresh = payload.get("last_refresh") if isinstance(payload, dict) else None
+    if last_refresh:
+        try:
+            refreshed = datetime.fromisoformat(str(last_refresh))
+            if refreshed.tzinfo is None:
+                refreshed = refreshed.replace(tzinfo=timezone.utc)
+            report_age = round((datetime.now(timezone.utc) - refreshed).total_seconds(), 3)
+        except ValueError:
+            report_age = None
+    if isinstance(payload, dict):
+        payload["report_age_seconds"] = report_age
+        payload["dependencies"] = ensure_health_prober(
+            current_app._get_current_object()
+        ).snapshot()
     return jsonify(payload)
 
 
@@ -823,4 +784,14 @@ def api_resource_recommendations():
 
 @status_bp.route("/metrics")
 def metrics():
-    return Response(generate_latest(), mimetype="text/plain")
+    body = generate_latest().decode("utf-8")
+    market_service = _ctx().get("market_data_service")
+    render_phases = getattr(market_service, "render_phase_metrics", None)
+    if callable(render_phases):
+        try:
+            extra = render_phases()
+            if isinstance(extra, str):
+                body += extra
+        except Exception:
+            pass
+    return Response(body, mimetype="text/plain")
@@ -300,6 +300,14 @@ def api_toggle_trading():
     ultimate.trading_enabled = enable
     if optimized:
         optimized.trading_enabled = enable
+    try:
+        from app.services.control_state import get_control_state_bus
+
+        get_control_state_bus().publish(
+            getattr(ultimate, "persistence_profile", None), "trading_enabled", enable
+        )
+    except Exception:
+        pass
 
     system_status = dashboard_data.setdefault("system_status", {})
     system_status["trading_enabled"] = enable
@@ -125,6 +125,16 @@ def _update_state_file(field: str, value: Any, *, profile: str | None = None) ->
         print(f"⚠️ Failed to directly update state file: {exc}")
 
 
+def _publish_control_state(field: str, value: Any, *, profile: str | None = None) -> None:
+    """Push a toggle to live traders in every worker via the control-state bus."""
+    try:
+        from app.services.control_state import get_control_state_bus
+
+        get_control_state_bus().publish(profile, field, value)
+    except Exception as exc:  # pragma: no cover - best effort
+        print(f"⚠️ Failed to publish {field} toggle: {exc}")
+
+
 def _update_trading_config_state_file(
     field: str, value: Any, *, profile: str | None = None
 ) -> None:
@@ -786,6 +796,7 @@ def api_spot_toggle():
         )
 
         persistence_profile = getattr(ultimate_trader, "persistence_profile", None)
+        _publish_control_state("trading_enabled", enable, profile=persistence_profile)
         _update_state_file("trading_enabled", enable, profile=persistence_profile)
 
         # Diagnostic: log instance ids and flags so we can compare with persistence
@@ -977,6 +988,7 @@ def api_futures_toggle():
             enable if user_scoped else trading_config.get("futures_enabled", False)
         )
 
+        _publish_control_state("futures_trading_enabled", enable, profile=persistence_profile)
         _update_state_file("futures_trading_enabled", enable, profile=persistence_profile)
         if not user_scoped:
             _update_trading_config_state_file("futures_enabled", enable)
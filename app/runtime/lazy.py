@@ -0,0 +1,176 @@
+"""Lazy factories and staged-startup bookkeeping for the legacy runtime.
+
+``ai_ml_auto_bot_final`` used to import every optional library and build
+every subsystem at import time. The helpers here let it register heavy
+objects as lazy proxies that are resolved on first attribute access or call,
+and record how long each bootstrap stage took so ``scripts/startup_report.py``
+can show where boot time goes.
+"""
+from __future__ import annotations
+
+import importlib
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+_REPORT_LOCK = threading.Lock()
+_PROCESS_START = time.time()
+_STAGES: list[dict[str, Any]] = []
+_LAZY_OBJECTS: dict[str, "_LazyBase"] = {}
+
+_MISSING = object()
+
+
+class _LazyBase:
+    """Proxy that forwards attribute access and calls to a deferred target."""
+
+    __slots__ = ("_lazy_name", "_lazy_lock", "_lazy_target", "_lazy_resolve_seconds")
+
+    def __init__(self, name: str) -> None:
+        object.__setattr__(self, "_lazy_name", name)
+        object.__setattr__(self, "_lazy_lock", threading.RLock())
+        object.__setattr__(self, "_lazy_target", _MISSING)
+        object.__setattr__(self, "_lazy_resolve_seconds", None)
+        with _REPORT_LOCK:
+            _LAZY_OBJECTS[name] = self
+
+    def _lazy_create(self) -> Any:  # pragma: no cover - overridden
+        raise NotImplementedError
+
+    def _lazy_resolve(self) -> Any:
+        target = object.__getattribute__(self, "_lazy_target")
+        if target is not _MISSING:
+            return target
+        with object.__getattribute__(self, "_lazy_lock"):
+            target = object.__getattribute__(self, "_lazy_target")
+            if target is _MISSING:
+                started = time.perf_counter()
+                target = self._lazy_create()
+                object.__setattr__(self, "_lazy_target", target)
+                object.__setattr__(
+                    self, "_lazy_resolve_seconds", time.perf_counter() - started
+                )
+        return target
+
+    @property
+    def lazy_resolved(self) -> bool:
+        return object.__getattribute__(self, "_lazy_target") is not _MISSING
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._lazy_resolve(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._lazy_resolve(), name, value)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self._lazy_resolve()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        name = object.__getattribute__(self, "_lazy_name")
+        if self.lazy_resolved:
+            return repr(self._lazy_resolve())
+        return f"<lazy {name} (unresolved)>"
+
+
+class LazyImport(_LazyBase):
+    """Module (or module attribute) imported on first use.
+
+    ``before_import`` runs once right before the import, e.g. to select the
+    matplotlib backend.
+    """
+
+    __slots__ = ("_lazy_module", "_lazy_attr", "_lazy_before")
+
+    def __init__(
+        self,
+        module: str,
+        attr: Optional[str] = None,
+        *,
+        before_import: Optional[Callable[[], Any]] = None,
+    ) -> None:
+        object.__setattr__(self, "_lazy_module", module)
+        object.__setattr__(self, "_lazy_attr", attr)
+        object.__setattr__(self, "_lazy_before", before_import)
+        super().__init__(f"{module}.{attr}" if attr else module)
+
+    def _lazy_create(self) -> Any:
+        before = object.__getattribute__(self, "_lazy_before")
+        if before is not None:
+            before()
+        module = importlib.import_module(object.__getattribute__(self, "_lazy_module"))
+        attr = object.__getattribute__(self, "_lazy_attr")
+        return getattr(module, attr) if attr else module
+
+
+class LazyService(_LazyBase):
+    """Singleton subsystem built by ``factory`` on first attribute access."""
+
+    __slots__ = ("_lazy_factory",)
+
+    def __init__(self, name: str, factory: Callable[[], Any]) -> None:
+        object.__setattr__(self, "_lazy_factory", factory)
+        super().__init__(name)
+
+    def _lazy_create(self) -> Any:
+        return object.__getattribute__(self, "_lazy_factory")()
+
+
+def is_resolved(value: Any) -> bool:
+    """Return ``False`` only for lazy proxies that have not been built yet."""
+    if isinstance(value, _LazyBase):
+        return value.lazy_resolved
+    return True
+
+
+def resolve(value: Any) -> Any:
+    """Return the real object behind ``value`` (building it if needed)."""
+    if isinstance(value, _LazyBase):
+        return value._lazy_resolve()
+    return value
+
+
+@contextmanager
+def startup_stage(name: str) -> Iterator[None]:
+    """Time one bootstrap stage for the startup report."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        with _REPORT_LOCK:
+            _STAGES.append(
+                {"stage": name, "seconds": round(time.perf_counter() - started, 4)}
+            )
+
+
+def get_startup_report() -> dict[str, Any]:
+    """Summarise bootstrap stage timings and lazy subsystem resolution."""
+    with _REPORT_LOCK:
+        stages = [dict(stage) for stage in _STAGES]
+        lazy = {
+            name: {
+                "resolved": proxy.lazy_resolved,
+                "resolve_seconds": (
+                    round(object.__getattribute__(proxy, "_lazy_resolve_seconds"), 4)
+                    if object.__getattribute__(proxy, "_lazy_resolve_seconds") is not None
+                    else None
+                ),
+            }
+            for name, proxy in _LAZY_OBJECTS.items()
+        }
+    return {
+        "uptime_seconds": round(time.time() - _PROCESS_START, 3),
+        "stages": stages,
+        "stage_total_seconds": round(sum(s["seconds"] for s in stages), 4),
+        "lazy": lazy,
+    }
+
+
+__all__ = [
+    "LazyImport",
+    "LazyService",
+    "get_startup_report",
+    "is_resolved",
+    "resolve",
+    "startup_stage",
+]
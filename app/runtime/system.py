@@ -196,6 +196,32 @@ def initialize_runtime_from_context(context: Mapping[str, Any]) -> None:
         except Exception as exc:
             print(f"⚠️ Failed to initialize health monitor: {exc}")
 
+    if has_app_context():
+        try:
+            from app.services.health_probe import ensure_health_prober
+
+            ensure_health_prober(current_app._get_current_object())
+            print("✅ Dependency health prober started")
+        except Exception as exc:
+            print(f"⚠️ Failed to start dependency health prober: {exc}")
+
+        market_data_service = context.get("market_data_service")
+        hooks = getattr(market_data_service, "cycle_hooks", None)
+        if isinstance(hooks, list):
+            try:
+                from app.services.dashboard_snapshots import ensure_dashboard_snapshots
+
+                store = ensure_dashboard_snapshots(current_app._get_current_object())
+                if store.refresh_subscribed not in hooks:
+                    hooks.append(store.refresh_subscribed)
+            except Exception as exc:
+                print(f"⚠️ Failed to wire dashboard snapshots: {exc}")
+            realtime = context.get("realtime_update_service")
+            notify = getattr(realtime, "notify", None)
+            if callable(notify) and notify not in hooks:
+                # Push changed sections right after each market cycle.
+                hooks.append(notify)
+
     if signal_handler:
         try:
             signal.signal(signal.SIGINT, signal_handler)
@@ -3,11 +3,15 @@ from __future__ import annotations
 
 from .backtest import BacktestManager
 from .binance import BinanceCredentialService, BinanceCredentialStore, BinanceLogManager
+from .bar_store import Bar, BarStore, get_bar_store
 from .binance_market import BinanceMarketDataHelper
+from .control_state import ControlStateBus, get_control_state_bus
+from .dashboard_snapshots import DashboardSnapshotStore, ensure_dashboard_snapshots
 from .futures import FuturesManualService
 from .futures_market import FuturesMarketDataService
 from .futures_safety import FuturesSafetyService
 from .health import HealthReportService, evaluate_health_payload
+from .health_probe import HealthProber, ensure_health_prober
 from .live_portfolio import LivePortfolioScheduler
 from .market_data import MarketDataService
 from .ml import MLServiceBundle, create_ml_services
@@ -19,6 +23,7 @@ from .pathing import (
 )
 from .persistence import PersistenceScheduler, ProfessionalPersistence
 from .realtime import RealtimeUpdateService
+from .signal_context import SignalContext, get_signal_context
 from .trading import (
     BinanceFuturesTrader,
     RealBinanceTrader,
@@ -30,22 +35,35 @@ from .trading import (
 )
 from .timescaledb_service import TimescaleDBService
 from .trade_history import ComprehensiveTradeHistory
+from .user_accounts import UserAccountRegistry, UserAccountState
+from .user_eligibility import AutoTradingEligibilityIndex, get_eligibility_index
 
 __all__ = [
     "BacktestManager",
+    "Bar",
+    "BarStore",
+    "get_bar_store",
     "BinanceCredentialService",
     "BinanceCredentialStore",
     "BinanceLogManager",
     "BinanceMarketDataHelper",
+    "ControlStateBus",
+    "get_control_state_bus",
+    "DashboardSnapshotStore",
+    "ensure_dashboard_snapshots",
     "FuturesManualService",
     "FuturesMarketDataService",
     "HealthReportService",
     "evaluate_health_payload",
+    "HealthProber",
+    "ensure_health_prober",
     "LivePortfolioScheduler",
     "MarketDataService",
     "PersistenceScheduler",
     "ProfessionalPersistence",
     "RealtimeUpdateService",
+    "SignalContext",
+    "get_signal_context",
     "MLServiceBundle",
     "create_ml_services",
     "BOT_PROFILE",
@@ -61,4 +79,8 @@ __all__ = [
     "record_user_trade",
     "ComprehensiveTradeHistory",
     "TimescaleDBService",
+    "UserAccountRegistry",
+    "UserAccountState",
+    "AutoTradingEligibilityIndex",
+    "get_eligibility_index",
 ]
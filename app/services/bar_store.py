@@ -0,0 +1,213 @@
+"""Per-symbol OHLCV bar store fed from the market-data cycle.
+
+The trading loop used to keep only a bounded list of last prices per symbol,
+so anything that needed candles (the CRT pattern recogniser in particular)
+fabricated OHLC from closes with fixed multipliers. ``BarStore`` records the
+ticks the cycle actually observes and folds them into bars:
+
+* ``bar_seconds == 0`` (default) closes one bar per recorded tick. The bar
+  opens at the previous close, so moves between cycles show up as real
+  bodies; a single observation carries no intrabar range, so these bars have
+  no wicks.
+* ``bar_seconds > 0`` buckets ticks by wall-clock time; a bar is closed when
+  the first tick of the next bucket arrives, and its high/low are the
+  extremes of the ticks seen inside the bucket.
+
+Each bar records how many ticks built it (``ticks``) so consumers can tell
+wickless tick bars from bars with an observed range.
+
+Every closed bar gets a per-symbol, monotonically increasing ``seq`` so that
+stateful consumers can ask for "bars since N" and fold only what is new.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Optional
+
+
+@dataclass(frozen=True)
+class Bar:
+    """One closed OHLCV bar."""
+
+    seq: int
+    open_time: float
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float = 0.0
+    ticks: int = 1
+
+
+def _as_price(value: Any) -> Optional[float]:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if math.isnan(number) or math.isinf(number) or number <= 0:
+        return None
+    return number
+
+
+class BarStore:
+    """Bounded, thread-safe OHLCV history per symbol."""
+
+    def __init__(self, *, max_bars: int = 1000, bar_seconds: float = 0.0) -> None:
+        self.max_bars = max(2, int(max_bars))
+        self.bar_seconds = max(0.0, float(bar_seconds or 0.0))
+        self._lock = threading.Lock()
+        self._bars: dict[str, deque[Bar]] = {}
+        self._open: dict[str, dict[str, float]] = {}
+        self._next_seq: dict[str, int] = {}
+
+    def configure(self, *, max_bars: Optional[int] = None, bar_seconds: Optional[float] = None) -> None:
+        with self._lock:
+            if max_bars is not None and int(max_bars) != self.max_bars:
+                self.max_bars = max(2, int(max_bars))
+                for symbol, bars in self._bars.items():
+                    self._bars[symbol] = deque(bars, maxlen=self.max_bars)
+            if bar_seconds is not None:
+                self.bar_seconds = max(0.0, float(bar_seconds or 0.0))
+
+    def _close_bar(self, symbol: str, pending: dict[str, float]) -> Bar:
+        seq = self._next_seq.get(symbol, 0)
+        self._next_seq[symbol] = seq + 1
+        bar = Bar(
+            seq=seq,
+            open_time=pending["open_time"],
+            open=pending["open"],
+            high=pending["high"],
+            low=pending["low"],
+            close=pending["close"],
+            volume=pending["volume"],
+            ticks=int(pending["ticks"]),
+        )
+        bars = self._bars.get(symbol)
+        if bars is None:
+            bars = self._bars[symbol] = deque(maxlen=self.max_bars)
+        bars.append(bar)
+        return bar
+
+    def record_tick(
+        self,
+        symbol: str,
+        price: Any,
+        *,
+        volume: Any = 0.0,
+        timestamp: Optional[float] = None,
+    ) -> Optional[Bar]:
+        """Fold one observed price into the store; return the bar it closed."""
+        close = _as_price(price)
+        if close is None:
+            return None
+        try:
+            vol = max(0.0, float(volume or 0.0))
+        except (TypeError, ValueError):
+            vol = 0.0
+        now = float(timestamp) if timestamp is not None else time.time()
+        symbol = str(symbol).upper()
+
+        with self._lock:
+            if self.bar_seconds <= 0:
+                bars = self._bars.get(symbol)
+                open_price = bars[-1].close if bars else close
+                return self._close_bar(
+                    symbol,
+                    {
+                        "open_time": now,
+                        "open": open_price,
+                        "high": max(open_price, close),
+                        "low": min(open_price, close),
+                        "close": close,
+                        "volume": vol,
+                        "ticks": 1,
+                    },
+                )
+
+            bucket = math.floor(now / self.bar_seconds) * self.bar_seconds
+            pending = self._open.get(symbol)
+            closed = None
+            if pending is not None and bucket > pending["open_time"]:
+                closed = self._close_bar(symbol, pending)
+                pending = None
+            if pending is None:
+                bars = self._bars.get(symbol)
+                open_price = bars[-1].close if bars else close
+                self._open[symbol] = {
+                    "open_time": bucket,
+                    "open": open_price,
+                    "high": max(open_price, close),
+                    "low": min(open_price, close),
+                    "close": close,
+                    "volume": vol,
+                    "ticks": 1,
+                }
+            else:
+                pending["high"] = max(pending["high"], close)
+                pending["low"] = min(pending["low"], close)
+                pending["close"] = close
+                pending["volume"] += vol
+                pending["ticks"] += 1
+            return closed
+
+    def bars(self, symbol: str, *, since_seq: int = -1, limit: Optional[int] = None) -> list[Bar]:
+        """Closed bars with ``seq > since_seq`` (oldest first)."""
+        with self._lock:
+            bars = self._bars.get(str(symbol).upper())
+            if not bars:
+                return []
+            if since_seq < bars[0].seq:
+                selected = list(bars)
+            else:
+                skip = since_seq - bars[0].seq + 1
+                selected = [bars[i] for i in range(skip, len(bars))]
+        if limit is not None and len(selected) > limit:
+            selected = selected[-int(limit) :]
+        return selected
+
+    def last_bar(self, symbol: str) -> Optional[Bar]:
+        with self._lock:
+            bars = self._bars.get(str(symbol).upper())
+            return bars[-1] if bars else None
+
+    def last_seq(self, symbol: str) -> int:
+        bar = self.last_bar(symbol)
+        return bar.seq if bar is not None else -1
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._bars)
+
+    def count(self, symbol: str) -> int:
+        with self._lock:
+            return len(self._bars.get(str(symbol).upper(), ()))
+
+    def prune(self, active_symbols) -> None:
+        keep = {str(symbol).upper() for symbol in active_symbols}
+        with self._lock:
+            for symbol in list(self._bars):
+                if symbol not in keep:
+                    self._bars.pop(symbol, None)
+                    self._open.pop(symbol, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._bars.clear()
+            self._open.clear()
+            self._next_seq.clear()
+
+
+_DEFAULT_STORE = BarStore()
+
+
+def get_bar_store() -> BarStore:
+    """Process-wide bar store shared by the market-data cycle and the signal engines."""
+    return _DEFAULT_STORE
+
+
+__all__ = ["Bar", "BarStore", "get_bar_store"]
@@ -108,6 +108,8 @@ class BinanceCredentialStore:
         self._migrate_legacy_files()
         self._lock = threading.RLock()
         self._cache: Optional[dict[str, dict[str, Any]]] = None
+        # (file signature, ids) memo for ``list_user_ids``; see ``_file_signature``.
+        self._user_ids_memo: Optional[tuple[Any, list[int]]] = None
         key = (
             encryption_key
             if encryption_key is not None
@@ -305,11 +307,37 @@ class BinanceCredentialStore:
             print(f"⚠️ Unable to load Binance credentials: {exc}")
         return {}
 
+    def _file_signature(self) -> Optional[tuple[int, int, int]]:
+        try:
+            stat = os.stat(self.credential_file)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def invalidate_user_ids(self) -> None:
+        """Forget the memoised ``list_user_ids`` result."""
+        with self._lock:
+            self._user_ids_memo = None
+
     def list_user_ids(self) -> list[int]:
-        """Return user ids that have at least one stored credential record."""
+        """Return user ids that have at least one stored credential record.
+
+        The result is memoised against the credential file's stat signature,
+        so repeated calls cost one ``stat`` while the file is unchanged (edits
+        by other processes still show up); local writes drop the memo.
+        """
 
         with self._lock:
-            data = self._load_from_disk()
+            signature = self._file_signature()
+            memo = self._user_ids_memo
+            if memo is not None and signature is not None and memo[0] == signature:
+                return list(memo[1])
+            user_ids = self._scan_user_ids(self._load_from_disk())
+            self._user_ids_memo = (signature, user_ids) if signature is not None else None
+        return list(user_ids)
+
+    @staticmethod
+    def _scan_user_ids(data: Any) -> list[int]:
         users = data.get("users") if isinstance(data, dict) else None
         if not isinstance(users, dict):
             return []
@@ -391,6 +419,7 @@ class BinanceCredentialStore:
         with open(tmp_file, "w", encoding="utf-8") as handle:
             json.dump(to_write, handle, indent=2, default=str)
         os.replace(tmp_file, self.credential_file)
+        self._user_ids_memo = None
 
     def get_credentials(
         self,
@@ -0,0 +1,448 @@
+"""Concurrent, weight-aware access to Binance REST clients.
+
+``RealBinanceTrader`` and ``BinanceFuturesTrader`` used to wrap every client
+call in one ``threading.Lock`` per trader, so a slow ``get_account`` or order
+book fetch held up every other request for that account, reads included,
+while nothing tracked how much of Binance's request weight was being spent.
+
+``BinanceRequestLayer`` replaces the lock:
+
+* a small pool of client sessions per credential. python-binance clients
+  keep per-call state (``client.response``), so a session is leased to one
+  request at a time, and extra sessions are created lazily from the
+  trader's factory only when requests actually overlap;
+* reads take no lock beyond the lease; endpoints where sequencing matters
+  (order placement, cancels, leverage changes) are serialised per symbol,
+  so orders on different symbols still go out in parallel;
+* every call first reserves its weight in a ``WeightRateLimiter``, which
+  mirrors Binance's fixed-window model: ``REQUEST_WEIGHT`` per minute is
+  shared by the whole process (the limit is per IP) and order counts per
+  ten seconds are kept per account. When the server reports its own count
+  (``X-MBX-USED-WEIGHT-1M``) the limiter adopts it.
+
+``FakeBinanceClient`` is an in-process stand-in with configurable latency,
+used by the tests and ``scripts/benchmark_binance_requests.py``.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import itertools
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple, Union
+
+SPOT_LIMITS = {"REQUEST_WEIGHT": (6000, 60.0), "ORDERS": (100, 10.0)}
+FUTURES_LIMITS = {"REQUEST_WEIGHT": (2400, 60.0), "ORDERS": (300, 10.0)}
+
+WeightSpec = Union[int, Callable[[Mapping[str, Any]], int]]
+
+
+@dataclass(frozen=True)
+class EndpointCost:
+    """Request weight, order-count cost and sequencing of one client method."""
+
+    weight: WeightSpec = 1
+    orders: int = 0
+    ordered: bool = False
+
+    def weight_for(self, kwargs: Mapping[str, Any]) -> int:
+        return int(self.weight(kwargs)) if callable(self.weight) else int(self.weight)
+
+
+def _depth_weight(kwargs: Mapping[str, Any]) -> int:
+    limit = int(kwargs.get("limit") or 100)
+    if limit <= 100:
+        return 5
+    if limit <= 500:
+        return 25
+    return 50 if limit <= 1000 else 250
+
+
+def _per_symbol(single: int, everything: int) -> Callable[[Mapping[str, Any]], int]:
+    return lambda kwargs: single if kwargs.get("symbol") else everything
+
+
+DEFAULT_COST = EndpointCost(1)
+
+SPOT_ENDPOINTS: Dict[str, EndpointCost] = {
+    "ping": EndpointCost(1),
+    "get_server_time": EndpointCost(1),
+    "get_account": EndpointCost(20),
+    "get_exchange_info": EndpointCost(20),
+    "get_symbol_info": EndpointCost(20),  # python-binance reads exchangeInfo
+    "get_symbol_ticker": EndpointCost(_per_symbol(2, 4)),
+    "get_order_book": EndpointCost(_depth_weight),
+    "get_order": EndpointCost(4),
+    "get_open_orders": EndpointCost(_per_symbol(6, 80)),
+    "cancel_order": EndpointCost(1, ordered=True),
+    "create_order": EndpointCost(1, orders=1, ordered=True),
+    "create_test_order": EndpointCost(1, ordered=True),
+}
+
+FUTURES_ENDPOINTS: Dict[str, EndpointCost] = {
+    "futures_ping": EndpointCost(1),
+    "mark_price": EndpointCost(1),
+    "futures_mark_price": EndpointCost(1),
+    "open_interest": EndpointCost(1),
+    "futures_open_interest": EndpointCost(1),
+    "ticker_24hr": EndpointCost(_per_symbol(1, 40)),
+    "futures_ticker": EndpointCost(_per_symbol(1, 40)),
+    "top_long_short_account_ratio": EndpointCost(1),
+    "futures_top_long_short_account_ratio": EndpointCost(1),
+    "get_position_risk": EndpointCost(5),
+    "futures_position_information": EndpointCost(5),
+    "balance": EndpointCost(5),
+    "futures_account_balance": EndpointCost(5),
+    "futures_income_history": EndpointCost(30),
+    "income_history": EndpointCost(30),
+    "futures_incomeHistory": EndpointCost(30),
+    "change_leverage": EndpointCost(1, ordered=True),
+    "futures_change_leverage": EndpointCost(1, ordered=True),
+    "new_order": EndpointCost(1, orders=1, ordered=True),
+    "futures_create_order": EndpointCost(1, orders=1, ordered=True),
+}
+
+_WEIGHT_HEADERS = ("x-mbx-used-weight-1m", "X-MBX-USED-WEIGHT-1M")
+
+
+class WeightRateLimiter:
+    """Fixed-window budgets keyed by bucket (``"ORDERS:<account>"`` uses ``ORDERS``)."""
+
+    def __init__(
+        self,
+        limits: Mapping[str, Tuple[int, float]],
+        *,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.limits = dict(limits)
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._windows: Dict[str, Tuple[float, int]] = {}
+        self.stats = {"acquired": 0, "waits": 0, "waited_seconds": 0.0, "synced": 0}
+
+    def _limit(self, bucket: str) -> Optional[Tuple[int, float]]:
+        return self.limits.get(bucket.split(":", 1)[0])
+
+    def _used_locked(self, bucket: str, now: float) -> Tuple[float, int]:
+        limit, interval = self._limit(bucket)  # type: ignore[misc]
+        start = now - (now % interval)
+        window = self._windows.get(bucket)
+        if window is None or window[0] != start:
+            return start, 0
+        return window
+
+    def acquire(self, costs: Mapping[str, int]) -> float:
+        """Reserve ``costs`` in every bucket, waiting for the next window if needed.
+
+        Returns the seconds spent waiting. A single request heavier than a
+        whole window is let through once the window is empty.
+        """
+        costs = {b: int(c) for b, c in costs.items() if c > 0 and self._limit(b)}
+        waited = 0.0
+        with self._cond:
+            while True:
+                now = self._clock()
+                wait = 0.0
+                for bucket, cost in costs.items():
+                    limit, interval = self._limit(bucket)  # type: ignore[misc]
+                    start, used = self._used_locked(bucket, now)
+                    if used and used + cost > limit:
+                        wait = max(wait, start + interval - now)
+                if wait <= 0:
+                    for bucket, cost in costs.items():
+                        start, used = self._used_locked(bucket, now)
+                        self._windows[bucket] = (start, used + cost)
+                    self.stats["acquired"] += 1
+                    if waited:
+                        self.stats["waits"] += 1
+                        self.stats["waited_seconds"] += waited
+                    return waited
+                self._cond.wait(wait)
+                waited += wait
+
+    def observe(self, bucket: str, used: int) -> None:
+        """Adopt the server's count for the current window when it is higher."""
+        if not self._limit(bucket):
+            return
+        with self._cond:
+            start, current = self._used_locked(bucket, self._clock())
+            if used > current:
+                self._windows[bucket] = (start, int(used))
+                self.stats["synced"] += 1
+
+    def usage(self) -> Dict[str, int]:
+        now = self._clock()
+        with self._cond:
+            return {bucket: self._used_locked(bucket, now)[1] for bucket in self._windows}
+
+
+_LIMITERS: Dict[Tuple[str, bool], WeightRateLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def get_rate_limiter(venue: str = "spot", testnet: bool = False) -> WeightRateLimiter:
+    """Process-wide limiter per venue and network (weight limits are per IP)."""
+    key = (venue, bool(testnet))
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(key)
+        if limiter is None:
+            limiter = WeightRateLimiter(FUTURES_LIMITS if venue == "futures" else SPOT_LIMITS)
+            _LIMITERS[key] = limiter
+        return limiter
+
+
+def account_key(api_key: Optional[str]) -> str:
+    """Short, non-reversible label for an API key (used in bucket names)."""
+    return hashlib.sha1(str(api_key or "").encode("utf-8")).hexdigest()[:12]
+
+
+class BinanceRequestLayer:
+    """Leases pooled client sessions and applies weights and per-symbol ordering."""
+
+    def __init__(
+        self,
+        *,
+        endpoints: Mapping[str, EndpointCost],
+        limiter: WeightRateLimiter,
+        account: str = "default",
+        pool_size: int = 4,
+    ) -> None:
+        self.endpoints = dict(endpoints)
+        self.limiter = limiter
+        self.account = account
+        self.pool_size = max(1, int(pool_size))
+        self._cond = threading.Condition()
+        self._factory: Optional[Callable[[], Any]] = None
+        self._primary: Any = None
+        self._idle: List[Any] = []
+        self._sessions = 0
+        self._generation = 0
+        self._symbol_locks: Dict[str, threading.Lock] = {}
+        self._symbol_locks_guard = threading.Lock()
+        self.stats = {"calls": 0, "in_flight": 0, "peak_in_flight": 0, "sessions": 0}
+
+    @property
+    def primary(self) -> Any:
+        return self._primary
+
+    def configure(
+        self,
+        client: Any,
+        *,
+        factory: Optional[Callable[[], Any]] = None,
+        pool_size: Optional[int] = None,
+    ) -> None:
+        """Replace the pool with ``client``; ``factory`` builds extra sessions."""
+        with self._cond:
+            self._primary = client
+            self._factory = factory
+            if pool_size is not None:
+                self.pool_size = max(1, int(pool_size))
+            self._idle = [client] if client is not None else []
+            self._sessions = len(self._idle)
+            self._generation += 1
+            self.stats["sessions"] = self._sessions
+            self._cond.notify_all()
+
+    @contextlib.contextmanager
+    def session(self) -> Iterator[Any]:
+        """Lease one client; waits if every session is busy and none can be added."""
+        with self._cond:
+            while True:
+                if self._primary is None:
+                    raise RuntimeError("Binance client is not connected")
+                if self._idle:
+                    client = self._idle.pop()
+                    break
+                if self._factory is not None and self._sessions < self.pool_size:
+                    self._sessions += 1
+                    client = None
+                    break
+                self._cond.wait()
+            generation = self._generation
+        if client is None:
+            try:
+                client = self._factory()  # type: ignore[misc]
+            except Exception:
+                with self._cond:
+                    self._sessions -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self.stats["sessions"] = max(self.stats["sessions"], self._sessions)
+        try:
+            yield client
+        finally:
+            with self._cond:
+                # Sessions from before a reconnect are dropped, not returned.
+                if generation == self._generation:
+                    self._idle.append(client)
+                    self._cond.notify()
+
+    def _symbol_lock(self, symbol: str) -> threading.Lock:
+        with self._symbol_locks_guard:
+            lock = self._symbol_locks.get(symbol)
+            if lock is None:
+                lock = self._symbol_locks[symbol] = threading.Lock()
+            return lock
+
+    def supports(self, method: str) -> bool:
+        return callable(getattr(self._primary, method, None))
+
+    def call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        """``client.<method>(*args, **kwargs)`` under the endpoint's weight and ordering."""
+        cost = self.endpoints.get(method, DEFAULT_COST)
+        budget = {"REQUEST_WEIGHT": cost.weight_for(kwargs)}
+        if cost.orders:
+            budget[f"ORDERS:{self.account}"] = cost.orders
+        self.limiter.acquire(budget)
+
+        symbol = kwargs.get("symbol") or (args[0] if args and isinstance(args[0], str) else None)
+        ordering = (
+            self._symbol_lock(str(symbol).upper())
+            if cost.ordered and symbol
+            else contextlib.nullcontext()
+        )
+        with ordering, self.session() as client:
+            with self._cond:
+                self.stats["calls"] += 1
+                self.stats["in_flight"] += 1
+                self.stats["peak_in_flight"] = max(
+                    self.stats["peak_in_flight"], self.stats["in_flight"]
+                )
+            try:
+                result = getattr(client, method)(*args, **kwargs)
+                self._observe(client)
+                return result
+            finally:
+                with self._cond:
+                    self.stats["in_flight"] -= 1
+
+    def _observe(self, client: Any) -> None:
+        headers = getattr(getattr(client, "response", None), "headers", None)
+        if not headers:
+            return
+        for name in _WEIGHT_HEADERS:
+            value = headers.get(name)
+            if value is not None:
+                try:
+                    self.limiter.observe("REQUEST_WEIGHT", int(value))
+                except (TypeError, ValueError):
+                    pass
+                return
+
+
+class FakeBinanceClient:
+    """Thread-safe in-memory spot/futures client with simulated latency."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, latency: float = 0.0, *, prices: Optional[Mapping[str, float]] = None) -> None:
+        self.latency = float(latency)
+        self.prices = dict(prices or {"BTCUSDT": 30_000.0, "ETHUSDT": 2_000.0})
+        self.orders: Dict[int, Dict[str, Any]] = {}
+        self.calls: List[str] = []
+        self._lock = threading.Lock()
+        self._active = 0
+        self.peak_concurrency = 0
+
+    def _request(self, name: str) -> None:
+        with self._lock:
+            self.calls.append(name)
+            self._active += 1
+            self.peak_concurrency = max(self.peak_concurrency, self._active)
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def get_account(self) -> Dict[str, Any]:
+        self._request("get_account")
+        return {"canTrade": True, "balances": [{"asset": "USDT", "free": "1000", "locked": "0"}]}
+
+    def get_server_time(self) -> Dict[str, Any]:
+        self._request("get_server_time")
+        return {"serverTime": int(time.time() * 1000)}
+
+    @staticmethod
+    def _symbol(symbol: str) -> Dict[str, Any]:
+        return {
+            "symbol": symbol,
+            "filters": [
+                {"filterType": "PRICE_FILTER", "tickSize": "0.01"},
+                {"filterType": "LOT_SIZE", "stepSize": "0.00001", "minQty": "0.00001", "maxQty": "9000"},
+                {"filterType": "NOTIONAL", "minNotional": "5"},
+            ],
+        }
+
+    def get_exchange_info(self) -> Dict[str, Any]:
+        self._request("get_exchange_info")
+        return {"symbols": [self._symbol(symbol) for symbol in self.prices]}
+
+    def get_symbol_info(self, symbol: str) -> Dict[str, Any]:
+        self._request("get_symbol_info")
+        return self._symbol(symbol)
+
+    def get_symbol_ticker(self, symbol: str) -> Dict[str, Any]:
+        self._request("get_symbol_ticker")
+        return {"symbol": symbol, "price": str(self.prices.get(symbol, 1.0))}
+
+    def get_order_book(self, symbol: str, limit: int = 100) -> Dict[str, Any]:
+        self._request("get_order_book")
+        price = self.prices.get(symbol, 1.0)
+        return {"bids": [[str(price * 0.999), "1"]], "asks": [[str(price * 1.001), "1"]]}
+
+    def create_order(self, **params: Any) -> Dict[str, Any]:
+        self._request("create_order")
+        order_id = next(self._ids)
+        order = dict(params, orderId=order_id, clientOrderId=f"fake_{order_id}")
+        order["status"] = "FILLED" if params.get("type") == "MARKET" else "NEW"
+        with self._lock:
+            self.orders[order_id] = order
+        return dict(order)
+
+    def create_test_order(self, **params: Any) -> Dict[str, Any]:
+        self._request("create_test_order")
+        return {}
+
+    def get_order(self, symbol: str, orderId: Optional[int] = None, **_params: Any) -> Optional[Dict[str, Any]]:
+        self._request("get_order")
+        with self._lock:
+            order = self.orders.get(int(orderId)) if orderId is not None else None
+            return dict(order) if order else None
+
+    def get_open_orders(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        self._request("get_open_orders")
+        with self._lock:
+            return [
+                dict(order) for order in self.orders.values()
+                if order["status"] == "NEW" and (symbol is None or order["symbol"] == symbol)
+            ]
+
+    def cancel_order(self, symbol: str, orderId: Optional[int] = None, **_params: Any) -> Dict[str, Any]:
+        self._request("cancel_order")
+        with self._lock:
+            order = self.orders.get(int(orderId)) if orderId is not None else None
+            if order:
+                order["status"] = "CANCELED"
+        return {"symbol": symbol, "orderId": orderId, "status": "CANCELED"}
+
+
+__all__ = [
+    "BinanceRequestLayer",
+    "DEFAULT_COST",
+    "EndpointCost",
+    "FUTURES_ENDPOINTS",
+    "FUTURES_LIMITS",
+    "FakeBinanceClient",
+    "SPOT_ENDPOINTS",
+    "SPOT_LIMITS",
+    "WeightRateLimiter",
+    "account_key",
+    "get_rate_limiter",
+]
@@ -0,0 +1,376 @@
+"""Shared trading-toggle state for traders and dashboard routes.
+
+``execute_ultimate_trade`` used to re-read the profile's ``bot_state.json``
+on every call just to pick up ``trader_state.trading_enabled``. The toggles
+now go through a ``ControlStateBus``:
+
+- dashboard routes call ``publish(profile, field, value)``; the update is
+  applied to every bound trader in this process immediately and written to a
+  tiny ``control_state.json`` next to the profile's ``bot_state.json``
+- traders are bound once per profile (``ensure_bound``); afterwards the hot
+  path only reads ``trader.trading_enabled``
+- other processes (gunicorn workers) pick changes up by watching the control
+  file's mtime every ``poll_seconds`` or, when configured, via Redis pub/sub
+
+A trader with no control file yet is seeded once from ``bot_state.json`` so
+existing deployments keep their persisted switch.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+import weakref
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+CONTROL_FIELDS: tuple[str, ...] = ("trading_enabled", "futures_trading_enabled")
+CONTROL_STATE_FILENAME = "control_state.json"
+DEFAULT_CHANNEL = "ai_bot:control_state"
+
+_UNBOUND = object()
+
+
+def _normalize_profile(profile: Any) -> Optional[str]:
+    return profile if isinstance(profile, str) and profile else None
+
+
+def _profile_key(profile: Optional[str]) -> str:
+    return _normalize_profile(profile) or ""
+
+
+def _default_state_dir(profile: Optional[str]) -> Path:
+    from app.services.persistence import ensure_persistence_dirs
+
+    return Path(ensure_persistence_dirs(profile or None))
+
+
+def apply_control_value(trader: Any, field: str, value: Any) -> None:
+    """Apply one toggle to ``trader`` using the executor's breaker semantics."""
+    if field == "trading_enabled":
+        if value is False:
+            trader.trading_enabled = False
+        elif value is True:
+            breaker = bool(
+                getattr(getattr(trader, "safety_manager", None), "global_breaker_active", False)
+            )
+            if not breaker:
+                trader.trading_enabled = True
+    elif field in CONTROL_FIELDS and isinstance(value, bool):
+        setattr(trader, field, value)
+
+
+class ControlStateBus:
+    """In-process toggle state with file-mtime or Redis cross-process updates."""
+
+    def __init__(
+        self,
+        *,
+        state_dir_resolver: Callable[[Optional[str]], Path] = _default_state_dir,
+        poll_seconds: float = 1.0,
+        redis_client: Any = None,
+        channel: str = DEFAULT_CHANNEL,
+        autostart: bool = True,
+    ) -> None:
+        self._state_dir_resolver = state_dir_resolver
+        self.poll_seconds = max(0.05, float(poll_seconds))
+        self.redis_client = redis_client
+        self.channel = channel
+        self.autostart = autostart
+        self.origin = uuid.uuid4().hex
+        self._lock = threading.RLock()
+        self._state: dict[str, dict[str, Any]] = {}
+        self._traders: dict[str, "weakref.WeakSet[Any]"] = {}
+        self._file_mtimes: dict[str, int] = {}
+        self._stop_event = threading.Event()
+        self._watch_thread: threading.Thread | None = None
+        self._redis_thread: threading.Thread | None = None
+        self._pubsub: Any = None
+        self.stats: dict[str, int] = {"published": 0, "file_updates": 0, "redis_updates": 0}
+
+    # ------------------------------------------------------------------ API
+    def get(self, profile: Optional[str], field: str, default: Any = None) -> Any:
+        with self._lock:
+            return self._state.get(_profile_key(profile), {}).get(field, default)
+
+    def snapshot(self, profile: Optional[str] = None) -> dict[str, Any]:
+        with self._lock:
+            if profile is None:
+                return {key: dict(values) for key, values in self._state.items()}
+            return dict(self._state.get(_profile_key(profile), {}))
+
+    def ensure_bound(self, trader: Any) -> None:
+        """Bind ``trader`` to its profile's toggles if not bound already.
+
+        Cheap enough for per-trade calls: one attribute comparison once bound.
+        """
+        profile = _normalize_profile(getattr(trader, "persistence_profile", None))
+        if getattr(trader, "_control_state_profile", _UNBOUND) == profile:
+            return
+        self.bind_trader(trader, profile)
+
+    def bind_trader(self, trader: Any, profile: Optional[str] = None) -> None:
+        profile = _normalize_profile(profile)
+        key = _profile_key(profile)
+        with self._lock:
+            for other_key, traders in self._traders.items():
+                if other_key != key:
+                    traders.discard(trader)
+            self._traders.setdefault(key, weakref.WeakSet()).add(trader)
+            if key not in self._state:
+                self._state[key] = self._load_initial_state(profile)
+            state = dict(self._state[key])
+        try:
+            object.__setattr__(trader, "_control_state_profile", profile)
+        except Exception:
+            pass
+        for field in CONTROL_FIELDS:
+            if field in state:
+                apply_control_value(trader, field, state[field])
+        if self.autostart:
+            self.start()
+
+    def publish(self, profile: Optional[str], field: str, value: Any) -> None:
+        """Set a toggle, push it to local traders and other processes."""
+        if field not in CONTROL_FIELDS:
+            raise ValueError(f"Unknown control field: {field}")
+        profile = _normalize_profile(profile)
+        key = _profile_key(profile)
+        updated_at = time.time()
+        with self._lock:
+            state = self._state.setdefault(key, {})
+            state[field] = value
+            state["updated_at"] = updated_at
+            payload = dict(state)
+        self._apply(key, {field: value})
+        self.stats["published"] += 1
+        self._write_file(profile, payload)
+        if self.redis_client is not None:
+            try:
+                self.redis_client.publish(
+                    self.channel,
+                    json.dumps(
+                        {"origin": self.origin, "profile": key, "field": field, "value": value}
+                    ),
+                )
+            except Exception as exc:
+                logger.warning("Control state publish to Redis failed: %s", exc)
+
+    # -------------------------------------------------------------- threads
+    def start(self) -> None:
+        with self._lock:
+            if self._watch_thread is None or not self._watch_thread.is_alive():
+                self._stop_event.clear()
+                self._watch_thread = threading.Thread(
+                    target=self._watch_loop, name="ControlStateWatcher", daemon=True
+                )
+                self._watch_thread.start()
+            if self.redis_client is not None and (
+                self._redis_thread is None or not self._redis_thread.is_alive()
+            ):
+                self._redis_thread = threading.Thread(
+                    target=self._redis_loop, name="ControlStateRedisListener", daemon=True
+                )
+                self._redis_thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        pubsub = self._pubsub
+        if pubsub is not None:
+            try:
+                pubsub.close()
+            except Exception:
+                pass
+        for thread in (self._watch_thread, self._redis_thread):
+            if thread and thread.is_alive() and thread is not threading.current_thread():
+                thread.join(timeout=self.poll_seconds + 1.0)
+        self._watch_thread = None
+        self._redis_thread = None
+
+    def poll_once(self) -> int:
+        """Check every bound profile's control file; return profiles refreshed."""
+        with self._lock:
+            keys = list(self._traders.keys())
+        refreshed = 0
+        for key in keys:
+            path = self._control_path(key or None)
+            if path is None:
+                continue
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            if self._file_mtimes.get(key) == mtime:
+                continue
+            self._file_mtimes[key] = mtime
+            payload = self._read_json(path)
+            if not isinstance(payload, dict):
+                continue
+            updates = {f: payload[f] for f in CONTROL_FIELDS if f in payload}
+            with self._lock:
+                state = self._state.setdefault(key, {})
+                if float(payload.get("updated_at") or 0) < float(state.get("updated_at") or 0):
+                    continue
+                changed = {f: v for f, v in updates.items() if state.get(f) != v}
+                state.update(updates)
+                state["updated_at"] = payload.get("updated_at", state.get("updated_at"))
+            if changed:
+                self._apply(key, changed)
+                self.stats["file_updates"] += 1
+                refreshed += 1
+        return refreshed
+
+    def _watch_loop(self) -> None:
+        while not self._stop_event.wait(self.poll_seconds):
+            try:
+                self.poll_once()
+            except Exception as exc:  # pragma: no cover - best effort
+                logger.debug("Control state poll failed: %s", exc)
+
+    def _redis_loop(self) -> None:
+        try:
+            self._pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(self.channel)
+        except Exception as exc:
+            logger.warning("Control state Redis subscribe failed: %s", exc)
+            return
+        while not self._stop_event.is_set():
+            try:
+                message = self._pubsub.get_message(timeout=self.poll_seconds)
+            except Exception:
+                if self._stop_event.wait(self.poll_seconds):
+                    return
+                continue
+            if message:
+                self.handle_message(message.get("data"))
+
+    def handle_message(self, data: Any) -> bool:
+        """Apply one Redis pub/sub payload; ignores this process's own messages."""
+        try:
+            if isinstance(data, bytes):
+                data = data.decode("utf-8")
+            payload = json.loads(data)
+        except Exception:
+            return False
+        if not isinstance(payload, dict) or payload.get("origin") == self.origin:
+            return False
+        field = payload.get("field")
+        if field not in CONTROL_FIELDS:
+            return False
+        key = _profile_key(payload.get("profile"))
+        with self._lock:
+            state = self._state.setdefault(key, {})
+            state[field] = payload.get("value")
+            state["updated_at"] = time.time()
+        self._apply(key, {field: payload.get("value")})
+        self.stats["redis_updates"] += 1
+        return True
+
+    # -------------------------------------------------------------- helpers
+    def _apply(self, key: str, updates: dict[str, Any]) -> None:
+        with self._lock:
+            traders = list(self._traders.get(key, ()))
+        for trader in traders:
+            for field, value in updates.items():
+                try:
+                    apply_control_value(trader, field, value)
+                except Exception:
+                    pass
+
+    def _control_path(self, profile: Optional[str]) -> Optional[Path]:
+        try:
+            return Path(self._state_dir_resolver(profile)) / CONTROL_STATE_FILENAME
+        except Exception:
+            return None
+
+    def _load_initial_state(self, profile: Optional[str]) -> dict[str, Any]:
+        control_path = self._control_path(profile)
+        if control_path is not None:
+            payload = self._read_json(control_path)
+            if isinstance(payload, dict):
+                try:
+                    self._file_mtimes[_profile_key(profile)] = os.stat(control_path).st_mtime_ns
+                except OSError:
+                    pass
+                return {
+                    key: value
+                    for key, value in payload.items()
+                    if key in CONTROL_FIELDS or key == "updated_at"
+                }
+            # Seed once from the persisted bot state (pre-existing deployments).
+            state = self._read_json(control_path.parent / "bot_state.json")
+            trader_state = (state or {}).get("trader_state") if isinstance(state, dict) else None
+            if isinstance(trader_state, dict):
+                return {
+                    field: trader_state[field]
+                    for field in CONTROL_FIELDS
+                    if isinstance(trader_state.get(field), bool)
+                }
+        return {}
+
+    def _write_file(self, profile: Optional[str], payload: dict[str, Any]) -> None:
+        path = self._control_path(profile)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as handle:
+                json.dump(payload, handle)
+            os.replace(tmp_path, path)
+            self._file_mtimes[_profile_key(profile)] = os.stat(path).st_mtime_ns
+        except Exception as exc:
+            logger.warning("Failed to write control state for %s: %s", profile or "default", exc)
+
+    @staticmethod
+    def _read_json(path: Path) -> Any:
+        try:
+            with open(path, "r", encoding="utf-8") as handle:
+                return json.load(handle)
+        except Exception:
+            return None
+
+
+_DEFAULT_BUS: ControlStateBus | None = None
+_DEFAULT_BUS_LOCK = threading.Lock()
+
+
+def get_control_state_bus() -> ControlStateBus:
+    """Process-wide bus; Redis pub/sub is used when ``CONTROL_STATE_REDIS=1``."""
+    global _DEFAULT_BUS
+    if _DEFAULT_BUS is None:
+        with _DEFAULT_BUS_LOCK:
+            if _DEFAULT_BUS is None:
+                redis_client = None
+                if os.getenv("CONTROL_STATE_REDIS", "0").lower() in ("1", "true", "yes"):
+                    try:
+                        import redis
+
+                        redis_client = redis.Redis(
+                            host=os.getenv("REDIS_HOST", "localhost"),
+                            port=int(os.getenv("REDIS_PORT", "6379")),
+                            socket_connect_timeout=1.0,
+                        )
+                        redis_client.ping()
+                    except Exception as exc:
+                        logger.warning("Control state Redis unavailable: %s", exc)
+                        redis_client = None
+                _DEFAULT_BUS = ControlStateBus(
+                    poll_seconds=float(os.getenv("CONTROL_STATE_POLL_SECONDS", "1.0")),
+                    redis_client=redis_client,
+                )
+    return _DEFAULT_BUS
+
+
+__all__ = [
+    "CONTROL_FIELDS",
+    "ControlStateBus",
+    "apply_control_value",
+    "get_control_state_bus",
+]
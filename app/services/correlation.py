@@ -0,0 +1,257 @@
+"""Rolling cross-symbol correlation of returns and signal strengths.
+
+``UltimateEnsembleSystem.create_correlation_matrix`` used to build its
+matrix with two nested ``DataFrame.iterrows()`` loops, O(n²) Python work
+every cycle, and only multiplied the two symbols' current signal strengths,
+so the "correlation" carried no history at all. The self-improvement
+worker's ``_calculate_portfolio_correlations`` returned hard-coded pairs.
+
+``RollingCorrelation`` keeps the last ``window`` observations of every
+symbol in a numpy ring buffer and maintains the column means and the
+co-moment matrix with a sliding Welford update: each new row adds one outer
+product and the row leaving the window subtracts one, so the full
+correlation matrix is a single normalisation away at any time. The
+co-moments are rebuilt exactly from the buffer once per window to stop
+floating-point drift. Symbols that appear later join with an all-zero
+history, which is exactly what the co-moments already imply for them.
+
+``CorrelationService`` holds one stream of log returns fed from the market
+data cycle plus one signal-strength stream per ensemble, and is shared
+process-wide through ``get_correlation_service``.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+RETURNS = "returns"
+
+
+class RollingCorrelation:
+    """Windowed correlation matrix over a growing set of symbols."""
+
+    def __init__(self, window: int = 120, *, min_periods: int = 20, capacity: int = 16) -> None:
+        self.window = max(2, int(window))
+        self.min_periods = max(2, min(int(min_periods), self.window))
+        self._lock = threading.Lock()
+        self._index: Dict[str, int] = {}
+        self._symbols: List[str] = []
+        capacity = max(1, int(capacity))
+        self._buffer = np.zeros((self.window, capacity))
+        self._mean = np.zeros(capacity)
+        self._comoment = np.zeros((capacity, capacity))
+        self._head = 0
+        self._count = 0
+        self._since_rebuild = 0
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._symbols)
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def ready(self) -> bool:
+        return self._count >= self.min_periods and len(self._symbols) > 1
+
+    # ---------------------------------------------------------------- updates
+    def _columns_locked(self, symbols: Iterable[str]) -> np.ndarray:
+        columns = []
+        for symbol in symbols:
+            column = self._index.get(symbol)
+            if column is None:
+                column = self._index[symbol] = len(self._symbols)
+                self._symbols.append(symbol)
+            columns.append(column)
+        size = len(self._symbols)
+        capacity = self._mean.shape[0]
+        if size > capacity:
+            grown = max(size, capacity * 2)
+            buffer = np.zeros((self.window, grown))
+            buffer[:, :capacity] = self._buffer
+            comoment = np.zeros((grown, grown))
+            comoment[:capacity, :capacity] = self._comoment
+            self._buffer = buffer
+            self._comoment = comoment
+            self._mean = np.concatenate([self._mean, np.zeros(grown - capacity)])
+        return np.asarray(columns, dtype=np.intp)
+
+    def push(self, values: Mapping[str, float], *, carry: bool = False) -> None:
+        """Append one observation; absent symbols get 0 (or their last value)."""
+        with self._lock:
+            columns = self._columns_locked(values.keys())
+            if carry and self._count:
+                row = self._buffer[(self._head - 1) % self.window].copy()
+            else:
+                row = np.zeros(self._mean.shape[0])
+            row[columns] = np.fromiter(
+                (float(v) for v in values.values()), dtype=float, count=len(columns)
+            )
+            row[~np.isfinite(row)] = 0.0
+            self._push_locked(row)
+
+    def _push_locked(self, row: np.ndarray) -> None:
+        mean, comoment = self._mean, self._comoment
+        if self._count == self.window:
+            old = self._buffer[self._head]
+            remaining = self._count - 1
+            previous_mean = mean.copy()
+            mean -= (old - mean) / remaining
+            comoment -= np.outer(old - mean, old - previous_mean)
+            self._count = remaining
+        self._buffer[self._head] = row
+        self._head = (self._head + 1) % self.window
+        self._count += 1
+        delta = row - mean
+        mean += delta / self._count
+        comoment += np.outer(delta, row - mean)
+
+        self._since_rebuild += 1
+        if self._since_rebuild >= self.window:
+            self._rebuild_locked()
+
+    def _rebuild_locked(self) -> None:
+        rows = self._buffer if self._count == self.window else self._buffer[: self._count]
+        self._mean = rows.mean(axis=0)
+        centred = rows - self._mean
+        self._comoment = centred.T @ centred
+        self._since_rebuild = 0
+
+    # ---------------------------------------------------------------- queries
+    def matrix(self) -> Tuple[List[str], np.ndarray]:
+        """``(symbols, correlation)``; zero-variance symbols correlate 0 with others."""
+        with self._lock:
+            size = len(self._symbols)
+            comoment = self._comoment[:size, :size].copy()
+            symbols = list(self._symbols)
+        variance = np.diag(comoment)
+        inverse = np.zeros(size)
+        varying = variance > 1e-12
+        inverse[varying] = 1.0 / np.sqrt(variance[varying])
+        corr = comoment
+        corr *= inverse[:, None]
+        corr *= inverse[None, :]
+        np.clip(corr, -1.0, 1.0, out=corr)
+        np.fill_diagonal(corr, 1.0)
+        return symbols, corr
+
+
+def nested(symbols: List[str], corr: np.ndarray) -> Dict[str, Dict[str, float]]:
+    """``{a: {b: corr}}`` without self-pairs (the ensemble's historical shape)."""
+    result: Dict[str, Dict[str, float]] = {}
+    for i, (symbol, row) in enumerate(zip(symbols, corr.tolist())):
+        del row[i]
+        result[symbol] = dict(zip(symbols[:i] + symbols[i + 1 :], row))
+    return result
+
+
+def top_pairs(
+    symbols: List[str],
+    corr: np.ndarray,
+    *,
+    min_abs: float = 0.0,
+    limit: Optional[int] = None,
+) -> Dict[str, float]:
+    """``{"A_B": corr}`` for the upper triangle, strongest first."""
+    upper_i, upper_j = np.triu_indices(len(symbols), k=1)
+    values = corr[upper_i, upper_j]
+    keep = np.flatnonzero(np.abs(values) >= min_abs)
+    keep = keep[np.argsort(-np.abs(values[keep]), kind="stable")]
+    if limit is not None:
+        keep = keep[:limit]
+    return {
+        f"{symbols[upper_i[k]]}_{symbols[upper_j[k]]}": float(values[k]) for k in keep
+    }
+
+
+class CorrelationService:
+    """Named ``RollingCorrelation`` streams plus a price-to-return feed."""
+
+    def __init__(self, window: int = 120, *, min_periods: int = 20) -> None:
+        self.window = window
+        self.min_periods = min_periods
+        self._lock = threading.Lock()
+        self._streams: Dict[str, RollingCorrelation] = {}
+        self._last_prices: Dict[str, float] = {}
+
+    def stream(self, name: str) -> RollingCorrelation:
+        with self._lock:
+            stream = self._streams.get(name)
+            if stream is None:
+                stream = self._streams[name] = RollingCorrelation(
+                    self.window, min_periods=self.min_periods
+                )
+            return stream
+
+    def update_prices(self, prices: Mapping[str, float]) -> int:
+        """Record one cycle of prices as log returns; returns symbols updated."""
+        symbols = list(prices)
+        if not symbols:
+            return 0
+        current = np.array([_positive(prices[s]) for s in symbols])
+        with self._lock:
+            previous = np.array([self._last_prices.get(s, np.nan) for s in symbols])
+            for symbol, price in zip(symbols, current):
+                if price > 0:
+                    self._last_prices[symbol] = float(price)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = np.log(current / previous)
+        returns[~np.isfinite(returns)] = 0.0
+        self.stream(RETURNS).push(dict(zip(symbols, returns)))
+        return len(symbols)
+
+    def record_signals(self, name: str, strengths: Mapping[str, float]) -> RollingCorrelation:
+        """Append signal strengths; symbols without a new signal keep their last one."""
+        stream = self.stream(f"signals:{name}")
+        stream.push(strengths, carry=True)
+        return stream
+
+    def pair_correlations(
+        self,
+        name: str = RETURNS,
+        symbols: Optional[Iterable[str]] = None,
+        *,
+        min_abs: float = 0.0,
+        limit: Optional[int] = None,
+    ) -> Dict[str, float]:
+        stream = self.stream(name)
+        if not stream.ready:
+            return {}
+        tracked, corr = stream.matrix()
+        if symbols is not None:
+            wanted = set(symbols)
+            columns = [i for i, s in enumerate(tracked) if s in wanted]
+            tracked = [tracked[i] for i in columns]
+            corr = corr[np.ix_(columns, columns)]
+        return top_pairs(tracked, corr, min_abs=min_abs, limit=limit)
+
+
+def _positive(value: object) -> float:
+    try:
+        number = float(value)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return np.nan
+    return number if number > 0 else np.nan
+
+
+_DEFAULT_SERVICE = CorrelationService()
+
+
+def get_correlation_service() -> CorrelationService:
+    """Process-wide service fed by the market data cycle."""
+    return _DEFAULT_SERVICE
+
+
+__all__ = [
+    "CorrelationService",
+    "RETURNS",
+    "RollingCorrelation",
+    "get_correlation_service",
+    "nested",
+    "top_pairs",
+]
@@ -0,0 +1,356 @@
+"""Pre-serialised per-user ``/api/dashboard`` payloads.
+
+``/api/dashboard`` rebuilt the portfolio, performance, system-status and
+journal sections for every request and asked for the Binance credential
+status with ``include_connection=True``, which can call the exchange. With
+many open tabs polling, the same payload was rebuilt over and over between
+two market cycles.
+
+``DashboardSnapshotStore`` keeps the latest payload per user as JSON bytes
+with a content ETag and a version that only moves when the content does.
+Compressed variants are produced lazily, once per snapshot. Users who polled
+recently are "subscribed": the market cycle calls ``refresh_subscribed`` to
+republish their snapshots, and requests are served from the store until the
+snapshot is invalidated (a write by that user) or older than ``max_age``.
+
+``CredentialStatusCache`` serves the credential status from memory and
+refreshes the connection check on its own cadence off the request path.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Mapping, Optional
+
+try:  # Optional: brotli is only used when installed.
+    import brotli  # type: ignore
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+PayloadBuilder = Callable[[int, Dict[str, Any]], Mapping[str, Any]]
+
+
+def _default_dumps(payload: Any) -> str:
+    return json.dumps(payload, default=str, separators=(",", ":"))
+
+
+def supported_encodings() -> tuple[str, ...]:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+@dataclass
+class DashboardSnapshot:
+    user_id: int
+    version: int
+    etag: str
+    body: bytes
+    built_at: float
+    _encoded: Dict[str, bytes] = field(default_factory=dict, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def encoded(self, encoding: str) -> Optional[bytes]:
+        """``body`` compressed with ``encoding`` (memoised per snapshot)."""
+        cached = self._encoded.get(encoding)
+        if cached is not None:
+            return cached
+        with self._lock:
+            cached = self._encoded.get(encoding)
+            if cached is None:
+                if encoding == "gzip":
+                    cached = gzip.compress(self.body, compresslevel=6, mtime=0)
+                elif encoding == "br" and brotli is not None:
+                    cached = brotli.compress(self.body, quality=5)
+                else:
+                    return None
+                self._encoded[encoding] = cached
+        return cached
+
+
+@dataclass
+class _Subscriber:
+    user_info: Dict[str, Any]
+    last_seen: float
+    version: int = 0
+    snapshot: Optional[DashboardSnapshot] = None
+    stale: bool = False
+    generation: int = 0
+
+
+class DashboardSnapshotStore:
+    """Versioned dashboard payloads per user, republished each market cycle."""
+
+    def __init__(
+        self,
+        builder: Optional[PayloadBuilder] = None,
+        *,
+        max_age: float = 10.0,
+        subscriber_ttl: float = 300.0,
+        compress_min_bytes: int = 1024,
+        dumps: Callable[[Any], str] = _default_dumps,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._builder = builder
+        self.max_age = max(0.0, float(max_age))
+        self.subscriber_ttl = max(1.0, float(subscriber_ttl))
+        self.compress_min_bytes = max(0, int(compress_min_bytes))
+        self._dumps = dumps
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._users: dict[int, _Subscriber] = {}
+        self.stats = {"builds": 0, "unchanged": 0, "hits": 0, "misses": 0, "invalidations": 0}
+
+    def set_builder(self, builder: Optional[PayloadBuilder]) -> None:
+        self._builder = builder
+
+    @property
+    def has_builder(self) -> bool:
+        return self._builder is not None
+
+    # ------------------------------------------------------------- publishing
+
+    def publish(
+        self,
+        user_id: int,
+        payload: Mapping[str, Any],
+        *,
+        generation: Optional[int] = None,
+    ) -> DashboardSnapshot:
+        """Serialise ``payload`` once; keep the version when nothing changed.
+
+        ``generation`` is the invalidation count observed before the payload
+        was built; if the user was invalidated meanwhile the snapshot stays
+        stale so the next read rebuilds it.
+        """
+        body = self._dumps(payload)
+        body_bytes = body.encode("utf-8") if isinstance(body, str) else bytes(body)
+        etag = hashlib.sha1(body_bytes).hexdigest()
+        now = self._clock()
+        user_id = int(user_id)
+        with self._lock:
+            entry = self._users.setdefault(user_id, _Subscriber(user_info={}, last_seen=now))
+            previous = entry.snapshot
+            if generation is None or generation == entry.generation:
+                entry.stale = False
+            if previous is not None and previous.etag == etag:
+                self.stats["unchanged"] += 1
+                previous.built_at = now
+                snapshot = previous
+            else:
+                self.stats["builds"] += 1
+                entry.version += 1
+                snapshot = DashboardSnapshot(user_id, entry.version, etag, body_bytes, now)
+            entry.snapshot = snapshot
+        return snapshot
+
+    def build(self, user_id: int, user_info: Optional[Mapping[str, Any]] = None) -> Optional[DashboardSnapshot]:
+        builder = self._builder
+        if builder is None:
+            return None
+        with self._lock:
+            entry = self._users.get(int(user_id))
+            info = dict(user_info if user_info is not None else (entry.user_info if entry else {}))
+            generation = entry.generation if entry is not None else 0
+        return self.publish(user_id, builder(int(user_id), info), generation=generation)
+
+    def refresh_subscribed(self) -> int:
+        """Republish every recently active user's snapshot; returns how many."""
+        if self._builder is None:
+            return 0
+        now = self._clock()
+        with self._lock:
+            for user_id in [
+                uid for uid, entry in self._users.items()
+                if now - entry.last_seen > self.subscriber_ttl
+            ]:
+                del self._users[user_id]
+            targets = list(self._users)
+        refreshed = 0
+        for user_id in targets:
+            try:
+                if self.build(user_id) is not None:
+                    refreshed += 1
+            except Exception:
+                # Leave it to the user's next request to rebuild.
+                self.invalidate(user_id)
+        return refreshed
+
+    # ---------------------------------------------------------------- reads
+
+    def touch(self, user_id: int, user_info: Mapping[str, Any]) -> None:
+        """Mark ``user_id`` as an active viewer (keeps it subscribed)."""
+        now = self._clock()
+        with self._lock:
+            entry = self._users.get(int(user_id))
+            if entry is None:
+                self._users[int(user_id)] = _Subscriber(user_info=dict(user_info), last_seen=now)
+            else:
+                entry.user_info = dict(user_info)
+                entry.last_seen = now
+
+    def get(self, user_id: int) -> Optional[DashboardSnapshot]:
+        """The current snapshot, or ``None`` when missing, invalidated or too old."""
+        now = self._clock()
+        with self._lock:
+            entry = self._users.get(int(user_id))
+            snapshot = entry.snapshot if entry is not None else None
+            if (
+                snapshot is None
+                or entry.stale
+                or (self.max_age and now - snapshot.built_at > self.max_age)
+            ):
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+            return snapshot
+
+    def get_or_build(self, user_id: int, user_info: Mapping[str, Any]) -> Optional[DashboardSnapshot]:
+        self.touch(user_id, user_info)
+        snapshot = self.get(user_id)
+        if snapshot is None:
+            snapshot = self.build(user_id, user_info)
+        return snapshot
+
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+        """Force a rebuild on the next read (all users when ``user_id`` is None)."""
+        with self._lock:
+            self.stats["invalidations"] += 1
+            if user_id is None:
+                entries = list(self._users.values())
+            else:
+                entry = self._users.get(int(user_id))
+                entries = [entry] if entry is not None else []
+            for entry in entries:
+                entry.stale = True
+                entry.generation += 1
+
+    def snapshot_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, "subscribers": len(self._users)}
+
+
+def call_credential_status(status_fn: Callable[..., Any], user_id: Any, *, include_connection: bool) -> dict:
+    """Call ``get_binance_credential_status`` across its historical signatures."""
+    try:
+        status = status_fn(
+            include_connection=include_connection, include_logs=True, user_id=user_id
+        )
+    except TypeError:
+        status = status_fn(include_logs=True, user_id=user_id)
+    return status if isinstance(status, dict) else {}
+
+
+class CredentialStatusCache:
+    """Per-user credential status with the connection check off the request path.
+
+    The first read for a user returns the local status (no exchange call) and
+    schedules a full refresh; afterwards reads return the cached full status
+    and schedule a refresh once it is older than ``interval``.
+    """
+
+    def __init__(
+        self,
+        status_fn: Callable[..., Any],
+        *,
+        interval: float = 60.0,
+        on_update: Optional[Callable[[Any], None]] = None,
+        runner: Optional[Callable[[Callable[[], None]], None]] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.status_fn = status_fn
+        self.interval = max(1.0, float(interval))
+        self._on_update = on_update
+        self._runner = runner or _thread_runner
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: dict[Any, tuple[float, dict]] = {}
+        self._in_flight: set[Any] = set()
+
+    def _schedule(self, user_id: Any) -> None:
+        with self._lock:
+            if user_id in self._in_flight:
+                return
+            self._in_flight.add(user_id)
+
+        def _job() -> None:
+            try:
+                self.refresh(user_id)
+            except Exception:
+                pass
+            finally:
+                with self._lock:
+                    self._in_flight.discard(user_id)
+
+        try:
+            self._runner(_job)
+        except Exception:
+            with self._lock:
+                self._in_flight.discard(user_id)
+
+    def refresh(self, user_id: Any) -> dict:
+        status = call_credential_status(self.status_fn, user_id, include_connection=True)
+        with self._lock:
+            self._entries[user_id] = (self._clock(), status)
+        if self._on_update is not None:
+            try:
+                self._on_update(user_id)
+            except Exception:
+                pass
+        return status
+
+    def get(self, user_id: Any) -> dict:
+        with self._lock:
+            cached = self._entries.get(user_id)
+        if cached is None:
+            status = call_credential_status(self.status_fn, user_id, include_connection=False)
+            self._schedule(user_id)
+            return status
+        checked_at, status = cached
+        if self._clock() - checked_at > self.interval:
+            self._schedule(user_id)
+        return status
+
+    def invalidate(self, user_id: Any = None) -> None:
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+
+def _thread_runner(job: Callable[[], None]) -> None:
+    threading.Thread(target=job, name="CredentialStatusRefresh", daemon=True).start()
+
+
+_STORE_LOCK = threading.Lock()
+
+
+def ensure_dashboard_snapshots(app: Any) -> DashboardSnapshotStore:
+    """Return the app's snapshot store, creating it on first use."""
+    store = app.extensions.get("dashboard_snapshots")
+    if store is not None:
+        return store
+    with _STORE_LOCK:
+        store = app.extensions.get("dashboard_snapshots")
+        if store is None:
+            store = DashboardSnapshotStore(
+                max_age=app.config.get("DASHBOARD_SNAPSHOT_MAX_AGE", 10.0),
+                subscriber_ttl=app.config.get("DASHBOARD_SNAPSHOT_SUBSCRIBER_TTL", 300.0),
+                dumps=app.json.dumps,
+            )
+            app.extensions["dashboard_snapshots"] = store
+    return store
+
+
+__all__ = [
+    "CredentialStatusCache",
+    "DashboardSnapshot",
+    "DashboardSnapshotStore",
+    "call_credential_status",
+    "ensure_dashboard_snapshots",
+    "supported_encodings",
+]
@@ -0,0 +1,358 @@
+"""Process-wide Binance exchangeInfo cache with precompiled symbol quantisers.
+
+``RealBinanceTrader._get_symbol_filters`` used to call
+``client.get_symbol_info(symbol)`` (a full exchangeInfo download on
+python-binance, weight 20) for each symbol, and kept the result on the
+trader. Every per-user trader built its own cache, so after a restart N
+users trading M symbols paid N×M exchangeInfo calls before their first
+order, and the results were re-parsed with ``Decimal`` on every order.
+
+``ExchangeInfoCache`` holds one bulk exchangeInfo load per venue and
+network, shared by every trader in the process (``get_exchange_info_cache``):
+
+* ``SymbolRules`` turns a symbol's LOT_SIZE / PRICE_FILTER / NOTIONAL
+  filters into plain floats once, with ``quantize_quantity`` and
+  ``quantize_price`` doing the rounding in float arithmetic;
+* the first lookup loads everything in one call, concurrent lookups wait
+  for that single load, and a lookup of an unknown symbol does not
+  refetch until the cache expires;
+* ``attach`` starts a daemon thread that reloads before ``ttl`` runs out,
+  so lookups on the order path do not block on the network;
+* ``invalidate`` marks the cache stale after the exchange rejects an order
+  with a filter failure, since that can mean the filters changed. A filter
+  failure is just as often a bad quantity, so each symbol forces at most one
+  reload per ``invalidate_interval``; repeated rejections in between are
+  counted in ``stats["invalidations_skipped"]`` and served from the cache;
+* when ``BINANCE_EXCHANGE_INFO_DIR`` is set (or ``path`` is given) the
+  parsed filters are also written to disk and reused across restarts while
+  younger than ``ttl``.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("ai_trading_bot")
+
+DEFAULT_TTL = 3600.0
+DEFAULT_INVALIDATE_INTERVAL = 300.0
+FILTER_FAILURE_CODES = frozenset({-1013, -2010})
+
+Fetch = Callable[[], Any]
+
+
+def _float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _decimals(step: float) -> int:
+    """Decimal places of a Binance step string such as ``0.00010000``."""
+    if step <= 0:
+        return 0
+    text = f"{step:.10f}".rstrip("0")
+    return len(text.split(".", 1)[1]) if "." in text else 0
+
+
+def _floor_to_step(value: float, step: float, decimals: int) -> float:
+    # The epsilon absorbs float representation error (0.3 / 0.1 = 2.999...),
+    # far below Binance's eight-decimal precision.
+    return round(math.floor(value / step + 1e-9) * step, decimals)
+
+
+@dataclass(frozen=True)
+class SymbolRules:
+    symbol: str
+    filters: Tuple[Dict[str, Any], ...] = ()
+    step_size: float = 0.0
+    min_qty: float = 0.0
+    max_qty: float = 0.0
+    tick_size: float = 0.0
+    min_notional: Optional[float] = None
+    qty_decimals: int = field(default=0, repr=False)
+    price_decimals: int = field(default=0, repr=False)
+
+    @classmethod
+    def from_filters(cls, symbol: str, filters: Iterable[Dict[str, Any]]) -> "SymbolRules":
+        filters = tuple(flt for flt in filters or () if isinstance(flt, dict))
+        by_type = {flt.get("filterType"): flt for flt in filters}
+        lot = by_type.get("LOT_SIZE") or {}
+        price = by_type.get("PRICE_FILTER") or {}
+        notional = by_type.get("NOTIONAL") or by_type.get("MIN_NOTIONAL")
+        min_notional = None
+        if notional:
+            value = notional.get("minNotional") or notional.get("notional")
+            min_notional = _float(value) if value is not None else None
+        step = _float(lot.get("stepSize"))
+        tick = _float(price.get("tickSize"))
+        return cls(
+            symbol=str(symbol).upper(),
+            filters=filters,
+            step_size=step,
+            min_qty=_float(lot.get("minQty")),
+            max_qty=_float(lot.get("maxQty")),
+            tick_size=tick,
+            min_notional=min_notional,
+            qty_decimals=_decimals(step),
+            price_decimals=_decimals(tick),
+        )
+
+    @property
+    def has_lot_size(self) -> bool:
+        return any(flt.get("filterType") == "LOT_SIZE" for flt in self.filters)
+
+    def quantize_quantity(self, quantity: float) -> Tuple[Optional[float], Optional[str]]:
+        """Round down to ``stepSize`` and clamp to ``maxQty``; ``None`` if unusable.
+
+        Returns ``(quantity, note)`` in the shape of
+        ``RealBinanceTrader._normalize_order_quantity``.
+        """
+        qty = float(quantity)
+        if not self.has_lot_size:
+            return qty, None
+        note = None
+        if self.step_size > 0:
+            stepped = _floor_to_step(qty, self.step_size, self.qty_decimals)
+            if stepped != qty:
+                note = f"Adjusted to stepSize {self.step_size:.{self.qty_decimals}f}"
+            qty = stepped
+        if self.max_qty > 0 and qty > self.max_qty:
+            qty = self.max_qty
+            note = f"Clamped to maxQty {self.max_qty}"
+        if qty <= 0:
+            return None, "Quantity rounded down to zero"
+        if qty < self.min_qty:
+            return None, f"Quantity {qty} below minQty {self.min_qty}"
+        return qty, note
+
+    def quantize_price(self, price: float) -> float:
+        price = float(price)
+        if self.tick_size <= 0:
+            return price
+        return _floor_to_step(price, self.tick_size, self.price_decimals)
+
+
+def parse_exchange_info(payload: Any) -> Dict[str, List[Dict[str, Any]]]:
+    """``{symbol: filters}`` from an exchangeInfo response."""
+    symbols = payload.get("symbols") if isinstance(payload, dict) else None
+    parsed: Dict[str, List[Dict[str, Any]]] = {}
+    for row in symbols or []:
+        if isinstance(row, dict) and row.get("symbol"):
+            parsed[str(row["symbol"]).upper()] = list(row.get("filters") or [])
+    return parsed
+
+
+def is_filter_failure(exc: BaseException) -> bool:
+    """True for order rejections caused by stale symbol filters."""
+    if getattr(exc, "code", None) in FILTER_FAILURE_CODES and "filter" in str(exc).lower():
+        return True
+    return "filter failure" in str(exc).lower()
+
+
+class ExchangeInfoCache:
+    """Shared exchangeInfo: one bulk load, TTL'd, refreshed in the background."""
+
+    def __init__(
+        self,
+        *,
+        ttl: float = DEFAULT_TTL,
+        invalidate_interval: float = DEFAULT_INVALIDATE_INTERVAL,
+        path: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.ttl = float(ttl)
+        self.invalidate_interval = float(invalidate_interval)
+        self.path = Path(path) if path else None
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._rules: Dict[str, SymbolRules] = {}
+        self._loaded_at: Optional[float] = None
+        self._stale = False
+        self._invalidated_at: Dict[str, float] = {}
+        self._fetch: Optional[Fetch] = None
+        self._refresher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.stats = {
+            "loads": 0,
+            "disk_loads": 0,
+            "hits": 0,
+            "misses": 0,
+            "invalidations": 0,
+            "invalidations_skipped": 0,
+            "errors": 0,
+        }
+        self._load_from_disk()
+
+    # ---------------------------------------------------------------- lookups
+    def is_fresh(self) -> bool:
+        age = self._age()
+        return age is not None and age < self.ttl
+
+    def rules(self, symbol: str, fetch: Optional[Fetch] = None) -> Optional[SymbolRules]:
+        """Rules for ``symbol``, loading exchangeInfo through ``fetch`` if stale."""
+        if not symbol:
+            return None
+        key = str(symbol).upper()
+        if not self.is_fresh():
+            self.refresh(fetch or self._fetch, max_age=self.ttl)
+        rules = self._rules.get(key)
+        self.stats["hits" if rules is not None else "misses"] += 1
+        return rules
+
+    def symbols(self) -> List[str]:
+        return sorted(self._rules)
+
+    # ---------------------------------------------------------------- loading
+    def _age(self) -> Optional[float]:
+        if self._loaded_at is None or self._stale:
+            return None
+        return self._clock() - self._loaded_at
+
+    def refresh(self, fetch: Optional[Fetch], *, max_age: Optional[float] = None) -> bool:
+        """Reload from ``fetch`` unless a load younger than ``max_age`` exists.
+
+        Callers that race for the same reload share one request.
+        """
+        if fetch is None:
+            return False
+        with self._load_lock:
+            age = self._age()
+            if max_age is not None and age is not None and age < max_age:
+                return True
+            try:
+                parsed = parse_exchange_info(fetch())
+            except Exception as exc:  # pylint: disable=broad-except
+                self.stats["errors"] += 1
+                logger.warning("exchangeInfo load failed: %s", exc)
+                return False
+            if not parsed:
+                self.stats["errors"] += 1
+                return False
+            self._install(parsed, self._clock())
+            self.stats["loads"] += 1
+            self._save_to_disk(parsed)
+            return True
+
+    def _install(self, parsed: Dict[str, List[Dict[str, Any]]], loaded_at: float) -> None:
+        rules = {sym: SymbolRules.from_filters(sym, filters) for sym, filters in parsed.items()}
+        with self._lock:
+            self._rules = rules
+            self._loaded_at = loaded_at
+            self._stale = False
+
+    def invalidate(self, symbol: Optional[str] = None) -> bool:
+        """Force the next lookup (of any symbol) to reload exchangeInfo.
+
+        Returns ``False`` without touching the cache when ``symbol`` already
+        forced a reload within ``invalidate_interval``.
+        """
+        key = str(symbol).upper() if symbol else "*"
+        now = self._clock()
+        with self._lock:
+            last = self._invalidated_at.get(key)
+            if last is not None and now - last < self.invalidate_interval:
+                self.stats["invalidations_skipped"] += 1
+                return False
+            self._invalidated_at[key] = now
+            self._stale = True
+            self.stats["invalidations"] += 1
+        logger.info("exchangeInfo invalidated symbol=%s", key)
+        return True
+
+    # ------------------------------------------------------------- background
+    def attach(self, fetch: Fetch, *, interval: Optional[float] = None) -> None:
+        """Use ``fetch`` for reloads and keep the cache warm from a daemon thread."""
+        self._fetch = fetch
+        if self._refresher is not None and self._refresher.is_alive():
+            return
+        period = float(interval or max(1.0, self.ttl * 0.8))
+        self._stop.clear()
+
+        def _loop() -> None:
+            while not self._stop.is_set():
+                age = self._age()
+                if age is not None and age < period:
+                    self._stop.wait(period - age)
+                elif not self.refresh(self._fetch, max_age=period):
+                    self._stop.wait(min(period, 60.0))
+
+        self._refresher = threading.Thread(target=_loop, name="exchange-info-refresh", daemon=True)
+        self._refresher.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    # ------------------------------------------------------------------- disk
+    def _load_from_disk(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            payload = json.loads(self.path.read_text())
+            fetched_at = float(payload["fetched_at"])
+            parsed = payload["symbols"]
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning("Ignoring exchangeInfo cache file %s: %s", self.path, exc)
+            return
+        if self._clock() - fetched_at < self.ttl and isinstance(parsed, dict):
+            self._install(parsed, fetched_at)
+            self.stats["disk_loads"] += 1
+
+    def _save_to_disk(self, parsed: Dict[str, List[Dict[str, Any]]]) -> None:
+        if self.path is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"fetched_at": self._loaded_at, "symbols": parsed}))
+            os.replace(tmp, self.path)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning("Unable to persist exchangeInfo cache %s: %s", self.path, exc)
+
+
+_CACHES: Dict[Tuple[str, bool], ExchangeInfoCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_exchange_info_cache(venue: str = "spot", testnet: bool = False) -> ExchangeInfoCache:
+    """Process-wide cache per venue and network."""
+    key = (venue, bool(testnet))
+    with _CACHES_LOCK:
+        cache = _CACHES.get(key)
+        if cache is None:
+            directory = os.getenv("BINANCE_EXCHANGE_INFO_DIR")
+            path = (
+                os.path.join(directory, f"exchange_info_{venue}_{'testnet' if testnet else 'live'}.json")
+                if directory
+                else None
+            )
+            ttl = _float(os.getenv("BINANCE_EXCHANGE_INFO_TTL")) or DEFAULT_TTL
+            interval = (
+                _float(os.getenv("BINANCE_EXCHANGE_INFO_INVALIDATE_INTERVAL"))
+                or DEFAULT_INVALIDATE_INTERVAL
+            )
+            cache = _CACHES[key] = ExchangeInfoCache(
+                ttl=ttl, invalidate_interval=interval, path=path
+            )
+        return cache
+
+
+__all__ = [
+    "DEFAULT_INVALIDATE_INTERVAL",
+    "DEFAULT_TTL",
+    "ExchangeInfoCache",
+    "SymbolRules",
+    "get_exchange_info_cache",
+    "is_filter_failure",
+    "parse_exchange_info",
+]
@@ -2,7 +2,8 @@
 
 This module adds a conservative, non-blocking safety layer for futures entries:
 - VPS-only rolling 24h backtest eligibility per symbol
-- Market regime gate using ATR% and ADX
+- Market regime gate using ATR% and ADX (incremental, cached per symbol/interval
+  and kept warm by a background refresher so the gate is an in-memory lookup)
 - Symbol hard-stops (max trades/day, max daily loss, max consecutive losses)
 - Persistence across restarts and UTC midnight reset
 
@@ -21,6 +22,7 @@ from typing import Any, Mapping, MutableMapping, Optional
 
 import pandas as pd
 
+from app.indicators.regime import IncrementalRegimeIndicators
 from app.services.backtest import summarize_backtest_result
 from app.services.pathing import resolve_profile_path
 
@@ -48,6 +50,20 @@ def _coerce_int(value: Any, default: int) -> int:
         return int(default)
 
 
+_INTERVAL_UNITS = {"m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def _interval_seconds(interval: str, default: int = 300) -> int:
+    """Convert a Binance interval string such as ``5m`` or ``4h`` to seconds."""
+    text = str(interval or "").strip()
+    if len(text) < 2 or text[-1] not in _INTERVAL_UNITS:
+        return default
+    try:
+        return max(1, int(text[:-1]) * _INTERVAL_UNITS[text[-1]])
+    except ValueError:
+        return default
+
+
 @dataclass(frozen=True)
 class FuturesSafetyConfig:
     enabled: bool = True
@@ -67,6 +83,9 @@ class FuturesSafetyConfig:
     min_atr_pct: float = 0.35
     min_adx: float = 18.0
     indicator_cache_seconds: int = 300
+    indicator_max_stale_seconds: int = 900
+    indicator_refresh_seconds: int = 60
+    indicator_watch_seconds: int = 3600
 
     max_trades_per_day: int = 6
     max_daily_loss_usdt: float = 25.0
@@ -93,6 +112,7 @@ class FuturesSafetyService:
 
         self._stop_event = threading.Event()
         self._thread: threading.Thread | None = None
+        self._indicator_thread: threading.Thread | None = None
         self._lock = threading.RLock()
 
         # Resolve the profile-aware persistence directory first, then write
@@ -107,6 +127,13 @@ class FuturesSafetyService:
         self.symbol_limits: dict[str, dict[str, Any]] = {}
         self.meta: dict[str, Any] = {"last_backtest": None, "last_save": None}
 
+        # Incremental ATR/ADX state per (symbol, interval); rebuilt from the
+        # first fetch after a restart, then only new candles are folded in.
+        self._regime_states: dict[tuple[str, str], IncrementalRegimeIndicators] = {}
+        # Symbols whose indicators the background refresher keeps warm.
+        self._watched_symbols: dict[str, float] = {}
+        self._refresh_requested: set[str] = set()
+
         self._load_state()
         self._reset_daily_if_needed()
 
@@ -134,6 +161,12 @@ class FuturesSafetyService:
             target=self._run_loop, name="FuturesSafetyLoop", daemon=True
         )
         self._thread.start()
+        self._indicator_thread = threading.Thread(
+            target=self._run_indicator_loop,
+            name="FuturesSafetyIndicatorLoop",
+            daemon=True,
+        )
+        self._indicator_thread.start()
         self._log("✅ FuturesSafetyService started")
         return True
 
@@ -142,6 +175,9 @@ class FuturesSafetyService:
         if self._thread and self._thread.is_alive():
             self._thread.join(timeout=5.0)
         self._thread = None
+        if self._indicator_thread and self._indicator_thread.is_alive():
+            self._indicator_thread.join(timeout=5.0)
+        self._indicator_thread = None
         self._log("🛑 FuturesSafetyService stopped")
 
     # ------------------------- gate API -------------------------
@@ -210,6 +246,7 @@ class FuturesSafetyService:
         """Increment per-day trade counts for symbols when we actually place an entry."""
         symbol_u = str(symbol).upper()
         day = _utc_day_key()
+        self.track_symbol(symbol_u)
         with self._lock:
             limits = self.symbol_limits.setdefault(symbol_u, {})
             if limits.get("utc_day") != day:
@@ -330,30 +367,136 @@ class FuturesSafetyService:
 
     # ------------------------- indicators -------------------------
 
+    def track_symbol(self, symbol: str) -> None:
+        """Keep indicators for ``symbol`` warm in the background refresher."""
+        with self._lock:
+            self._watched_symbols[str(symbol).upper()] = time.time()
+
+    def _exposure_symbols(self, cfg: FuturesSafetyConfig) -> list[str]:
+        """Symbols with open or recent futures exposure (entries today or recently gated)."""
+        now = time.time()
+        day = _utc_day_key()
+        with self._lock:
+            for symbol, seen in list(self._watched_symbols.items()):
+                if now - seen > cfg.indicator_watch_seconds:
+                    self._watched_symbols.pop(symbol, None)
+            symbols = set(self._watched_symbols) | set(self._refresh_requested)
+            for symbol, limits in self.symbol_limits.items():
+                if limits.get("utc_day") == day and _coerce_int(limits.get("trades_today"), 0) > 0:
+                    symbols.add(symbol)
+        return sorted(symbols)
+
     def _get_indicator_metrics(
         self, symbol: str, cfg: FuturesSafetyConfig
         , *, trader: Any
     ) -> dict[str, Any] | None:
         now = time.time()
+        self.track_symbol(symbol)
         with self._lock:
             cached = self.indicators.get(symbol)
-            if cached and _safe_float(cached.get("ts"), 0) + cfg.indicator_cache_seconds > now:
+        if cached:
+            ts = _safe_float(cached.get("ts"), 0)
+            expires_at = _safe_float(
+                cached.get("expires_at"), ts + cfg.indicator_cache_seconds
+            )
+            if now < expires_at:
                 return dict(cached)
+            # Serve a bounded-stale snapshot while the refresher catches up.
+            refresher_alive = bool(
+                self._indicator_thread and self._indicator_thread.is_alive()
+            )
+            if refresher_alive and now - ts <= cfg.indicator_max_stale_seconds:
+                with self._lock:
+                    self._refresh_requested.add(symbol)
+                return {**cached, "stale": True}
 
+        return self._refresh_indicator_metrics(symbol, cfg, trader=trader)
+
+    def _refresh_indicator_metrics(
+        self, symbol: str, cfg: FuturesSafetyConfig, *, trader: Any
+    ) -> dict[str, Any] | None:
         df = self._fetch_recent_candles(symbol, cfg, trader=trader)
         if df is None or df.empty:
             return None
 
-        metrics = self._calculate_atr_adx(df, cfg)
+        metrics = self._update_regime_state(symbol, cfg, df)
         if not metrics:
             return None
 
+        now = time.time()
+        interval_s = _interval_seconds(cfg.indicator_interval)
+        expires_at = now + cfg.indicator_cache_seconds
+        last_open = metrics.get("last_open_time")
+        if last_open is not None:
+            # The newest candle is still forming; once it closes the cached
+            # snapshot no longer reflects the latest bar.
+            next_close = _safe_float(last_open, 0.0) + interval_s
+            if next_close > now:
+                expires_at = min(expires_at, next_close)
+            else:
+                expires_at = min(expires_at, now + interval_s)
+
         metrics["ts"] = now
+        metrics["expires_at"] = expires_at
         with self._lock:
             self.indicators[symbol] = dict(metrics)
+            self._refresh_requested.discard(symbol)
         self._save_state_best_effort()
         return dict(metrics)
 
+    def _update_regime_state(
+        self, symbol: str, cfg: FuturesSafetyConfig, df: pd.DataFrame
+    ) -> dict[str, Any] | None:
+        """Fold newly closed candles into the streaming ATR/ADX state.
+
+        The last row is treated as the forming candle: it is evaluated with
+        ``peek`` but only folded in once a newer candle arrives.
+        """
+        if df is None or df.empty:
+            return None
+
+        key = (symbol, cfg.indicator_interval)
+        interval_s = _interval_seconds(cfg.indicator_interval)
+        highs = df["high"].astype(float).tolist()
+        lows = df["low"].astype(float).tolist()
+        closes = df["close"].astype(float).tolist()
+        open_times: list[float] | None = None
+        if "open_time" in df.columns:
+            open_times = [float(v) for v in df["open_time"].tolist()]
+
+        with self._lock:
+            state = self._regime_states.get(key)
+            rebuild = (
+                state is None
+                or open_times is None
+                or state.last_open_time is None
+                or state.atr_period != cfg.atr_period
+                or state.adx_period != cfg.adx_period
+                # Gap between the stored state and the fetched window.
+                or open_times[0] > state.last_open_time + interval_s
+            )
+            if rebuild:
+                state = IncrementalRegimeIndicators(
+                    atr_period=cfg.atr_period, adx_period=cfg.adx_period
+                )
+            assert state is not None
+
+            for idx in range(len(closes) - 1):
+                open_time = open_times[idx] if open_times is not None else None
+                if (
+                    open_time is not None
+                    and state.last_open_time is not None
+                    and open_time <= state.last_open_time
+                ):
+                    continue
+                state.update(highs[idx], lows[idx], closes[idx], open_time)
+            self._regime_states[key] = state
+
+            metrics: dict[str, Any] = dict(state.peek(highs[-1], lows[-1], closes[-1]))
+        metrics["last_open_time"] = open_times[-1] if open_times is not None else None
+        metrics["interval"] = cfg.indicator_interval
+        return metrics
+
     def _fetch_recent_candles(
         self, symbol: str, cfg: FuturesSafetyConfig
         , *, trader: Any
@@ -386,7 +529,32 @@ class FuturesSafetyService:
             columns={cols["high"]: "high", cols["low"]: "low", cols["close"]: "close"},
             inplace=True,
         )
-        df = pd.DataFrame(df[["high", "low", "close"]].dropna())
+        keep = ["high", "low", "close"]
+        time_col = next(
+            (cols[name] for name in ("open_time", "date", "timestamp") if name in cols),
+            None,
+        )
+        open_times: pd.Series | None = None
+        if time_col is not None:
+            open_times = pd.Series(data[time_col])
+        elif isinstance(data.index, pd.DatetimeIndex):
+            open_times = pd.Series(data.index, index=data.index)
+        if open_times is not None:
+            try:
+                if pd.api.types.is_numeric_dtype(open_times):
+                    # Binance open_time is epoch milliseconds.
+                    seconds = open_times.astype(float)
+                    seconds = seconds.where(seconds < 1e11, seconds / 1000.0)
+                else:
+                    parsed = pd.to_datetime(open_times, utc=True)
+                    seconds = (parsed - pd.Timestamp(0, tz="UTC")).dt.total_seconds()
+                df["open_time"] = seconds.to_numpy()
+                keep.append("open_time")
+            except Exception:
+                pass
+        df = pd.DataFrame(df[keep].dropna())
+        if "open_time" in df.columns:
+            df = df.sort_values("open_time", kind="stable")
         return df
 
     def _calculate_atr_adx(
@@ -414,7 +582,7 @@ class FuturesSafetyService:
         tr = pd.Series(tr)
 
         atr = tr.ewm(alpha=1 / n_atr, adjust=False).mean()
-        atr_pct = (atr / close.replace(0, pd.NA)) * 100
+        atr_pct = (atr / close.replace(0, float("nan"))) * 100
 
         up_move = high.diff()
         down_move = (-low.diff())
@@ -426,9 +594,9 @@ class FuturesSafetyService:
         plus_dm_smoothed = plus_dm.ewm(alpha=1 / n_adx, adjust=False).mean()
         minus_dm_smoothed = minus_dm.ewm(alpha=1 / n_adx, adjust=False).mean()
 
-        plus_di = 100 * (plus_dm_smoothed / tr_smoothed.replace(0, pd.NA))
-        minus_di = 100 * (minus_dm_smoothed / tr_smoothed.replace(0, pd.NA))
-        dx = 100 * ((plus_di - minus_di).abs() / (plus_di + minus_di).replace(0, pd.NA))
+        plus_di = 100 * (plus_dm_smoothed / tr_smoothed.replace(0, float("nan")))
+        minus_di = 100 * (minus_dm_smoothed / tr_smoothed.replace(0, float("nan")))
+        dx = 100 * ((plus_di - minus_di).abs() / (plus_di + minus_di).replace(0, float("nan")))
         adx = dx.ewm(alpha=1 / n_adx, adjust=False).mean()
 
         last_atr_pct = float(atr_pct.dropna().iloc[-1]) if not atr_pct.dropna().empty else 0.0
@@ -565,6 +733,37 @@ class FuturesSafetyService:
                 self._log(f"⚠️ FuturesSafetyService backtest loop error: {exc}")
             self._stop_event.wait(self._get_interval_seconds())
 
+    def _run_indicator_loop(self) -> None:
+        while not self._stop_event.is_set():
+            cfg = self._effective_config()
+            try:
+                self._refresh_exposed_indicators_once(cfg)
+            except Exception as exc:  # pragma: no cover
+                self._log(f"⚠️ FuturesSafetyService indicator refresh error: {exc}")
+            self._stop_event.wait(max(5.0, float(cfg.indicator_refresh_seconds)))
+
+    def _refresh_exposed_indicators_once(self, cfg: FuturesSafetyConfig) -> int:
+        """Refresh expired indicator snapshots for symbols with futures exposure."""
+        if not cfg.enabled:
+            return 0
+        refreshed = 0
+        now = time.time()
+        for symbol in self._exposure_symbols(cfg):
+            if self._stop_event.is_set():
+                break
+            with self._lock:
+                cached = self.indicators.get(symbol) or {}
+                requested = symbol in self._refresh_requested
+            expires_at = _safe_float(
+                cached.get("expires_at"),
+                _safe_float(cached.get("ts"), 0) + cfg.indicator_cache_seconds,
+            )
+            if cached and not requested and now < expires_at:
+                continue
+            if self._refresh_indicator_metrics(symbol, cfg, trader=self.ultimate_trader):
+                refreshed += 1
+        return refreshed
+
     def _run_backtest_once(self) -> None:
         cfg = self._effective_config()
         if not cfg.enabled:
@@ -688,6 +887,9 @@ class FuturesSafetyService:
             min_atr_pct=_safe_float(tc.get("futures_safety_min_atr_pct", 0.35), 0.35),
             min_adx=_safe_float(tc.get("futures_safety_min_adx", 18.0), 18.0),
             indicator_cache_seconds=_coerce_int(tc.get("futures_safety_indicator_cache_seconds", 300), 300),
+            indicator_max_stale_seconds=_coerce_int(tc.get("futures_safety_indicator_max_stale_seconds", 900), 900),
+            indicator_refresh_seconds=_coerce_int(tc.get("futures_safety_indicator_refresh_seconds", 60), 60),
+            indicator_watch_seconds=_coerce_int(tc.get("futures_safety_indicator_watch_seconds", 3600), 3600),
             max_trades_per_day=_coerce_int(tc.get("futures_safety_max_trades_per_day", 6), 6),
             max_daily_loss_usdt=_safe_float(tc.get("futures_safety_max_daily_loss_usdt", 25.0), 25.0),
             max_consecutive_losses=_coerce_int(tc.get("futures_safety_max_consecutive_losses", 3), 3),
@@ -0,0 +1,320 @@
+"""Background dependency prober backing the ``/health`` endpoints.
+
+``/health`` used to call the Binance mainnet and testnet time endpoints (5s
+timeouts each), run ``SELECT 1`` and sample CPU for a full second on every
+request, so each load-balancer or orchestrator probe could take 10s and
+every probe hit the exchange. ``HealthProber`` runs those checks on its own
+cadence in a daemon thread and keeps the latest result per dependency with
+its timestamp and a bounded latency history; request handlers only read the
+cached snapshot.
+
+A result older than ``stale_factor`` times its probe interval is reported as
+``"stale"`` (the prober itself is stuck or dead), a dependency that has not
+been probed yet as ``"pending"``. ``/health`` reports ``"starting"`` rather
+than ``"healthy"`` while any required dependency is still pending.
+"""
+
+from __future__ import annotations
+
+import shutil
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+ProbeFn = Callable[[], Tuple[str, Dict[str, Any]]]
+
+BINANCE_TIME_URL = "https://api.binance.com/api/v3/time"
+BINANCE_TESTNET_TIME_URL = "https://testnet.binance.vision/api/v3/time"
+
+DEFAULT_INTERVALS = {
+    "binance_api": 30.0,
+    "binance_testnet_api": 60.0,
+    "database": 15.0,
+    "disk_space": 60.0,
+    "memory": 10.0,
+    "cpu": 10.0,
+}
+
+
+def _percentile(values: list[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return round(ordered[index], 2)
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    if ts is None:
+        return None
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
+
+
+@dataclass
+class _Probe:
+    name: str
+    fn: ProbeFn
+    interval: float
+    status: str = "pending"
+    details: Dict[str, Any] = field(default_factory=dict)
+    latency_ms: Optional[float] = None
+    checked_at: Optional[float] = None
+    error: Optional[str] = None
+    next_due: float = 0.0
+    runs: int = 0
+    failures: int = 0
+    history: deque = field(default_factory=lambda: deque(maxlen=60))
+
+
+class HealthProber:
+    """Runs dependency probes periodically and serves cached results."""
+
+    def __init__(
+        self,
+        probes: Mapping[str, Tuple[ProbeFn, float]] | None = None,
+        *,
+        stale_factor: float = 3.0,
+        history_size: int = 60,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.stale_factor = max(1.0, float(stale_factor))
+        self.history_size = max(1, int(history_size))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._probes: dict[str, _Probe] = {}
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.started_at = clock()
+        for name, (fn, interval) in (probes or {}).items():
+            self.add_probe(name, fn, interval)
+
+    def add_probe(self, name: str, fn: ProbeFn, interval: float) -> None:
+        with self._lock:
+            self._probes[name] = _Probe(
+                name=name,
+                fn=fn,
+                interval=max(0.5, float(interval)),
+                history=deque(maxlen=self.history_size),
+            )
+
+    # ------------------------------------------------------------- execution
+
+    def _run_probe(self, probe: _Probe) -> None:
+        started = time.perf_counter()
+        try:
+            status, details = probe.fn()
+            error = None
+        except Exception as exc:
+            status, details, error = "error", {}, f"{type(exc).__name__}: {exc}"
+        latency_ms = round((time.perf_counter() - started) * 1000, 2)
+        now = self._clock()
+        with self._lock:
+            probe.status = str(status)
+            probe.details = dict(details or {})
+            probe.error = error
+            probe.latency_ms = latency_ms
+            probe.checked_at = now
+            probe.next_due = now + probe.interval
+            probe.runs += 1
+            if probe.status not in ("ok", "unknown"):
+                probe.failures += 1
+            probe.history.append(latency_ms)
+
+    def run_due(self, *, force: bool = False) -> int:
+        """Run every probe whose interval elapsed; returns how many ran."""
+        now = self._clock()
+        with self._lock:
+            due = [p for p in self._probes.values() if force or p.next_due <= now]
+        for probe in due:
+            self._run_probe(probe)
+        return len(due)
+
+    def start(self) -> bool:
+        if self._thread and self._thread.is_alive():
+            return False
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="HealthProber", daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        thread = self._thread
+        if thread and thread.is_alive():
+            thread.join(timeout=2.0)
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def _loop(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.run_due()
+            except Exception:
+                pass
+            with self._lock:
+                pending = [p.next_due for p in self._probes.values()]
+            wait = (min(pending) - self._clock()) if pending else 1.0
+            self._stop_event.wait(min(5.0, max(0.25, wait)))
+
+    # ---------------------------------------------------------------- reads
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Latest result per dependency with age, staleness and latency stats."""
+        now = self._clock()
+        checks: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for name, probe in self._probes.items():
+                age = None if probe.checked_at is None else round(now - probe.checked_at, 3)
+                stale = age is not None and age > probe.interval * self.stale_factor
+                history = list(probe.history)
+                entry: Dict[str, Any] = {
+                    "status": "stale" if stale else probe.status,
+                    **probe.details,
+                    "checked_at": _iso(probe.checked_at),
+                    "age_seconds": age,
+                    "stale": stale,
+                    "interval_seconds": probe.interval,
+                    "probe_latency_ms": {
+                        "last": probe.latency_ms,
+                        "p50": _percentile(history, 50),
+                        "p95": _percentile(history, 95),
+                        "max": round(max(history), 2) if history else None,
+                        "samples": len(history),
+                    },
+                    "runs": probe.runs,
+                    "failures": probe.failures,
+                }
+                if stale:
+                    entry["last_status"] = probe.status
+                if probe.error:
+                    entry["error"] = probe.error
+                checks[name] = entry
+        return checks
+
+    def uptime_seconds(self) -> float:
+        return round(self._clock() - self.started_at, 3)
+
+
+# ------------------------------------------------------------------ probes
+
+
+def _http_time_probe(url: str, timeout: float = 5.0) -> ProbeFn:
+    def _probe() -> Tuple[str, Dict[str, Any]]:
+        import requests
+
+        started = time.perf_counter()
+        try:
+            response = requests.get(url, timeout=timeout)
+        except Exception:
+            return "error", {"latency_ms": None}
+        if response.status_code == 200:
+            return "ok", {"latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+        return "error", {"latency_ms": None}
+
+    return _probe
+
+
+def _database_probe(app: Any) -> ProbeFn:
+    def _probe() -> Tuple[str, Dict[str, Any]]:
+        from app.extensions import db
+
+        with app.app_context():
+            try:
+                db.session.execute(db.text("SELECT 1"))
+                return "ok", {}
+            except Exception:
+                return "error", {}
+            finally:
+                try:
+                    db.session.remove()
+                except Exception:
+                    pass
+
+    return _probe
+
+
+def _disk_probe() -> Tuple[str, Dict[str, Any]]:
+    try:
+        _total, _used, free = shutil.disk_usage("/")
+    except Exception:
+        return "error", {"free_gb": None}
+    return ("ok" if free > 1024**3 else "low"), {"free_gb": round(free / (1024**3), 2)}
+
+
+def _memory_probe() -> Tuple[str, Dict[str, Any]]:
+    try:
+        import psutil
+    except ImportError:
+        return "unknown", {"usage_percent": None}
+    memory = psutil.virtual_memory()
+    return ("high" if memory.percent > 90 else "ok"), {"usage_percent": round(memory.percent, 1)}
+
+
+def _cpu_probe() -> Tuple[str, Dict[str, Any]]:
+    try:
+        import psutil
+    except ImportError:
+        return "unknown", {"usage_percent": None}
+    # Non-blocking: utilisation since the previous call, i.e. over the
+    # probe interval instead of a one-second sleep inside the request.
+    usage = round(psutil.cpu_percent(interval=None), 1)
+    return ("high" if usage > 95 else "ok"), {"usage_percent": usage}
+
+
+def build_default_prober(app: Any, intervals: Mapping[str, float] | None = None) -> HealthProber:
+    """Prober with the dependency checks ``/health`` reports."""
+    merged = dict(DEFAULT_INTERVALS)
+    merged.update(intervals or {})
+    try:
+        import psutil
+
+        psutil.cpu_percent(interval=None)  # prime the CPU counter
+    except Exception:
+        pass
+    return HealthProber(
+        {
+            "binance_api": (_http_time_probe(BINANCE_TIME_URL), merged["binance_api"]),
+            "binance_testnet_api": (
+                _http_time_probe(BINANCE_TESTNET_TIME_URL),
+                merged["binance_testnet_api"],
+            ),
+            "database": (_database_probe(app), merged["database"]),
+            "disk_space": (_disk_probe, merged["disk_space"]),
+            "memory": (_memory_probe, merged["memory"]),
+            "cpu": (_cpu_probe, merged["cpu"]),
+        }
+    )
+
+
+_PROBER_LOCK = threading.Lock()
+
+
+def ensure_health_prober(app: Any) -> HealthProber:
+    """Return the app's prober, creating and starting it on first use."""
+    prober = app.extensions.get("health_prober")
+    if prober is not None:
+        return prober
+    with _PROBER_LOCK:
+        prober = app.extensions.get("health_prober")
+        if prober is None:
+            prober = build_default_prober(app, app.config.get("HEALTH_PROBE_INTERVALS"))
+            app.extensions["health_prober"] = prober
+        if app.config.get("HEALTH_PROBER_AUTOSTART", True):
+            prober.start()
+    return prober
+
+
+__all__ = [
+    "DEFAULT_INTERVALS",
+    "HealthProber",
+    "build_default_prober",
+    "ensure_health_prober",
+]
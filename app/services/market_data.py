@@ -10,6 +10,18 @@ from typing import Any, Callable, Iterable
 
 import redis
 
+from app.services.bar_store import get_bar_store
+from app.services.correlation import get_correlation_service
+from app.services.price_triggers import get_price_trigger_book
+from app.services.phase_timing import PhaseTimingRecorder, SamplingProfiler
+from app.services.signal_context import get_signal_context
+from app.services.user_accounts import (
+    UserAccountRegistry,
+    build_user_trader,
+    collect_shared_engines,
+    has_open_exposure,
+)
+
 
 class MarketDataService:
     """Encapsulates the legacy market-data loop and dashboard refresh logic."""
@@ -100,10 +112,59 @@ class MarketDataService:
 
         self._user_traders: dict[int, tuple[Any, Any]] = {}
         self._user_last_save: dict[int, float] = {}
+        # Compact per-user account state; heavy traders are hydrated lazily
+        # and evicted back to disk when idle.
+        self.user_accounts = UserAccountRegistry(
+            idle_seconds=self.trading_config.get("user_trader_idle_seconds", 1800),
+            max_hydrated=self.trading_config.get("max_hydrated_user_traders"),
+        )
+        self._shared_engines: dict[str, dict[str, Any]] | None = None
+        # Callables run after each completed cycle (e.g. republishing the
+        # per-user dashboard snapshots); failures are logged and ignored.
+        self.cycle_hooks: list[Callable[[], Any]] = []
 
         # Lightweight per-symbol phase tracking for dashboard observability.
         # This is best-effort telemetry only and must never affect trading logic.
         self._phase_state: dict[str, dict[str, Any]] = {}
+        self.phase_timings = PhaseTimingRecorder(
+            max_samples=self.trading_config.get("phase_timing_max_samples", 512),
+            window_seconds=self.trading_config.get("phase_timing_window_seconds", 3600),
+        )
+        self._cycle_profiler: SamplingProfiler | None = self._build_cycle_profiler()
+
+        # OHLC bars built from the ticks this loop observes; the CRT engine
+        # folds them incrementally instead of synthesising candles.
+        self.bar_store = get_bar_store()
+        try:
+            self.bar_store.configure(
+                max_bars=self.trading_config.get("crt_bar_store_size", 1000),
+                bar_seconds=self.trading_config.get("crt_bar_seconds", 0),
+            )
+        except Exception:
+            pass
+
+    def _build_cycle_profiler(self) -> SamplingProfiler | None:
+        """Optional stack sampler that dumps folded stacks for slow cycles."""
+        try:
+            slow_seconds = float(self.trading_config.get("phase_profile_slow_cycle_seconds") or 0)
+        except (TypeError, ValueError):
+            slow_seconds = 0.0
+        if slow_seconds <= 0:
+            return None
+        output_dir = self.trading_config.get("phase_profile_dir")
+        if not output_dir:
+            from app.services.pathing import resolve_profile_path
+
+            output_dir = os.path.join(resolve_profile_path("logs"), "cycle_profiles")
+        return SamplingProfiler(
+            output_dir=str(output_dir),
+            slow_seconds=slow_seconds,
+            interval_seconds=float(
+                self.trading_config.get("phase_profile_interval_ms", 10) or 10
+            )
+            / 1000.0,
+            max_dumps=int(self.trading_config.get("phase_profile_max_dumps", 20) or 20),
+        )
 
     def _set_symbol_phase(
         self,
@@ -141,6 +202,10 @@ class MarketDataService:
             if detail is not None:
                 phase_payload["detail"] = str(detail)
             phase_payload["updated_at"] = now
+
+            duration = self.phase_timings.mark(str(symbol), str(phase), str(status))
+            if duration is not None:
+                phase_payload["duration_ms"] = round(duration * 1000.0, 3)
         except Exception:
             return
 
@@ -157,6 +222,27 @@ class MarketDataService:
             except Exception:
                 return {}
 
+    def get_phase_timings(self, symbols: Iterable[str] | None = None) -> dict[str, Any]:
+        """Return rolling p50/p95/p99 phase, symbol and cycle wall times."""
+        try:
+            payload = self.phase_timings.snapshot(symbols=symbols, phase_order=self.PHASE_ORDER)
+        except Exception:
+            return {}
+        profiler = self._cycle_profiler
+        if profiler is not None:
+            payload["profiler"] = {
+                "slow_cycle_seconds": profiler.slow_seconds,
+                "last_dump": profiler.last_dump,
+            }
+        return payload
+
+    def render_phase_metrics(self) -> str:
+        """Prometheus text exposition of the phase timing windows."""
+        try:
+            return self.phase_timings.render_prometheus()
+        except Exception:
+            return ""
+
     def _resolve_auto_user_ids(self) -> list[int]:
         if self.auto_user_id_provider:
             try:
@@ -206,16 +292,26 @@ class MarketDataService:
                     )
                 except Exception:
                     pass
+            self.user_accounts.touch(user_id, expected_profile)
             return cached
 
         base_ultimate = self.ultimate_trader
         base_optimized = self.optimized_trader
         ultimate_cls = type(base_ultimate)
         optimized_cls = type(base_optimized)
+        shared = self._get_shared_engines()
 
         initial_balance = getattr(base_ultimate, "initial_balance", 10000)
-        ultimate = ultimate_cls(initial_balance=initial_balance)
-        optimized = optimized_cls(initial_balance=initial_balance)
+        ultimate = build_user_trader(
+            ultimate_cls,
+            initial_balance=initial_balance,
+            shared_engines=shared["ultimate"],
+        )
+        optimized = build_user_trader(
+            optimized_cls,
+            initial_balance=initial_balance,
+            shared_engines=shared["optimized"],
+        )
 
         profile = self._user_profile_name(user_id)
         setattr(ultimate, "persistence_profile", profile)
@@ -285,8 +381,91 @@ class MarketDataService:
                 pass
 
         self._user_traders[user_id] = (ultimate, optimized)
+        self.user_accounts.mark_hydrated(user_id, profile, ultimate, optimized)
         return ultimate, optimized
 
+    def _get_shared_engines(self) -> dict[str, dict[str, Any]]:
+        if self._shared_engines is None:
+            self._shared_engines = {
+                "ultimate": collect_shared_engines(self.ultimate_trader),
+                "optimized": collect_shared_engines(self.optimized_trader),
+            }
+        return self._shared_engines
+
+    def get_user_account_state(self, user_id: int) -> dict[str, Any] | None:
+        """Return the compact account state without hydrating a trader."""
+        cached = self._user_traders.get(int(user_id))
+        state = self.user_accounts.get(int(user_id))
+        if state is None:
+            return None
+        if cached is not None:
+            state.capture(cached[0], cached[1])
+        return state.to_dict()
+
+    def evict_idle_user_traders(self, active_user_ids: Iterable[int] = ()) -> list[int]:
+        """Persist and drop hydrated user traders that are idle or over the cap."""
+        self.user_accounts.configure(
+            idle_seconds=self.trading_config.get("user_trader_idle_seconds"),
+            max_hydrated=self.trading_config.get("max_hydrated_user_traders"),
+        )
+        candidates = self.user_accounts.eviction_candidates(
+            list(self._user_traders.keys()), keep=active_user_ids
+        )
+        evicted: list[int] = []
+        for uid in candidates:
+            traders = self._user_traders.get(uid)
+            if traders is None:
+                continue
+            user_ultimate, user_optimized = traders
+            if has_open_exposure(user_optimized):
+                # The optimized trader is not persisted; dropping it would
+                # lose its positions and orphan its take-profit orders.
+                continue
+            if not self._persist_user_state(uid, user_ultimate):
+                # Keep the trader in memory rather than lose unsaved state.
+                continue
+            self._user_traders.pop(uid, None)
+            book = get_price_trigger_book()
+            for trader in traders:
+                if trader is not None:
+                    book.remove_owner(trader)
+            self.user_accounts.mark_evicted(uid, user_ultimate, user_optimized)
+            evicted.append(uid)
+        if evicted:
+            self.bot_logger.info(
+                "Evicted %d idle user trader(s): %s", len(evicted), evicted
+            )
+        return evicted
+
+    def _check_triggered_stops(
+        self, current_prices: dict[str, Any], dashboard_traders: Iterable[Any]
+    ) -> list[Any]:
+        """Run stop/take-profit checks for every trader a tick actually affects.
+
+        One lookup in the shared trigger book fans the tick out across all
+        hydrated user traders; dashboard traders without trigger indexing are
+        checked the old way.
+        """
+        dashboard = tuple(dashboard_traders)
+        affected = get_price_trigger_book().fan_out(current_prices)
+        managed: list[Any] = list(dashboard)
+        for pair in list(self._user_traders.values()):
+            managed.extend(pair or ())
+
+        messages: list[Any] = []
+        seen: set[int] = set()
+        for trader in managed:
+            if trader is None or id(trader) in seen:
+                continue
+            seen.add(id(trader))
+            if trader in affected:
+                messages.extend(
+                    trader.check_advanced_stop_loss(current_prices, symbols=affected[trader])
+                )
+            elif trader in dashboard and not hasattr(trader, "refresh_position_triggers"):
+                messages.extend(trader.check_advanced_stop_loss(current_prices))
+        return messages
+
     def _maybe_persist_user_state(self, user_id: int, user_trader: Any) -> None:
         if not self.persistence_manager or not hasattr(self.persistence_manager, "save_complete_state"):
             return
@@ -297,7 +476,13 @@ class MarketDataService:
         interval_sec = max(60.0, interval_min * 60.0)
         if now - last < interval_sec:
             return
+        self._persist_user_state(user_id, user_trader)
+
+    def _persist_user_state(self, user_id: int, user_trader: Any) -> bool:
+        if not self.persistence_manager or not hasattr(self.persistence_manager, "save_complete_state"):
+            return False
 
+        now = time.time()
         symbols = self.symbols_for_persistence or list(self.get_active_trading_universe() or [])
         profile = self._user_profile_name(user_id)
         try:
@@ -310,6 +495,7 @@ class MarketDataService:
                 profile=profile,
             )
             self._user_last_save[user_id] = now
+            return True
         except TypeError:
             # Older persistence signature
             try:
@@ -321,10 +507,11 @@ class MarketDataService:
                     self.historical_data,
                 )
                 self._user_last_save[user_id] = now
+                return True
             except Exception:
-                pass
+                return False
         except Exception:
-            pass
+            return False
 
     def _get_cached_market_data(self, symbol: str) -> dict[str, Any] | None:
         """Get market data from cache if available and fresh."""
@@ -363,6 +550,22 @@ class MarketDataService:
             time.sleep(5)
             return
 
+        profiler = self._cycle_profiler
+        self.phase_timings.begin_cycle()
+        if profiler is not None:
+            profiler.start()
+        try:
+            self._run_cycle()
+        finally:
+            duration = self.phase_timings.end_cycle()
+            if profiler is not None:
+                dump = profiler.finish(duration)
+                if dump:
+                    self.bot_logger.warning(
+                        "Slow market data cycle (%.1fs); profile written to %s", duration, dump
+                    )
+
+    def _run_cycle(self) -> None:
         active_symbols = list(self.get_active_trading_universe() or [])
         self.refresh_symbol_counters()
         self.refresh_indicator_dashboard_state()
@@ -374,6 +577,7 @@ class MarketDataService:
             for sym in list(self._phase_state.keys()):
                 if sym not in active_set:
                     self._phase_state.pop(sym, None)
+            get_signal_context().prune(active_set)
         except Exception:
             pass
 
@@ -415,12 +619,23 @@ class MarketDataService:
                 history.append(real_data.get("price"))
                 if len(history) > 100:
                     history.pop(0)
+                try:
+                    self.bar_store.record_tick(symbol, real_data.get("price"))
+                except Exception:
+                    pass
                 self._set_symbol_phase(symbol, "fetch_market_data", status="ok", progress=15)
                 self._set_symbol_phase(symbol, "update_history", status="ok", progress=20)
             else:
                 self._set_symbol_phase(symbol, "fetch_market_data", status="error", progress=15)
                 self._set_symbol_phase(symbol, "update_history", status="error", progress=20)
 
+        try:
+            get_correlation_service().update_prices(
+                {symbol: data.get("price") for symbol, data in market_data.items()}
+            )
+        except Exception:
+            pass
+
         if self.trading_config.get("parallel_processing"):
             if market_data:
                 for symbol in active_symbols:
@@ -876,9 +1091,9 @@ class MarketDataService:
             for symbol, data in market_data.items()
             if "price" in data
         }
-        for message in ultimate_for_dashboard.check_advanced_stop_loss(current_prices):
-            print(f"🤖 {message}")
-        for message in optimized_for_dashboard.check_advanced_stop_loss(current_prices):
+        for message in self._check_triggered_stops(
+            current_prices, (ultimate_for_dashboard, optimized_for_dashboard)
+        ):
             print(f"🤖 {message}")
 
         portfolio = ultimate_for_dashboard.get_portfolio_summary(current_prices)
@@ -953,6 +1168,17 @@ class MarketDataService:
             optimized_crt_signals,
         )
 
+        try:
+            self.evict_idle_user_traders(user_ids)
+        except Exception as exc:
+            self.bot_logger.warning("User trader eviction failed: %s", exc)
+
+        for hook in list(self.cycle_hooks):
+            try:
+                hook()
+            except Exception as exc:
+                self.bot_logger.warning("Cycle hook %r failed: %s", hook, exc)
+
     def update_performance_metrics(self) -> None:
         try:
             performance = self.ultimate_trader.trade_history.get_trade_statistics()[
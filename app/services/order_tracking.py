@@ -0,0 +1,373 @@
+"""In-memory order state fed by Binance user-data-stream execution reports.
+
+``UltimateAIAutoTrader.update_auto_take_profit_orders`` used to call
+``RealBinanceTrader.get_order`` for every symbol in ``auto_take_profit_state``
+every ``auto_take_profit_adjust_interval`` seconds, one REST round-trip under
+the client lock each, just to learn whether a take-profit had filled.
+
+``OrderStateTracker`` holds the orders the bot cares about and updates them
+from ``executionReport`` events: status, cumulative filled quantity and
+price. Events for orders it does not track (manual trades on the same
+account) are ignored, and stale events never move an order backwards. An
+``on_update`` callback fires outside the lock for every change.
+
+Events come from a ``UserDataStream``: ``BinanceUserDataStream`` wraps
+python-binance's ``ThreadedWebsocketManager`` user socket, and
+``LocalUserDataStream`` lets paper trading and tests push events directly.
+Since a stream can drop silently, ``reconcile`` applies one batched
+``get_open_orders`` snapshot: a tracked order missing from the snapshot has
+left the book and is marked ``CLOSED``.
+"""
+
+from __future__ import annotations
+
+import abc
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("ai_trading_bot")
+
+# "CLOSED" is ours: the order left the book but we did not see why.
+TERMINAL_STATUSES = frozenset(
+    {"FILLED", "CANCELED", "REJECTED", "EXPIRED", "EXPIRED_IN_MATCH", "CLOSED"}
+)
+
+
+def _float(value: Any, default: float = 0.0) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _order_id(value: Any) -> Optional[int]:
+    try:
+        return int(value) if value not in (None, "", -1, "-1") else None
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class TrackedOrder:
+    symbol: str
+    order_id: Optional[int]
+    client_order_id: Optional[str]
+    side: str = "SELL"
+    price: float = 0.0
+    orig_qty: float = 0.0
+    executed_qty: float = 0.0
+    status: str = "NEW"
+    tracked_at: float = 0.0
+    updated_at: float = 0.0
+    event_time_ms: int = 0
+
+    @property
+    def remaining(self) -> float:
+        return max(0.0, self.orig_qty - self.executed_qty)
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "symbol": self.symbol,
+            "order_id": self.order_id,
+            "client_order_id": self.client_order_id,
+            "side": self.side,
+            "price": self.price,
+            "orig_qty": self.orig_qty,
+            "executed_qty": self.executed_qty,
+            "remaining": self.remaining,
+            "status": self.status,
+            "updated_at": self.updated_at,
+        }
+
+
+class OrderStateTracker:
+    """Orders keyed by exchange id and client id, updated from events."""
+
+    def __init__(
+        self,
+        *,
+        on_update: Optional[Callable[[TrackedOrder], None]] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.on_update = on_update
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._by_id: Dict[int, TrackedOrder] = {}
+        self._by_client: Dict[str, TrackedOrder] = {}
+        self.stats = {"events": 0, "applied": 0, "ignored": 0, "reconciled": 0, "closed": 0}
+
+    # ------------------------------------------------------------------ state
+    def track(
+        self,
+        symbol: str,
+        response: Optional[Dict[str, Any]],
+        *,
+        side: str = "SELL",
+        price: Optional[float] = None,
+        quantity: Optional[float] = None,
+    ) -> Optional[TrackedOrder]:
+        """Start tracking an order from its placement response."""
+        response = response if isinstance(response, dict) else {}
+        order_id = _order_id(response.get("orderId"))
+        client_id = response.get("clientOrderId") or None
+        if order_id is None and not client_id:
+            return None
+        now = self._clock()
+        order = TrackedOrder(
+            symbol=str(response.get("symbol") or symbol).upper(),
+            order_id=order_id,
+            client_order_id=client_id,
+            side=str(response.get("side") or side).upper(),
+            price=_float(response.get("price"), _float(price)),
+            orig_qty=_float(response.get("origQty"), _float(quantity)),
+            executed_qty=_float(response.get("executedQty")),
+            status=str(response.get("status") or "NEW").upper(),
+            tracked_at=now,
+            updated_at=now,
+        )
+        with self._lock:
+            self._index_locked(order)
+        return order
+
+    def _index_locked(self, order: TrackedOrder) -> None:
+        if order.order_id is not None:
+            self._by_id[order.order_id] = order
+        if order.client_order_id:
+            self._by_client[order.client_order_id] = order
+
+    def _find_locked(
+        self, order_id: Optional[int], client_ids: Iterable[Optional[str]]
+    ) -> Optional[TrackedOrder]:
+        if order_id is not None and order_id in self._by_id:
+            return self._by_id[order_id]
+        for client_id in client_ids:
+            if client_id and client_id in self._by_client:
+                return self._by_client[client_id]
+        return None
+
+    def get(self, order_id: Any = None, client_order_id: Optional[str] = None) -> Optional[TrackedOrder]:
+        with self._lock:
+            return self._find_locked(_order_id(order_id), [client_order_id])
+
+    def forget(self, order_id: Any = None, client_order_id: Optional[str] = None) -> None:
+        with self._lock:
+            order = self._find_locked(_order_id(order_id), [client_order_id])
+            if order is None:
+                return
+            if order.order_id is not None:
+                self._by_id.pop(order.order_id, None)
+            if order.client_order_id:
+                self._by_client.pop(order.client_order_id, None)
+
+    def open_orders(self) -> List[TrackedOrder]:
+        with self._lock:
+            return [order for order in self._unique_locked() if not order.is_terminal]
+
+    # ----------------------------------------------------------------- events
+    def apply_event(self, event: Any) -> Optional[TrackedOrder]:
+        """Apply one user-data-stream message; returns the order it changed."""
+        if isinstance(event, dict) and isinstance(event.get("data"), dict):
+            event = event["data"]  # combined-stream envelope
+        if not isinstance(event, dict) or event.get("e") != "executionReport":
+            return None
+        self.stats["events"] += 1
+        event_time = int(_float(event.get("E") or event.get("T")))
+        with self._lock:
+            order = self._find_locked(
+                _order_id(event.get("i")), [event.get("c"), event.get("C")]
+            )
+            if order is None or (order.is_terminal and order.status != "CLOSED"):
+                self.stats["ignored"] += 1
+                return None
+            if event_time and event_time < order.event_time_ms:
+                self.stats["ignored"] += 1
+                return None
+            executed = _float(event.get("z"), order.executed_qty)
+            status = str(event.get("X") or order.status).upper()
+            order.executed_qty = max(order.executed_qty, executed)
+            order.orig_qty = _float(event.get("q"), order.orig_qty) or order.orig_qty
+            order.price = _float(event.get("p"), order.price) or order.price
+            order.status = status
+            order.event_time_ms = max(order.event_time_ms, event_time)
+            order.updated_at = self._clock()
+            if order.order_id is None and _order_id(event.get("i")) is not None:
+                order.order_id = _order_id(event.get("i"))
+                self._by_id[order.order_id] = order
+            self.stats["applied"] += 1
+        self._notify(order)
+        return order
+
+    def reconcile(
+        self,
+        open_orders: Iterable[Dict[str, Any]],
+        *,
+        as_of: Optional[float] = None,
+        symbols: Optional[Iterable[str]] = None,
+    ) -> List[TrackedOrder]:
+        """Bring tracked orders in line with a ``get_open_orders`` snapshot.
+
+        Orders tracked after ``as_of`` (the time the snapshot was requested)
+        are left alone, since the snapshot may predate them.
+        """
+        scope = {str(s).upper() for s in symbols} if symbols is not None else None
+        listed: Dict[Tuple[str, Any], Dict[str, Any]] = {}
+        for row in open_orders or []:
+            if not isinstance(row, dict):
+                continue
+            if _order_id(row.get("orderId")) is not None:
+                listed[("id", _order_id(row.get("orderId")))] = row
+            if row.get("clientOrderId"):
+                listed[("client", row.get("clientOrderId"))] = row
+
+        changed: List[TrackedOrder] = []
+        now = self._clock()
+        with self._lock:
+            self.stats["reconciled"] += 1
+            for order in self._unique_locked():
+                if order.is_terminal or (scope is not None and order.symbol not in scope):
+                    continue
+                if as_of is not None and order.tracked_at > as_of:
+                    continue
+                row = listed.get(("id", order.order_id)) or listed.get(
+                    ("client", order.client_order_id)
+                )
+                if row is None:
+                    order.status = "CLOSED"
+                    self.stats["closed"] += 1
+                else:
+                    executed = max(order.executed_qty, _float(row.get("executedQty")))
+                    status = str(row.get("status") or order.status).upper()
+                    price = _float(row.get("price"), order.price)
+                    if (executed, status, price) == (order.executed_qty, order.status, order.price):
+                        continue
+                    order.executed_qty, order.status, order.price = executed, status, price
+                order.updated_at = now
+                changed.append(order)
+        for order in changed:
+            self._notify(order)
+        return changed
+
+    def _unique_locked(self) -> List[TrackedOrder]:
+        seen: Dict[int, TrackedOrder] = {}
+        for order in list(self._by_id.values()) + list(self._by_client.values()):
+            seen.setdefault(id(order), order)
+        return list(seen.values())
+
+    def _notify(self, order: TrackedOrder) -> None:
+        if self.on_update is None:
+            return
+        try:
+            self.on_update(order)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Order update callback failed order_id=%s", order.order_id)
+
+
+class UserDataStream(abc.ABC):
+    """Source of user-data-stream events delivered to a callback."""
+
+    def __init__(self) -> None:
+        self.connected = False
+        self.last_event_at: Optional[float] = None
+        self._callback: Optional[Callable[[Dict[str, Any]], Any]] = None
+
+    @abc.abstractmethod
+    def start(self, callback: Callable[[Dict[str, Any]], Any]) -> bool:
+        """Begin delivering events to ``callback``; safe to call again to restart."""
+
+    def stop(self) -> None:
+        self.connected = False
+
+    def _dispatch(self, message: Any) -> None:
+        if isinstance(message, dict) and message.get("e") == "error":
+            # python-binance reports socket failures in-band.
+            self.connected = False
+            logger.warning("User data stream error: %s", message.get("m"))
+            return
+        self.last_event_at = time.time()
+        if self._callback is not None:
+            self._callback(message)
+
+
+class LocalUserDataStream(UserDataStream):
+    """In-process stream for paper trading and tests: ``push`` delivers events."""
+
+    def start(self, callback: Callable[[Dict[str, Any]], Any]) -> bool:
+        self._callback = callback
+        self.connected = True
+        return True
+
+    def push(self, event: Dict[str, Any]) -> None:
+        self._dispatch(event)
+
+
+class BinanceUserDataStream(UserDataStream):
+    """Spot user data stream over python-binance's ``ThreadedWebsocketManager``."""
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        api_secret: Optional[str],
+        *,
+        testnet: bool = True,
+        manager_factory: Optional[Callable[[], Any]] = None,
+    ) -> None:
+        super().__init__()
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.testnet = testnet
+        self._manager_factory = manager_factory
+        self._manager: Any = None
+
+    def _create_manager(self) -> Any:
+        if self._manager_factory is not None:
+            return self._manager_factory()
+        from binance import ThreadedWebsocketManager
+
+        return ThreadedWebsocketManager(
+            api_key=self.api_key, api_secret=self.api_secret, testnet=self.testnet
+        )
+
+    def start(self, callback: Callable[[Dict[str, Any]], Any]) -> bool:
+        # A restart after an in-band error must not leave the previous
+        # manager's socket thread running (and delivering events twice).
+        self.stop()
+        self._callback = callback
+        manager = None
+        try:
+            manager = self._create_manager()
+            manager.start()
+            manager.start_user_socket(callback=self._dispatch)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning("User data stream unavailable: %s", exc)
+            self._manager = manager
+            self.stop()
+            return False
+        self._manager = manager
+        self.connected = True
+        return True
+
+    def stop(self) -> None:
+        super().stop()
+        manager, self._manager = self._manager, None
+        if manager is not None:
+            try:
+                manager.stop()
+            except Exception:  # pylint: disable=broad-except
+                pass
+
+
+__all__ = [
+    "BinanceUserDataStream",
+    "LocalUserDataStream",
+    "OrderStateTracker",
+    "TERMINAL_STATUSES",
+    "TrackedOrder",
+    "UserDataStream",
+]
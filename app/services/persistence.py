@@ -1,32 +1,36 @@
-"""Persistence services for saving and scheduling bot state."""
+"""Persistence services for saving and scheduling bot state.
+
+``save_complete_state`` used to serialise every section twice (an indented
+zstd backup and an indented ``bot_state.json``) on each save, write a new
+full backup every time and call ``get_trade_history()`` twice just to read a
+timestamp, reloading and sorting the whole trade journal.
+
+Each top-level section is now serialised once and fingerprinted per profile.
+``bot_state.json`` keeps its schema (routes read and patch it in place) but is
+only rewritten when a section changed or another writer touched the file.
+Backups are a full ``state_backup_*.json.zst`` every ``full_backup_every``
+saves with small ``state_delta_*`` files holding only changed sections in
+between (``load_backup_state`` replays them). The last trade time comes from
+the trade history index. Duration and bytes of every save are kept in
+``get_save_metrics`` and in ``state_manifest.json``.
+"""
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
 import os
 import shutil
 import threading
 import time
+from array import array
 from contextlib import contextmanager
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Callable, Dict
+from typing import Any, Callable, Dict, Optional
 
 from utils.compression import get_compressor
-try:
-    from scripts.clean_trade_history import _to_float
-except Exception:
-    # In some deployment layouts the top-level `scripts` module may not be
-    # importable at module-import time. Provide a small fallback implementation
-    # to avoid crashing the WSGI process; the behavior mirrors the utility
-    # defined in `scripts/clean_trade_history.py`.
-    def _to_float(value) -> float:
-        try:
-            if value in (None, ""):
-                return 0.0
-            return float(value)
-        except Exception:
-            return 0.0
 
 LoggerLike = logging.Logger
 
@@ -87,6 +91,115 @@ def _atomic_write_json(path: os.PathLike[str] | str, payload: Any) -> None:
     os.replace(tmp, target)
 
 
+def _series_digest(prices) -> str:
+    """Fingerprint a price series by its full contents.
+
+    Rolling windows keep the same length and can keep the same first and last
+    value while the middle moves, so nothing short of the whole series is a
+    safe key. Numeric series hash their packed doubles; anything else falls
+    back to ``repr``.
+    """
+    try:
+        payload = array("d", prices).tobytes()
+    except (TypeError, ValueError):
+        payload = repr(list(prices)).encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def _atomic_write_bytes(path: os.PathLike[str] | str, payload: bytes) -> None:
+    target = str(path)
+    tmp = f"{target}.tmp.{os.getpid()}.{threading.get_ident()}"
+    with open(tmp, "wb") as handle:
+        handle.write(payload)
+        handle.flush()
+        try:
+            os.fsync(handle.fileno())
+        except Exception:
+            pass
+    os.replace(tmp, target)
+
+
+def _encode_section(value: Any) -> bytes:
+    return json.dumps(value, default=str, separators=(",", ":")).encode("utf-8")
+
+
+def _join_sections(fragments: Dict[str, bytes]) -> bytes:
+    """A JSON object built from already-serialised member values."""
+    return b"{" + b",".join(
+        json.dumps(key).encode("utf-8") + b":" + fragment for key, fragment in fragments.items()
+    ) + b"}"
+
+
+def _file_signature(path: os.PathLike[str] | str) -> Optional[tuple]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+# Top-level ``bot_state.json`` members that are fingerprinted for changes;
+# ``timestamp``, ``system_metrics`` and ``trades`` move on every save.
+STATE_SECTIONS = (
+    "version",
+    "trader_state",
+    "ml_system_state",
+    "configuration",
+    "historical_data_summary",
+    "futures_manual_settings",
+)
+_STATE_KEY_ORDER = (
+    "version",
+    "timestamp",
+    "trader_state",
+    "ml_system_state",
+    "configuration",
+    "historical_data_summary",
+    "futures_manual_settings",
+    "system_metrics",
+    "trades",
+)
+_FULL_BACKUP_PREFIX = "state_backup_"
+_DELTA_BACKUP_PREFIX = "state_delta_"
+_BACKUP_SUFFIX = ".json.zst"
+
+
+@dataclass
+class _ProfileSaveState:
+    """What the last save of one profile wrote, for dirty checks."""
+
+    digests: Dict[str, str] = field(default_factory=dict)
+    state_signature: Optional[tuple] = None
+    backup_base: Optional[str] = None
+    backup_deltas: int = 0
+    backup_digests: Dict[str, str] = field(default_factory=dict)
+    critical_digest: Optional[str] = None
+    metrics: Dict[str, Any] = field(
+        default_factory=lambda: {
+            "saves": 0,
+            "state_writes": 0,
+            "state_writes_skipped": 0,
+            "full_backups": 0,
+            "delta_backups": 0,
+            "bytes_written": 0,
+            "total_duration_sec": 0.0,
+        }
+    )
+
+
+def _last_trade_time(trader) -> Any:
+    """Timestamp of the newest trade without reloading the full journal."""
+    history = getattr(trader, "trade_history", None)
+    if history is None:
+        return None
+    trade_index = getattr(history, "trade_index", None)
+    if callable(trade_index):
+        newest = trade_index().newest()
+        return newest.get("timestamp") if newest else None
+    trades = history.get_trade_history()
+    return trades[0].get("timestamp") if trades else None
+
+
 def _default_noop(*_: Any, **__: Any) -> None:
     """Fallback noop for optional callbacks."""
 
@@ -167,6 +280,11 @@ def ensure_persistence_dirs(profile_override: str | None = None) -> Path:
     return target
 
 
+def _backup_stem(name: str) -> str:
+    """``state_backup_<stem>.json.zst`` -> ``<stem>``."""
+    return name[len(_FULL_BACKUP_PREFIX): -len(_BACKUP_SUFFIX)]
+
+
 class ProfessionalPersistence:
     """File-backed persistence for the AI bot state."""
 
@@ -178,6 +296,8 @@ class ProfessionalPersistence:
         futures_settings_getter: Callable[[], Dict[str, Any]] | None = None,
         futures_settings_setter: Callable[[Dict[str, Any]], None] | None = None,
         compression_level: int = 3,
+        full_backup_every: int = 12,
+        max_full_backups: int = 10,
     ) -> None:
         self.persistence_dir = persistence_dir
         persist_dir = ensure_persistence_dirs()
@@ -193,6 +313,11 @@ class ProfessionalPersistence:
 
         # Initialize Zstandard compressor
         self.compressor = get_compressor(level=compression_level)
+        self.full_backup_every = max(1, int(full_backup_every))
+        self.max_full_backups = max(1, int(max_full_backups))
+        self._save_lock = threading.RLock()
+        self._profiles: Dict[str, _ProfileSaveState] = {}
+        self._history_summary_memo: Dict[Any, tuple] = {}
 
     def save_complete_state(
         self,
@@ -235,9 +360,9 @@ class ProfessionalPersistence:
                 t_enabled,
                 t_paper,
             )
-            state = {
+            started = time.perf_counter()
+            sections = {
                 "version": self.current_version,
-                "timestamp": datetime.now().isoformat(),
                 "trader_state": self._get_trader_state(trader),
                 "ml_system_state": self._get_ml_system_state(ml_system),
                 "configuration": {
@@ -249,38 +374,72 @@ class ProfessionalPersistence:
                     historical_data
                 ),
                 "futures_manual_settings": self._futures_settings_getter() or {},
-                "system_metrics": {
-                    "total_uptime": self._calculate_uptime(),
-                    "save_count": self._get_save_count(profile),
-                    "last_trade_time": trader.trade_history.get_trade_history()[-1][
-                        "timestamp"
-                    ]
-                    if trader.trade_history.get_trade_history()
-                    else None,
-                },
             }
-
-            # Validate pnl before persisting state
-            def validate_pnl(trade):
-                if trade.get("status") == "CLOSED" and _to_float(trade.get("pnl", 0)) == 0:
-                    raise ValueError("Invalid pnl for CLOSED trade")
+            saved_at = datetime.now()
+            system_metrics = {
+                "total_uptime": self._calculate_uptime(),
+                "save_count": self._get_save_count(profile),
+                "last_trade_time": _last_trade_time(trader),
+            }
+            fragments = {name: _encode_section(value) for name, value in sections.items()}
+            fragments["timestamp"] = _encode_section(saved_at.isoformat())
+            fragments["system_metrics"] = _encode_section(system_metrics)
+            fragments["trades"] = b"[]"
+            fragments = {key: fragments[key] for key in _STATE_KEY_ORDER}
+            digests = {
+                name: hashlib.sha1(fragments[name]).hexdigest() for name in STATE_SECTIONS
+            }
 
             # Create backup directory if it doesn't exist
             backup_dir.mkdir(exist_ok=True)
 
-            # Compress and save the state
-            backup_file = backup_dir / f"state_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json.zst"
-            self.compressor.compress_json(state, backup_file)
-
-            with _bot_state_file_lock(state_file):
-                _atomic_write_json(state_file, {
-                    **state,
-                    "trades": [
-                        validate_pnl(trade) or trade for trade in state.get("trades", [])
-                    ],
-                })
+            with self._save_lock:
+                tracker = self._profiles.setdefault(str(state_file), _ProfileSaveState())
+                dirty = [name for name in STATE_SECTIONS if tracker.digests.get(name) != digests[name]]
+                bytes_written = 0
+
+                # Another writer (e.g. a route toggling trading flags) patched
+                # the file since our last save: rewrite it from memory.
+                if dirty or _file_signature(state_file) != tracker.state_signature:
+                    body = _join_sections(fragments)
+                    with _bot_state_file_lock(state_file):
+                        _atomic_write_bytes(state_file, body)
+                        tracker.state_signature = _file_signature(state_file)
+                    bytes_written += len(body)
+                    tracker.metrics["state_writes"] += 1
+                else:
+                    tracker.metrics["state_writes_skipped"] += 1
+                tracker.digests = digests
+
+                backup_kind, backup_bytes = self._write_backup(
+                    tracker, backup_dir, fragments, digests, saved_at
+                )
+                bytes_written += backup_bytes
+                bytes_written += self._save_critical_components(
+                    trader, ml_system, tracker=tracker, persist_dir=persist_dir
+                )
 
-            self._save_critical_components(trader, ml_system)
+                duration = time.perf_counter() - started
+                metrics = tracker.metrics
+                metrics["saves"] += 1
+                metrics["bytes_written"] += bytes_written
+                metrics["total_duration_sec"] += duration
+                metrics.update(
+                    last_saved_at=saved_at.isoformat(),
+                    last_duration_sec=round(duration, 6),
+                    last_bytes_written=bytes_written,
+                    last_dirty_sections=dirty,
+                    last_backup=backup_kind,
+                )
+                manifest = {
+                    "timestamp": saved_at.isoformat(),
+                    "system_metrics": system_metrics,
+                    "section_digests": digests,
+                    "backup_base": tracker.backup_base,
+                    "backup_deltas": tracker.backup_deltas,
+                    "save_metrics": dict(metrics),
+                }
+            _atomic_write_json(persist_dir / "state_manifest.json", manifest)
             self._update_save_count(profile)
             return True
         except Exception as exc:  # pragma: no cover - defensive logging
@@ -365,10 +524,18 @@ class ProfessionalPersistence:
         }
 
     def _summarize_historical_data(self, historical_data) -> Dict[str, Any]:
+        # Symbols whose series did not change keep their previous entry (and
+        # ``last_updated``), so the section only changes with the data.
         summary: Dict[str, Any] = {}
+        memo = self._history_summary_memo
         for symbol, prices in historical_data.items():
             if prices:
-                summary[symbol] = {
+                key = _series_digest(prices)
+                cached = memo.get(symbol)
+                if cached is not None and cached[0] == key:
+                    summary[symbol] = cached[1]
+                    continue
+                entry = {
                     "data_points": len(prices),
                     "latest_price": prices[-1],
                     "price_range": (
@@ -378,9 +545,19 @@ class ProfessionalPersistence:
                     ),
                     "last_updated": datetime.now().isoformat(),
                 }
+                memo[symbol] = (key, entry)
+                summary[symbol] = entry
         return summary
 
-    def _save_critical_components(self, trader, ml_system) -> None:
+    def _save_critical_components(
+        self,
+        trader,
+        ml_system,
+        *,
+        tracker: Optional[_ProfileSaveState] = None,
+        persist_dir: Optional[Path] = None,
+    ) -> int:
+        """Write ``critical_state.json`` next to the profile's ``bot_state.json``."""
         try:
             critical_state = {
                 "positions": trader.positions,
@@ -389,12 +566,117 @@ class ProfessionalPersistence:
                 "models_loaded": list(ml_system.models.keys()),
                 "futures_manual_settings": self._futures_settings_getter() or {},
             }
-            persist_dir = ensure_persistence_dirs()
+            if persist_dir is None:
+                persist_dir = ensure_persistence_dirs()
             critical_file = persist_dir / "critical_state.json"
-            with open(critical_file, "w") as handle:
-                json.dump(critical_state, handle, indent=2, default=str)
+            body = json.dumps(critical_state, indent=2, default=str).encode("utf-8")
+            digest = hashlib.sha1(body).hexdigest()
+            if tracker is not None and tracker.critical_digest == digest and critical_file.exists():
+                return 0
+            _atomic_write_bytes(critical_file, body)
+            if tracker is not None:
+                tracker.critical_digest = digest
+            return len(body)
         except Exception as exc:  # pragma: no cover
             print(f"⚠️ Warning: Could not save critical components: {exc}")
+            return 0
+
+    # ------------------------------------------------------------- backups
+
+    def _write_backup(
+        self,
+        tracker: _ProfileSaveState,
+        backup_dir: Path,
+        fragments: Dict[str, bytes],
+        digests: Dict[str, str],
+        saved_at: datetime,
+    ) -> tuple[Optional[str], int]:
+        """Full snapshot every ``full_backup_every`` saves, deltas in between."""
+        changed = [name for name in STATE_SECTIONS if tracker.backup_digests.get(name) != digests[name]]
+        base = tracker.backup_base
+        if (
+            base is None
+            or tracker.backup_deltas >= self.full_backup_every - 1
+            or not (backup_dir / base).exists()
+        ):
+            name = f"{_FULL_BACKUP_PREFIX}{saved_at.strftime('%Y%m%d_%H%M%S_%f')}{_BACKUP_SUFFIX}"
+            payload = _join_sections(fragments)
+            kind = "full"
+            tracker.backup_base = name
+            tracker.backup_deltas = 0
+            tracker.metrics["full_backups"] += 1
+        elif changed:
+            sequence = tracker.backup_deltas + 1
+            name = f"{_DELTA_BACKUP_PREFIX}{_backup_stem(base)}_{sequence:04d}{_BACKUP_SUFFIX}"
+            payload = _join_sections(
+                {
+                    "base": _encode_section(base),
+                    "sequence": _encode_section(sequence),
+                    "timestamp": fragments["timestamp"],
+                    "system_metrics": fragments["system_metrics"],
+                    "sections": _join_sections({key: fragments[key] for key in changed}),
+                }
+            )
+            kind = "delta"
+            tracker.backup_deltas = sequence
+            tracker.metrics["delta_backups"] += 1
+        else:
+            return None, 0
+
+        compressed = self.compressor.cctx.compress(payload)
+        _atomic_write_bytes(backup_dir / name, compressed)
+        tracker.backup_digests = dict(digests)
+        if kind == "full":
+            self._cleanup_compressed_backups(backup_dir)
+        return kind, len(compressed)
+
+    def _cleanup_compressed_backups(self, backup_dir: Path) -> None:
+        """Keep the newest ``max_full_backups`` snapshots and their deltas."""
+        try:
+            names = os.listdir(backup_dir)
+            fulls = sorted(
+                name for name in names
+                if name.startswith(_FULL_BACKUP_PREFIX) and name.endswith(_BACKUP_SUFFIX)
+            )
+            expired = fulls[: max(0, len(fulls) - self.max_full_backups)]
+            expired_stems = {_backup_stem(name) for name in expired}
+            for name in names:
+                if name in expired or (
+                    name.startswith(_DELTA_BACKUP_PREFIX)
+                    and name[len(_DELTA_BACKUP_PREFIX):].rsplit("_", 1)[0] in expired_stems
+                ):
+                    os.remove(backup_dir / name)
+        except Exception as exc:  # pragma: no cover
+            print(f"⚠️ Backup cleanup failed: {exc}")
+
+    def load_backup_state(self, *, profile: str | None = None) -> Optional[Dict[str, Any]]:
+        """Newest full backup with its deltas replayed, or ``None``."""
+        backup_dir = ensure_persistence_dirs(profile) / "backups"
+        try:
+            names = os.listdir(backup_dir)
+        except OSError:
+            return None
+        fulls = sorted(
+            name for name in names
+            if name.startswith(_FULL_BACKUP_PREFIX) and name.endswith(_BACKUP_SUFFIX)
+        )
+        if not fulls:
+            return None
+        base = fulls[-1]
+        state = self.compressor.decompress_json(backup_dir / base)
+        prefix = f"{_DELTA_BACKUP_PREFIX}{_backup_stem(base)}_"
+        for name in sorted(n for n in names if n.startswith(prefix) and n.endswith(_BACKUP_SUFFIX)):
+            delta = self.compressor.decompress_json(backup_dir / name)
+            state.update(delta.get("sections") or {})
+            state["timestamp"] = delta.get("timestamp", state.get("timestamp"))
+            state["system_metrics"] = delta.get("system_metrics", state.get("system_metrics"))
+        return state
+
+    def get_save_metrics(self, *, profile: str | None = None) -> Dict[str, Any]:
+        state_file = ensure_persistence_dirs(profile) / "bot_state.json"
+        with self._save_lock:
+            tracker = self._profiles.get(str(state_file))
+            return dict(tracker.metrics) if tracker is not None else {}
 
     def _restore_trader_state(self, trader, state: Dict[str, Any]) -> None:
         trader.balance = state.get("balance", trader.initial_balance)
@@ -552,6 +834,17 @@ class ProfessionalPersistence:
                 status["last_save_time"] = state.get("timestamp")
             except Exception:
                 pass
+        manifest_file = persist_dir / "state_manifest.json"
+        if manifest_file.exists():
+            # Saves that changed nothing skip bot_state.json but still
+            # record themselves in the manifest.
+            try:
+                with open(manifest_file, "r") as handle:
+                    manifest = json.load(handle)
+                status["last_save_time"] = manifest.get("timestamp") or status["last_save_time"]
+                status["save_metrics"] = manifest.get("save_metrics", {})
+            except Exception:
+                pass
         return status
 
 
@@ -606,11 +899,17 @@ class PersistenceScheduler:
                         )
                         duration = time.time() - started_at
                         if success:
+                            details: Dict[str, Any] = {"duration_sec": round(duration, 3)}
+                            get_metrics = getattr(self.persistence_manager, "get_save_metrics", None)
+                            if callable(get_metrics):
+                                metrics = get_metrics()
+                                details["bytes_written"] = metrics.get("last_bytes_written")
+                                details["dirty_sections"] = metrics.get("last_dirty_sections")
                             self._log_event(
                                 "PERSISTENCE",
                                 "Automatic state save completed",
                                 level=logging.INFO,
-                                details={"duration_sec": round(duration, 3)},
+                                details=details,
                             )
                         else:
                             self._log_event(
@@ -0,0 +1,380 @@
+"""Wall-time telemetry for the market-data cycle phases.
+
+``MarketDataService._set_symbol_phase`` marks each symbol's progress through
+the cycle (fetch, ML, ensemble, QFM, CRT, trade, persist, ...). This module
+turns those marks into durations:
+
+- a phase's duration runs from its ``running`` mark (or, when a phase is only
+  ever marked as finished, from the symbol's previous mark) to its terminal
+  mark (``ok``/``error``/...)
+- samples are kept in bounded rolling windows per phase, per symbol and per
+  symbol/phase, plus cycle and per-symbol cycle totals
+- ``snapshot()`` reports p50/p95/p99 for ``/api/phases`` and
+  ``render_prometheus()`` emits summary-style text for ``/metrics``
+
+``SamplingProfiler`` is an optional hook that samples the cycle thread's stack
+and writes a folded-stack (flamegraph/speedscope) file when a cycle exceeds a
+configured threshold.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Callable, Iterable, Mapping
+
+QUANTILES: tuple[float, ...] = (0.5, 0.95, 0.99)
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    if len(sorted_values) == 1:
+        return float(sorted_values[0])
+    pos = (len(sorted_values) - 1) * q
+    lower = int(pos)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    frac = pos - lower
+    return float(sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * frac)
+
+
+class _Window:
+    """Bounded rolling window of (timestamp, seconds) samples."""
+
+    __slots__ = ("samples", "count", "total")
+
+    def __init__(self, max_samples: int) -> None:
+        self.samples: deque[tuple[float, float]] = deque(maxlen=max_samples)
+        # Lifetime counters (Prometheus summaries expose monotonic _count/_sum).
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, ts: float, seconds: float) -> None:
+        self.samples.append((ts, seconds))
+        self.count += 1
+        self.total += seconds
+
+    def prune(self, cutoff: float) -> None:
+        while self.samples and self.samples[0][0] < cutoff:
+            self.samples.popleft()
+
+    def stats(self) -> dict[str, float]:
+        values = sorted(seconds for _ts, seconds in self.samples)
+        payload: dict[str, float] = {
+            "samples": len(values),
+            "count": self.count,
+            "sum_seconds": round(self.total, 6),
+            "max_seconds": round(values[-1], 6) if values else 0.0,
+            "mean_seconds": round(sum(values) / len(values), 6) if values else 0.0,
+        }
+        for q in QUANTILES:
+            payload[f"p{int(q * 100)}_seconds"] = round(percentile(values, q), 6)
+        return payload
+
+
+_TERMINAL_STATUSES = frozenset({"ok", "error", "failed", "skipped", "blocked", "done"})
+
+
+class PhaseTimingRecorder:
+    """Collects per-phase, per-symbol and per-cycle wall-time samples."""
+
+    def __init__(
+        self,
+        *,
+        max_samples: int = 512,
+        window_seconds: float = 3600.0,
+        clock: Callable[[], float] = time.perf_counter,
+        wall_clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.max_samples = max(8, int(max_samples))
+        self.window_seconds = max(0.0, float(window_seconds))
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._lock = threading.Lock()
+        self._phases: dict[str, _Window] = {}
+        self._symbol_phases: dict[tuple[str, str], _Window] = {}
+        self._symbols: dict[str, _Window] = {}
+        self._cycles = _Window(self.max_samples)
+        self._open: dict[tuple[str, str], float] = {}
+        self._last_mark: dict[str, float] = {}
+        self._symbol_started: dict[str, float] = {}
+        self._cycle_started: float | None = None
+        self._last_cycle: dict[str, Any] = {}
+        self._cycle_phase_totals: dict[str, float] = {}
+
+    # ------------------------------------------------------------------ marks
+    def begin_cycle(self) -> None:
+        now = self._clock()
+        with self._lock:
+            self._cycle_started = now
+            self._open.clear()
+            self._last_mark.clear()
+            self._symbol_started.clear()
+            self._cycle_phase_totals = {}
+
+    def end_cycle(self, *, symbols: int | None = None) -> float:
+        """Close the current cycle and return its duration in seconds."""
+        now = self._clock()
+        with self._lock:
+            started = self._cycle_started
+            if started is None:
+                return 0.0
+            duration = max(0.0, now - started)
+            ts = self._wall_clock()
+            self._cycles.add(ts, duration)
+            for symbol, first in self._symbol_started.items():
+                last = self._last_mark.get(symbol, first)
+                self._window(self._symbols, symbol).add(ts, max(0.0, last - first))
+            slowest = sorted(
+                self._cycle_phase_totals.items(), key=lambda item: item[1], reverse=True
+            )[:5]
+            self._last_cycle = {
+                "duration_seconds": round(duration, 6),
+                "finished_at": ts,
+                "symbols": symbols if symbols is not None else len(self._symbol_started),
+                "slowest_phases": [
+                    {"phase": phase, "seconds": round(seconds, 6)} for phase, seconds in slowest
+                ],
+            }
+            self._cycle_started = None
+            self._prune(ts)
+            return duration
+
+    def mark(self, symbol: str, phase: str, status: str = "running") -> float | None:
+        """Record a phase transition; return the phase duration when it ends."""
+        now = self._clock()
+        key = (str(symbol), str(phase))
+        with self._lock:
+            previous = self._last_mark.get(key[0])
+            self._last_mark[key[0]] = now
+            self._symbol_started.setdefault(key[0], now)
+            if status == "running":
+                self._open[key] = now
+                return None
+            if status not in _TERMINAL_STATUSES:
+                return None
+            started = self._open.pop(key, None)
+            if started is None:
+                started = previous if previous is not None else now
+            duration = max(0.0, now - started)
+            ts = self._wall_clock()
+            self._window(self._phases, key[1]).add(ts, duration)
+            self._window(self._symbol_phases, key).add(ts, duration)
+            self._cycle_phase_totals[key[1]] = (
+                self._cycle_phase_totals.get(key[1], 0.0) + duration
+            )
+            return duration
+
+    def record(self, symbol: str, phase: str, seconds: float) -> None:
+        """Record an externally measured phase duration."""
+        ts = self._wall_clock()
+        with self._lock:
+            self._window(self._phases, str(phase)).add(ts, float(seconds))
+            self._window(self._symbol_phases, (str(symbol), str(phase))).add(
+                ts, float(seconds)
+            )
+
+    # -------------------------------------------------------------- reporting
+    def snapshot(
+        self, *, symbols: Iterable[str] | None = None, phase_order: Iterable[str] = ()
+    ) -> dict[str, Any]:
+        wanted = set(symbols) if symbols is not None else None
+        with self._lock:
+            self._prune(self._wall_clock())
+            order = {name: idx for idx, name in enumerate(phase_order)}
+            phases = {
+                name: window.stats()
+                for name, window in sorted(
+                    self._phases.items(), key=lambda item: (order.get(item[0], len(order)), item[0])
+                )
+            }
+            per_symbol: dict[str, Any] = {}
+            for (symbol, phase), window in self._symbol_phases.items():
+                if wanted is not None and symbol not in wanted:
+                    continue
+                entry = per_symbol.setdefault(symbol, {"phases": {}})
+                entry["phases"][phase] = window.stats()
+            for symbol, window in self._symbols.items():
+                if wanted is not None and symbol not in wanted:
+                    continue
+                per_symbol.setdefault(symbol, {"phases": {}})["total"] = window.stats()
+            return {
+                "window_seconds": self.window_seconds,
+                "max_samples": self.max_samples,
+                "cycle": self._cycles.stats(),
+                "last_cycle": dict(self._last_cycle),
+                "phases": phases,
+                "symbols": per_symbol,
+            }
+
+    def render_prometheus(self, prefix: str = "market_data") -> str:
+        """Render rolling-window quantiles as Prometheus summary text."""
+        with self._lock:
+            self._prune(self._wall_clock())
+            lines: list[str] = []
+            self._render_summary(
+                lines,
+                f"{prefix}_cycle_seconds",
+                "Market data cycle wall time",
+                [({}, self._cycles)],
+            )
+            self._render_summary(
+                lines,
+                f"{prefix}_phase_seconds",
+                "Market data phase wall time across symbols",
+                [({"phase": name}, window) for name, window in sorted(self._phases.items())],
+            )
+            self._render_summary(
+                lines,
+                f"{prefix}_symbol_seconds",
+                "Per-symbol wall time within a market data cycle",
+                [({"symbol": name}, window) for name, window in sorted(self._symbols.items())],
+            )
+            return "\n".join(lines) + ("\n" if lines else "")
+
+    # --------------------------------------------------------------- helpers
+    def _window(self, store: dict[Any, _Window], key: Any) -> _Window:
+        window = store.get(key)
+        if window is None:
+            window = _Window(self.max_samples)
+            store[key] = window
+        return window
+
+    def _prune(self, now: float) -> None:
+        if self.window_seconds <= 0:
+            return
+        cutoff = now - self.window_seconds
+        self._cycles.prune(cutoff)
+        for store in (self._phases, self._symbol_phases, self._symbols):
+            for window in store.values():
+                window.prune(cutoff)
+
+    @staticmethod
+    def _render_summary(
+        lines: list[str],
+        name: str,
+        help_text: str,
+        series: list[tuple[Mapping[str, str], _Window]],
+    ) -> None:
+        if not series:
+            return
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} summary")
+        for labels, window in series:
+            values = sorted(seconds for _ts, seconds in window.samples)
+            for q in QUANTILES:
+                lines.append(
+                    f"{name}{_labels({**labels, 'quantile': str(q)})} "
+                    f"{percentile(values, q):.6f}"
+                )
+            lines.append(f"{name}_sum{_labels(labels)} {window.total:.6f}")
+            lines.append(f"{name}_count{_labels(labels)} {window.count}")
+
+
+def _labels(labels: Mapping[str, str]) -> str:
+    if not labels:
+        return ""
+    body = ",".join(
+        f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for key, value in labels.items()
+    )
+    return "{" + body + "}"
+
+
+class SamplingProfiler:
+    """Samples one thread's Python stack and dumps folded stacks for slow cycles.
+
+    Output is one ``frame;frame;frame count`` line per unique stack, which
+    ``flamegraph.pl`` and speedscope both read.
+    """
+
+    def __init__(
+        self,
+        *,
+        output_dir: str,
+        slow_seconds: float,
+        interval_seconds: float = 0.01,
+        max_dumps: int = 20,
+    ) -> None:
+        self.output_dir = output_dir
+        self.slow_seconds = float(slow_seconds)
+        self.interval_seconds = max(0.001, float(interval_seconds))
+        self.max_dumps = max(1, int(max_dumps))
+        self._stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._target_ident: int | None = None
+        self.last_dump: str | None = None
+
+    def start(self, target_ident: int | None = None) -> None:
+        self.stop()
+        self._stacks = Counter()
+        self._target_ident = target_ident or threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="MarketDataCycleProfiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+
+    def finish(self, duration: float, *, label: str = "cycle") -> str | None:
+        """Stop sampling and write a profile if ``duration`` was slow."""
+        self.stop()
+        if duration < self.slow_seconds or not self._stacks:
+            return None
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            path = os.path.join(
+                self.output_dir,
+                f"{label}_{time.strftime('%Y%m%d_%H%M%S')}_{int(duration * 1000)}ms.folded",
+            )
+            with open(path, "w", encoding="utf-8") as handle:
+                for stack, count in self._stacks.most_common():
+                    handle.write(f"{stack} {count}\n")
+            self.last_dump = path
+            self._prune_dumps()
+            return path
+        except Exception:
+            return None
+
+    def _run(self) -> None:
+        target = self._target_ident
+        while not self._stop.wait(self.interval_seconds):
+            frame = sys._current_frames().get(target)  # noqa: SLF001 - sampling API
+            if frame is None:
+                continue
+            parts: list[str] = []
+            while frame is not None:
+                code = frame.f_code
+                parts.append(
+                    f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+                )
+                frame = frame.f_back
+            self._stacks[";".join(reversed(parts))] += 1
+
+    def _prune_dumps(self) -> None:
+        try:
+            dumps = sorted(
+                (
+                    os.path.join(self.output_dir, name)
+                    for name in os.listdir(self.output_dir)
+                    if name.endswith(".folded")
+                ),
+                key=os.path.getmtime,
+            )
+            for stale in dumps[: max(0, len(dumps) - self.max_dumps)]:
+                os.remove(stale)
+        except Exception:
+            pass
+
+
+__all__ = ["PhaseTimingRecorder", "SamplingProfiler", "percentile"]
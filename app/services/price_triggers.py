@@ -0,0 +1,341 @@
+"""Shared price-trigger index for stop-loss and take-profit monitoring.
+
+``UltimateAIAutoTrader.check_advanced_stop_loss`` used to walk every open
+position on every tick and, for most of them, conclude that nothing had
+happened. ``PriceTriggerBook`` keeps, per symbol, the positions' lower
+(stop) and upper (take-profit) trigger levels in sorted arrays, so one price
+update finds exactly the positions whose trigger it crossed with two bisects.
+
+The book is process-wide: every trader registers its positions under its own
+owner key, and ``fan_out`` maps a tick to every affected trader across
+users. Levels are a conservative superset of the trader's own checks (the
+lower level is the highest of the traditional and advanced stops), so the
+trader still runs its exact stop/take-profit logic for each candidate.
+
+Traders keep the book current through ``TrackedPositions``, a ``dict`` that
+reports item assignment and removal; anything that edits a position in place
+must call ``PriceTriggerBook.update`` (or reassign the position) afterwards.
+"""
+
+from __future__ import annotations
+
+import bisect
+import copy
+import math
+import threading
+import weakref
+from typing import Any, Callable, Mapping, Optional
+
+_ADVANCED_STOP_KEYS = ("fixed", "atr", "trailing", "time", "volatility")
+
+
+def _level(value: Any) -> Optional[float]:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(number) else number
+
+
+def position_trigger_levels(position: Any) -> tuple[Optional[float], Optional[float]]:
+    """``(lower, upper)`` prices at which ``position`` needs a closer look.
+
+    Mirrors the order of checks in ``check_advanced_stop_loss``: a missing
+    ``stop_loss`` or ``take_profit`` defaults to 0 there, so the same default
+    applies here (a missing take-profit therefore triggers on any price).
+    """
+    if not isinstance(position, Mapping):
+        return None, None
+    lower = _level(position.get("stop_loss", 0))
+    stops = position.get("advanced_stops")
+    if isinstance(stops, Mapping):
+        for key in _ADVANCED_STOP_KEYS:
+            level = _level(stops.get(key))
+            if level is None or (key in ("trailing", "time") and level <= 0):
+                continue
+            lower = level if lower is None else max(lower, level)
+    upper = _level(position.get("take_profit", 0))
+    return lower, upper
+
+
+class _SortedLevels:
+    """Parallel sorted arrays of ``(level, owner_key)``."""
+
+    __slots__ = ("levels", "owners")
+
+    def __init__(self) -> None:
+        self.levels: list[float] = []
+        self.owners: list[int] = []
+
+    def add(self, level: float, owner: int) -> None:
+        index = bisect.bisect_right(self.levels, level)
+        self.levels.insert(index, level)
+        self.owners.insert(index, owner)
+
+    def remove(self, level: float, owner: int) -> None:
+        lo = bisect.bisect_left(self.levels, level)
+        hi = bisect.bisect_right(self.levels, level)
+        for index in range(lo, hi):
+            if self.owners[index] == owner:
+                del self.levels[index]
+                del self.owners[index]
+                return
+
+    def at_or_above(self, price: float) -> list[int]:
+        return self.owners[bisect.bisect_left(self.levels, price) :]
+
+    def at_or_below(self, price: float) -> list[int]:
+        return self.owners[: bisect.bisect_right(self.levels, price)]
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+
+class PriceTriggerBook:
+    """Per-symbol sorted stop/take-profit levels shared by all traders."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._lower: dict[str, _SortedLevels] = {}
+        self._upper: dict[str, _SortedLevels] = {}
+        self._entries: dict[tuple[int, str], tuple[Optional[float], Optional[float]]] = {}
+        self._owner_symbols: dict[int, set[str]] = {}
+        self._owners: dict[int, weakref.ReferenceType] = {}
+        self._dead: list[weakref.ReferenceType] = []
+        self.stats = {"ticks": 0, "candidates": 0}
+
+    # ----------------------------------------------------------- registration
+
+    def _owner_key(self, owner: Any) -> int:
+        key = id(owner)
+        ref = self._owners.get(key)
+        if ref is None or ref() is not owner:
+            if ref is not None:
+                # id() was reused after the previous owner was collected.
+                self._drop_owner_locked(key)
+            self._owners[key] = weakref.ref(owner, self._dead.append)
+        return key
+
+    def _reap_locked(self) -> None:
+        # Weakref callbacks may fire mid-operation, so they only queue the
+        # dead reference; cleanup happens here under the lock.
+        while self._dead:
+            ref = self._dead.pop()
+            for key, live in list(self._owners.items()):
+                if live is ref:
+                    self._drop_owner_locked(key)
+
+    def _remove_locked(self, key: int, symbol: str) -> None:
+        previous = self._entries.pop((key, symbol), None)
+        if previous is None:
+            return
+        lower, upper = previous
+        if lower is not None:
+            self._lower[symbol].remove(lower, key)
+        if upper is not None:
+            self._upper[symbol].remove(upper, key)
+        symbols = self._owner_symbols.get(key)
+        if symbols is not None:
+            symbols.discard(symbol)
+
+    def _drop_owner_locked(self, key: int) -> None:
+        for symbol in list(self._owner_symbols.pop(key, ())):
+            self._remove_locked(key, symbol)
+        self._owners.pop(key, None)
+
+    def update(self, owner: Any, symbol: str, position: Any) -> None:
+        """Register, move or (``position=None``) remove one position's triggers."""
+        symbol = str(symbol)
+        lower, upper = position_trigger_levels(position) if position is not None else (None, None)
+        with self._lock:
+            self._reap_locked()
+            key = self._owner_key(owner)
+            self._remove_locked(key, symbol)
+            if lower is None and upper is None:
+                return
+            self._entries[(key, symbol)] = (lower, upper)
+            self._owner_symbols.setdefault(key, set()).add(symbol)
+            if lower is not None:
+                self._lower.setdefault(symbol, _SortedLevels()).add(lower, key)
+            if upper is not None:
+                self._upper.setdefault(symbol, _SortedLevels()).add(upper, key)
+
+    def replace_all(self, owner: Any, positions: Mapping[str, Any]) -> None:
+        """Drop the owner's triggers and register ``positions`` instead."""
+        with self._lock:
+            self._drop_owner_locked(id(owner))
+        for symbol, position in list(positions.items()):
+            self.update(owner, symbol, position)
+
+    def remove_owner(self, owner: Any) -> None:
+        with self._lock:
+            key = id(owner)
+            ref = self._owners.get(key)
+            if ref is not None and ref() is owner:
+                self._drop_owner_locked(key)
+
+    def tracks(self, owner: Any) -> bool:
+        with self._lock:
+            ref = self._owners.get(id(owner))
+            return ref is not None and ref() is owner
+
+    # ---------------------------------------------------------------- queries
+
+    def crossed(self, symbol: str, price: Any) -> set[int]:
+        """Owner keys whose stop (``price <= lower``) or target (``price >= upper``) was hit."""
+        level = _level(price)
+        if level is None:
+            return set()
+        with self._lock:
+            hits: set[int] = set()
+            lower = self._lower.get(str(symbol))
+            if lower:
+                hits.update(lower.at_or_above(level))
+            upper = self._upper.get(str(symbol))
+            if upper:
+                hits.update(upper.at_or_below(level))
+            return hits
+
+    def fan_out(self, prices: Mapping[str, Any]) -> dict[Any, list[str]]:
+        """Map one tick (``symbol -> price``) to ``{trader: [symbols to check]}``."""
+        affected: dict[int, list[str]] = {}
+        for symbol, price in prices.items():
+            for key in self.crossed(symbol, price):
+                affected.setdefault(key, []).append(str(symbol))
+        result: dict[Any, list[str]] = {}
+        with self._lock:
+            self._reap_locked()
+            self.stats["ticks"] += 1
+            self.stats["candidates"] += sum(len(symbols) for symbols in affected.values())
+            for key, symbols in affected.items():
+                ref = self._owners.get(key)
+                owner = ref() if ref is not None else None
+                if owner is not None:
+                    result[owner] = symbols
+        return result
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "tracked": len(self._entries),
+                "owners": len(self._owners),
+                "symbols": sum(1 for levels in self._lower.values() if levels)
+                + sum(1 for levels in self._upper.values() if levels),
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lower.clear()
+            self._upper.clear()
+            self._entries.clear()
+            self._owner_symbols.clear()
+            self._owners.clear()
+            self._dead.clear()
+
+
+class TrackedPositions(dict):
+    """``dict`` of open positions that keeps a ``PriceTriggerBook`` in sync.
+
+    Copies, pickles and deep copies are plain dicts so persistence and
+    account snapshots never carry the book along.
+    """
+
+    def __init__(self, data: Any = None, *, on_change: Optional[Callable[[str, Any], None]] = None):
+        super().__init__(data or {})
+        self._on_change = on_change
+
+    def _notify(self, symbol: Any, position: Any) -> None:
+        callback = self._on_change
+        if callback is None:
+            return
+        try:
+            callback(symbol, position)
+        except Exception:
+            pass
+
+    def __setitem__(self, symbol, position) -> None:
+        super().__setitem__(symbol, position)
+        self._notify(symbol, position)
+
+    def __delitem__(self, symbol) -> None:
+        super().__delitem__(symbol)
+        self._notify(symbol, None)
+
+    _MISSING = object()
+
+    def pop(self, symbol, default=_MISSING):
+        if symbol in self:
+            position = super().pop(symbol)
+            self._notify(symbol, None)
+            return position
+        if default is TrackedPositions._MISSING:
+            raise KeyError(symbol)
+        return default
+
+    def popitem(self):
+        symbol, position = super().popitem()
+        self._notify(symbol, None)
+        return symbol, position
+
+    def setdefault(self, symbol, default=None):
+        if symbol in self:
+            return self[symbol]
+        self[symbol] = default
+        return default
+
+    def update(self, *args, **kwargs) -> None:
+        for symbol, position in dict(*args, **kwargs).items():
+            self[symbol] = position
+
+    def clear(self) -> None:
+        symbols = list(self.keys())
+        super().clear()
+        for symbol in symbols:
+            self._notify(symbol, None)
+
+    def copy(self) -> dict:
+        return dict(self)
+
+    def __copy__(self) -> dict:
+        return dict(self)
+
+    def __deepcopy__(self, memo) -> dict:
+        return copy.deepcopy(dict(self), memo)
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+
+def track_positions(
+    owner: Any, positions: Any, book: Optional[PriceTriggerBook] = None
+) -> TrackedPositions:
+    """Wrap ``positions`` for ``owner`` and (re)register them in ``book``."""
+    book = book or get_price_trigger_book()
+    owner_ref = weakref.ref(owner)
+
+    def _on_change(symbol: Any, position: Any) -> None:
+        target = owner_ref()
+        if target is not None:
+            book.update(target, symbol, position)
+
+    tracked = TrackedPositions(positions if isinstance(positions, Mapping) else {}, on_change=_on_change)
+    book.replace_all(owner, tracked)
+    return tracked
+
+
+_DEFAULT_BOOK = PriceTriggerBook()
+
+
+def get_price_trigger_book() -> PriceTriggerBook:
+    """Process-wide book shared by every trader instance."""
+    return _DEFAULT_BOOK
+
+
+__all__ = [
+    "PriceTriggerBook",
+    "TrackedPositions",
+    "get_price_trigger_book",
+    "position_trigger_levels",
+    "track_positions",
+]
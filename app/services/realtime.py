@@ -1,27 +1,142 @@
-"""Background realtime update service for Socket.IO broadcasts."""
+"""Background realtime update service for Socket.IO broadcasts.
+
+The service used to emit the full ``portfolio``, ``pnl``, ``performance`` and
+market-data payloads to every connected client every five seconds, whether
+or not anything had changed, and to every socket rather than to the users the
+data belongs to.
+
+Each section is now serialised once per flush and fingerprinted item by item
+(portfolio keys, market-data symbols, ...). A section is only emitted to a
+room when its fingerprint differs from what that room last received; when
+only a few items changed the event carries just those items plus
+``removed`` keys and ``"delta": True``. Shared sections go to the
+``dashboard`` room, per-user sections (``set_user_sections``) to the user's
+``user_<id>`` room, and a socket that just registered gets one full copy of
+every section addressed to its ``sid``.
+
+``notify()`` asks for an early flush (e.g. after a market cycle); bursts of
+notifications inside ``min_interval`` collapse into one flush. Emitted
+messages, bytes and skipped sections are counted per ``stats_interval``
+and exposed through ``stats()``.
+"""
 from __future__ import annotations
 
+import hashlib
+import json
 import threading
 import time
-from typing import Any, Callable
+from dataclasses import dataclass, field
+from typing import Any, Callable, Mapping, Optional
 
 from flask_socketio import SocketIO
 
+DASHBOARD_ROOM = "dashboard"
+
+UserSectionProvider = Callable[[int], Mapping[str, Any]]
+
+
+def user_room(user_id: Any) -> str:
+    return f"user_{user_id}"
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, default=str, sort_keys=True, separators=(",", ":"))
+
+
+@dataclass
+class _Section:
+    """One serialised section: per-item fingerprints and sizes."""
+
+    event: str
+    wrap: Optional[str]
+    value: Any
+    items: dict[str, tuple[str, int]]
+    digest: str
+
+    @classmethod
+    def build(cls, event: str, wrap: Optional[str], value: Any, dumps: Callable[[Any], str]) -> "_Section":
+        items: dict[str, tuple[str, int]] = {}
+        if wrap is not None and isinstance(value, Mapping):
+            for key, item in value.items():
+                raw = dumps(item).encode("utf-8")
+                items[str(key)] = (hashlib.sha1(raw).hexdigest(), len(raw) + len(str(key)) + 4)
+        else:
+            raw = dumps(value).encode("utf-8")
+            items[""] = (hashlib.sha1(raw).hexdigest(), len(raw))
+        digest = hashlib.sha1(
+            "|".join(f"{key}={fp}" for key, (fp, _size) in sorted(items.items())).encode("utf-8")
+        ).hexdigest()
+        return cls(event, wrap, value, items, digest)
+
+    @property
+    def supports_delta(self) -> bool:
+        return self.wrap is not None and isinstance(self.value, Mapping)
+
+    def payload(self, *, only: Optional[list[str]] = None) -> dict[str, Any]:
+        if self.wrap is None:
+            return dict(self.value) if isinstance(self.value, Mapping) else {"value": self.value}
+        if only is None:
+            return {self.wrap: self.value}
+        return {self.wrap: {key: self.value[key] for key in self.value if str(key) in only}}
+
+    def size(self, keys: Optional[list[str]] = None) -> int:
+        if keys is None:
+            return sum(size for _fp, size in self.items.values())
+        return sum(self.items[key][1] for key in keys)
+
+
+@dataclass
+class _RoomState:
+    fingerprints: dict[str, dict[str, str]] = field(default_factory=dict)
+    digests: dict[str, str] = field(default_factory=dict)
+    versions: dict[str, int] = field(default_factory=dict)
+
+
+def _empty_counters() -> dict[str, int]:
+    return {"flushes": 0, "messages": 0, "bytes": 0, "deltas": 0, "skipped": 0}
+
 
 class RealtimeUpdateService:
-    """Emit dashboard updates over Socket.IO on a fixed cadence."""
+    """Emit changed dashboard sections over Socket.IO, per room."""
 
     def __init__(
         self,
         socketio: SocketIO,
         dashboard_data: dict[str, Any],
         get_active_trading_universe: Callable[[], list[str]] | None = None,
+        *,
+        interval: float = 5.0,
+        min_interval: float = 1.0,
+        stats_interval: float = 60.0,
+        max_delta_ratio: float = 0.5,
+        market_symbols: int = 10,
+        clock: Callable[[], float] = time.time,
     ) -> None:
         self._socketio = socketio
         self._dashboard_data = dashboard_data
         self._get_active_trading_universe = get_active_trading_universe or (lambda: [])
+        self.interval = max(0.1, float(interval))
+        self.min_interval = max(0.0, float(min_interval))
+        self.stats_interval = max(1.0, float(stats_interval))
+        self.max_delta_ratio = float(max_delta_ratio)
+        self.market_symbols = int(market_symbols)
+        self._clock = clock
+        self._user_sections: Optional[UserSectionProvider] = None
         self._thread: threading.Thread | None = None
         self._stop_event = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._clients: dict[str, Optional[int]] = {}
+        self._pending_full: set[str] = set()
+        self._rooms: dict[str, _RoomState] = {}
+        self._last_flush = 0.0
+        self._window_start = clock()
+        self._window = _empty_counters()
+        self._last_window: dict[str, int] = _empty_counters()
+        self._totals = _empty_counters()
+
+    # ------------------------------------------------------------ lifecycle
 
     def start(self) -> None:
         if self._thread and self._thread.is_alive():
@@ -37,61 +152,211 @@ class RealtimeUpdateService:
         if not self._thread:
             return
         self._stop_event.set()
+        self._wake.set()
         self._thread.join(timeout=2)
         self._thread = None
         print("ℹ️ Real-time update service stopped")
 
+    def notify(self) -> None:
+        """Request a flush soon; calls within ``min_interval`` coalesce."""
+        self._wake.set()
+
     def _run_loop(self) -> None:
         while not self._stop_event.is_set():
+            self._wake.wait(self.interval)
+            if self._stop_event.is_set():
+                break
+            wait = self.min_interval - (self._clock() - self._last_flush)
+            if wait > 0 and self._stop_event.wait(wait):
+                break
+            # Cleared before flushing so a notify during the flush schedules another.
+            self._wake.clear()
             try:
-                self._emit_portfolio_update()
-                self._emit_pnl_update()
-                self._emit_performance_update()
-                self._emit_market_data_update()
-                time.sleep(5)
+                self.flush()
             except Exception as exc:  # pragma: no cover - defensive
                 print(f"Error in real-time update service: {exc}")
-                time.sleep(10)
+                self._stop_event.wait(10)
 
-    def _emit_portfolio_update(self) -> None:
-        payload = {
-            "portfolio": self._dashboard_data.get("portfolio", {}),
-            "timestamp": time.time(),
-        }
-        self._socketio.emit("portfolio_update", payload)
+    # -------------------------------------------------------------- clients
 
-    def _emit_pnl_update(self) -> None:
+    def set_user_sections(self, provider: Optional[UserSectionProvider]) -> None:
+        """``provider(user_id)`` returns ``{section: value}`` for that user's room."""
+        self._user_sections = provider
+
+    def register_client(self, sid: str, user_id: Optional[int] = None) -> None:
+        """Track a socket that joined the shared (and its user's) room."""
+        with self._lock:
+            self._clients[sid] = int(user_id) if user_id is not None else None
+            self._pending_full.add(sid)
+        self.notify()
+
+    def unregister_client(self, sid: str) -> None:
+        with self._lock:
+            user_id = self._clients.pop(sid, None)
+            self._pending_full.discard(sid)
+            if user_id is not None and user_id not in self._clients.values():
+                self._rooms.pop(user_room(user_id), None)
+            if not self._clients:
+                self._rooms.pop(DASHBOARD_ROOM, None)
+
+    # ------------------------------------------------------------- sections
+
+    def _shared_sections(self) -> list[tuple[str, Optional[str], Any]]:
         portfolio = self._dashboard_data.get("portfolio", {}) or {}
         positions = portfolio.get("positions") or []
-        pnl_payload = {
+        pnl = {
             "total_pnl": portfolio.get("total_pnl", 0),
             "daily_pnl": portfolio.get("daily_pnl", 0),
             "open_positions_pnl": sum(
                 pos.get("pnl", 0) for pos in positions if isinstance(pos, dict)
             ),
-            "timestamp": time.time(),
-        }
-        self._socketio.emit("pnl_update", pnl_payload)
-
-    def _emit_performance_update(self) -> None:
-        payload = {
-            "performance": self._dashboard_data.get("performance", {}),
-            "timestamp": time.time(),
         }
-        self._socketio.emit("performance_update", payload)
-
-    def _emit_market_data_update(self) -> None:
+        sections: list[tuple[str, Optional[str], Any]] = [
+            ("portfolio_update", "portfolio", portfolio),
+            ("pnl_update", None, pnl),
+            ("performance_update", "performance", self._dashboard_data.get("performance", {})),
+        ]
         active_symbols = self._get_active_trading_universe() or []
         dashboard_market_data = self._dashboard_data.get("market_data", {}) or {}
-        market_data = {}
-        for symbol in active_symbols[:10]:
-            if symbol in dashboard_market_data:
-                market_data[symbol] = dashboard_market_data[symbol]
+        market_data = {
+            symbol: dashboard_market_data[symbol]
+            for symbol in list(active_symbols)[: self.market_symbols]
+            if symbol in dashboard_market_data
+        }
         if market_data:
-            self._socketio.emit(
-                "market_data_update",
-                {
-                    "market_data": market_data,
-                    "timestamp": time.time(),
-                },
-            )
+            sections.append(("market_data_update", "market_data", market_data))
+        return sections
+
+    def _user_section_list(self, user_id: int) -> list[tuple[str, Optional[str], Any]]:
+        provider = self._user_sections
+        if provider is None:
+            return []
+        try:
+            values = provider(user_id) or {}
+        except Exception as exc:
+            print(f"Realtime user sections failed for user {user_id}: {exc}")
+            return []
+        return [(f"{name}_update", name, value) for name, value in values.items()]
+
+    # ----------------------------------------------------------------- flush
+
+    def flush(self) -> dict[str, int]:
+        """Emit every changed section once; returns this flush's counters."""
+        with self._flush_lock:
+            counters = _empty_counters()
+            counters["flushes"] = 1
+            with self._lock:
+                clients = dict(self._clients)
+                fresh = [sid for sid in self._pending_full if sid in clients]
+                self._pending_full.clear()
+            now = self._clock()
+
+            shared = [
+                _Section.build(event, wrap, value, _dumps)
+                for event, wrap, value in self._shared_sections()
+            ]
+            by_user: dict[int, list[_Section]] = {}
+            for user_id in sorted({uid for uid in clients.values() if uid is not None}):
+                by_user[user_id] = [
+                    _Section.build(event, wrap, value, _dumps)
+                    for event, wrap, value in self._user_section_list(user_id)
+                ]
+
+            sent_full: dict[str, set[str]] = {}
+            if clients:
+                sent_full[DASHBOARD_ROOM] = self._emit_changed(DASHBOARD_ROOM, shared, now, counters)
+            for user_id, sections in by_user.items():
+                room = user_room(user_id)
+                sent_full[room] = self._emit_changed(room, sections, now, counters)
+            for sid in fresh:
+                # New sockets only miss what their rooms did not just get in full.
+                targets = [(DASHBOARD_ROOM, shared)]
+                if clients[sid] is not None:
+                    targets.append((user_room(clients[sid]), by_user.get(clients[sid], [])))
+                for room, sections in targets:
+                    for section in sections:
+                        if section.event in sent_full.get(room, ()):
+                            continue
+                        self._emit(section, section.payload(), sid, now, None, counters)
+                        counters["bytes"] += section.size()
+
+            self._last_flush = now
+            self._record(counters, now)
+            return counters
+
+    def _emit_changed(
+        self, room: str, sections: list[_Section], now: float, counters: dict[str, int]
+    ) -> set[str]:
+        """Emit sections whose fingerprint moved; returns events sent in full."""
+        sent_full: set[str] = set()
+        with self._lock:
+            state = self._rooms.setdefault(room, _RoomState())
+        for section in sections:
+            if state.digests.get(section.event) == section.digest:
+                counters["skipped"] += 1
+                continue
+            previous = state.fingerprints.get(section.event)
+            current = {key: fp for key, (fp, _size) in section.items.items()}
+            version = state.versions.get(section.event, 0) + 1
+            extra: dict[str, Any] = {"version": version}
+            changed: Optional[list[str]] = None
+            if previous is not None and section.supports_delta:
+                changed = [key for key, fp in current.items() if previous.get(key) != fp]
+                removed = [key for key in previous if key not in current]
+                if len(changed) + len(removed) > self.max_delta_ratio * max(1, len(current)):
+                    changed = None
+                else:
+                    extra.update(delta=True, removed=removed)
+            self._emit(section, section.payload(only=changed), room, now, extra, counters)
+            counters["bytes"] += section.size(changed)
+            if changed is not None:
+                counters["deltas"] += 1
+            else:
+                sent_full.add(section.event)
+            state.fingerprints[section.event] = current
+            state.digests[section.event] = section.digest
+            state.versions[section.event] = version
+        return sent_full
+
+    def _emit(
+        self,
+        section: _Section,
+        payload: dict[str, Any],
+        to: str,
+        now: float,
+        extra: Optional[dict[str, Any]],
+        counters: dict[str, int],
+    ) -> None:
+        message = dict(payload)
+        if extra:
+            message.update(extra)
+        message["timestamp"] = now
+        self._socketio.emit(section.event, message, to=to)
+        counters["messages"] += 1
+
+    # ----------------------------------------------------------------- stats
+
+    def _record(self, counters: dict[str, int], now: float) -> None:
+        with self._lock:
+            if now - self._window_start >= self.stats_interval:
+                self._last_window = self._window
+                self._window = _empty_counters()
+                self._window_start = now
+            for key, value in counters.items():
+                self._window[key] += value
+                self._totals[key] += value
+
+    def stats(self) -> dict[str, Any]:
+        """Emitted messages/bytes for the current and previous interval."""
+        with self._lock:
+            return {
+                "interval_seconds": self.stats_interval,
+                "current": dict(self._window),
+                "last_interval": dict(self._last_window),
+                "totals": dict(self._totals),
+                "clients": len(self._clients),
+                "rooms": len(self._rooms),
+            }
+
+
+__all__ = ["DASHBOARD_ROOM", "RealtimeUpdateService", "user_room"]
@@ -0,0 +1,159 @@
+"""Per-cycle memo of market-only signal sets shared by every trader.
+
+Within one market-data cycle the CRT composite and the RSI/MACD technical
+signal set for a symbol depend only on the symbol's price history and the
+market snapshot, yet they used to be recomputed by the ML systems and again
+by each (user x profile) trader. ``SignalContext`` keys results by symbol, a
+cheap history version and the snapshot fields the generators read, so the
+first caller computes and everyone else gets a copy.
+
+Only the newest version per symbol is kept, so the memo naturally turns over
+every cycle and stays bounded by the size of the trading universe.
+"""
+
+from __future__ import annotations
+
+import copy
+import math
+import threading
+from typing import Any, Callable, Iterable, Mapping, Optional
+
+# How many trailing prices feed the history fingerprint (with the length).
+_FINGERPRINT_TAIL = 8
+
+
+def _as_float(value: Any) -> Optional[float]:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(number) else number
+
+
+def history_version(historical_prices: Any) -> tuple:
+    """O(1) fingerprint of an append-only price history."""
+    try:
+        length = len(historical_prices)
+    except TypeError:
+        return (0,)
+    if not length:
+        return (0,)
+    tail = historical_prices[-_FINGERPRINT_TAIL:]
+    return (length, tuple(_as_float(value) for value in tail))
+
+
+def snapshot_version(market_data: Any) -> tuple:
+    if not isinstance(market_data, Mapping):
+        return ()
+    return (
+        _as_float(market_data.get("price")),
+        _as_float(market_data.get("volume")),
+        _as_float(market_data.get("volume_change")),
+    )
+
+
+class SignalContext:
+    """Memoises market-only signal sets per symbol and history version."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict[str, Any]] = {}
+        self.stats: dict[str, int] = {
+            "technical_hits": 0,
+            "technical_misses": 0,
+            "crt_hits": 0,
+            "crt_misses": 0,
+        }
+
+    def _entry(self, symbol: str, version: tuple) -> dict[str, Any]:
+        entry = self._entries.get(symbol)
+        if entry is None or entry["version"] != version:
+            entry = {"version": version}
+            self._entries[symbol] = entry
+        return entry
+
+    def _memo(
+        self,
+        kind: str,
+        symbol: str,
+        market_data: Any,
+        historical_prices: Any,
+        compute: Callable[[], Any],
+    ) -> tuple[Any, bool]:
+        version = (history_version(historical_prices), snapshot_version(market_data))
+        with self._lock:
+            entry = self._entry(str(symbol), version)
+            if kind in entry:
+                self.stats[f"{kind}_hits"] += 1
+                return copy.deepcopy(entry[kind]), True
+        result = compute()
+        with self._lock:
+            entry = self._entry(str(symbol), version)
+            entry.setdefault(kind, copy.deepcopy(result))
+            self.stats[f"{kind}_misses"] += 1
+        return result, False
+
+    def technical_signals(
+        self,
+        symbol: str,
+        market_data: Any,
+        historical_prices: Any,
+        compute: Callable[[str, Any, Any], list],
+    ) -> list:
+        """Return the market-only technical signal list, computing it once."""
+        result, _hit = self._memo(
+            "technical",
+            symbol,
+            market_data,
+            historical_prices,
+            lambda: compute(symbol, market_data, historical_prices),
+        )
+        return result
+
+    def crt_signals(
+        self, generator: Any, symbol: str, market_data: Any, historical_prices: Any
+    ) -> Any:
+        """Return ``generator.generate_crt_signals`` for this cycle, computing it once.
+
+        Generators that did not compute the signal still get the matching
+        ``signals_history`` entry so their dashboard data stays populated.
+        """
+
+        def _compute() -> dict[str, Any]:
+            signal = generator.generate_crt_signals(symbol, market_data, historical_prices)
+            history = getattr(generator, "signals_history", None)
+            recorded = history.get(symbol) if isinstance(history, dict) else None
+            return {"signal": signal, "history": copy.deepcopy(recorded)}
+
+        payload, hit = self._memo("crt", symbol, market_data, historical_prices, _compute)
+        if hit and payload.get("history") is not None:
+            history = getattr(generator, "signals_history", None)
+            if isinstance(history, dict):
+                history[symbol] = payload["history"]
+        return payload.get("signal")
+
+    def prune(self, active_symbols: Iterable[str]) -> None:
+        keep = {str(symbol) for symbol in active_symbols}
+        with self._lock:
+            for symbol in list(self._entries):
+                if symbol not in keep:
+                    self._entries.pop(symbol, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {"symbols": len(self._entries), **self.stats}
+
+
+_DEFAULT_CONTEXT = SignalContext()
+
+
+def get_signal_context() -> SignalContext:
+    """Process-wide context shared by the ML systems and all traders."""
+    return _DEFAULT_CONTEXT
+
+
+__all__ = ["SignalContext", "get_signal_context", "history_version"]
@@ -13,6 +13,7 @@ import pandas as pd
 
 from .pathing import resolve_profile_path, safe_parse_datetime
 from .persistence import _atomic_write_json
+from .trade_pages import OrderedTradeIndex
 
 
 class ComprehensiveTradeHistory:
@@ -40,6 +41,7 @@ class ComprehensiveTradeHistory:
         self.crt_signals_file = os.path.join(resolved_dir, "crt_signals.json")
         self.journal_file = os.path.join(resolved_dir, "trading_journal.json")
         self._log_callback = log_callback
+        self._trade_index: Optional[OrderedTradeIndex] = None
 
     # ------------------------------------------------------------------
     # Persistence helpers
@@ -371,79 +373,107 @@ class ComprehensiveTradeHistory:
     # ------------------------------------------------------------------
     # Analytics
     # ------------------------------------------------------------------
-    def get_trade_history(
-        self, filters: Optional[Dict[str, Any]] = None
-    ) -> list[Dict[str, Any]]:
-        try:
-            trades = self.load_trades()
+    def _collect_trades(self) -> list[Dict[str, Any]]:
+        """Stored trades (display-normalised) plus futures orders from the journal."""
+        trades = self.load_trades()
 
-            persisted_futures_order_ids: set[str] = set()
-            for trade in trades:
-                try:
-                    if str(trade.get("exchange") or "").strip().upper() != "BINANCE_FUTURES":
-                        continue
-                    order_id = trade.get("binance_order_id")
-                    if order_id is not None and str(order_id).strip():
-                        persisted_futures_order_ids.add(str(order_id).strip())
-                except Exception:
+        persisted_futures_order_ids: set[str] = set()
+        for trade in trades:
+            try:
+                if str(trade.get("exchange") or "").strip().upper() != "BINANCE_FUTURES":
                     continue
+                order_id = trade.get("binance_order_id")
+                if order_id is not None and str(order_id).strip():
+                    persisted_futures_order_ids.add(str(order_id).strip())
+            except Exception:
+                continue
 
-            # Normalize legacy values for display/API consumers.
-            for trade in trades:
-                status = str(trade.get("status") or "").upper()
-                try:
-                    exit_price = float(trade.get("exit_price") or 0)
-                except Exception:
-                    exit_price = 0.0
-
-                if status == "OPEN":
-                    if exit_price == 0.0:
-                        trade["exit_price"] = None
-                elif status == "CLOSED":
-                    if exit_price == 0.0:
-                        # In many records, `entry_price` represents the close execution price.
-                        try:
-                            entry_price = float(trade.get("entry_price") or 0)
-                        except Exception:
-                            entry_price = 0.0
-                        if entry_price > 0:
-                            trade["exit_price"] = entry_price
-
-            # Also include futures trades from journal
-            futures_trades = []
-            journal_events = self.get_journal_events(event_type="FUTURES_ORDER")
-            for event in journal_events:
-                payload = event.get("payload", {})
-                if payload:
-                    raw_resp = payload.get("raw_response") if isinstance(payload, dict) else None
-                    order_id = None
-                    if isinstance(raw_resp, dict):
-                        order_id = raw_resp.get("orderId")
-                    if order_id is not None and str(order_id).strip() in persisted_futures_order_ids:
-                        continue
+        # Normalize legacy values for display/API consumers.
+        for trade in trades:
+            status = str(trade.get("status") or "").upper()
+            try:
+                exit_price = float(trade.get("exit_price") or 0)
+            except Exception:
+                exit_price = 0.0
+
+            if status == "OPEN":
+                if exit_price == 0.0:
+                    trade["exit_price"] = None
+            elif status == "CLOSED":
+                if exit_price == 0.0:
+                    # In many records, `entry_price` represents the close execution price.
+                    try:
+                        entry_price = float(trade.get("entry_price") or 0)
+                    except Exception:
+                        entry_price = 0.0
+                    if entry_price > 0:
+                        trade["exit_price"] = entry_price
+
+        # Also include futures trades from journal
+        futures_trades = []
+        journal_events = self.get_journal_events(event_type="FUTURES_ORDER")
+        for event in journal_events:
+            payload = event.get("payload", {})
+            if payload:
+                raw_resp = payload.get("raw_response") if isinstance(payload, dict) else None
+                order_id = None
+                if isinstance(raw_resp, dict):
+                    order_id = raw_resp.get("orderId")
+                if order_id is not None and str(order_id).strip() in persisted_futures_order_ids:
+                    continue
 
-                    # Convert journal event to trade format
-                    trade_record = {
-                        "trade_id": f"futures_{event.get('id', len(futures_trades) + 1)}",
-                        "timestamp": payload.get("timestamp", event.get("timestamp")),
-                        "symbol": payload.get("symbol"),
-                        "side": payload.get("side"),
-                        "action_type": "FUTURES_ORDER",
-                        "quantity": float(payload.get("quantity", 0)),
-                        "entry_price": 0.0,  # Futures orders don't have entry price in journal
-                        "total_value": 0.0,
-                        "exit_price": 0.0,
-                        "pnl": 0.0,  # P&L not tracked in journal for futures
-                        "status": payload.get("status", "UNKNOWN"),
-                        "execution_mode": "futures",
-                        "leverage": payload.get("leverage", 1),
-                        "reduce_only": payload.get("reduce_only", False),
-                        "testnet": payload.get("testnet", True),
-                    }
-                    futures_trades.append(trade_record)
-
-            # Combine regular trades with futures trades
-            all_trades = trades + futures_trades
+                # Convert journal event to trade format
+                trade_record = {
+                    "trade_id": f"futures_{event.get('id', len(futures_trades) + 1)}",
+                    "timestamp": payload.get("timestamp", event.get("timestamp")),
+                    "symbol": payload.get("symbol"),
+                    "side": payload.get("side"),
+                    "action_type": "FUTURES_ORDER",
+                    "quantity": float(payload.get("quantity", 0)),
+                    "entry_price": 0.0,  # Futures orders don't have entry price in journal
+                    "total_value": 0.0,
+                    "exit_price": 0.0,
+                    "pnl": 0.0,  # P&L not tracked in journal for futures
+                    "status": payload.get("status", "UNKNOWN"),
+                    "execution_mode": "futures",
+                    "leverage": payload.get("leverage", 1),
+                    "reduce_only": payload.get("reduce_only", False),
+                    "testnet": payload.get("testnet", True),
+                }
+                futures_trades.append(trade_record)
+
+        # Combine regular trades with futures trades
+        return trades + futures_trades
+
+    def _file_signature(self) -> tuple:
+        signature = []
+        for path in (self.trades_file, self.journal_file):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def trade_index(self) -> OrderedTradeIndex:
+        """Newest-first index of ``_collect_trades``, rebuilt when the files change."""
+        signature = self._file_signature()
+        index = self._trade_index
+        if index is None or index.signature != signature:
+            try:
+                records = self._collect_trades()
+            except Exception as exc:
+                logging.getLogger(__name__).error("Error indexing trade history: %s", exc)
+                records = []
+            index = OrderedTradeIndex(records, signature=signature)
+            self._trade_index = index
+        return index
+
+    def get_trade_history(
+        self, filters: Optional[Dict[str, Any]] = None
+    ) -> list[Dict[str, Any]]:
+        try:
+            all_trades = self._collect_trades()
 
             if filters:
                 if "symbol" in filters:
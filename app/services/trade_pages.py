@@ -0,0 +1,303 @@
+"""Keyset pagination over the trade journal and ``UserTrade`` rows.
+
+``/api/trades`` used to load the full filtered trade list, re-parse and
+re-sort every timestamp, slice a 20-row page and, in merged mode, load 200
+``UserTrade`` rows and sort the combined list again, so every request cost
+O(history).
+
+Trades are ordered newest first by ``TradeKey`` ``(timestamp, source rank,
+id)``, a total order across both sources. ``OrderedTradeIndex`` keeps the
+journal sorted once (rebuilt only when the underlying files change) together
+with memoised per-filter views (symbol, execution mode, side, status), so
+seeking to a cursor, applying a ``days`` cut-off and counting are bisects. ``user_trade_stream``
+reads ``UserTrade`` with the same keyset condition pushed into SQL, and
+``merge_pages`` k-way merges any number of already-ordered streams.
+
+Cursors are opaque URL-safe strings encoding the last ``TradeKey`` served.
+"""
+
+from __future__ import annotations
+
+import base64
+import bisect
+import heapq
+import itertools
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable, Iterator, Mapping, NamedTuple, Optional, Sequence
+
+from .pathing import safe_parse_datetime
+
+SOURCE_DB = 0
+SOURCE_JOURNAL = 1
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 200
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+class TradeKey(NamedTuple):
+    """Sort key; larger keys are newer and come first."""
+
+    ts: datetime
+    source: int
+    ident: Any
+
+    def encode(self) -> str:
+        raw = json.dumps([self.ts.isoformat(), self.source, self.ident], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+    @classmethod
+    def decode(cls, cursor: Optional[str]) -> Optional["TradeKey"]:
+        """Parse a cursor; ``ValueError`` for anything malformed."""
+        if not cursor:
+            return None
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            ts, source, ident = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            source = int(source)
+            ident = int(ident) if source == SOURCE_DB else str(ident)
+            return cls(datetime.fromisoformat(ts), source, ident)
+        except Exception as exc:
+            raise ValueError(f"invalid cursor: {cursor!r}") from exc
+
+
+def trade_timestamp(value: Any) -> datetime:
+    """Naive UTC-comparable datetime for ordering; unparseable sorts oldest."""
+    parsed = value if isinstance(value, datetime) else safe_parse_datetime(value)
+    if parsed is None:
+        return datetime.min
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def clamp_page_size(value: Any, default: int = DEFAULT_PAGE_SIZE) -> int:
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(MAX_PAGE_SIZE, size))
+
+
+def _mode_filter(value: Any) -> Optional[str]:
+    mode = str(value or "").strip().lower()
+    return mode if mode in ("futures", "real", "paper") else None
+
+
+def _days_cutoff(filters: Mapping[str, Any], now: Optional[datetime] = None) -> Optional[datetime]:
+    days = filters.get("days")
+    if not days:
+        return None
+    return (now or datetime.now()) - timedelta(days=days)
+
+
+class _View:
+    """Newest-first slice of the index matching one filter combination."""
+
+    __slots__ = ("keys", "records", "neg_keys")
+
+    def __init__(self, rows: Sequence[tuple[TradeKey, dict]]):
+        self.keys = [key for key, _record in rows]
+        self.records = [record for _key, record in rows]
+        # Negated so the newest-first sequence is ascending for ``bisect``.
+        self.neg_keys = [_negate(key) for key in self.keys]
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def position_after(self, key: Optional[TradeKey]) -> int:
+        if key is None:
+            return 0
+        return bisect.bisect_right(self.neg_keys, _negate(key))
+
+    def position_before_time(self, cutoff: Optional[datetime]) -> int:
+        """First position whose timestamp is older than ``cutoff``."""
+        if cutoff is None:
+            return len(self.records)
+        return bisect.bisect_right(self.neg_keys, (-_seconds(cutoff), float("inf"), ()))
+
+
+def _negate(key: TradeKey) -> tuple:
+    return (-_seconds(key.ts), -key.source, _neg_ident(key.ident))
+
+
+def _seconds(ts: datetime) -> float:
+    if ts == datetime.min:
+        return float("-inf")
+    return (ts - _EPOCH).total_seconds()
+
+
+def _neg_ident(ident: Any) -> tuple:
+    # Journal ids are strings; negate them by inverting each code point so
+    # the tuple ordering flips without mixing types.
+    if isinstance(ident, int):
+        return (-ident,)
+    return tuple(-ord(ch) for ch in str(ident)) + (1,)
+
+
+class OrderedTradeIndex:
+    """Journal trades sorted newest first, with memoised filter views."""
+
+    def __init__(self, records: Iterable[Mapping[str, Any]], *, signature: Any = None):
+        rows: list[tuple[TradeKey, dict]] = []
+        for position, record in enumerate(records):
+            if not isinstance(record, Mapping):
+                continue
+            # Load position keeps ids unique when ``trade_id`` repeats.
+            trade_id = record.get("trade_id")
+            ident = f"{'' if trade_id in (None, '') else trade_id}#{position:09d}"
+            rows.append((TradeKey(trade_timestamp(record.get("timestamp")), SOURCE_JOURNAL, ident), dict(record)))
+        rows.sort(key=lambda row: row[0], reverse=True)
+        self.signature = signature
+        self._rows = rows
+        self._views: dict[tuple[Optional[str], ...], _View] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _view(self, filters: Mapping[str, Any]) -> _View:
+        symbol = filters.get("symbol") or None
+        mode = _mode_filter(filters.get("execution_mode"))
+        side = filters.get("side") or None
+        status = filters.get("status") or None
+        view_key = (symbol, mode, side, status)
+        view = self._views.get(view_key)
+        if view is None:
+            view = _View(
+                [
+                    (key, record)
+                    for key, record in self._rows
+                    if (symbol is None or record.get("symbol") == symbol)
+                    and (mode is None or record.get("execution_mode") == mode)
+                    and (side is None or record.get("side") == side)
+                    and (status is None or record.get("status") == status)
+                ]
+            )
+            self._views[view_key] = view
+        return view
+
+    def newest(self) -> Optional[dict]:
+        """The most recent trade, or ``None`` when the journal is empty."""
+        return dict(self._rows[0][1]) if self._rows else None
+
+    def count(self, filters: Mapping[str, Any], *, now: Optional[datetime] = None) -> int:
+        view = self._view(filters)
+        return view.position_before_time(_days_cutoff(filters, now))
+
+    def stream(
+        self,
+        filters: Mapping[str, Any],
+        *,
+        after: Optional[TradeKey] = None,
+        now: Optional[datetime] = None,
+    ) -> Iterator[tuple[TradeKey, dict]]:
+        """``(key, trade)`` pairs strictly older than ``after``, newest first."""
+        view = self._view(filters)
+        start = view.position_after(after)
+        stop = view.position_before_time(_days_cutoff(filters, now))
+        for position in range(start, stop):
+            yield view.keys[position], dict(view.records[position])
+
+
+def user_trade_row(trade: Any) -> dict[str, Any]:
+    """API shape of a ``UserTrade`` row in the merged trade view."""
+    return {
+        "db_id": trade.id,
+        "symbol": trade.symbol,
+        "side": trade.side,
+        "quantity": trade.quantity,
+        "price": trade.entry_price,
+        "type": trade.trade_type,
+        "status": trade.status,
+        "signal": trade.signal_source,
+        "confidence": trade.confidence_score,
+        "timestamp": trade.timestamp.isoformat() if trade.timestamp else None,
+        "source": "db",
+        "user_id": trade.user_id,
+    }
+
+
+def _user_trade_query(filters: Mapping[str, Any], now: Optional[datetime] = None):
+    from app.models import UserTrade
+
+    query = UserTrade.query
+    if filters.get("symbol"):
+        query = query.filter(UserTrade.symbol == filters["symbol"])
+    cutoff = _days_cutoff(filters, now)
+    if cutoff is not None:
+        query = query.filter(UserTrade.timestamp >= cutoff)
+    return query
+
+
+def count_user_trades(filters: Mapping[str, Any], *, now: Optional[datetime] = None) -> int:
+    return _user_trade_query(filters, now).count()
+
+
+def user_trade_stream(
+    filters: Mapping[str, Any],
+    *,
+    after: Optional[TradeKey] = None,
+    batch_size: int = DEFAULT_PAGE_SIZE,
+    now: Optional[datetime] = None,
+) -> Iterator[tuple[TradeKey, dict]]:
+    """``UserTrade`` rows newest first, fetched in keyset batches."""
+    from sqlalchemy import and_, or_
+
+    from app.models import UserTrade
+
+    base = _user_trade_query(filters, now).order_by(
+        UserTrade.timestamp.desc(), UserTrade.id.desc()
+    )
+    batch_size = max(1, int(batch_size))
+    cursor = after
+    while True:
+        query = base
+        if cursor is not None:
+            if cursor.source == SOURCE_DB:
+                query = query.filter(
+                    or_(
+                        UserTrade.timestamp < cursor.ts,
+                        and_(UserTrade.timestamp == cursor.ts, UserTrade.id < cursor.ident),
+                    )
+                )
+            else:
+                # DB rows rank below journal rows at the same instant.
+                query = query.filter(UserTrade.timestamp <= cursor.ts)
+        rows = query.limit(batch_size).all()
+        for row in rows:
+            key = TradeKey(trade_timestamp(row.timestamp), SOURCE_DB, int(row.id))
+            yield key, user_trade_row(row)
+            cursor = key
+        if len(rows) < batch_size:
+            return
+
+
+def merge_pages(
+    streams: Sequence[Iterable[tuple[TradeKey, dict]]],
+    *,
+    limit: int,
+    offset: int = 0,
+) -> tuple[list[dict], Optional[TradeKey], bool]:
+    """K-way merge of newest-first streams; ``(page, last key, has_more)``."""
+    merged = heapq.merge(*streams, key=lambda item: item[0], reverse=True)
+    window = list(itertools.islice(merged, offset, offset + limit + 1))
+    has_more = len(window) > limit
+    window = window[:limit]
+    last_key = window[-1][0] if window else None
+    return [record for _key, record in window], last_key, has_more
+
+
+__all__ = [
+    "DEFAULT_PAGE_SIZE",
+    "MAX_PAGE_SIZE",
+    "OrderedTradeIndex",
+    "TradeKey",
+    "clamp_page_size",
+    "count_user_trades",
+    "merge_pages",
+    "trade_timestamp",
+    "user_trade_row",
+    "user_trade_stream",
+]
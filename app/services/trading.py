@@ -8,13 +8,21 @@ import threading
 import time
 from collections import deque
 from datetime import datetime, timedelta
-from decimal import Decimal, ROUND_DOWN
+from decimal import Decimal
 from dataclasses import dataclass
 from typing import Any, Callable, Iterable, Optional, Union
 
 import redis
 
 from .binance import _coerce_bool
+from .binance_requests import (
+    FUTURES_ENDPOINTS,
+    SPOT_ENDPOINTS,
+    BinanceRequestLayer,
+    account_key,
+    get_rate_limiter,
+)
+from .exchange_info import get_exchange_info_cache, is_filter_failure
 from .ml import MLServiceBundle
 
 
@@ -110,15 +118,17 @@ class RealBinanceTrader:
         self.use_rsa = bool(self.private_key_path)
         self._coerce_bool = coerce_bool or _coerce_bool
         self.testnet = self._coerce_bool(testnet, default=True)
+        self._requests = BinanceRequestLayer(
+            endpoints=SPOT_ENDPOINTS,
+            limiter=get_rate_limiter("spot", self.testnet),
+            account=account_key(self.api_key),
+        )
         self.client = None
         self.connected = False
         self.last_error = None
         self.account_status = {}
         self.order_history = deque(maxlen=order_history_limit)
-        self._client_lock = threading.Lock()
-        self.symbol_filters = {}
-        self.min_notional_cache = {}
-        self.price_tick_cache = {}
+        self.exchange_info = get_exchange_info_cache("spot", self.testnet)
         self.binance_client_cls = binance_client_cls
         self.api_exception_cls = api_exception_cls or Exception
         account_label = str(account_type or "spot").strip().lower()
@@ -160,6 +170,45 @@ class RealBinanceTrader:
         except Exception:
             pass
 
+    @property
+    def client(self):
+        """Primary client session; extra sessions are pooled by ``_requests``."""
+        return self._requests.primary
+
+    @client.setter
+    def client(self, value):
+        self._requests.configure(value)
+
+    def _create_client(self):
+        if self.use_rsa:
+            # If a filesystem path was provided, pass a Path object so
+            # the underlying binance client will open the file instead
+            # of treating the string as key material.
+            try:
+                from pathlib import Path
+
+                pk_arg = (
+                    Path(self.private_key_path)
+                    if self.private_key_path and Path(self.private_key_path).exists()
+                    else self.private_key_path
+                )
+            except Exception:
+                pk_arg = self.private_key_path
+
+            client = self.binance_client_cls(
+                self.api_key,
+                private_key=pk_arg,
+                private_key_pass=self.private_key_pass,
+                testnet=self.testnet,
+            )
+        else:
+            client = self.binance_client_cls(
+                self.api_key, self.api_secret, testnet=self.testnet
+            )
+        if self.testnet:
+            client.API_URL = self.TESTNET_API_URL
+        return client
+
     def connect(self):
         """Create a Binance client session."""
         if not self.binance_client_cls:
@@ -188,37 +237,13 @@ class RealBinanceTrader:
                 self.account_type,
                 self.testnet,
             )
-            with self._client_lock:
-                if self.use_rsa:
-                    # If a filesystem path was provided, pass a Path object so
-                    # the underlying binance client will open the file instead
-                    # of treating the string as key material.
-                    try:
-                        from pathlib import Path
-
-                        pk_arg = (
-                            Path(self.private_key_path)
-                            if self.private_key_path and Path(self.private_key_path).exists()
-                            else self.private_key_path
-                        )
-                    except Exception:
-                        pk_arg = self.private_key_path
-
-                    self.client = self.binance_client_cls(
-                        self.api_key,
-                        private_key=pk_arg,
-                        private_key_pass=self.private_key_pass,
-                        testnet=self.testnet,
-                    )
-                else:
-                    self.client = self.binance_client_cls(
-                        self.api_key, self.api_secret, testnet=self.testnet
-                    )
-                if self.testnet:
-                    self.client.API_URL = self.TESTNET_API_URL
-                self.connected = True
-                self.last_error = None
-                self.symbol_filters.clear()
+            self._requests.limiter = get_rate_limiter("spot", self.testnet)
+            self._requests.account = account_key(self.api_key)
+            self._requests.configure(self._create_client(), factory=self._create_client)
+            self.connected = True
+            self.last_error = None
+            self.exchange_info = get_exchange_info_cache("spot", self.testnet)
+            self.exchange_info.attach(self._fetch_exchange_info)
             self.refresh_account_status()
             self._log_event("CONNECT", "Connected to Binance API", severity="success")
             self.logger.info(
@@ -283,8 +308,7 @@ class RealBinanceTrader:
         if not self.is_ready():
             return None
         try:
-            with self._client_lock:
-                account = self.client.get_account()
+            account = self._requests.call("get_account")
             self.account_status = {
                 "can_trade": account.get("canTrade", False),
                 "balances": [
@@ -325,8 +349,7 @@ class RealBinanceTrader:
         if not self.is_ready():
             return False
         try:
-            with self._client_lock:
-                server_time = self.client.get_server_time()
+            server_time = self._requests.call("get_server_time")
             self.logger.debug(
                 "Synced Binance server time account_type=%s", self.account_type
             )
@@ -339,29 +362,18 @@ class RealBinanceTrader:
             )
             return False
 
-    def _get_symbol_filters(self, symbol):
-        if not symbol:
-            return []
-        symbol_key = str(symbol).upper()
-        cached = self.symbol_filters.get(symbol_key)
-        if cached is not None:
-            return cached
+    def _fetch_exchange_info(self):
+        return self._requests.call("get_exchange_info")
 
-        if not self.is_ready():
-            return []
+    def symbol_rules(self, symbol):
+        """Precompiled filters for ``symbol`` from the shared exchangeInfo cache."""
+        return self.exchange_info.rules(
+            symbol, self._fetch_exchange_info if self.is_ready() else None
+        )
 
-        try:
-            with self._client_lock:
-                info = self.client.get_symbol_info(symbol_key)
-            filters = info.get("filters", []) if isinstance(info, dict) else []
-            self.symbol_filters[symbol_key] = filters
-            return filters
-        except Exception as exc:
-            self.logger.warning(
-                "Unable to fetch symbol filters symbol=%s error=%s", symbol_key, exc
-            )
-            self.symbol_filters[symbol_key] = []
-            return []
+    def _get_symbol_filters(self, symbol):
+        rules = self.symbol_rules(symbol)
+        return list(rules.filters) if rules is not None else []
 
     def _resolve_price(self, symbol, reference_price=None):
         try:
@@ -374,8 +386,7 @@ class RealBinanceTrader:
             return None
 
         try:
-            with self._client_lock:
-                ticker = self.client.get_symbol_ticker(symbol=str(symbol).upper())
+            ticker = self._requests.call("get_symbol_ticker", symbol=str(symbol).upper())
             price = (
                 float(ticker.get("price"))
                 if isinstance(ticker, dict) and ticker.get("price")
@@ -387,64 +398,15 @@ class RealBinanceTrader:
             return None
 
     def get_min_notional(self, symbol):
-        if not symbol:
-            return None
-        symbol_key = str(symbol).upper()
-        if symbol_key in self.min_notional_cache:
-            return self.min_notional_cache[symbol_key]
-
-        filters = self._get_symbol_filters(symbol_key)
-        min_notional = None
-        for flt in filters:
-            filter_type = flt.get("filterType")
-            if filter_type in ("NOTIONAL", "MIN_NOTIONAL"):
-                value = flt.get("minNotional") or flt.get("notional")
-                if value is not None:
-                    try:
-                        min_notional = float(value)
-                    except Exception:
-                        min_notional = None
-                break
-
-        if min_notional is not None:
-            self.min_notional_cache[symbol_key] = min_notional
-
-        return min_notional
+        rules = self.symbol_rules(symbol)
+        return rules.min_notional if rules is not None else None
 
     def _normalize_order_quantity(self, symbol, quantity):
         try:
-            filters = self._get_symbol_filters(symbol)
-            lot_filter = next(
-                (flt for flt in filters if flt.get("filterType") == "LOT_SIZE"), None
-            )
-            if not lot_filter:
+            rules = self.symbol_rules(symbol)
+            if rules is None:
                 return float(quantity), None
-
-            step_size = Decimal(str(lot_filter.get("stepSize", "0")))
-            min_qty = Decimal(str(lot_filter.get("minQty", "0")))
-            max_qty = Decimal(str(lot_filter.get("maxQty", "0")))
-
-            qty = Decimal(str(quantity))
-            original_qty = qty
-            adjustment_note = None
-
-            if step_size > 0:
-                steps = (qty / step_size).to_integral_value(rounding=ROUND_DOWN)
-                qty = steps * step_size
-                if qty != original_qty:
-                    adjustment_note = f"Adjusted to stepSize {step_size}"
-
-            if max_qty > 0 and qty > max_qty:
-                qty = max_qty
-                adjustment_note = f"Clamped to maxQty {max_qty}"
-
-            if qty <= 0:
-                return None, "Quantity rounded down to zero"
-
-            if qty < min_qty:
-                return None, f"Quantity {qty} below minQty {min_qty}"
-
-            return float(qty), adjustment_note
+            return rules.quantize_quantity(quantity)
         except Exception as exc:
             self.logger.warning(
                 "Failed to normalize quantity symbol=%s qty=%s error=%s",
@@ -455,43 +417,19 @@ class RealBinanceTrader:
             return float(quantity), None
 
     def get_price_tick_size(self, symbol):
-        if not symbol:
+        rules = self.symbol_rules(symbol)
+        if rules is None or rules.tick_size <= 0:
             return None
-        symbol_key = str(symbol).upper()
-        cached = self.price_tick_cache.get(symbol_key)
-        if cached is not None:
-            return cached
-
-        filters = self._get_symbol_filters(symbol_key)
-        price_filter = next(
-            (flt for flt in filters if flt.get("filterType") == "PRICE_FILTER"), None
-        )
-        tick_size = None
-        if price_filter:
-            tick_value = price_filter.get("tickSize")
-            if tick_value is not None:
-                try:
-                    tick_size = float(tick_value)
-                except Exception:
-                    tick_size = None
-        if tick_size is not None:
-            self.price_tick_cache[symbol_key] = tick_size
-        return tick_size
+        return rules.tick_size
 
     def normalize_price(self, symbol, price):
         if price is None:
             return None
-        tick_size = self.get_price_tick_size(symbol)
-        if not tick_size:
+        rules = self.symbol_rules(symbol)
+        if rules is None:
             return float(price)
         try:
-            tick = Decimal(str(tick_size))
-            if tick <= 0:
-                return float(price)
-            price_dec = Decimal(str(price))
-            steps = (price_dec / tick).to_integral_value(rounding=ROUND_DOWN)
-            normalized = steps * tick
-            return float(normalized)
+            return rules.quantize_price(price)
         except Exception as exc:
             self.logger.warning(
                 "Failed to normalize price symbol=%s price=%s error=%s",
@@ -505,10 +443,9 @@ class RealBinanceTrader:
         if not self.is_ready():
             return None
         try:
-            with self._client_lock:
-                return self.client.get_order_book(
-                    symbol=str(symbol).upper(), limit=limit
-                )
+            return self._requests.call(
+                "get_order_book", symbol=str(symbol).upper(), limit=limit
+            )
         except Exception as exc:
             self.logger.warning(
                 "Failed to fetch order book symbol=%s error=%s", symbol, exc
@@ -537,8 +474,7 @@ class RealBinanceTrader:
         if client_order_id:
             params["origClientOrderId"] = str(client_order_id)
         try:
-            with self._client_lock:
-                return self.client.get_order(**params)
+            return self._requests.call("get_order", **params)
         except Exception as exc:
             if isinstance(exc, self.api_exception_cls):
                 self.last_error = str(exc)
@@ -557,6 +493,20 @@ class RealBinanceTrader:
                 )
         return None
 
+    def get_open_orders(self, symbol=None):
+        """Open orders for ``symbol``, or for the whole account in one call."""
+        if not self.is_ready():
+            return None
+        params = {"symbol": str(symbol).upper()} if symbol else {}
+        try:
+            return self._requests.call("get_open_orders", **params)
+        except Exception as exc:
+            self.last_error = str(exc)
+            self.logger.warning(
+                "Failed to get open orders symbol=%s error=%s", symbol or "*", exc
+            )
+        return None
+
     def cancel_order(self, symbol, order_id=None, client_order_id=None):
         if not self.is_ready():
             return None
@@ -568,8 +518,7 @@ class RealBinanceTrader:
         if client_order_id:
             params["origClientOrderId"] = str(client_order_id)
         try:
-            with self._client_lock:
-                response = self.client.cancel_order(**params)
+            response = self._requests.call("cancel_order", **params)
             self._log_event(
                 "ORDER_CANCELLED",
                 f"Cancelled order for {symbol}",
@@ -768,13 +717,12 @@ class RealBinanceTrader:
         try:
             # Execute order through circuit breaker
             def _execute_order():
-                with self._client_lock:
-                    if self.testnet:
-                        response = self.client.create_test_order(**order_request)
-                        status = "TEST_SUBMITTED"
-                    else:
-                        response = self.client.create_order(**order_request)
-                        status = response.get("status", "SUBMITTED")
+                if self.testnet:
+                    response = self._requests.call("create_test_order", **order_request)
+                    status = "TEST_SUBMITTED"
+                else:
+                    response = self._requests.call("create_order", **order_request)
+                    status = response.get("status", "SUBMITTED")
                 return response, status
 
             response, status = self.circuit_breaker.call(_execute_order)
@@ -806,6 +754,8 @@ class RealBinanceTrader:
             return None
         except Exception as exc:
             self.last_error = str(exc)
+            if is_filter_failure(exc):
+                self.exchange_info.invalidate(symbol)
             self._record_order_event("FAILED", order_request, error=self.last_error)
             self._log_event(
                 "ORDER_ERROR",
@@ -948,11 +898,15 @@ class BinanceFuturesTrader:
         self._coerce_bool = coerce_bool or _coerce_bool
         self._safe_float = safe_float or self._default_safe_float
         self.testnet = self._coerce_bool(testnet, default=True)
+        self._requests = BinanceRequestLayer(
+            endpoints=FUTURES_ENDPOINTS,
+            limiter=get_rate_limiter("futures", self.testnet),
+            account=account_key(self.api_key),
+        )
         self.client = None
         self.connected = False
         self.last_error = None
         self.account_status: dict[str, Any] = {}
-        self._client_lock = threading.Lock()
         self.leverage_cache: dict[str, int] = {}
         self.margin_type_cache: dict[str, Any] = {}
         self._open_interest_cache: dict[str, float] = {}
@@ -1026,6 +980,28 @@ class BinanceFuturesTrader:
 
         return client
 
+    @property
+    def client(self):
+        """Primary client session; extra sessions are pooled by ``_requests``."""
+        return self._requests.primary
+
+    @client.setter
+    def client(self, value):
+        self._requests.configure(value)
+
+    def _create_client(self, client_type: str):
+        if client_type == "um":
+            kwargs = {"key": self.api_key, "secret": self.api_secret}
+            if self.testnet:
+                kwargs["base_url"] = self.TESTNET_BASE_URL
+            return self.binance_um_futures_cls(**kwargs)
+        rest_client = self.binance_rest_client_cls(
+            self.api_key,
+            self.api_secret,
+            testnet=self.testnet,
+        )
+        return self._configure_rest_client(rest_client)
+
     def connect(self) -> bool:
         if not self.api_key or not self.api_secret:
             self.last_error = "Missing futures API credentials"
@@ -1037,25 +1013,15 @@ class BinanceFuturesTrader:
         candidate = None
         client_type = None
 
-        if self.binance_um_futures_cls:
+        for kind, cls in (
+            ("um", self.binance_um_futures_cls),
+            ("rest", self.binance_rest_client_cls),
+        ):
+            if candidate is not None or not cls:
+                continue
             try:
-                kwargs = {"key": self.api_key, "secret": self.api_secret}
-                if self.testnet:
-                    kwargs["base_url"] = self.TESTNET_BASE_URL
-                candidate = self.binance_um_futures_cls(**kwargs)
-                client_type = "um"
-            except Exception as exc:
-                errors.append(str(exc))
-
-        if candidate is None and self.binance_rest_client_cls:
-            try:
-                rest_client = self.binance_rest_client_cls(
-                    self.api_key,
-                    self.api_secret,
-                    testnet=self.testnet,
-                )
-                candidate = self._configure_rest_client(rest_client)
-                client_type = "rest"
+                candidate = self._create_client(kind)
+                client_type = kind
             except Exception as exc:
                 errors.append(str(exc))
 
@@ -1071,8 +1037,11 @@ class BinanceFuturesTrader:
                 self.logger.error("Binance futures connect failed: %s", self.last_error)
             return False
 
-        with self._client_lock:
-            self.client = candidate
+        self._requests.limiter = get_rate_limiter("futures", self.testnet)
+        self._requests.account = account_key(self.api_key)
+        self._requests.configure(
+            candidate, factory=lambda: self._create_client(client_type)
+        )
         self._client_type = client_type
         self.connected = True
         self.last_error = None
@@ -1080,7 +1049,7 @@ class BinanceFuturesTrader:
 
         if client_type == "rest":
             try:
-                self.client.futures_ping()
+                self._requests.call("futures_ping")
             except Exception as exc:
                 self._log_event(
                     "FUTURES_PING_WARN",
@@ -1148,11 +1117,10 @@ class BinanceFuturesTrader:
         }
 
         try:
-            with self._client_lock:
-                if self._client_type == "um":
-                    mark_payload = self.client.mark_price(symbol=symbol_key)
-                else:
-                    mark_payload = self.client.futures_mark_price(symbol=symbol_key)
+            mark_payload = self._requests.call(
+                "mark_price" if self._client_type == "um" else "futures_mark_price",
+                symbol=symbol_key,
+            )
             if isinstance(mark_payload, dict):
                 mark_price = self._safe_float(mark_payload.get("markPrice"))
                 index_price = self._safe_float(
@@ -1180,13 +1148,10 @@ class BinanceFuturesTrader:
             )
 
         try:
-            with self._client_lock:
-                if self._client_type == "um":
-                    open_interest_payload = self.client.open_interest(symbol=symbol_key)
-                else:
-                    open_interest_payload = self.client.futures_open_interest(
-                        symbol=symbol_key
-                    )
+            open_interest_payload = self._requests.call(
+                "open_interest" if self._client_type == "um" else "futures_open_interest",
+                symbol=symbol_key,
+            )
             if isinstance(open_interest_payload, dict):
                 open_interest = self._safe_float(
                     open_interest_payload.get("openInterest")
@@ -1208,11 +1173,10 @@ class BinanceFuturesTrader:
             pass
 
         try:
-            with self._client_lock:
-                if self._client_type == "um":
-                    ticker_payload = self.client.ticker_24hr(symbol=symbol_key)
-                else:
-                    ticker_payload = self.client.futures_ticker(symbol=symbol_key)
+            ticker_payload = self._requests.call(
+                "ticker_24hr" if self._client_type == "um" else "futures_ticker",
+                symbol=symbol_key,
+            )
             if isinstance(ticker_payload, dict):
                 metrics["taker_buy_volume"] = self._safe_float(
                     ticker_payload.get("takerBuyVolume")
@@ -1221,19 +1185,24 @@ class BinanceFuturesTrader:
             pass
 
         try:
-            with self._client_lock:
-                if self._client_type == "um" and hasattr(
-                    self.client, "top_long_short_account_ratio"
-                ):
-                    ratio_payload = self.client.top_long_short_account_ratio(
-                        symbol=symbol_key, period="5m", limit=1
-                    )
-                elif hasattr(self.client, "futures_top_long_short_account_ratio"):
-                    ratio_payload = self.client.futures_top_long_short_account_ratio(
-                        symbol=symbol_key, period="5m", limit=1
-                    )
-                else:
-                    ratio_payload = None
+            if self._client_type == "um" and self._requests.supports(
+                "top_long_short_account_ratio"
+            ):
+                ratio_payload = self._requests.call(
+                    "top_long_short_account_ratio",
+                    symbol=symbol_key,
+                    period="5m",
+                    limit=1,
+                )
+            elif self._requests.supports("futures_top_long_short_account_ratio"):
+                ratio_payload = self._requests.call(
+                    "futures_top_long_short_account_ratio",
+                    symbol=symbol_key,
+                    period="5m",
+                    limit=1,
+                )
+            else:
+                ratio_payload = None
             if isinstance(ratio_payload, list) and ratio_payload:
                 metrics["long_short_ratio"] = self._safe_float(
                     ratio_payload[0].get("longShortRatio"), metrics["long_short_ratio"]
@@ -1261,15 +1230,13 @@ class BinanceFuturesTrader:
         if cached == leverage_int:
             return True
         try:
-            with self._client_lock:
-                if self._client_type == "um":
-                    self.client.change_leverage(
-                        symbol=symbol_key, leverage=leverage_int
-                    )
-                else:
-                    self.client.futures_change_leverage(
-                        symbol=symbol_key, leverage=leverage_int
-                    )
+            self._requests.call(
+                "change_leverage"
+                if self._client_type == "um"
+                else "futures_change_leverage",
+                symbol=symbol_key,
+                leverage=leverage_int,
+            )
             self.leverage_cache[symbol_key] = leverage_int
             self._log_event(
                 "FUTURES_LEVERAGE",
@@ -1296,13 +1263,12 @@ class BinanceFuturesTrader:
             return None
         symbol_key = str(symbol).upper()
         try:
-            with self._client_lock:
-                if self._client_type == "um":
-                    positions = self.client.get_position_risk(symbol=symbol_key)
-                else:
-                    positions = self.client.futures_position_information(
-                        symbol=symbol_key
-                    )
+            positions = self._requests.call(
+                "get_position_risk"
+                if self._client_type == "um"
+                else "futures_position_information",
+                symbol=symbol_key,
+            )
             if isinstance(positions, list) and positions:
                 return positions[0]
             return None
@@ -1328,11 +1294,10 @@ class BinanceFuturesTrader:
             }
             if reduce_only:
                 params["reduceOnly"] = "true" if self._client_type == "rest" else True
-            with self._client_lock:
-                if self._client_type == "um":
-                    response = self.client.new_order(**params)
-                else:
-                    response = self.client.futures_create_order(**params)
+            response = self._requests.call(
+                "new_order" if self._client_type == "um" else "futures_create_order",
+                **params,
+            )
             self._log_event(
                 "FUTURES_ORDER",
                 f"{params['side']} {params['quantity']} {params['symbol']} (reduceOnly={reduce_only})",
@@ -1375,11 +1340,9 @@ class BinanceFuturesTrader:
         if not self.is_ready():
             return None
         try:
-            with self._client_lock:
-                if self._client_type == "um":
-                    balances = self.client.balance()
-                else:
-                    balances = self.client.futures_account_balance()
+            balances = self._requests.call(
+                "balance" if self._client_type == "um" else "futures_account_balance"
+            )
             if isinstance(balances, list):
                 return next(
                     (bal for bal in balances if bal.get("asset") == "USDT"),
@@ -1417,8 +1380,7 @@ class BinanceFuturesTrader:
         if start_ms is None or end_ms is None:
             return []
 
-        client = self.client
-        if client is None:
+        if self.client is None:
             return []
 
         method_names = [
@@ -1443,22 +1405,20 @@ class BinanceFuturesTrader:
             },
         ]
 
-        with self._client_lock:
-            for name in method_names:
-                fn = getattr(client, name, None)
-                if not callable(fn):
+        for name in method_names:
+            if not self._requests.supports(name):
+                continue
+            for kwargs in kwargs_candidates:
+                try:
+                    result = self._requests.call(name, **kwargs)
+                    if isinstance(result, list):
+                        return result
+                    if isinstance(result, dict) and isinstance(
+                        result.get("data"), list
+                    ):
+                        return result["data"]
+                except Exception:
                     continue
-                for kwargs in kwargs_candidates:
-                    try:
-                        result = fn(**kwargs)
-                        if isinstance(result, list):
-                            return result
-                        if isinstance(result, dict) and isinstance(
-                            result.get("data"), list
-                        ):
-                            return result["data"]
-                    except Exception:
-                        continue
 
         return []
 
@@ -0,0 +1,264 @@
+"""Compact per-user account state for multi-user auto-trading.
+
+Per-user traders used to be full, independent ``UltimateAIAutoTrader``
+instances, each owning its own ensemble, CRT generator, prediction engine and
+TimescaleDB service. Those subsystems only depend on shared market inputs, so
+this module:
+
+- collects them once from the global traders and injects them into every
+  user-scoped trader (``collect_shared_engines`` / ``build_user_trader``)
+- keeps a small ``UserAccountState`` per user (balance, positions, config and
+  a trade-history handle) that survives when the heavy trader is evicted
+- tracks access times so idle traders can be persisted and dropped, then
+  lazily re-hydrated on next use
+
+Only the ultimate trader of a user pair is persisted, so a pair whose
+optimized trader still holds positions or open take-profit orders is kept in
+memory (``has_open_exposure``) instead of being evicted.
+
+Per-user state that depends on the account (positions, risk, safety and
+stop-loss tracking, QFM analytics, exchange credentials, trade history)
+stays on the trader itself.
+"""
+
+from __future__ import annotations
+
+import copy
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Mapping
+
+# Trader attributes that carry no account-specific state and can therefore be
+# shared by every user-scoped trader built from the same base trader.
+SHARED_TRADER_ENGINES: tuple[str, ...] = (
+    "ensemble_system",
+    "crt_generator",
+    "parallel_engine",
+    "timescaledb_service",
+)
+
+
+def collect_shared_engines(base_trader: Any) -> dict[str, Any]:
+    """Return the shareable engine objects owned by ``base_trader``."""
+    engines: dict[str, Any] = {}
+    for name in SHARED_TRADER_ENGINES:
+        engine = getattr(base_trader, name, None)
+        if engine is not None:
+            engines[name] = engine
+    return engines
+
+
+def build_user_trader(
+    trader_cls: type, *, initial_balance: Any, shared_engines: Mapping[str, Any]
+) -> Any:
+    """Instantiate ``trader_cls`` reusing ``shared_engines`` where supported."""
+    engines = dict(shared_engines or {})
+    try:
+        trader = trader_cls(initial_balance=initial_balance, shared_engines=engines)
+    except TypeError:
+        # Older trader signature - construct normally, then swap engines in.
+        trader = trader_cls(initial_balance=initial_balance)
+        for name, engine in engines.items():
+            try:
+                setattr(trader, name, engine)
+            except Exception:
+                pass
+    return trader
+
+
+def has_open_exposure(trader: Any) -> bool:
+    """True while ``trader`` holds positions or tracks open orders."""
+    if trader is None:
+        return False
+    if getattr(trader, "positions", None) or getattr(trader, "auto_take_profit_state", None):
+        return True
+    tracker = getattr(trader, "order_tracker", None)
+    try:
+        return bool(tracker is not None and tracker.open_orders())
+    except Exception:
+        return False
+
+
+def _copy_positions(trader: Any) -> dict[str, Any]:
+    positions = dict(getattr(trader, "positions", {}) or {})
+    try:
+        return copy.deepcopy(positions)
+    except Exception:
+        return positions
+
+
+def _safe_float(value: Any) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class UserAccountState:
+    """Lightweight account snapshot kept for every known auto-trading user."""
+
+    user_id: int
+    profile: str
+    balance: float | None = None
+    positions: dict[str, Any] = field(default_factory=dict)
+    optimized_positions: dict[str, Any] = field(default_factory=dict)
+    trading_config: dict[str, Any] = field(default_factory=dict)
+    trading_enabled: bool = False
+    paper_trading: bool = False
+    futures_trading_enabled: bool = False
+    trade_history_dir: str | None = None
+    hydrated: bool = False
+    last_access: float = 0.0
+    hydrated_at: float | None = None
+    evicted_at: float | None = None
+    hydrations: int = 0
+    evictions: int = 0
+
+    def capture(self, trader: Any, optimized: Any = None) -> None:
+        """Copy the account-level fields from a hydrated trader pair."""
+        self.balance = _safe_float(getattr(trader, "balance", None))
+        self.positions = _copy_positions(trader)
+        if optimized is not None:
+            self.optimized_positions = _copy_positions(optimized)
+        try:
+            self.trading_config = dict(getattr(trader, "trading_config", {}) or {})
+        except Exception:
+            self.trading_config = {}
+        self.trading_enabled = bool(getattr(trader, "trading_enabled", False))
+        self.paper_trading = bool(getattr(trader, "paper_trading", False))
+        self.futures_trading_enabled = bool(
+            getattr(trader, "futures_trading_enabled", False)
+        )
+        history = getattr(trader, "trade_history", None)
+        data_dir = getattr(history, "data_dir", None)
+        self.trade_history_dir = str(data_dir) if data_dir else None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "user_id": self.user_id,
+            "profile": self.profile,
+            "balance": self.balance,
+            "open_positions": len(self.positions),
+            "optimized_open_positions": len(self.optimized_positions),
+            "trading_enabled": self.trading_enabled,
+            "paper_trading": self.paper_trading,
+            "futures_trading_enabled": self.futures_trading_enabled,
+            "trade_history_dir": self.trade_history_dir,
+            "hydrated": self.hydrated,
+            "last_access": self.last_access,
+            "hydrated_at": self.hydrated_at,
+            "evicted_at": self.evicted_at,
+            "hydrations": self.hydrations,
+            "evictions": self.evictions,
+        }
+
+
+class UserAccountRegistry:
+    """Tracks per-user account state and decides which traders to evict."""
+
+    def __init__(
+        self,
+        *,
+        idle_seconds: float = 1800.0,
+        max_hydrated: int | None = None,
+        clock: Any = time.time,
+    ) -> None:
+        self.idle_seconds = max(0.0, float(idle_seconds))
+        self.max_hydrated = int(max_hydrated) if max_hydrated else None
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._accounts: dict[int, UserAccountState] = {}
+
+    def configure(
+        self, *, idle_seconds: Any = None, max_hydrated: Any = None
+    ) -> None:
+        with self._lock:
+            if idle_seconds is not None:
+                try:
+                    self.idle_seconds = max(0.0, float(idle_seconds))
+                except (TypeError, ValueError):
+                    pass
+            if max_hydrated is not None:
+                try:
+                    self.max_hydrated = int(max_hydrated) or None
+                except (TypeError, ValueError):
+                    pass
+
+    def get(self, user_id: int) -> UserAccountState | None:
+        with self._lock:
+            return self._accounts.get(int(user_id))
+
+    def touch(self, user_id: int, profile: str) -> UserAccountState:
+        with self._lock:
+            state = self._accounts.get(int(user_id))
+            if state is None:
+                state = UserAccountState(user_id=int(user_id), profile=profile)
+                self._accounts[int(user_id)] = state
+            state.last_access = self._clock()
+            return state
+
+    def mark_hydrated(
+        self, user_id: int, profile: str, trader: Any, optimized: Any = None
+    ) -> UserAccountState:
+        with self._lock:
+            state = self.touch(user_id, profile)
+            state.capture(trader, optimized)
+            state.hydrated = True
+            state.hydrated_at = state.last_access
+            state.hydrations += 1
+            return state
+
+    def mark_evicted(
+        self, user_id: int, trader: Any, optimized: Any = None
+    ) -> UserAccountState | None:
+        with self._lock:
+            state = self._accounts.get(int(user_id))
+            if state is None:
+                return None
+            state.capture(trader, optimized)
+            state.hydrated = False
+            state.evicted_at = self._clock()
+            state.evictions += 1
+            return state
+
+    def eviction_candidates(
+        self, hydrated_ids: Iterable[int], *, keep: Iterable[int] = ()
+    ) -> list[int]:
+        """Return hydrated user ids that are idle or exceed the hydration cap.
+
+        Users in ``keep`` (typically those traded in the current cycle) are
+        never selected by the cap so active accounts do not thrash.
+        """
+        now = self._clock()
+        keep_set = {int(uid) for uid in keep}
+        with self._lock:
+            ordered = sorted(
+                (int(uid) for uid in hydrated_ids),
+                key=lambda uid: getattr(self._accounts.get(uid), "last_access", 0.0),
+            )
+            selected: list[int] = []
+            if self.idle_seconds > 0:
+                for uid in ordered:
+                    if uid in keep_set:
+                        continue
+                    state = self._accounts.get(uid)
+                    last = state.last_access if state is not None else 0.0
+                    if now - last >= self.idle_seconds:
+                        selected.append(uid)
+            if self.max_hydrated:
+                remaining = [uid for uid in ordered if uid not in selected]
+                overflow = len(remaining) - self.max_hydrated
+                for uid in remaining:
+                    if overflow <= 0:
+                        break
+                    if uid in keep_set:
+                        continue
+                    selected.append(uid)
+                    overflow -= 1
+            return selected
+
+    def snapshot(self) -> dict[int, dict[str, Any]]:
+        with self._lock:
+            return {uid: state.to_dict() for uid, state in self._accounts.items()}
@@ -0,0 +1,276 @@
+"""Cached index of users eligible for automated multi-user trading.
+
+Every market cycle resolves which users to trade for: active, non-admin users
+with a live subscription, narrowed to those with stored Binance credentials.
+That used to load every candidate ``User`` and then lazy-load each one's
+``subscriptions`` (one query per user), and re-read the credential JSON from
+disk, on every cycle.
+
+``AutoTradingEligibilityIndex`` computes the eligible ids with one joined
+query and keeps them until something relevant changes:
+
+* ORM writes to ``User``, ``UserSubscription`` or ``SubscriptionPlan``
+  (mapper events, plus bulk ``query.update()``/``delete()`` via
+  ``do_orm_execute``) invalidate the index;
+* subscription status is time-dependent (trials and billing periods end), so
+  the cached set also expires at the earliest upcoming ``trial_end`` or
+  ``current_period_end`` boundary;
+* ``max_age`` bounds staleness for writes made outside this process.
+
+Credential ids come from ``BinanceCredentialStore.list_user_ids``, which is
+memoised against the credential file's stat signature.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import weakref
+from datetime import datetime
+from typing import Any, Callable, Iterable, Optional
+
+DEFAULT_MAX_AGE_SECONDS = 300.0
+
+
+class AutoTradingEligibilityIndex:
+    """In-memory, event-invalidated set of auto-trading eligible user ids."""
+
+    def __init__(
+        self,
+        *,
+        max_age: float = DEFAULT_MAX_AGE_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        utcnow: Callable[[], datetime] = datetime.utcnow,
+    ) -> None:
+        self.max_age = max(0.0, float(max_age))
+        self._clock = clock
+        self._utcnow = utcnow
+        self._lock = threading.Lock()
+        self._version = 0
+        self._cached: Optional[list[int]] = None
+        self._cached_version = -1
+        self._cached_bind: Any = None
+        self._expires_at: Optional[float] = None
+        self._valid_until: Optional[datetime] = None
+        self.stats = {"hits": 0, "rebuilds": 0, "invalidations": 0, "errors": 0}
+
+    # ------------------------------------------------------------ invalidation
+
+    def invalidate(self, reason: Optional[str] = None) -> None:
+        """Drop the cached set; the next lookup re-runs the query."""
+        with self._lock:
+            self._version += 1
+            self._cached = None
+            self.stats["invalidations"] += 1
+            self.stats["last_invalidation"] = reason
+
+    # ----------------------------------------------------------------- lookup
+
+    @staticmethod
+    def _bind_key() -> Any:
+        from app.extensions import db
+
+        engine = db.engine
+        return (id(engine), str(engine.url))
+
+    def _is_fresh_locked(self, bind: Any) -> bool:
+        if self._cached is None or self._cached_version != self._version:
+            return False
+        if self._cached_bind != bind:
+            return False
+        if self._expires_at is not None and self._clock() >= self._expires_at:
+            return False
+        if self._valid_until is not None and self._utcnow() >= self._valid_until:
+            return False
+        return True
+
+    def _query(self) -> tuple[list[int], Optional[datetime]]:
+        from app.extensions import db
+        from app.models import (
+            ACTIVE_SUBSCRIPTION_STATUSES,
+            SubscriptionPlan,
+            User,
+            UserSubscription,
+            compute_subscription_status,
+        )
+
+        rows = (
+            db.session.query(
+                User.id,
+                UserSubscription.id,
+                UserSubscription.status,
+                UserSubscription.trial_end,
+                UserSubscription.current_period_end,
+                UserSubscription.cancel_at_period_end,
+                UserSubscription.auto_renew,
+                UserSubscription.canceled_at,
+                SubscriptionPlan.plan_type,
+            )
+            .outerjoin(UserSubscription, UserSubscription.user_id == User.id)
+            .outerjoin(SubscriptionPlan, SubscriptionPlan.id == UserSubscription.plan_id)
+            .filter(User.is_active.is_(True))
+            .filter(User.is_admin.is_(False))
+            .all()
+        )
+
+        now = self._utcnow()
+        eligible: set[int] = set()
+        valid_until: Optional[datetime] = None
+        for row in rows:
+            (user_id, subscription_id, status, trial_end, period_end,
+             cancel_at_period_end, auto_renew, canceled_at, plan_type) = row
+            if subscription_id is None:
+                continue
+            for boundary in (trial_end, period_end):
+                if boundary is not None and boundary > now:
+                    valid_until = boundary if valid_until is None else min(valid_until, boundary)
+            effective = compute_subscription_status(
+                status,
+                trial_end=trial_end,
+                current_period_end=period_end,
+                cancel_at_period_end=cancel_at_period_end,
+                auto_renew=auto_renew,
+                canceled_at=canceled_at,
+                plan_type=plan_type,
+                now=now,
+            )
+            if effective in ACTIVE_SUBSCRIPTION_STATUSES:
+                eligible.add(int(user_id))
+        return sorted(eligible), valid_until
+
+    def eligible_user_ids(self) -> list[int]:
+        """Active, non-admin users with a live subscription (sorted)."""
+        try:
+            bind = self._bind_key()
+        except Exception:
+            self.stats["errors"] += 1
+            return []
+        with self._lock:
+            if self._is_fresh_locked(bind):
+                self.stats["hits"] += 1
+                return list(self._cached or [])
+            version = self._version
+        try:
+            user_ids, valid_until = self._query()
+        except Exception:
+            with self._lock:
+                self.stats["errors"] += 1
+            return []
+        with self._lock:
+            self.stats["rebuilds"] += 1
+            # A write that landed while the query ran leaves the result uncached.
+            if version == self._version:
+                self._cached = user_ids
+                self._cached_version = version
+                self._cached_bind = bind
+                self._valid_until = valid_until
+                self._expires_at = self._clock() + self.max_age if self.max_age else None
+        return list(user_ids)
+
+    def resolve_auto_user_ids(self, credential_store: Any = None) -> list[int]:
+        """Eligible users with stored credentials.
+
+        Falls back to all eligible users, then to every user with stored
+        credentials, matching the previous per-cycle provider.
+        """
+        db_ids = self.eligible_user_ids()
+        credential_ids = _credential_user_ids(credential_store)
+        return (
+            sorted(set(db_ids) & set(credential_ids))
+            or sorted(db_ids)
+            or sorted(credential_ids)
+        )
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "version": self._version,
+                "cached": self._cached is not None,
+                "size": len(self._cached or []),
+                "valid_until": self._valid_until.isoformat() if self._valid_until else None,
+            }
+
+
+def _credential_user_ids(credential_store: Any) -> list[int]:
+    list_ids = getattr(credential_store, "list_user_ids", None)
+    if not callable(list_ids):
+        return []
+    try:
+        return [int(uid) for uid in (list_ids() or [])]
+    except Exception:
+        return []
+
+
+# ------------------------------------------------------------------ events
+
+_LISTENER_LOCK = threading.Lock()
+_LISTENERS_INSTALLED = False
+_SUBSCRIBERS: "weakref.WeakSet[AutoTradingEligibilityIndex]" = weakref.WeakSet()
+
+
+def _invalidate_subscribers(reason: str) -> None:
+    for index in list(_SUBSCRIBERS):
+        index.invalidate(reason)
+
+
+def _tracked_models() -> Iterable[Any]:
+    from app.models import SubscriptionPlan, User, UserSubscription
+
+    return (User, UserSubscription, SubscriptionPlan)
+
+
+def install_model_listeners(index: AutoTradingEligibilityIndex) -> None:
+    """Invalidate ``index`` on ORM writes to users, subscriptions and plans."""
+    global _LISTENERS_INSTALLED
+    with _LISTENER_LOCK:
+        _SUBSCRIBERS.add(index)
+        if _LISTENERS_INSTALLED:
+            return
+        from sqlalchemy import event
+        from sqlalchemy.orm import Session
+
+        models = tuple(_tracked_models())
+        mapped_classes = set(models)
+
+        def _on_write(_mapper, _connection, target) -> None:
+            _invalidate_subscribers(type(target).__name__)
+
+        for model in models:
+            for name in ("after_insert", "after_update", "after_delete"):
+                event.listen(model, name, _on_write)
+
+        def _on_orm_execute(state) -> None:
+            if not (state.is_update or state.is_delete):
+                return
+            mapper = state.bind_mapper
+            if mapper is not None and mapper.class_ in mapped_classes:
+                _invalidate_subscribers(f"bulk:{mapper.class_.__name__}")
+
+        event.listen(Session, "do_orm_execute", _on_orm_execute)
+        _LISTENERS_INSTALLED = True
+
+
+_DEFAULT_INDEX: Optional[AutoTradingEligibilityIndex] = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_eligibility_index() -> AutoTradingEligibilityIndex:
+    """Process-wide index, wired to the ORM write events on first use."""
+    global _DEFAULT_INDEX
+    with _INDEX_LOCK:
+        if _DEFAULT_INDEX is None:
+            _DEFAULT_INDEX = AutoTradingEligibilityIndex()
+        index = _DEFAULT_INDEX
+    try:
+        install_model_listeners(index)
+    except Exception:
+        pass
+    return index
+
+
+__all__ = [
+    "AutoTradingEligibilityIndex",
+    "get_eligibility_index",
+    "install_model_listeners",
+]
@@ -0,0 +1,314 @@
+"""Backtest-grounded objective for strategy parameter search.
+
+``StrategyManager._evaluate_parameter_combination`` used to score parameters
+with a fixed shape heuristic (distance of the risk/reward ratio from 2.0 and
+so on) and never looked at market data, so optimisation cycles could not tell
+a profitable stop/target from a losing one.
+
+The tuned parameters (``stop_loss_pct``, ``take_profit_pct``,
+``confidence_threshold``, ``max_position_size``) do not change what a
+strategy's ``analyze_market`` says; they only change which signals are
+taken and how trades exit. Scoring is therefore split in two:
+
+* ``build_signal_tape`` replays ``analyze_market`` once over local candles
+  (the ``KlineStore`` used by paper trading, downloaded into on a miss) and
+  records, for every BUY/SELL bar, its confidence plus the running-max
+  favourable and adverse excursion over the next ``horizon`` bars. ``SignalMemo`` keeps tapes keyed by the
+  strategy's non-tuned parameters and the candle window, so repeated
+  optimisation cycles skip the replay entirely.
+* ``backtest_scores`` evaluates a whole parameter matrix against the tapes.
+  Because the excursion rows are monotonic, each trade's take-profit and
+  stop-loss bars are ``np.searchsorted`` lookups for all combinations at
+  once; walking signals in time order with a per-combination "busy until"
+  array keeps positions from overlapping. The score is the log growth of
+  equity (position-sized, net of fees) minus a drawdown penalty.
+
+``budget`` below 1 scores only the most recent fraction of each tape, which
+is what successive halving in ``app.strategies.optimizer`` relies on.
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .optimizer import DEFAULT_PARAMETERS, parameter_column
+
+BULLISH = ("BUY", "STRONG_BUY")
+BEARISH = ("SELL", "STRONG_SELL")
+
+# Strategies never read more than the last 100 candles.
+_ANALYSIS_WINDOW = 100
+
+
+@dataclass
+class SignalTape:
+    """Replayed signals for one symbol, ready for vectorised exits."""
+
+    symbol: str
+    bars: int
+    index: np.ndarray  # bar offset of each signal
+    confidence: np.ndarray
+    favourable: np.ndarray  # (signals, horizon) running-max excursion in our favour
+    adverse: np.ndarray  # (signals, horizon) running-max excursion against us
+    final: np.ndarray  # return at the horizon close
+
+    @property
+    def signals(self) -> int:
+        return len(self.index)
+
+
+@dataclass
+class BacktestData:
+    """Picklable input for ``backtest_scores`` (sent to optimiser workers)."""
+
+    tapes: List[SignalTape] = field(default_factory=list)
+    fee_rate: float = 0.001
+    drawdown_penalty: float = 0.5
+
+    @property
+    def signals(self) -> int:
+        return sum(tape.signals for tape in self.tapes)
+
+
+def _forward_windows(values: np.ndarray, horizon: int) -> np.ndarray:
+    """``(n, horizon)`` view of ``values[i + 1 : i + 1 + horizon]``, edge-padded."""
+    padded = np.concatenate([values[1:], np.repeat(values[-1:], horizon)])
+    return np.lib.stride_tricks.sliding_window_view(padded, horizon)[: len(values)]
+
+
+def build_signal_tape(
+    strategy: Any,
+    symbol: str,
+    candles: np.ndarray,
+    *,
+    horizon: int = 48,
+) -> SignalTape:
+    """Replay ``strategy.analyze_market`` over ``candles`` (``(n, 6)`` klines).
+
+    The replay runs on a shallow copy without the QFM engine so the live
+    engine's streaming state is left alone and the tape is deterministic.
+    """
+    candles = np.asarray(candles, dtype=np.float64)
+    horizon = max(1, int(horizon))
+    replica = copy.copy(strategy)
+    replica.qfm_engine = None
+    market_data = [
+        {
+            "timestamp": row[0],
+            "open": row[1],
+            "high": row[2],
+            "low": row[3],
+            "close": row[4],
+            "volume": row[5],
+        }
+        for row in candles.tolist()
+    ]
+
+    index: List[int] = []
+    direction: List[int] = []
+    confidence: List[float] = []
+    for i in range(len(market_data) - 1):
+        window = market_data[max(0, i + 1 - _ANALYSIS_WINDOW): i + 1]
+        try:
+            decision = replica.analyze_market(symbol, window) or {}
+        except Exception:  # pylint: disable=broad-except
+            continue
+        signal = decision.get("signal", "HOLD")
+        if signal in BULLISH or signal in BEARISH:
+            index.append(i)
+            direction.append(1 if signal in BULLISH else -1)
+            confidence.append(float(decision.get("confidence", 0.0) or 0.0))
+
+    signal_index = np.asarray(index, dtype=np.int64)
+    side = np.asarray(direction, dtype=np.float64)[:, None]
+    close = candles[:, 4] if len(candles) else np.empty(0)
+    if not len(signal_index):
+        empty = np.empty((0, horizon))
+        return SignalTape(symbol, len(candles), signal_index, np.empty(0), empty, empty, np.empty(0))
+
+    entry = close[signal_index][:, None]
+    highs = _forward_windows(candles[:, 2], horizon)[signal_index] / entry - 1.0
+    lows = _forward_windows(candles[:, 3], horizon)[signal_index] / entry - 1.0
+    closes = _forward_windows(close, horizon)[signal_index] / entry - 1.0
+    long_side = side > 0
+    favourable = np.where(long_side, highs, -lows)
+    adverse = np.where(long_side, -lows, highs)
+    return SignalTape(
+        symbol=symbol,
+        bars=len(candles),
+        index=signal_index,
+        confidence=np.asarray(confidence, dtype=np.float64),
+        favourable=np.maximum.accumulate(favourable, axis=1),
+        adverse=np.maximum.accumulate(adverse, axis=1),
+        final=(closes[:, -1] * side[:, 0]),
+    )
+
+
+def _score_tape(
+    tape: SignalTape,
+    stop_loss: np.ndarray,
+    take_profit: np.ndarray,
+    threshold: np.ndarray,
+    position: np.ndarray,
+    fee_rate: float,
+    budget: float,
+    state: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+) -> None:
+    growth, peak, drawdown, trades = state
+    busy = np.zeros(len(stop_loss), dtype=np.int64)
+    horizon = tape.favourable.shape[1]
+    first_bar = tape.bars - budget * tape.bars
+    cost = 2.0 * fee_rate
+    for k in range(tape.signals):
+        bar = tape.index[k]
+        if bar < first_bar:
+            continue
+        take = (tape.confidence[k] >= threshold) & (bar >= busy)
+        if not take.any():
+            continue
+        rows = np.flatnonzero(take)
+        tp, sl = take_profit[rows], stop_loss[rows]
+        tp_hit = np.searchsorted(tape.favourable[k], tp, side="left")
+        sl_hit = np.searchsorted(tape.adverse[k], sl, side="left")
+        # A bar that touches both levels is counted as a stop (conservative).
+        returns = np.where(
+            tp_hit < sl_hit, tp, np.where(sl_hit < horizon, -sl, tape.final[k])
+        )
+        busy[rows] = bar + np.minimum(np.minimum(tp_hit, sl_hit), horizon - 1) + 1
+        pnl = position[rows] * (returns - cost)
+        growth[rows] += np.log1p(np.maximum(pnl, -0.999999))
+        peak[rows] = np.maximum(peak[rows], growth[rows])
+        drawdown[rows] = np.maximum(drawdown[rows], peak[rows] - growth[rows])
+        trades[rows] += 1
+
+
+def backtest_scores(
+    matrix: np.ndarray, names: Sequence[str], data: Any = None, budget: float = 1.0
+) -> np.ndarray:
+    """Score each parameter row by replaying exits over ``data.tapes``."""
+    matrix = np.atleast_2d(np.asarray(matrix, dtype=np.float64))
+    n = len(matrix)
+    growth, peak, drawdown = np.zeros(n), np.zeros(n), np.zeros(n)
+    trades = np.zeros(n, dtype=np.int64)
+    if not isinstance(data, BacktestData):
+        return growth
+
+    stop_loss = np.maximum(parameter_column(matrix, names, "stop_loss_pct"), 1e-6)
+    take_profit = np.maximum(parameter_column(matrix, names, "take_profit_pct"), 1e-6)
+    threshold = parameter_column(matrix, names, "confidence_threshold")
+    position = np.clip(parameter_column(matrix, names, "max_position_size"), 0.0, 1.0)
+    budget = min(1.0, max(float(budget), 0.0))
+    state = (growth, peak, drawdown, trades)
+    for tape in data.tapes:
+        _score_tape(
+            tape, stop_loss, take_profit, threshold, position, data.fee_rate, budget, state
+        )
+    return growth - data.drawdown_penalty * drawdown
+
+
+def strategy_fingerprint(strategy: Any, tuned: Iterable[str] = DEFAULT_PARAMETERS) -> str:
+    """Hash of the parameters that drive ``analyze_market`` (tuned keys excluded)."""
+    tuned = set(tuned)
+    signal_params = {
+        key: value for key, value in (getattr(strategy, "parameters", {}) or {}).items()
+        if key not in tuned
+    }
+    payload = json.dumps(
+        [type(strategy).__name__, signal_params], sort_keys=True, default=str
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class SignalMemo:
+    """LRU of ``SignalTape`` objects shared across optimisation cycles."""
+
+    def __init__(self, max_entries: int = 64) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self._tapes: "OrderedDict[Tuple[Any, ...], SignalTape]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def tape(
+        self, strategy: Any, symbol: str, candles: np.ndarray, *, horizon: int = 48
+    ) -> SignalTape:
+        candles = np.asarray(candles)
+        span = (float(candles[0, 0]), float(candles[-1, 0])) if len(candles) else (0.0, 0.0)
+        key = (strategy_fingerprint(strategy), symbol, len(candles), span, int(horizon))
+        with self._lock:
+            cached = self._tapes.get(key)
+            if cached is not None:
+                self._tapes.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+        tape = build_signal_tape(strategy, symbol, candles, horizon=horizon)
+        with self._lock:
+            self._tapes[key] = tape
+            while len(self._tapes) > self.max_entries:
+                self._tapes.popitem(last=False)
+        return tape
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._tapes), "hits": self.hits, "misses": self.misses}
+
+
+def _stored_window(store: Any, symbol: str, interval: str, bars: int) -> np.ndarray:
+    try:
+        return np.array(store.window(symbol, interval, limit=bars))
+    except Exception:  # pylint: disable=broad-except
+        return np.empty((0, 6))
+
+
+def load_backtest_data(
+    strategy: Any,
+    symbols: Sequence[str],
+    *,
+    store: Any,
+    memo: SignalMemo,
+    interval: str = "1h",
+    bars: int = 1000,
+    horizon: int = 48,
+    fee_rate: float = 0.001,
+    fetch: Optional[Callable[[str, str, int], Any]] = None,
+) -> Optional[BacktestData]:
+    """Tapes for ``symbols`` from ``store`` (a ``KlineStore``); ``None`` without candles.
+
+    When the store holds too few candles for a symbol, ``fetch(symbol,
+    interval, bars)`` is asked to download them into the store first.
+    """
+    tapes = []
+    for symbol in symbols:
+        candles = _stored_window(store, symbol, interval, bars)
+        if len(candles) <= horizon and fetch is not None:
+            try:
+                fetch(symbol, interval, bars)
+            except Exception:  # pylint: disable=broad-except
+                pass
+            candles = _stored_window(store, symbol, interval, bars)
+        if len(candles) <= horizon:
+            continue
+        tapes.append(memo.tape(strategy, symbol, candles, horizon=horizon))
+    if not tapes:
+        return None
+    return BacktestData(tapes=tapes, fee_rate=fee_rate)
+
+
+__all__ = [
+    "BacktestData",
+    "SignalMemo",
+    "SignalTape",
+    "backtest_scores",
+    "build_signal_tape",
+    "load_backtest_data",
+    "strategy_fingerprint",
+]
@@ -22,6 +22,15 @@ from .base import (
     ScalpingStrategy,
     TrendFollowingStrategy,
 )
+from .backtest_objective import SignalMemo, backtest_scores, load_backtest_data
+from .optimizer import (
+    DEFAULT_PARAMETERS,
+    OptimizationJob,
+    heuristic_scores,
+    optimize_many,
+    params_matrix,
+    run_optimization,
+)
 from .qfm import QuantumFusionMomentumEngine
 
 
@@ -43,6 +52,10 @@ class StrategyManager:
             "recent_results": [],
         }
         self.qfm_engine = QuantumFusionMomentumEngine()  # Initialize QFM engine
+        self.signal_memo = SignalMemo()
+        self.kline_store = None
+        # ``(symbol, interval, bars)`` -> downloads candles into the KlineStore.
+        self.kline_fetcher = None
         self.initialize_strategies()
         self.initialize_ml_feedback_system()
         self.initialize_performance_analytics()
@@ -511,7 +524,19 @@ class StrategyManager:
                 },
                 "optimization_method": "bayesian",
                 "max_iterations": 50,
+                "batch_size": 10,
+                "patience": 2,
                 "convergence_threshold": 0.01,
+                # Worker threads for concurrent optimisation; None = cores - 1.
+                "max_workers": None,
+                # Candle replay used to score parameters (see backtest_objective).
+                "backtest": {
+                    "symbols": ["BTCUSDT"],
+                    "interval": "1h",
+                    "bars": 1000,
+                    "horizon": 48,
+                    "fee_rate": 0.001,
+                },
                 "current_best_params": {},
                 "optimization_history": [],
             },
@@ -572,17 +597,13 @@ class StrategyManager:
 
     def _run_scheduled_optimization(self):
         """Run scheduled parameter optimization."""
-        optimization_results = {}
-
-        for strategy_name, strategy in self.strategies.items():
-            if not getattr(strategy, "active", True):
-                continue
-
-            try:
-                result = self.optimize_strategy_parameters(strategy_name)
-                optimization_results[strategy_name] = result
-            except Exception as exc:  # pylint: disable=broad-except
-                optimization_results[strategy_name] = {"error": str(exc)}
+        optimization_results = self.optimize_strategies(
+            [
+                strategy_name
+                for strategy_name, strategy in self.strategies.items()
+                if getattr(strategy, "active", True)
+            ]
+        )
 
         current_time = time.time()
         schedule = self.continuous_improvement["optimization_schedule"]
@@ -604,38 +625,36 @@ class StrategyManager:
 
         return optimization_results
 
-    def optimize_strategy_parameters(self, strategy_name, optimization_method=None):
-        """Optimize parameters for a specific strategy."""
+    def _optimization_job(self, strategy_name, optimization_method=None):
+        """Build the ``OptimizationJob`` for a strategy, or an error dict."""
         if strategy_name not in self.strategies:
             return {"error": f"Strategy {strategy_name} not found"}
 
-        if not optimization_method:
-            optimization_method = self.continuous_improvement["automated_optimization"][
-                "optimization_method"
-            ]
-
-        strategy = self.strategies[strategy_name]
-        param_ranges = self.continuous_improvement["automated_optimization"][
-            "parameter_ranges"
-        ]
-
+        settings = self.continuous_improvement["automated_optimization"]
         performance_data = self._get_strategy_performance_data(strategy_name, days=30)
         if not performance_data:
             return {"error": "Insufficient performance data for optimization"}
 
-        if optimization_method == "bayesian":
-            optimized_params = self._bayesian_parameter_optimization(
-                strategy_name, param_ranges, performance_data
-            )
-        elif optimization_method == "grid":
-            optimized_params = self._grid_parameter_optimization(
-                strategy_name, param_ranges, performance_data
-            )
-        else:
-            optimized_params = self._random_parameter_optimization(
-                strategy_name, param_ranges, performance_data
-            )
+        backtest_data = self._backtest_data(strategy_name, performance_data)
+        return OptimizationJob(
+            key=strategy_name,
+            ranges=dict(settings["parameter_ranges"]),
+            method=optimization_method or settings["optimization_method"],
+            data=backtest_data if backtest_data is not None else performance_data,
+            objective=backtest_scores if backtest_data is not None else heuristic_scores,
+            max_evaluations=settings["max_iterations"],
+            batch_size=settings.get("batch_size", 10),
+            convergence_threshold=settings["convergence_threshold"],
+            patience=settings.get("patience", 2),
+        )
 
+    def _apply_optimization_result(self, strategy_name, outcome):
+        """Apply a worker's best parameters to the strategy and summarise."""
+        if "error" in outcome:
+            return {"error": outcome["error"]}
+
+        strategy = self.strategies[strategy_name]
+        optimized_params = outcome["params"]
         original_params = strategy.parameters.copy()
         strategy.parameters.update(optimized_params)
         improvement = self._calculate_parameter_improvement(
@@ -644,109 +663,98 @@ class StrategyManager:
 
         return {
             "strategy": strategy_name,
-            "method": optimization_method,
+            "method": outcome["method"],
             "original_params": original_params,
             "optimized_params": optimized_params,
             "expected_improvement": improvement,
+            "evaluations": outcome["evaluations"],
+            "stopped_early": outcome["stopped_early"],
+            "elapsed_seconds": outcome["elapsed"],
             "timestamp": time.time(),
         }
 
-    def _bayesian_parameter_optimization(
-        self, strategy_name, param_ranges, performance_data
-    ):
-        """Bayesian optimization for parameter tuning (simplified)."""
-        best_params: Dict[str, float] = {}
-        best_score = -float("inf")
-        n_samples = min(
-            20, self.continuous_improvement["automated_optimization"]["max_iterations"]
-        )
-
-        for _ in range(n_samples):
-            params = {
-                param: random.uniform(*bounds) for param, bounds in param_ranges.items()
-            }
-            score = self._evaluate_parameter_combination(
-                strategy_name, params, performance_data
-            )
-            if score > best_score:
-                best_score = score
-                best_params = params.copy()
-
-        return best_params
-
-    def _grid_parameter_optimization(
-        self, strategy_name, param_ranges, performance_data
-    ):
-        """Grid search optimization."""
-        from itertools import product  # Local import to avoid top-level dependency
-
-        param_grid = {
-            param: [min_val + i * (max_val - min_val) / 4 for i in range(5)]
-            for param, (min_val, max_val) in param_ranges.items()
-        }
-
-        best_params: Dict[str, float] = {}
-        best_score = -float("inf")
-        param_names = list(param_grid.keys())
-        param_values = list(param_grid.values())
-
-        for combo in product(*param_values):
-            params = dict(zip(param_names, combo))
-            score = self._evaluate_parameter_combination(
-                strategy_name, params, performance_data
-            )
-            if score > best_score:
-                best_score = score
-                best_params = params.copy()
-
-        return best_params
+    def optimize_strategy_parameters(self, strategy_name, optimization_method=None):
+        """Optimize parameters for a specific strategy."""
+        job = self._optimization_job(strategy_name, optimization_method)
+        if isinstance(job, dict):
+            return job
+        try:
+            outcome = run_optimization(job).to_dict()
+        except Exception as exc:  # pylint: disable=broad-except
+            outcome = {"error": str(exc)}
+        return self._apply_optimization_result(strategy_name, outcome)
 
-    def _random_parameter_optimization(
-        self, strategy_name, param_ranges, performance_data
-    ):
-        """Random search optimization."""
-        best_params: Dict[str, float] = {}
-        best_score = -float("inf")
-        n_samples = min(
-            50, self.continuous_improvement["automated_optimization"]["max_iterations"]
+    def optimize_strategies(self, strategy_names, optimization_method=None):
+        """Optimize several strategies concurrently within the CPU budget."""
+        results = {}
+        jobs = []
+        for strategy_name in strategy_names:
+            job = self._optimization_job(strategy_name, optimization_method)
+            if isinstance(job, dict):
+                results[strategy_name] = job
+            else:
+                jobs.append(job)
+
+        cpu_limit = self.continuous_improvement["automated_optimization"].get(
+            "max_workers"
         )
-
-        for _ in range(n_samples):
-            params = {
-                param: random.uniform(*bounds) for param, bounds in param_ranges.items()
-            }
-            score = self._evaluate_parameter_combination(
-                strategy_name, params, performance_data
+        outcomes = optimize_many(jobs, max_workers=cpu_limit)
+        for job in jobs:
+            results[job.key] = self._apply_optimization_result(
+                job.key, outcomes.get(job.key, {"error": "optimization did not run"})
             )
-            if score > best_score:
-                best_score = score
-                best_params = params.copy()
+        return results
 
-        return best_params
+    def _backtest_data(self, strategy_name, performance_data):
+        """Signal tapes over cached candles for the strategy's traded symbols."""
+        strategy = self.strategies.get(strategy_name)
+        if strategy is None:
+            return None
+        settings = self.continuous_improvement["automated_optimization"]["backtest"]
+        symbols = list(settings.get("symbols") or [])
+        for trade in performance_data or []:
+            symbol = trade.get("symbol") if isinstance(trade, dict) else None
+            if symbol and symbol not in symbols:
+                symbols.append(symbol)
+        if self.kline_store is None:
+            from app.trading.kline_replay import KlineStore
+
+            self.kline_store = KlineStore()
+        return load_backtest_data(
+            strategy,
+            symbols,
+            store=self.kline_store,
+            memo=self.signal_memo,
+            interval=settings.get("interval", "1h"),
+            bars=settings.get("bars", 1000),
+            horizon=settings.get("horizon", 48),
+            fee_rate=settings.get("fee_rate", 0.001),
+            fetch=self.kline_fetcher,
+        )
 
     def _evaluate_parameter_combination(self, strategy_name, params, performance_data):
-        """Evaluate a parameter combination using historical data."""
-        stop_loss = params.get("stop_loss_pct", 0.02)
-        take_profit = params.get("take_profit_pct", 0.04)
-        confidence_threshold = params.get("confidence_threshold", 0.5)
-        max_position = params.get("max_position_size", 0.1)
-
-        risk_reward_ratio = take_profit / max(stop_loss, 1e-6)
-        balance_score = 1.0 - abs(risk_reward_ratio - 2.0) / 4.0
-        position_score = 1.0 - abs(max_position - 0.1) / 0.2
-        confidence_score = 1.0 - abs(confidence_threshold - 0.6) / 0.8
-
-        return (balance_score * 0.5) + (position_score * 0.3) + (confidence_score * 0.2)
+        """Evaluate a parameter combination by replaying cached candles.
+
+        Falls back to the risk/reward shape heuristic when no candles are
+        stored for the strategy's symbols.
+        """
+        names = tuple(DEFAULT_PARAMETERS)
+        matrix = params_matrix(params, names)
+        data = self._backtest_data(strategy_name, performance_data)
+        if data is None:
+            return float(heuristic_scores(matrix, names)[0])
+        return float(backtest_scores(matrix, names, data)[0])
 
     def _calculate_parameter_improvement(
         self, strategy_name, original_params, optimized_params
     ):
         """Calculate expected improvement from parameter optimization."""
+        performance_data = self._get_strategy_performance_data(strategy_name, days=30)
         original_score = self._evaluate_parameter_combination(
-            strategy_name, original_params, []
+            strategy_name, original_params, performance_data
         )
         optimized_score = self._evaluate_parameter_combination(
-            strategy_name, optimized_params, []
+            strategy_name, optimized_params, performance_data
         )
         improvement = optimized_score - original_score
 
@@ -1776,7 +1784,7 @@ class StrategyManager:
 
     # ==================== OPTIMIZATION HELPERS ====================
     def optimize_all_strategies(self):
-        """Optimize every active strategy sequentially."""
+        """Optimize every active strategy, concurrently where cores allow."""
         if self.optimization_status["running"]:
             return self.optimization_status.get("last_result")
 
@@ -1785,12 +1793,13 @@ class StrategyManager:
 
         results = {}
         try:
-            for strategy_name in self.strategies:
-                if not self.active_strategies.get(strategy_name, True):
-                    continue
-                results[strategy_name] = self.optimize_strategy_parameters(
+            results = self.optimize_strategies(
+                [
                     strategy_name
-                )
+                    for strategy_name in self.strategies
+                    if self.active_strategies.get(strategy_name, True)
+                ]
+            )
         except Exception as exc:  # pylint: disable=broad-except
             self.optimization_status["last_error"] = str(exc)
         finally:
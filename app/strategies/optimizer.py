@@ -0,0 +1,422 @@
+"""Batch parameter search for ``StrategyManager``.
+
+``StrategyManager.optimize_strategy_parameters`` used to score one parameter
+dict at a time: the "grid" method walked a full 5^k ``itertools.product``
+(625 combinations for the four tuned parameters), while the "bayesian" and
+random methods were the same serial ``random.uniform`` loop with no model of
+where good parameters lie. Strategies were optimised one after another.
+
+Searches here work on parameter *matrices*. A ``ParameterSpace`` maps between
+``(n, k)`` arrays and parameter dicts, and an objective scores a whole matrix
+in one call: ``objective(matrix, names, data, budget) -> (n,) scores``, where
+``budget`` in ``(0, 1]`` is the fraction of ``data`` to evaluate against.
+
+* ``grid`` scores the full grid in vectorised chunks.
+* ``random`` runs successive halving over random candidates: everything is
+  scored on a small budget, the best ``1/eta`` move up to ``eta`` times the
+  budget, and only the survivors are scored on the full data.
+* ``bayesian`` is a local Tree-structured Parzen Estimator. Each round asks
+  for a batch drawn where the density of good observations is high relative
+  to the bad ones, and the search stops early once the best score has not
+  improved by ``convergence_threshold`` for ``patience`` rounds.
+
+``optimize_many`` runs one ``OptimizationJob`` per strategy on a thread pool
+capped by a CPU budget; the objectives spend their time in numpy, which
+releases the GIL. It deliberately avoids process pools: spawned workers
+re-import the launching script as ``__mp_main__``, and when that script is
+``ai_ml_auto_bot_final.py`` every worker would repeat the bot's startup and
+run its ``atexit`` save on exit.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+Objective = Callable[[np.ndarray, Sequence[str], Any, float], np.ndarray]
+
+DEFAULT_PARAMETERS = {
+    "stop_loss_pct": 0.02,
+    "take_profit_pct": 0.04,
+    "confidence_threshold": 0.5,
+    "max_position_size": 0.1,
+}
+
+# Rows per objective call for exhaustive grids; bounds peak memory on large k.
+_GRID_CHUNK = 8192
+
+
+@dataclass(frozen=True)
+class ParameterSpace:
+    """Box bounds for named float parameters."""
+
+    names: Tuple[str, ...]
+    bounds: Tuple[Tuple[float, float], ...]
+
+    @classmethod
+    def from_ranges(cls, ranges: Mapping[str, Sequence[float]]) -> "ParameterSpace":
+        names = tuple(ranges)
+        bounds = tuple((float(ranges[name][0]), float(ranges[name][1])) for name in names)
+        return cls(names, bounds)
+
+    @property
+    def lows(self) -> np.ndarray:
+        return np.array([low for low, _high in self.bounds], dtype=np.float64)
+
+    @property
+    def spans(self) -> np.ndarray:
+        return np.array([high - low for low, high in self.bounds], dtype=np.float64)
+
+    def denormalise(self, unit: np.ndarray) -> np.ndarray:
+        """Map points of the unit cube onto the parameter box."""
+        return self.lows + np.clip(unit, 0.0, 1.0) * self.spans
+
+    def normalise(self, matrix: np.ndarray) -> np.ndarray:
+        spans = np.where(self.spans > 0, self.spans, 1.0)
+        return np.clip((matrix - self.lows) / spans, 0.0, 1.0)
+
+    def sample(self, n: int, rng: np.random.Generator) -> np.ndarray:
+        return self.denormalise(rng.random((int(n), len(self.names))))
+
+    def grid(self, points: int = 5) -> np.ndarray:
+        """Every combination of ``points`` evenly spaced values per parameter."""
+        axes = [np.linspace(low, high, points) for low, high in self.bounds]
+        mesh = np.meshgrid(*axes, indexing="ij")
+        return np.stack([axis.ravel() for axis in mesh], axis=1)
+
+    def to_dict(self, row: Sequence[float]) -> Dict[str, float]:
+        return {name: float(value) for name, value in zip(self.names, row)}
+
+
+def parameter_column(matrix: np.ndarray, names: Sequence[str], name: str) -> np.ndarray:
+    """Column ``name`` of ``matrix``, or its default when it is not being tuned."""
+    if name in names:
+        return matrix[:, list(names).index(name)]
+    return np.full(len(matrix), DEFAULT_PARAMETERS[name])
+
+
+def heuristic_scores(
+    matrix: np.ndarray, names: Sequence[str], data: Any = None, budget: float = 1.0
+) -> np.ndarray:
+    """Vectorised form of the manager's risk/reward shape score.
+
+    Rewards a 2:1 take-profit/stop-loss ratio, ~10% position size and a 0.6
+    confidence threshold. ``data`` and ``budget`` are unused.
+    """
+    matrix = np.atleast_2d(np.asarray(matrix, dtype=np.float64))
+    stop_loss = parameter_column(matrix, names, "stop_loss_pct")
+    take_profit = parameter_column(matrix, names, "take_profit_pct")
+    confidence_threshold = parameter_column(matrix, names, "confidence_threshold")
+    max_position = parameter_column(matrix, names, "max_position_size")
+
+    risk_reward_ratio = take_profit / np.maximum(stop_loss, 1e-6)
+    balance_score = 1.0 - np.abs(risk_reward_ratio - 2.0) / 4.0
+    position_score = 1.0 - np.abs(max_position - 0.1) / 0.2
+    confidence_score = 1.0 - np.abs(confidence_threshold - 0.6) / 0.8
+    return (balance_score * 0.5) + (position_score * 0.3) + (confidence_score * 0.2)
+
+
+def params_matrix(params: Mapping[str, Any], names: Sequence[str]) -> np.ndarray:
+    """One-row matrix for ``params``; missing or non-numeric values use defaults."""
+    row = []
+    for name in names:
+        value = params.get(name, DEFAULT_PARAMETERS.get(name, 0.0))
+        try:
+            row.append(float(value))
+        except (TypeError, ValueError):
+            row.append(float(DEFAULT_PARAMETERS.get(name, 0.0)))
+    return np.array([row], dtype=np.float64)
+
+
+class TPESampler:
+    """Tree-structured Parzen Estimator over the unit cube, maximising scores.
+
+    Observations are split at the ``gamma`` quantile into good and bad sets,
+    each modelled as a Gaussian-kernel mixture plus a uniform prior. New
+    points are drawn around good observations and the candidates with the
+    highest ``l(x) / g(x)`` ratio are returned.
+    """
+
+    def __init__(
+        self,
+        dims: int,
+        *,
+        gamma: float = 0.25,
+        candidates: int = 48,
+        n_startup: int = 10,
+        min_bandwidth: float = 0.02,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.dims = int(dims)
+        self.gamma = float(gamma)
+        self.candidates = max(1, int(candidates))
+        self.n_startup = max(2, int(n_startup))
+        self.min_bandwidth = float(min_bandwidth)
+        self.rng = np.random.default_rng(seed)
+        self._x = np.empty((0, self.dims))
+        self._y = np.empty(0)
+
+    @property
+    def observations(self) -> int:
+        return len(self._y)
+
+    def tell(self, unit: np.ndarray, scores: np.ndarray) -> None:
+        unit = np.atleast_2d(np.asarray(unit, dtype=np.float64))
+        scores = np.asarray(scores, dtype=np.float64).ravel()
+        finite = np.isfinite(scores)
+        self._x = np.vstack([self._x, unit[finite]])
+        self._y = np.concatenate([self._y, scores[finite]])
+
+    def _bandwidth(self, points: np.ndarray) -> np.ndarray:
+        n = max(len(points), 1)
+        spread = points.std(axis=0) if len(points) > 1 else np.full(self.dims, 0.5)
+        scott = spread * n ** (-1.0 / (self.dims + 4))
+        return np.clip(scott, self.min_bandwidth, 1.0)
+
+    @staticmethod
+    def _log_density(x: np.ndarray, centres: np.ndarray, bandwidth: np.ndarray) -> np.ndarray:
+        z = (x[:, None, :] - centres[None, :, :]) / bandwidth
+        log_kernel = -0.5 * np.einsum("cnd,cnd->cn", z, z) - np.sum(
+            np.log(bandwidth * math.sqrt(2.0 * math.pi))
+        )
+        peak = log_kernel.max(axis=1, keepdims=True)
+        mixture = peak[:, 0] + np.log(np.exp(log_kernel - peak).mean(axis=1))
+        n = len(centres)
+        # Blend with the uniform prior (log density 0 on the unit cube).
+        return np.logaddexp(mixture + math.log(n / (n + 1.0)), -math.log(n + 1.0))
+
+    def ask(self, n: int) -> np.ndarray:
+        n = max(1, int(n))
+        if self.observations < self.n_startup:
+            return self.rng.random((n, self.dims))
+
+        order = np.argsort(-self._y, kind="stable")
+        n_good = max(1, int(math.ceil(self.gamma * len(order))))
+        good = self._x[order[:n_good]]
+        bad = self._x[order[n_good:]] if n_good < len(order) else self._x[order[-1:]]
+        good_bw = self._bandwidth(good)
+
+        total = n * self.candidates
+        centres = good[self.rng.integers(0, len(good), total)]
+        draws = centres + self.rng.normal(0.0, 1.0, (total, self.dims)) * good_bw
+        # Reflect at the walls so mass is not piled up on the bounds.
+        draws = np.abs(draws)
+        draws = 1.0 - np.abs(1.0 - draws)
+        draws = np.clip(draws, 0.0, 1.0)
+
+        ratio = self._log_density(draws, good, good_bw) - self._log_density(
+            draws, bad, self._bandwidth(bad)
+        )
+        # Each batch slot picks the best of its own candidate pool, which keeps
+        # a batch from collapsing onto one point.
+        pools = ratio.reshape(n, self.candidates)
+        picks = pools.argmax(axis=1) + np.arange(n) * self.candidates
+        return draws[picks]
+
+
+@dataclass
+class OptimizationJob:
+    """Everything a worker needs to optimise one strategy."""
+
+    key: str
+    ranges: Dict[str, Tuple[float, float]]
+    method: str = "bayesian"
+    data: Any = None
+    objective: Objective = heuristic_scores
+    max_evaluations: int = 50
+    batch_size: int = 10
+    grid_points: int = 5
+    convergence_threshold: float = 0.01
+    patience: int = 2
+    min_budget: float = 1.0 / 9.0
+    eta: int = 3
+    seed: Optional[int] = None
+
+
+@dataclass
+class OptimizationResult:
+    key: str
+    method: str
+    params: Dict[str, float]
+    score: float
+    evaluations: int
+    rounds: int
+    stopped_early: bool = False
+    elapsed: float = 0.0
+    history: List[float] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _score(job: OptimizationJob, names: Sequence[str], matrix: np.ndarray, budget: float) -> np.ndarray:
+    scores = np.asarray(job.objective(matrix, names, job.data, budget), dtype=np.float64)
+    return np.where(np.isfinite(scores), scores, -np.inf)
+
+
+def successive_halving(
+    job: OptimizationJob, space: ParameterSpace, configs: np.ndarray
+) -> Tuple[np.ndarray, float, int, int]:
+    """Score ``configs`` on growing budgets, keeping the top ``1/eta`` each rung.
+
+    Returns ``(best_row, best_score, evaluations, rungs)``; the winner was
+    scored on the full budget.
+    """
+    eta = max(2, int(job.eta))
+    budget = min(1.0, max(float(job.min_budget), 1e-6))
+    survivors = configs
+    evaluations = 0
+    rungs = 0
+    while True:
+        scores = _score(job, space.names, survivors, budget)
+        evaluations += len(survivors)
+        rungs += 1
+        if budget >= 1.0 or len(survivors) == 1:
+            if budget < 1.0:
+                scores = _score(job, space.names, survivors, 1.0)
+                evaluations += len(survivors)
+            best = int(np.argmax(scores))
+            return survivors[best], float(scores[best]), evaluations, rungs
+        keep = max(1, int(math.ceil(len(survivors) / eta)))
+        order = np.argsort(-scores, kind="stable")[:keep]
+        survivors = survivors[order]
+        budget = min(1.0, budget * eta)
+
+
+def _grid_search(job: OptimizationJob, space: ParameterSpace) -> OptimizationResult:
+    grid = space.grid(max(2, int(job.grid_points)))
+    best_row, best_score = None, -np.inf
+    for start in range(0, len(grid), _GRID_CHUNK):
+        chunk = grid[start: start + _GRID_CHUNK]
+        scores = _score(job, space.names, chunk, 1.0)
+        index = int(np.argmax(scores))
+        if best_row is None or scores[index] > best_score:
+            best_row, best_score = chunk[index], float(scores[index])
+    return OptimizationResult(
+        job.key, "grid", space.to_dict(best_row), best_score, len(grid), 1
+    )
+
+
+def _random_search(job: OptimizationJob, space: ParameterSpace) -> OptimizationResult:
+    rng = np.random.default_rng(job.seed)
+    configs = space.sample(max(1, int(job.max_evaluations)), rng)
+    row, score, evaluations, rungs = successive_halving(job, space, configs)
+    return OptimizationResult(job.key, "random", space.to_dict(row), score, evaluations, rungs)
+
+
+def _bayesian_search(job: OptimizationJob, space: ParameterSpace) -> OptimizationResult:
+    batch = max(1, int(job.batch_size))
+    sampler = TPESampler(len(space.names), n_startup=batch, seed=job.seed)
+    best_row, best_score = None, -np.inf
+    history: List[float] = []
+    evaluations = rounds = stale = 0
+    stopped_early = False
+    while evaluations < job.max_evaluations:
+        unit = sampler.ask(min(batch, int(job.max_evaluations) - evaluations))
+        matrix = space.denormalise(unit)
+        scores = _score(job, space.names, matrix, 1.0)
+        sampler.tell(unit, scores)
+        evaluations += len(matrix)
+        rounds += 1
+
+        index = int(np.argmax(scores))
+        improved = best_row is None or scores[index] > best_score + job.convergence_threshold
+        if best_row is None or scores[index] > best_score:
+            best_row, best_score = matrix[index], float(scores[index])
+        history.append(best_score)
+        stale = 0 if improved else stale + 1
+        if rounds > 1 and stale >= job.patience:
+            stopped_early = evaluations < job.max_evaluations
+            break
+    return OptimizationResult(
+        job.key,
+        "bayesian",
+        space.to_dict(best_row),
+        best_score,
+        evaluations,
+        rounds,
+        stopped_early=stopped_early,
+        history=history,
+    )
+
+
+_SEARCHES = {
+    "grid": _grid_search,
+    "random": _random_search,
+    "bayesian": _bayesian_search,
+}
+
+
+def run_optimization(job: OptimizationJob) -> OptimizationResult:
+    """Run ``job`` in the current process. Unknown methods use random search."""
+    started = time.perf_counter()
+    space = ParameterSpace.from_ranges(job.ranges)
+    search = _SEARCHES.get(job.method, _random_search)
+    result = search(job, space)
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def cpu_budget(max_workers: Optional[int] = None, jobs: int = 1) -> int:
+    """Workers to use: ``max_workers`` or all but one core, never above ``jobs``."""
+    if max_workers is None:
+        max_workers = max(1, (os.cpu_count() or 1) - 1)
+    return max(1, min(int(max_workers), int(jobs)))
+
+
+def _run_serial(jobs: Iterable[OptimizationJob]) -> Dict[str, Dict[str, Any]]:
+    results: Dict[str, Dict[str, Any]] = {}
+    for job in jobs:
+        try:
+            results[job.key] = run_optimization(job).to_dict()
+        except Exception as exc:  # pylint: disable=broad-except
+            results[job.key] = {"error": str(exc)}
+    return results
+
+
+def optimize_many(
+    jobs: Sequence[OptimizationJob],
+    *,
+    max_workers: Optional[int] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Run ``jobs`` concurrently within ``max_workers`` threads.
+
+    Returns ``{job.key: OptimizationResult.to_dict()}``; a job that raised maps
+    to ``{"error": message}`` instead.
+    """
+    jobs = list(jobs)
+    workers = cpu_budget(max_workers, len(jobs))
+    if workers <= 1:
+        return _run_serial(jobs)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="optimizer") as pool:
+        futures = {job.key: pool.submit(run_optimization, job) for job in jobs}
+        for key, future in futures.items():
+            try:
+                results[key] = future.result().to_dict()
+            except Exception as exc:  # pylint: disable=broad-except
+                results[key] = {"error": str(exc)}
+    return results
+
+
+__all__ = [
+    "DEFAULT_PARAMETERS",
+    "OptimizationJob",
+    "OptimizationResult",
+    "ParameterSpace",
+    "TPESampler",
+    "cpu_budget",
+    "heuristic_scores",
+    "optimize_many",
+    "parameter_column",
+    "params_matrix",
+    "run_optimization",
+    "successive_halving",
+]
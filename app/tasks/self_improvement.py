@@ -1,6 +1,7 @@
 """Self-improvement background worker."""
 from __future__ import annotations
 
+import importlib.util
 import os
 import shutil
 import threading
@@ -14,6 +15,9 @@ import json
 import requests
 import tempfile
 
+from app.runtime.lazy import LazyImport
+from app.services.correlation import get_correlation_service
+
 # Data science imports for RIBS
 try:
     import pandas as pd
@@ -25,14 +29,14 @@ except ImportError:
     pd = None
     np = None
 
-# RIBS imports
-try:
-    from app.services.ribs_optimizer import TradingRIBSOptimizer
-
-    RIBS_AVAILABLE = True
-except ImportError:
-    RIBS_AVAILABLE = False
-    TradingRIBSOptimizer = None
+# RIBS imports. pyribs pulls in scipy/sklearn/numba, so only check that it is
+# installed here and import the optimizer when a worker actually enables it.
+RIBS_AVAILABLE = importlib.util.find_spec("ribs") is not None
+TradingRIBSOptimizer = (
+    LazyImport("app.services.ribs_optimizer", "TradingRIBSOptimizer")
+    if RIBS_AVAILABLE
+    else None
+)
 
 from utils.compression import get_compressor
 
@@ -283,15 +287,25 @@ class SelfImprovementWorker:
             "momentum": 0.25,
         }
 
+    def _portfolio_symbols(self) -> set[str]:
+        symbols: set[str] = set()
+        for trader in (self.ultimate_trader, self.optimized_trader):
+            positions = getattr(trader, "positions", None)
+            if isinstance(positions, dict):
+                symbols.update(str(symbol).upper() for symbol in positions)
+        return symbols
+
     def _calculate_portfolio_correlations(self) -> dict[str, float]:
-        """Calculate current portfolio correlations."""
-        # This would analyze actual portfolio data
-        # For now, return sample correlations
-        return {
-            "BTCUSDT_ETHUSDT": 0.85,
-            "BTCUSDT_ADAUSDT": 0.65,
-            "ETHUSDT_ADAUSDT": 0.70,
-        }
+        """Rolling return correlations between held symbols (all tracked if <2 held).
+
+        Only pairs strong enough to change a position size are returned.
+        """
+        held = self._portfolio_symbols()
+        return get_correlation_service().pair_correlations(
+            symbols=held if len(held) > 1 else None,
+            min_abs=0.6,
+            limit=200,
+        )
 
     def _calculate_correlation_adjustments(
         self, correlations: dict[str, float]
@@ -4,12 +4,17 @@ Provides real exchange integration with support for multiple exchanges.
 """
 
 import asyncio
-from typing import Dict, List, Optional, Tuple
+import itertools
+import math
+from typing import Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 import logging
+import time
 from datetime import datetime
 from enum import Enum
 
+import numpy as np
+
 try:
     from binance.client import Client as BinanceClient
 
@@ -18,6 +23,17 @@ except ImportError:
     BINANCE_AVAILABLE = False
     BinanceClient = None
 
+from app.trading.kline_replay import KlineReplay, KlineStore, synthetic_klines
+from app.trading.paper_matching import (
+    DEFAULT_QUOTE_LIQUIDITY,
+    FeeModel,
+    Fill,
+    LatencyModel,
+    MatchingEngine,
+    PaperOrder,
+    split_symbol,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -417,17 +433,50 @@ class BinanceAdapter(ExchangeAdapter):
 
 
 class PaperTradingAdapter(ExchangeAdapter):
-    """Paper trading adapter for safe strategy testing."""
+    """Paper trading adapter for safe strategy testing.
 
-    def __init__(self, credentials: ExchangeCredentials):
+    Orders go through a local :class:`MatchingEngine`: MARKET orders sweep
+    the (synthetic or replayed) depth with slippage, LIMIT orders rest until
+    crossed, and balances are locked while orders are open. Synthetic depth
+    is re-quoted around the current ticker on every order and book request,
+    with ``quote_liquidity`` of quote asset at each touch level.
+
+    Between market events the engine's simulated time moves by the wall-clock
+    time elapsed since the previous adapter call (``clock``, milliseconds), so
+    order latency expires in live paper trading while kline replays keep
+    their own timestamps.
+    """
+
+    def __init__(
+        self,
+        credentials: ExchangeCredentials,
+        *,
+        engine: Optional[MatchingEngine] = None,
+        fee_model: Optional[FeeModel] = None,
+        latency_model: Optional[LatencyModel] = None,
+        depth_levels: int = 20,
+        quote_liquidity: float = DEFAULT_QUOTE_LIQUIDITY,
+        kline_store: Optional[KlineStore] = None,
+        clock: Optional[Callable[[], float]] = None,
+    ):
         super().__init__(credentials)
         self.paper_balances = {
             "USDT": AccountBalance("USDT", 10000.0, 0.0, 10000.0),
             "BTC": AccountBalance("BTC", 0.5, 0.0, 0.5),
             "ETH": AccountBalance("ETH", 5.0, 0.0, 5.0),
         }
-        self.paper_orders = []
         self.price_feeds = {}  # Cache for price data
+        self.depth_levels = depth_levels
+        self.kline_store = kline_store or KlineStore()
+        self.engine = engine or MatchingEngine(
+            fees=fee_model, latency=latency_model, quote_liquidity=quote_liquidity
+        )
+        self.engine.on_fill = self._apply_fill
+        self._clock = clock or (lambda: time.monotonic() * 1000.0)
+        self._clock_mark = self._clock()
+        # Balance still locked per open order (quote for BUY, base for SELL).
+        self._reserved: Dict[str, float] = {}
+        self._order_ids = itertools.count(1)
 
     async def connect(self) -> bool:
         """Connect to paper trading (always succeeds)."""
@@ -435,6 +484,12 @@ class PaperTradingAdapter(ExchangeAdapter):
         logger.info("Connected to Paper Trading")
         return True
 
+    def _advance_clock(self) -> None:
+        """Move simulated time by the wall-clock time since the last call."""
+        now = self._clock()
+        elapsed, self._clock_mark = now - self._clock_mark, now
+        self.engine.advance(self.engine.now + max(0.0, elapsed))
+
     async def disconnect(self):
         """Disconnect from paper trading."""
         self.is_connected = False
@@ -470,94 +525,157 @@ class PaperTradingAdapter(ExchangeAdapter):
         return price
 
     async def get_orderbook(self, symbol: str, limit: int = 100) -> Optional[OrderBook]:
-        """Get simulated order book."""
+        """Get the simulated order book, including resting paper orders."""
         price = await self.get_ticker_price(symbol)
         if not price:
             return None
 
-        # Generate simulated order book around current price
-        spread = price * 0.001  # 0.1% spread
-
-        bids = []
-        asks = []
-
-        for i in range(limit):
-            bid_price = price - spread - (i * spread * 0.1)
-            ask_price = price + spread + (i * spread * 0.1)
-            quantity = 10.0 / (i + 1)  # Decreasing quantity
-
-            bids.append((max(bid_price, 0.01), quantity))
-            asks.append((ask_price, quantity))
-
+        self._advance_clock()
+        self.engine.synthetic_depth(symbol, price, levels=max(limit, self.depth_levels))
+        bids, asks = self.engine.book(symbol).snapshot(limit)
         return OrderBook(
             symbol=symbol, bids=bids, asks=asks, timestamp=datetime.utcnow()
         )
 
+    def update_market_price(self, symbol: str, price: float) -> None:
+        """Move the simulated market: re-quote depth so resting orders can fill."""
+        self.price_feeds[symbol] = float(price)
+        self._advance_clock()
+        self.engine.synthetic_depth(symbol, float(price), levels=self.depth_levels)
+
+    def replay_klines(self, symbol: str, klines: List[KlineData]) -> None:
+        """Drive the book from recorded candles (fills resting orders they cross)."""
+        self.engine.replay_klines(symbol, klines, depth_levels=self.depth_levels)
+        if klines:
+            self.price_feeds[symbol] = float(klines[-1].close)
+
     async def get_historical_klines(
-        self, symbol: str, interval: str, limit: int = 100
+        self,
+        symbol: str,
+        interval: str,
+        limit: int = 100,
+        *,
+        end_time: Optional[datetime] = None,
     ) -> List[KlineData]:
-        """Get simulated historical candlestick data for paper trading."""
+        """Stored candles for paper trading, synthetic ones only when none exist."""
         try:
-            # Generate simulated historical data
-            # In a real implementation, you might use real historical data
-            # but for paper trading, we'll generate realistic-looking data
-
-            current_price = await self.get_ticker_price(symbol) or 100.0
-            volatility = 0.02  # 2% daily volatility
-
-            klines = []
-            current_time = datetime.utcnow()
-
-            for i in range(limit):
-                # Generate price movement
-                price_change = (
-                    current_price * volatility * (0.5 - i * 0.001)
-                )  # Slight trend
-                noise = (
-                    current_price * volatility * 0.1 * (0.5 - (i % 2))
-                )  # Random noise
-                close_price = current_price + price_change + noise
-
-                # Ensure reasonable bounds
-                close_price = max(close_price, current_price * 0.5)
-                close_price = min(close_price, current_price * 1.5)
-
-                # Generate OHLC
-                high = close_price * (1 + abs(price_change) * 0.5)
-                low = close_price * (1 - abs(price_change) * 0.5)
-                open_price = current_price
-                volume = 1000.0 + (i * 10)  # Increasing volume
-
-                klines.append(
-                    KlineData(
-                        timestamp=current_time,
-                        open=open_price,
-                        high=high,
-                        low=low,
-                        close=close_price,
-                        volume=volume,
-                    )
+            end_ms = end_time.timestamp() * 1000.0 if end_time is not None else None
+            rows = self.kline_store.window(symbol, interval, end_ms=end_ms, limit=limit)
+            if not len(rows):
+                current_price = await self.get_ticker_price(symbol) or 100.0
+                rows = synthetic_klines(
+                    symbol, interval, limit, price=current_price, end_ms=end_ms
                 )
-
-                # Move to previous candle
-                current_price = close_price
-                # For hourly candles, subtract 1 hour, etc.
-                if interval.endswith("h"):
-                    hours = int(interval[:-1]) if interval[:-1].isdigit() else 1
-                    current_time = current_time.replace(hour=current_time.hour - hours)
-                elif interval.endswith("d"):
-                    days = int(interval[:-1]) if interval[:-1].isdigit() else 1
-                    current_time = current_time.replace(day=current_time.day - days)
-                else:
-                    # Default to 1 hour intervals
-                    current_time = current_time.replace(hour=current_time.hour - 1)
-
-            return klines[::-1]  # Reverse to get chronological order
+            return [
+                KlineData(
+                    timestamp=datetime.utcfromtimestamp(row[0] / 1000.0),
+                    open=float(row[1]),
+                    high=float(row[2]),
+                    low=float(row[3]),
+                    close=float(row[4]),
+                    volume=float(row[5]),
+                )
+                for row in np.asarray(rows).tolist()
+            ]
 
         except Exception as e:
             logger.error(f"Error generating paper trading klines for {symbol}: {e}")
             return []
 
+    def replay_stored_klines(
+        self,
+        symbol: str,
+        interval: str,
+        *,
+        start_ms: Optional[float] = None,
+        end_ms: Optional[float] = None,
+        speed: float = math.inf,
+    ) -> int:
+        """Drive the matching engine from stored candles, ``speed`` x real time."""
+        replay = KlineReplay(
+            self.kline_store, symbol, interval, start_ms=start_ms, end_ms=end_ms, speed=speed
+        )
+        last_close: List[float] = []
+
+        def _feed(row) -> None:
+            ts, o, h, low, c, v = (float(value) for value in row)
+            self.engine.on_kline(symbol, ts, o, h, low, c, v, depth_levels=self.depth_levels)
+            last_close[:] = [c]
+
+        count = replay.run(_feed)
+        if last_close:
+            self.price_feeds[symbol] = last_close[0]
+        return count
+
+    def _balance(self, asset: str) -> AccountBalance:
+        balance = self.paper_balances.get(asset)
+        if balance is None:
+            balance = AccountBalance(asset, 0.0, 0.0, 0.0)
+            self.paper_balances[asset] = balance
+        return balance
+
+    @staticmethod
+    def _failed_status(
+        order_id: str, symbol: str, side: str, order_type: str, quantity: float, price: float
+    ) -> OrderStatus:
+        return OrderStatus(
+            order_id=order_id,
+            symbol=symbol,
+            side=side,
+            type=order_type,
+            quantity=quantity,
+            price=price,
+            status="failed",
+            filled=0,
+            remaining=quantity,
+            timestamp=datetime.utcnow(),
+        )
+
+    def _order_status(self, order: PaperOrder) -> OrderStatus:
+        return OrderStatus(
+            order_id=order.order_id,
+            symbol=order.symbol,
+            side=order.side.lower(),
+            type=order.type.lower(),
+            quantity=order.quantity,
+            price=order.average_price if order.filled else (order.price or 0.0),
+            status=order.status,
+            filled=order.filled,
+            remaining=order.remaining,
+            timestamp=datetime.utcfromtimestamp(order.placed_at),
+        )
+
+    def _apply_fill(self, fill: Fill, order: PaperOrder) -> None:
+        base_asset, quote_asset = split_symbol(order.symbol)
+        base, quote = self._balance(base_asset), self._balance(quote_asset)
+        notional = fill.price * fill.quantity
+        reserved = self._reserved.get(order.order_id, 0.0)
+        if order.side == "BUY":
+            spent = min(notional, reserved)
+            quote.locked -= spent
+            quote.free -= notional - spent  # beyond the estimate (latency moved the book)
+            quote.total -= notional
+            base.free += fill.quantity - fill.fee
+            base.total += fill.quantity - fill.fee
+            self._reserved[order.order_id] = reserved - spent
+        else:
+            base.locked -= fill.quantity
+            base.total -= fill.quantity
+            quote.free += notional - fill.fee
+            quote.total += notional - fill.fee
+            self._reserved[order.order_id] = reserved - fill.quantity
+        if not order.is_open:
+            self._release(order)
+
+    def _release(self, order: PaperOrder) -> None:
+        leftover = self._reserved.pop(order.order_id, 0.0)
+        if leftover <= 0:
+            return
+        base_asset, quote_asset = split_symbol(order.symbol)
+        balance = self._balance(quote_asset if order.side == "BUY" else base_asset)
+        balance.locked -= leftover
+        balance.free += leftover
+
     async def place_order(
         self,
         symbol: str,
@@ -566,118 +684,81 @@ class PaperTradingAdapter(ExchangeAdapter):
         quantity: float,
         price: Optional[float] = None,
     ) -> OrderStatus:
-        """Simulate order placement."""
+        """Submit an order to the local matching engine."""
         current_price = await self.get_ticker_price(symbol)
+        try:
+            base_asset, quote_asset = split_symbol(symbol)
+        except ValueError as exc:
+            logger.error(f"Paper order rejected: {exc}")
+            current_price = None
         if not current_price:
-            return OrderStatus(
-                order_id="failed",
-                symbol=symbol,
-                side=side,
-                type=order_type,
-                quantity=quantity,
-                price=price or 0,
-                status="failed",
-                filled=0,
-                remaining=quantity,
-                timestamp=datetime.utcnow(),
+            return self._failed_status("failed", symbol, side, order_type, quantity, price or 0)
+
+        # Re-quote so earlier paper fills never leave the simulated market dry.
+        self._advance_clock()
+        self.engine.synthetic_depth(symbol, current_price, levels=self.depth_levels)
+
+        is_buy = side.upper() == "BUY"
+        is_limit = order_type.upper() == "LIMIT" and bool(price)
+        if is_limit:
+            required = quantity * price if is_buy else quantity  # type: ignore[operator]
+        elif is_buy:
+            required = self.engine.estimate(symbol, "BUY", quantity)[1]
+        else:
+            required = quantity
+        locked = self._balance(quote_asset if is_buy else base_asset)
+        if locked.free < required:
+            return self._failed_status(
+                "insufficient_balance",
+                symbol,
+                side,
+                order_type,
+                quantity,
+                price if is_limit else current_price,
             )
 
-        # Determine execution price
-        if order_type.upper() == "MARKET":
-            execution_price = current_price
-        elif order_type.upper() == "LIMIT" and price:
-            # For paper trading, we'll assume limit orders execute immediately
-            # In a more sophisticated simulation, you might delay execution
-            execution_price = price
-        else:
-            execution_price = current_price
-
-        # Calculate trade value
-        trade_value = quantity * execution_price
-
-        # Check if user has sufficient balance
-        base_asset = symbol[:-4]  # e.g., 'BTC' from 'BTCUSDT'
-        quote_asset = symbol[-4:]  # e.g., 'USDT' from 'BTCUSDT'
-
-        if side.upper() == "BUY":
-            # Buying: need quote currency (USDT)
-            if self.paper_balances[quote_asset].free < trade_value:
-                return OrderStatus(
-                    order_id="insufficient_balance",
-                    symbol=symbol,
-                    side=side,
-                    type=order_type,
-                    quantity=quantity,
-                    price=execution_price,
-                    status="failed",
-                    filled=0,
-                    remaining=quantity,
-                    timestamp=datetime.utcnow(),
-                )
-            # Update balances
-            self.paper_balances[quote_asset].free -= trade_value
-            self.paper_balances[quote_asset].total -= trade_value
-            self.paper_balances[base_asset].free += quantity
-            self.paper_balances[base_asset].total += quantity
-
-        elif side.upper() == "SELL":
-            # Selling: need base currency (BTC)
-            if self.paper_balances[base_asset].free < quantity:
-                return OrderStatus(
-                    order_id="insufficient_balance",
-                    symbol=symbol,
-                    side=side,
-                    type=order_type,
-                    quantity=quantity,
-                    price=execution_price,
-                    status="failed",
-                    filled=0,
-                    remaining=quantity,
-                    timestamp=datetime.utcnow(),
-                )
-            # Update balances
-            self.paper_balances[base_asset].free -= quantity
-            self.paper_balances[base_asset].total -= quantity
-            self.paper_balances[quote_asset].free += trade_value
-            self.paper_balances[quote_asset].total += trade_value
-
-        # Create order record
-        order_id = f"paper_{len(self.paper_orders) + 1}"
-        order_status = OrderStatus(
+        order_id = f"paper_{next(self._order_ids)}"
+        locked.free -= required
+        locked.locked += required
+        self._reserved[order_id] = required
+        order = self.engine.submit(
+            symbol,
+            side,
+            "LIMIT" if is_limit else "MARKET",
+            quantity,
+            price if is_limit else None,
             order_id=order_id,
-            symbol=symbol,
-            side=side,
-            type=order_type,
-            quantity=quantity,
-            price=execution_price,
-            status="filled",
-            filled=quantity,
-            remaining=0,
-            timestamp=datetime.utcnow(),
         )
-
-        self.paper_orders.append(order_status)
-        logger.info(f"Paper trade executed: {order_status}")
-
+        if not order.is_open:
+            self._release(order)
+        order_status = self._order_status(order)
+        order_status.side = side
+        logger.info(f"Paper order {order.status}: {order_status}")
         return order_status
 
     async def cancel_order(self, symbol: str, order_id: str) -> bool:
-        """Cancel paper order (not applicable for filled orders)."""
-        # Paper orders are immediately filled, so cancellation isn't meaningful
-        return False
+        """Cancel a resting paper order and release its locked balance."""
+        self._advance_clock()
+        order = self.engine.get(order_id)
+        if order is None or order.symbol != symbol or not self.engine.cancel(order_id):
+            return False
+        self._release(order)
+        return True
 
     async def get_order_status(
         self, symbol: str, order_id: str
     ) -> Optional[OrderStatus]:
         """Get paper order status."""
-        for order in self.paper_orders:
-            if order.order_id == order_id and order.symbol == symbol:
-                return order
-        return None
+        self._advance_clock()
+        order = self.engine.get(order_id)
+        if order is None or order.symbol != symbol:
+            return None
+        return self._order_status(order)
 
     async def get_open_orders(self, symbol: Optional[str] = None) -> List[OrderStatus]:
-        """Get open paper orders (paper orders are immediately filled)."""
-        return []  # No open orders in paper trading
+        """Get resting paper orders."""
+        self._advance_clock()
+        return [self._order_status(order) for order in self.engine.orders_for(symbol)]
 
 
 class ExchangeFactory:
@@ -0,0 +1,288 @@
+"""Local OHLCV replay for paper trading.
+
+``PaperTradingAdapter.get_historical_klines`` used to fabricate candles in a
+Python loop, stepping time back with ``datetime.replace(hour=hour - n)`` (which
+raises or wraps wrongly across midnight and month ends) and never looked at
+candles stored on disk.
+
+``KlineStore`` serves candles from ``<root>/<SYMBOL>/<interval>.npy`` files
+holding a ``(n, 6)`` float64 array ``[open_time_ms, open, high, low, close,
+volume]`` sorted by time. Files are opened with ``np.load(mmap_mode="r")`` so
+only the pages a window touches are read, and windows are located with
+``np.searchsorted`` on the time column. A ``<interval>.parquet`` file is
+converted once to the ``.npy`` layout when pandas can read it. Real candles
+downloaded by the ML training path (``get_real_historical_data``) are
+upserted with ``KlineStore.merge``, which is what fills the store for paper
+replay, strategy backtests and the feature store.
+
+``KlineReplay`` walks a stored window in time order, optionally sleeping the
+real gaps divided by ``speed`` for soak tests. ``synthetic_klines`` is the
+fallback when no data exists: a vectorised, seeded random walk on exact
+interval boundaries that ends at the current price.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+COLUMNS = ("open_time", "open", "high", "low", "close", "volume")
+
+_UNIT_MS = {
+    "s": 1_000,
+    "m": 60_000,
+    "h": 3_600_000,
+    "d": 86_400_000,
+    "w": 604_800_000,
+    "M": 2_592_000_000,  # 30 days; only used for spacing synthetic candles
+}
+
+
+def interval_ms(interval: str) -> int:
+    """``"15m"`` -> 900000; unknown intervals fall back to one hour."""
+    interval = str(interval or "").strip()
+    unit = interval[-1:] if interval else ""
+    count = interval[:-1]
+    if unit in _UNIT_MS and (count == "" or count.isdigit()):
+        return _UNIT_MS[unit] * max(1, int(count or 1))
+    return _UNIT_MS["h"]
+
+
+def default_kline_root() -> Path:
+    env_path = os.getenv("PAPER_KLINE_DIR")
+    if env_path:
+        return Path(env_path)
+    from app.services.pathing import PROJECT_ROOT_PATH
+
+    return PROJECT_ROOT_PATH / "data" / "klines"
+
+
+class KlineStore:
+    """Memory-mapped per-symbol/interval candle files with O(log n) windows."""
+
+    def __init__(self, root: os.PathLike[str] | str | None = None) -> None:
+        self.root = Path(root) if root is not None else default_kline_root()
+        self._lock = threading.Lock()
+        self._arrays: Dict[Tuple[str, str], Tuple[Any, np.ndarray]] = {}
+        self._merge_lock = threading.Lock()
+
+    def path(self, symbol: str, interval: str, suffix: str = ".npy") -> Path:
+        return self.root / symbol.upper() / f"{interval}{suffix}"
+
+    def write(self, symbol: str, interval: str, rows: Any) -> Path:
+        """Store ``rows`` (``(n, 6)``) sorted by open time; replaces the file."""
+        data = np.asarray(rows, dtype=np.float64).reshape(-1, len(COLUMNS))
+        data = data[np.argsort(data[:, 0], kind="stable")]
+        target = self.path(symbol, interval)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f"{target.stem}.tmp.{os.getpid()}.npy")
+        np.save(tmp, np.ascontiguousarray(data))
+        os.replace(tmp, target)
+        with self._lock:
+            self._arrays.pop((symbol.upper(), interval), None)
+        return target
+
+    def merge(self, symbol: str, interval: str, rows: Any) -> Path:
+        """Upsert ``rows`` into the stored candles; a row replaces the stored bar
+        with the same open time. Rows with non-finite values are dropped."""
+        new = np.asarray(rows, dtype=np.float64).reshape(-1, len(COLUMNS))
+        new = new[np.isfinite(new).all(axis=1)]
+        with self._merge_lock:
+            existing = self.array(symbol, interval)
+            if existing is not None and len(existing):
+                kept = np.asarray(existing)[~np.isin(existing[:, 0], new[:, 0])]
+                new = np.concatenate([kept, new])
+            # Last occurrence wins among duplicate open times in ``rows``.
+            _, last = np.unique(new[::-1, 0], return_index=True)
+            return self.write(symbol, interval, new[::-1][last])
+
+    def _convert_parquet(self, symbol: str, interval: str) -> bool:
+        source = self.path(symbol, interval, ".parquet")
+        if not source.exists():
+            return False
+        try:
+            import pandas as pd
+
+            frame = pd.read_parquet(source)
+        except Exception:
+            return False
+        if "open_time" not in frame.columns and "timestamp" in frame.columns:
+            stamps = frame["timestamp"]
+            if not np.issubdtype(stamps.dtype, np.number):
+                stamps = pd.to_datetime(stamps, utc=True).astype("int64") // 1_000_000
+            frame = frame.assign(open_time=stamps)
+        try:
+            rows = frame[list(COLUMNS)].to_numpy(dtype=np.float64)
+        except KeyError:
+            return False
+        self.write(symbol, interval, rows)
+        return True
+
+    def array(self, symbol: str, interval: str) -> Optional[np.ndarray]:
+        """The stored ``(n, 6)`` array (memory-mapped), or ``None``."""
+        key = (symbol.upper(), interval)
+        path = self.path(symbol, interval)
+        try:
+            stat = path.stat()
+        except OSError:
+            if not self._convert_parquet(symbol, interval):
+                return None
+            stat = path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._arrays.get(key)
+            if cached is not None and cached[0] == signature:
+                return cached[1]
+        data = np.load(path, mmap_mode="r")
+        if data.ndim != 2 or data.shape[1] != len(COLUMNS):
+            return None
+        with self._lock:
+            self._arrays[key] = (signature, data)
+        return data
+
+    def window(
+        self,
+        symbol: str,
+        interval: str,
+        *,
+        start_ms: Optional[float] = None,
+        end_ms: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> np.ndarray:
+        """Candles with ``start_ms <= open_time <= end_ms``, the last ``limit`` of them."""
+        data = self.array(symbol, interval)
+        if data is None or not len(data):
+            return np.empty((0, len(COLUMNS)))
+        times = data[:, 0]
+        lo = 0 if start_ms is None else int(np.searchsorted(times, start_ms, side="left"))
+        hi = len(data) if end_ms is None else int(np.searchsorted(times, end_ms, side="right"))
+        if limit is not None and hi - lo > limit:
+            lo = hi - max(0, int(limit))
+        return data[lo:hi]
+
+    def bounds(self, symbol: str, interval: str) -> Optional[Tuple[float, float]]:
+        data = self.array(symbol, interval)
+        if data is None or not len(data):
+            return None
+        return float(data[0, 0]), float(data[-1, 0])
+
+
+def candles_from_frame(frame: Any) -> np.ndarray:
+    """``(n, 6)`` candles in ``COLUMNS`` order from an OHLCV DataFrame.
+
+    The open time is taken from ``open_time`` (epoch ms), or else from a
+    ``timestamp`` or ``date`` column (epoch ms or datetimes).
+    """
+    if "open_time" not in frame.columns:
+        for column in ("timestamp", "date"):
+            if column in frame.columns:
+                stamps = frame[column]
+                if not np.issubdtype(stamps.dtype, np.number):
+                    import pandas as pd
+
+                    stamps = pd.to_datetime(stamps, utc=True).astype("int64") // 1_000_000
+                frame = frame.assign(open_time=stamps)
+                break
+        else:
+            raise KeyError("frame has no open_time, timestamp or date column")
+    return frame[list(COLUMNS)].to_numpy(dtype=np.float64)
+
+
+class KlineReplay:
+    """Iterate stored candles in order, optionally paced at ``speed`` x real time."""
+
+    def __init__(
+        self,
+        store: KlineStore,
+        symbol: str,
+        interval: str,
+        *,
+        start_ms: Optional[float] = None,
+        end_ms: Optional[float] = None,
+        speed: float = math.inf,
+        batch: int = 4096,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.store = store
+        self.symbol = symbol
+        self.interval = interval
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.speed = float(speed)
+        self.batch = max(1, int(batch))
+        self._sleep = sleep
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        rows = self.store.window(
+            self.symbol, self.interval, start_ms=self.start_ms, end_ms=self.end_ms
+        )
+        paced = math.isfinite(self.speed) and self.speed > 0
+        previous: Optional[float] = None
+        # Copy out of the memory map a batch at a time.
+        for offset in range(0, len(rows), self.batch):
+            for row in np.array(rows[offset: offset + self.batch]):
+                if paced and previous is not None:
+                    gap = (row[0] - previous) / 1000.0 / self.speed
+                    if gap > 0:
+                        self._sleep(gap)
+                previous = row[0]
+                yield row
+
+    def run(self, callback: Callable[[np.ndarray], Any]) -> int:
+        """Call ``callback(row)`` for every candle; returns how many were replayed."""
+        count = 0
+        for row in self:
+            callback(row)
+            count += 1
+        return count
+
+
+def synthetic_klines(
+    symbol: str,
+    interval: str,
+    limit: int,
+    *,
+    price: float,
+    end_ms: Optional[float] = None,
+    daily_volatility: float = 0.02,
+    seed: Optional[int] = None,
+) -> np.ndarray:
+    """Seeded random-walk candles ending at ``price`` on the current interval boundary."""
+    limit = max(0, int(limit))
+    step = interval_ms(interval)
+    if end_ms is None:
+        end_ms = time.time() * 1000.0
+    last_open = (int(end_ms) // step) * step
+    if seed is None:
+        seed = zlib.crc32(f"{symbol.upper()}:{interval}:{last_open}".encode("utf-8"))
+    rng = np.random.default_rng(seed)
+
+    sigma = daily_volatility * math.sqrt(step / _UNIT_MS["d"])
+    returns = rng.normal(0.0, sigma, limit + 1)
+    path = np.cumsum(returns)
+    levels = float(price) * np.exp(path - path[-1])
+    opens, closes = levels[:-1], levels[1:]
+    wick = np.abs(rng.normal(0.0, sigma / 2.0, (2, limit)))
+    highs = np.maximum(opens, closes) * (1.0 + wick[0])
+    lows = np.minimum(opens, closes) * (1.0 - wick[1])
+    volumes = rng.lognormal(mean=7.0, sigma=0.5, size=limit)
+    times = last_open - step * np.arange(limit - 1, -1, -1, dtype=np.float64)
+    return np.column_stack([times, opens, highs, lows, closes, volumes])
+
+
+__all__ = [
+    "COLUMNS",
+    "KlineReplay",
+    "KlineStore",
+    "candles_from_frame",
+    "default_kline_root",
+    "interval_ms",
+    "synthetic_klines",
+]
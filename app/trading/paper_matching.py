@@ -0,0 +1,612 @@
+"""Deterministic order matching for paper trading.
+
+``PaperTradingAdapter.place_order`` used to fill every MARKET and LIMIT order
+immediately at the ticker (or limit) price, keep every order in an unbounded
+list scanned by ``get_order_status`` and derive assets with ``symbol[:-4]``.
+
+``MatchingEngine`` keeps one price-level book per symbol. Each level holds
+external liquidity (a depth snapshot, synthetic depth around a price sized
+by quote notional, or recorded klines replayed through ``on_kline``) and a
+FIFO of resting paper
+orders. Incoming orders sweep the opposite side in price-time order, so
+MARKET orders pay slippage and can partially fill; LIMIT remainders rest and
+fill later as makers when external liquidity crosses them or a kline trades
+through their price (capped at ``participation`` of the kline volume).
+Orders are found through a dict; finished orders are kept in a bounded
+insertion-ordered map.
+
+Time is simulated (milliseconds) and only moves through ``advance`` (market
+events, or the paper adapter's wall-clock elapsed time between calls), and
+the latency model draws from a seeded RNG, so a replay is reproducible.
+"""
+
+from __future__ import annotations
+
+import heapq
+import random
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+EPSILON = 1e-12
+
+# Longest suffix wins, so ``FDUSD`` is tried before ``USD``-style quotes.
+QUOTE_ASSETS = (
+    "FDUSD",
+    "USDT",
+    "USDC",
+    "BUSD",
+    "TUSD",
+    "DAI",
+    "BTC",
+    "ETH",
+    "BNB",
+    "EUR",
+    "TRY",
+    "BRL",
+    "GBP",
+)
+
+OPEN_STATUSES = frozenset({"pending_new", "new", "partially_filled"})
+
+# Quote-asset notional at each side's synthetic touch level.
+DEFAULT_QUOTE_LIQUIDITY = 500_000.0
+
+
+def split_symbol(symbol: str, quote_assets: Sequence[str] = QUOTE_ASSETS) -> Tuple[str, str]:
+    """``"ETHBTC"`` -> ``("ETH", "BTC")``; ``ValueError`` for unknown quotes."""
+    symbol = str(symbol or "").upper()
+    for quote in sorted(quote_assets, key=len, reverse=True):
+        if symbol.endswith(quote) and len(symbol) > len(quote):
+            return symbol[: -len(quote)], quote
+    raise ValueError(f"Cannot determine base/quote assets for {symbol!r}")
+
+
+@dataclass(frozen=True)
+class FeeModel:
+    """Proportional maker/taker fees, charged in the asset received."""
+
+    maker_rate: float = 0.001
+    taker_rate: float = 0.001
+
+    def rate(self, maker: bool) -> float:
+        return self.maker_rate if maker else self.taker_rate
+
+
+class LatencyModel:
+    """Order activation delay in milliseconds: ``base_ms`` plus seeded jitter."""
+
+    def __init__(self, base_ms: float = 0.0, jitter_ms: float = 0.0, seed: int = 0) -> None:
+        self.base_ms = max(0.0, float(base_ms))
+        self.jitter_ms = max(0.0, float(jitter_ms))
+        self._rng = random.Random(seed)
+
+    def delay(self) -> float:
+        if self.jitter_ms <= 0:
+            return self.base_ms
+        return self.base_ms + self._rng.uniform(0.0, self.jitter_ms)
+
+
+@dataclass(frozen=True)
+class Fill:
+    order_id: str
+    symbol: str
+    side: str
+    price: float
+    quantity: float
+    fee: float
+    maker: bool
+    timestamp: float
+
+
+class PaperOrder:
+    __slots__ = (
+        "order_id",
+        "symbol",
+        "side",
+        "type",
+        "quantity",
+        "price",
+        "filled",
+        "quote_filled",
+        "fees",
+        "status",
+        "created_at",
+        "active_at",
+        "placed_at",
+    )
+
+    def __init__(
+        self,
+        order_id: str,
+        symbol: str,
+        side: str,
+        order_type: str,
+        quantity: float,
+        price: Optional[float],
+        created_at: float,
+        active_at: float,
+    ) -> None:
+        self.order_id = order_id
+        self.symbol = symbol
+        self.side = side
+        self.type = order_type
+        self.quantity = quantity
+        self.price = price
+        self.filled = 0.0
+        self.quote_filled = 0.0
+        self.fees = 0.0
+        self.status = "pending_new" if active_at > created_at else "new"
+        self.created_at = created_at
+        self.active_at = active_at
+        self.placed_at = time.time()
+
+    @property
+    def remaining(self) -> float:
+        return max(0.0, self.quantity - self.filled)
+
+    @property
+    def average_price(self) -> float:
+        return self.quote_filled / self.filled if self.filled > EPSILON else 0.0
+
+    @property
+    def is_open(self) -> bool:
+        return self.status in OPEN_STATUSES
+
+
+class _Level:
+    __slots__ = ("external", "orders", "resting")
+
+    def __init__(self) -> None:
+        self.external = 0.0
+        self.orders: Deque[PaperOrder] = deque()
+        self.resting = 0.0
+
+    @property
+    def empty(self) -> bool:
+        return self.external <= EPSILON and self.resting <= EPSILON
+
+
+class _BookSide:
+    """Price levels of one side with a lazily pruned best-price heap."""
+
+    __slots__ = ("is_bid", "levels", "_heap")
+
+    def __init__(self, is_bid: bool) -> None:
+        self.is_bid = is_bid
+        self.levels: Dict[float, _Level] = {}
+        self._heap: List[float] = []
+
+    def level(self, price: float) -> _Level:
+        level = self.levels.get(price)
+        if level is None:
+            level = _Level()
+            self.levels[price] = level
+            heapq.heappush(self._heap, -price if self.is_bid else price)
+        return level
+
+    def best(self) -> Optional[float]:
+        heap = self._heap
+        while heap:
+            price = -heap[0] if self.is_bid else heap[0]
+            level = self.levels.get(price)
+            if level is not None and (level.external > EPSILON or level.resting > EPSILON):
+                return price
+            heapq.heappop(heap)
+            if level is not None:
+                del self.levels[price]
+        return None
+
+    def discard_if_empty(self, price: float) -> None:
+        level = self.levels.get(price)
+        if level is not None and level.empty and not level.orders:
+            del self.levels[price]
+            # Stale heap entries are skipped by ``best``; compact when they pile up.
+            if len(self._heap) > 4 * len(self.levels) + 64:
+                self._heap = [-p if self.is_bid else p for p in self.levels]
+                heapq.heapify(self._heap)
+
+    def crosses(self, price: float, limit: Optional[float]) -> bool:
+        """Whether a taker with ``limit`` may trade at this side's ``price``."""
+        if limit is None:
+            return True
+        return price >= limit if self.is_bid else price <= limit
+
+    def prices(self) -> List[float]:
+        """Non-empty prices, best first."""
+        live = [price for price, level in self.levels.items() if not level.empty]
+        return sorted(live, reverse=self.is_bid)
+
+
+class SymbolBook:
+    __slots__ = ("symbol", "bids", "asks", "external_prices")
+
+    def __init__(self, symbol: str) -> None:
+        self.symbol = symbol
+        self.bids = _BookSide(is_bid=True)
+        self.asks = _BookSide(is_bid=False)
+        self.external_prices: set[tuple[bool, float]] = set()
+
+    def side(self, is_bid: bool) -> _BookSide:
+        return self.bids if is_bid else self.asks
+
+    def has_external(self) -> bool:
+        return bool(self.external_prices)
+
+    def snapshot(self, limit: int = 100) -> Tuple[List[Tuple[float, float]], List[Tuple[float, float]]]:
+        def _levels(side: _BookSide) -> List[Tuple[float, float]]:
+            rows = []
+            for price in side.prices()[:limit]:
+                level = side.levels[price]
+                rows.append((price, level.external + level.resting))
+            return rows
+
+        return _levels(self.bids), _levels(self.asks)
+
+
+class MatchingEngine:
+    """Per-symbol price-time matching of paper orders against simulated depth."""
+
+    def __init__(
+        self,
+        *,
+        fees: Optional[FeeModel] = None,
+        latency: Optional[LatencyModel] = None,
+        participation: float = 0.1,
+        quote_liquidity: float = DEFAULT_QUOTE_LIQUIDITY,
+        max_closed_orders: int = 10_000,
+        on_fill: Optional[Callable[[Fill, PaperOrder], None]] = None,
+    ) -> None:
+        self.fees = fees or FeeModel()
+        self.latency = latency or LatencyModel()
+        self.participation = max(0.0, float(participation))
+        self.quote_liquidity = max(0.0, float(quote_liquidity))
+        self.max_closed_orders = max(0, int(max_closed_orders))
+        self.on_fill = on_fill
+        self.now = 0.0
+        self.books: Dict[str, SymbolBook] = {}
+        self.open_orders: Dict[str, PaperOrder] = {}
+        self.closed_orders: "OrderedDict[str, PaperOrder]" = OrderedDict()
+        self._pending: List[Tuple[float, int, PaperOrder]] = []
+        self._sequence = 0
+        self.stats = {"orders": 0, "fills": 0, "canceled": 0, "rejected": 0}
+
+    # ---------------------------------------------------------------- lookup
+
+    def book(self, symbol: str) -> SymbolBook:
+        book = self.books.get(symbol)
+        if book is None:
+            book = SymbolBook(symbol)
+            self.books[symbol] = book
+        return book
+
+    def get(self, order_id: str) -> Optional[PaperOrder]:
+        return self.open_orders.get(order_id) or self.closed_orders.get(order_id)
+
+    def orders_for(self, symbol: Optional[str] = None) -> List[PaperOrder]:
+        return [
+            order for order in self.open_orders.values()
+            if symbol is None or order.symbol == symbol
+        ]
+
+    # -------------------------------------------------------------- ordering
+
+    def submit(
+        self,
+        symbol: str,
+        side: str,
+        order_type: str,
+        quantity: float,
+        price: Optional[float] = None,
+        *,
+        order_id: Optional[str] = None,
+    ) -> PaperOrder:
+        self._sequence += 1
+        self.stats["orders"] += 1
+        side = side.upper()
+        order_type = order_type.upper()
+        order = PaperOrder(
+            order_id or f"paper_{self._sequence}",
+            symbol,
+            side,
+            order_type,
+            float(quantity),
+            float(price) if price is not None else None,
+            self.now,
+            self.now + self.latency.delay(),
+        )
+        if (
+            side not in ("BUY", "SELL")
+            or order_type not in ("MARKET", "LIMIT")
+            or order.quantity <= 0
+            or (order_type == "LIMIT" and (order.price is None or order.price <= 0))
+        ):
+            self.stats["rejected"] += 1
+            order.status = "rejected"
+            self._close(order)
+            return order
+        self.open_orders[order.order_id] = order
+        if order.status == "pending_new":
+            heapq.heappush(self._pending, (order.active_at, self._sequence, order))
+        else:
+            self._activate(order)
+        return order
+
+    def cancel(self, order_id: str) -> bool:
+        order = self.open_orders.get(order_id)
+        if order is None:
+            return False
+        if order.status != "pending_new" and order.price is not None:
+            side = self.book(order.symbol).side(order.side == "BUY")
+            level = side.levels.get(order.price)
+            if level is not None:
+                # The deque entry is skipped lazily when it reaches the front.
+                level.resting -= order.remaining
+        order.status = "canceled"
+        self.stats["canceled"] += 1
+        self._close(order)
+        return True
+
+    def estimate(self, symbol: str, side: str, quantity: float) -> Tuple[float, float]:
+        """``(quantity, notional)`` a MARKET order would fill now, without trading."""
+        opposite = self.book(symbol).side(side.upper() != "BUY")
+        remaining, notional = float(quantity), 0.0
+        for price in opposite.prices():
+            if remaining <= EPSILON:
+                break
+            level = opposite.levels[price]
+            take = min(remaining, level.external + level.resting)
+            notional += take * price
+            remaining -= take
+        return float(quantity) - max(0.0, remaining), notional
+
+    def advance(self, timestamp: float) -> None:
+        """Move simulated time forward and activate orders whose latency elapsed."""
+        if timestamp > self.now:
+            self.now = float(timestamp)
+        pending = self._pending
+        while pending and pending[0][0] <= self.now:
+            _active_at, _seq, order = heapq.heappop(pending)
+            if order.status == "pending_new":
+                order.status = "new"
+                self._activate(order)
+
+    # ---------------------------------------------------------------- depth
+
+    def set_depth(
+        self,
+        symbol: str,
+        bids: Iterable[Tuple[float, float]],
+        asks: Iterable[Tuple[float, float]],
+        *,
+        timestamp: Optional[float] = None,
+    ) -> None:
+        """Replace the external liquidity of ``symbol`` with a depth snapshot."""
+        if timestamp is not None:
+            self.advance(timestamp)
+        book = self.book(symbol)
+        for is_bid, price in book.external_prices:
+            side = book.side(is_bid)
+            level = side.levels.get(price)
+            if level is not None:
+                level.external = 0.0
+                side.discard_if_empty(price)
+        book.external_prices = set()
+        for is_bid, rows in ((True, bids), (False, asks)):
+            side = book.side(is_bid)
+            for price, quantity in rows:
+                if quantity > EPSILON and price > 0:
+                    side.level(float(price)).external = float(quantity)
+                    book.external_prices.add((is_bid, float(price)))
+        self._uncross(book)
+
+    def synthetic_depth(
+        self,
+        symbol: str,
+        mid: float,
+        *,
+        levels: int = 20,
+        spread_bps: float = 10.0,
+        step_bps: float = 5.0,
+        quote_liquidity: Optional[float] = None,
+        timestamp: Optional[float] = None,
+    ) -> None:
+        """Depth around ``mid`` with liquidity thinning away from the touch.
+
+        Each touch level holds ``quote_liquidity`` (default: the engine's) worth
+        of the quote asset and level ``i`` a ``1 / (i + 1)`` share of that, so
+        the depth in base units scales with price instead of being a fixed
+        quantity that a low-priced symbol exhausts in one order.
+        """
+        if quote_liquidity is None:
+            quote_liquidity = self.quote_liquidity
+        if mid <= 0:
+            return
+        quantity = float(quote_liquidity) / mid
+        half = mid * spread_bps / 20_000.0
+        step = mid * step_bps / 10_000.0
+        bids = [(mid - half - i * step, quantity / (i + 1)) for i in range(levels)]
+        asks = [(mid + half + i * step, quantity / (i + 1)) for i in range(levels)]
+        self.set_depth(
+            symbol, [row for row in bids if row[0] > 0], asks, timestamp=timestamp
+        )
+
+    def on_kline(
+        self,
+        symbol: str,
+        timestamp: float,
+        open_price: float,
+        high: float,
+        low: float,
+        close: float,
+        volume: float,
+        *,
+        depth_levels: int = 20,
+    ) -> None:
+        """Replay one candle: fill resting orders it traded through, then re-quote."""
+        self.advance(timestamp)
+        book = self.book(symbol)
+        budget = self.participation * float(volume)
+        self._trade_through(book, True, lambda price: price >= low, budget)
+        self._trade_through(book, False, lambda price: price <= high, budget)
+        if depth_levels:
+            self.synthetic_depth(symbol, close, levels=depth_levels)
+
+    def replay_klines(self, symbol: str, klines: Iterable[Any], *, depth_levels: int = 20) -> None:
+        """Feed ``KlineData`` objects or ``(ts_ms, o, h, l, c, v)`` rows in order."""
+        for kline in klines:
+            if isinstance(kline, (tuple, list)):
+                ts, o, h, low, c, v = kline[:6]
+            else:
+                stamp = kline.timestamp
+                ts = stamp.timestamp() * 1000.0 if isinstance(stamp, datetime) else float(stamp)
+                o, h, low, c, v = kline.open, kline.high, kline.low, kline.close, kline.volume
+            self.on_kline(
+                symbol, float(ts), float(o), float(h), float(low), float(c), float(v),
+                depth_levels=depth_levels,
+            )
+
+    # -------------------------------------------------------------- internals
+
+    def _activate(self, order: PaperOrder) -> None:
+        book = self.books.get(order.symbol) or self.book(order.symbol)
+        is_buy = order.side == "BUY"
+        opposite = book.asks if is_buy else book.bids
+        limit = order.price if order.type == "LIMIT" else None
+        remaining = order.quantity - order.filled
+        fill = self._fill
+        while remaining > EPSILON:
+            price = opposite.best()
+            if price is None or (
+                limit is not None and (price > limit if is_buy else price < limit)
+            ):
+                break
+            level = opposite.levels[price]
+            if level.external > EPSILON:
+                take = remaining if remaining < level.external else level.external
+                level.external -= take
+                fill(order, price, take, False)
+                remaining -= take
+            orders = level.orders
+            while remaining > EPSILON and orders:
+                maker = orders[0]
+                if maker.status not in OPEN_STATUSES:
+                    orders.popleft()
+                    continue
+                available = maker.quantity - maker.filled
+                take = remaining if remaining < available else available
+                level.resting -= take
+                fill(maker, price, take, True)
+                fill(order, price, take, False)
+                remaining -= take
+                if maker.status not in OPEN_STATUSES:
+                    orders.popleft()
+            if not orders:
+                level.resting = 0.0  # drop float residue so the level empties
+        if order.status not in OPEN_STATUSES:
+            return
+        if order.type == "MARKET":
+            # Not enough depth: the unfilled part expires, as on the exchange.
+            order.status = "expired"
+            self._close(order)
+            return
+        level = (book.bids if is_buy else book.asks).level(order.price)  # type: ignore[arg-type]
+        level.orders.append(order)
+        level.resting += remaining
+
+    def _uncross(self, book: SymbolBook) -> None:
+        """Fill resting orders that new external liquidity now crosses."""
+        for is_bid in (True, False):
+            own, other = book.side(is_bid), book.side(not is_bid)
+            if not any(level.resting > EPSILON for level in own.levels.values()):
+                continue
+            for own_price in own.prices():
+                level = own.levels[own_price]
+                if level.resting <= EPSILON:
+                    continue
+                crossed = [
+                    price for price in other.prices()
+                    if (price <= own_price if is_bid else price >= own_price)
+                ]
+                if not crossed:
+                    break  # worse resting prices cannot cross either
+                for other_price in crossed:
+                    opposite = other.levels[other_price]
+                    while opposite.external > EPSILON and level.orders:
+                        order = level.orders[0]
+                        if not order.is_open:
+                            level.orders.popleft()
+                            continue
+                        take = min(order.remaining, opposite.external)
+                        opposite.external -= take
+                        level.resting -= take
+                        self._fill(order, own_price, take, True)
+                        if not order.is_open:
+                            level.orders.popleft()
+                    if level.resting <= EPSILON:
+                        break
+
+    def _trade_through(
+        self, book: SymbolBook, is_bid: bool, traded: Callable[[float], bool], budget: float
+    ) -> None:
+        side = book.side(is_bid)
+        for price in side.prices():
+            if budget <= EPSILON or not traded(price):
+                break
+            level = side.levels[price]
+            while budget > EPSILON and level.orders:
+                order = level.orders[0]
+                if not order.is_open:
+                    level.orders.popleft()
+                    continue
+                take = min(order.remaining, budget)
+                budget -= take
+                level.resting -= take
+                self._fill(order, price, take, True)
+                if not order.is_open:
+                    level.orders.popleft()
+
+    def _fill(self, order: PaperOrder, price: float, quantity: float, maker: bool) -> None:
+        order.filled += quantity
+        notional = price * quantity
+        order.quote_filled += notional
+        fees = self.fees
+        fee = (quantity if order.side == "BUY" else notional) * (
+            fees.maker_rate if maker else fees.taker_rate
+        )
+        order.fees += fee
+        if order.quantity - order.filled <= EPSILON:
+            order.filled = order.quantity
+            order.status = "filled"
+            self._close(order)
+        else:
+            order.status = "partially_filled"
+        self.stats["fills"] += 1
+        if self.on_fill is not None:
+            self.on_fill(
+                Fill(order.order_id, order.symbol, order.side, price, quantity, fee, maker, self.now),
+                order,
+            )
+
+    def _close(self, order: PaperOrder) -> None:
+        self.open_orders.pop(order.order_id, None)
+        if self.max_closed_orders:
+            closed = self.closed_orders
+            closed[order.order_id] = order
+            while len(closed) > self.max_closed_orders:
+                closed.popitem(last=False)
+
+
+__all__ = [
+    "DEFAULT_QUOTE_LIQUIDITY",
+    "Fill",
+    "FeeModel",
+    "LatencyModel",
+    "MatchingEngine",
+    "PaperOrder",
+    "QUOTE_ASSETS",
+    "SymbolBook",
+    "split_symbol",
+]
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Throughput of concurrent Binance calls: one global lock versus the request layer.
+
+``FakeBinanceClient`` simulates REST latency. ``--threads`` workers issue a
+mix of reads (order books, tickers, order lookups) and orders across
+``--symbols`` symbols, first through a single ``threading.Lock`` as the
+traders used to, then through ``BinanceRequestLayer`` with a session pool
+and per-symbol order serialisation. The weight budget is generous so only
+the locking strategy is compared.
+
+Use ``--json`` for a machine-readable payload.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from app.services.binance_requests import (  # noqa: E402
+    SPOT_ENDPOINTS,
+    BinanceRequestLayer,
+    FakeBinanceClient,
+    WeightRateLimiter,
+)
+
+Workload = List[Tuple[str, Dict[str, Any]]]
+
+
+def workload(requests: int, symbols: List[str], order_ratio: float) -> Workload:
+    calls: Workload = []
+    every = max(1, round(1.0 / order_ratio)) if order_ratio > 0 else 0
+    for i in range(requests):
+        symbol = symbols[i % len(symbols)]
+        if every and i % every == 0:
+            calls.append(
+                ("create_order", {"symbol": symbol, "side": "BUY", "type": "MARKET", "quantity": 1})
+            )
+        elif i % 3 == 0:
+            calls.append(("get_order_book", {"symbol": symbol, "limit": 5}))
+        elif i % 3 == 1:
+            calls.append(("get_symbol_ticker", {"symbol": symbol}))
+        else:
+            calls.append(("get_open_orders", {"symbol": symbol}))
+    return calls
+
+
+def _drive(call: Callable[[str, Dict[str, Any]], Any], calls: Workload, threads: int) -> float:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(lambda item: call(item[0], item[1]), calls))
+    return time.perf_counter() - started
+
+
+def measure(args: argparse.Namespace) -> Dict[str, Any]:
+    symbols = [f"SYM{i}USDT" for i in range(args.symbols)]
+    calls = workload(args.requests, symbols, args.order_ratio)
+
+    locked_client = FakeBinanceClient(latency=args.latency)
+    lock = threading.Lock()
+
+    def locked(method: str, kwargs: Dict[str, Any]) -> Any:
+        with lock:
+            return getattr(locked_client, method)(**kwargs)
+
+    layered_client = FakeBinanceClient(latency=args.latency)
+    layer = BinanceRequestLayer(
+        endpoints=SPOT_ENDPOINTS,
+        limiter=WeightRateLimiter({"REQUEST_WEIGHT": (10**9, 60.0)}),
+        pool_size=args.pool_size,
+    )
+    layer.configure(layered_client, factory=lambda: layered_client)
+
+    locked_elapsed = _drive(locked, calls, args.threads)
+    layered_elapsed = _drive(lambda m, kw: layer.call(m, **kw), calls, args.threads)
+    return {
+        "requests": len(calls),
+        "threads": args.threads,
+        "pool_size": args.pool_size,
+        "latency_ms": args.latency * 1000,
+        "global_lock_rps": round(len(calls) / locked_elapsed, 1),
+        "layered_rps": round(len(calls) / layered_elapsed, 1),
+        "speedup": round(locked_elapsed / layered_elapsed, 2),
+        "peak_concurrency": layered_client.peak_concurrency,
+        "sessions": layer.stats["sessions"],
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400, help="calls per run")
+    parser.add_argument("--threads", type=int, default=16, help="caller threads")
+    parser.add_argument("--pool-size", type=int, default=8, help="client sessions")
+    parser.add_argument("--symbols", type=int, default=8, help="distinct symbols")
+    parser.add_argument("--latency", type=float, default=0.01, help="simulated seconds per call")
+    parser.add_argument("--order-ratio", type=float, default=0.1, help="share of calls that are orders")
+    parser.add_argument("--json", action="store_true", help="emit JSON")
+    args = parser.parse_args(argv)
+
+    result = measure(args)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return 0
+    for key, value in result.items():
+        print(f"{key:>18}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Cost of one correlation cycle at hundreds of symbols.
+
+Three measurements per symbol count, all on seeded synthetic data:
+
+* ``iterrows_ms``: the nested ``DataFrame.iterrows()`` co-signal matrix
+  ``create_correlation_matrix`` used to build every cycle;
+* ``push_ms``: one sliding-Welford update of ``RollingCorrelation``
+  (append a row, drop the oldest), i.e. the per-cycle maintenance cost;
+* ``matrix_ms``: turning the maintained co-moments into the full
+  correlation matrix, plus ``corrcoef_ms`` for recomputing it from the
+  window with ``numpy.corrcoef`` as a reference.
+
+Use ``--json`` for a machine-readable payload.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from app.services.correlation import RollingCorrelation  # noqa: E402
+
+
+def _iterrows_matrix(frame: pd.DataFrame) -> Dict[str, Dict[str, float]]:
+    result: Dict[str, Dict[str, float]] = {}
+    for _, row1 in frame.iterrows():
+        result[row1["symbol"]] = {}
+        for _, row2 in frame.iterrows():
+            if row1["symbol"] != row2["symbol"]:
+                result[row1["symbol"]][row2["symbol"]] = row1["signal_strength"] * row2["signal_strength"]
+    return result
+
+
+def _ms(fn, repeats: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - started) / repeats * 1000
+
+
+def measure(symbols: int, window: int, repeats: int, iterrows_limit: int) -> Dict[str, Any]:
+    rng = np.random.default_rng(symbols)
+    names = [f"SYM{i}USDT" for i in range(symbols)]
+    rows = rng.normal(size=(window + repeats, symbols))
+    rolling = RollingCorrelation(window, min_periods=2, capacity=symbols)
+    for row in rows[:window]:
+        rolling.push(dict(zip(names, row)))
+
+    pending = iter(rows[window:])
+    push_ms = _ms(lambda: rolling.push(dict(zip(names, next(pending)))), repeats)
+    matrix_ms = _ms(rolling.matrix, repeats)
+    window_rows = rows[repeats : window + repeats]
+    corrcoef_ms = _ms(lambda: np.corrcoef(window_rows.T), repeats)
+
+    iterrows_ms = None
+    if symbols <= iterrows_limit:
+        frame = pd.DataFrame({"symbol": names, "signal_strength": rows[-1]})
+        iterrows_ms = _ms(lambda: _iterrows_matrix(frame), 1)
+    return {
+        "symbols": symbols,
+        "window": window,
+        "iterrows_ms": None if iterrows_ms is None else round(iterrows_ms, 1),
+        "push_ms": round(push_ms, 3),
+        "matrix_ms": round(matrix_ms, 3),
+        "corrcoef_ms": round(corrcoef_ms, 3),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, nargs="+", default=[100, 500, 1000])
+    parser.add_argument("--window", type=int, default=120, help="observations per symbol")
+    parser.add_argument("--repeats", type=int, default=20, help="timed repetitions")
+    parser.add_argument(
+        "--iterrows-limit",
+        type=int,
+        default=500,
+        help="skip the iterrows baseline above this many symbols",
+    )
+    parser.add_argument("--json", action="store_true", help="emit JSON")
+    args = parser.parse_args(argv)
+
+    results = [measure(n, args.window, args.repeats, args.iterrows_limit) for n in args.symbols]
+    if args.json:
+        print(json.dumps({"results": results}, indent=2))
+        return 0
+
+    print(f"{'symbols':>8} {'iterrows ms':>12} {'push ms':>9} {'matrix ms':>10} {'corrcoef ms':>12}")
+    for row in results:
+        baseline = "-" if row["iterrows_ms"] is None else row["iterrows_ms"]
+        print(
+            f"{row['symbols']:>8} {baseline:>12} {row['push_ms']:>9} "
+            f"{row['matrix_ms']:>10} {row['corrcoef_ms']:>12}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
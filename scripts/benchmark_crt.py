@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Per-tick latency of the incremental CRT engine versus history length.
+
+For each history length the engine is warmed with that many bars, then the
+script times ``IncrementalCRTEngine.analyze`` for a run of appended ticks
+(fold one bar + build all analyses). As a baseline it also times rebuilding
+the state from scratch over the whole history, which is what every call cost
+before the engine kept state between ticks.
+
+Use ``--json`` for a machine-readable payload.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+import numpy as np  # noqa: E402
+
+from app.indicators.crt import IncrementalCRTEngine  # noqa: E402
+from app.services.bar_store import BarStore  # noqa: E402
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    return float(np.percentile(np.asarray(samples), pct)) if samples else 0.0
+
+
+def measure(length: int, ticks: int, seed: int = 7) -> Dict[str, Any]:
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, length + ticks)))
+    store = BarStore(max_bars=length + ticks)
+    for i, price in enumerate(closes[:length]):
+        store.record_tick("BENCH", float(price), timestamp=float(i))
+
+    engine = IncrementalCRTEngine()
+    engine.analyze("BENCH", [float(closes[length - 1])], store=store)
+
+    per_tick_us: List[float] = []
+    for i in range(length, length + ticks):
+        price = float(closes[i])
+        store.record_tick("BENCH", price, timestamp=float(i))
+        started = time.perf_counter()
+        engine.analyze("BENCH", [price], store=store)
+        per_tick_us.append((time.perf_counter() - started) * 1e6)
+
+    started = time.perf_counter()
+    IncrementalCRTEngine().analyze("BENCH", [float(closes[-1])], store=store)
+    rebuild_ms = (time.perf_counter() - started) * 1e3
+
+    return {
+        "history": length,
+        "tick_p50_us": round(_percentile(per_tick_us, 50), 1),
+        "tick_p99_us": round(_percentile(per_tick_us, 99), 1),
+        "full_rebuild_ms": round(rebuild_ms, 2),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--lengths",
+        default="100,1000,10000,50000",
+        help="comma-separated history lengths (bars)",
+    )
+    parser.add_argument("--ticks", type=int, default=500, help="ticks timed per length")
+    parser.add_argument("--json", action="store_true", help="emit JSON")
+    args = parser.parse_args(argv)
+
+    lengths = [int(item) for item in args.lengths.split(",") if item.strip()]
+    results = [measure(length, args.ticks) for length in lengths]
+
+    if args.json:
+        print(json.dumps({"ticks": args.ticks, "results": results}, indent=2))
+        return 0
+
+    print(f"{'history':>8} {'tick p50 (us)':>14} {'tick p99 (us)':>14} {'rebuild (ms)':>13}")
+    for row in results:
+        print(
+            f"{row['history']:>8} {row['tick_p50_us']:>14} {row['tick_p99_us']:>14} "
+            f"{row['full_rebuild_ms']:>13}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
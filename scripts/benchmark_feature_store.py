@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Cost of keeping one symbol's features current as bars arrive.
+
+For ``--bars`` bars of seeded random-walk candles written to a temporary
+``KlineStore``:
+
+* ``rebuild_ms``: the full pipeline over the whole history, which is what a
+  recompute-from-scratch store pays on every new bar;
+* ``append_ms``: ``FeatureStore.materialize`` after one more bar is stored
+  (resume the bank state, compute one row, rewrite the matrix);
+* ``noop_ms``: ``materialize`` when nothing new arrived;
+* ``open_ms``: a second store (another process) opening the persisted
+  matrix as a memory map and reading its last row.
+
+Use ``--json`` for a machine-readable payload.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from app.cache.trading_cache import TradingCache  # noqa: E402
+from app.ml.feature_store import FeatureStore  # noqa: E402
+from app.trading.kline_replay import KlineStore, synthetic_klines  # noqa: E402
+
+
+def _ms(fn, repeats: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - started) / repeats * 1000
+
+
+def measure(bars: int, repeats: int) -> Dict[str, Any]:
+    candles = synthetic_klines("BTCUSDT", "1m", bars + repeats, price=45_000.0, end_ms=1.9e12, seed=bars)
+    with tempfile.TemporaryDirectory() as tmp:
+        def store() -> FeatureStore:
+            return FeatureStore(
+                TradingCache(enable_redis=False),
+                kline_store=KlineStore(Path(tmp) / "klines"),
+                root=Path(tmp) / "features",
+            )
+
+        writer = store()
+        pipeline = writer.pipeline
+        rebuild_ms = _ms(lambda: pipeline.compute(candles[:bars], 0, pipeline.new_bank()), 3)
+        writer.materialize("BTCUSDT", "1m", candles[:bars])
+
+        stop = iter(range(bars + 1, bars + repeats + 1))
+        append_ms = _ms(lambda: writer.materialize("BTCUSDT", "1m", candles[: next(stop)]), repeats)
+        noop_ms = _ms(lambda: writer.materialize("BTCUSDT", "1m", candles), repeats)
+        open_ms = _ms(lambda: store().latest("BTCUSDT", "1m"), repeats)
+        size_mb = writer.path("BTCUSDT", "1m").stat().st_size / 1e6
+    return {
+        "bars": bars,
+        "columns": len(pipeline.columns),
+        "matrix_mb": round(size_mb, 2),
+        "rebuild_ms": round(rebuild_ms, 2),
+        "append_ms": round(append_ms, 3),
+        "noop_ms": round(noop_ms, 3),
+        "open_ms": round(open_ms, 3),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bars", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeats", type=int, default=20, help="timed repetitions")
+    parser.add_argument("--json", action="store_true", help="emit JSON")
+    args = parser.parse_args(argv)
+
+    results = [measure(n, args.repeats) for n in args.bars]
+    if args.json:
+        print(json.dumps({"results": results}, indent=2))
+        return 0
+
+    print(f"{'bars':>8} {'MB':>6} {'rebuild ms':>11} {'append ms':>10} {'noop ms':>8} {'open ms':>8}")
+    for row in results:
+        print(
+            f"{row['bars']:>8} {row['matrix_mb']:>6} {row['rebuild_ms']:>11} "
+            f"{row['append_ms']:>10} {row['noop_ms']:>8} {row['open_ms']:>8}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Per-bar cost of updating indicators for a whole symbol universe.
+
+``per_symbol_ms`` folds one bar into a set of single-stream calculators
+(SMA 20/50, EMA 12/26, RSI 14, MACD, Bollinger) for every symbol in a
+Python loop; ``bank_ms`` does the same bar for all symbols with one
+``IndicatorBank.update`` call. ``backfill_sec`` is
+``IndicatorBank.calculate_all_indicators`` over ``--bars`` bars of history.
+All inputs are seeded random walks.
+
+Use ``--json`` for a machine-readable payload.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from app.indicators.calculator import (  # noqa: E402
+    BollingerBandsCalculator,
+    EMACalculator,
+    IndicatorBank,
+    MACDCalculator,
+    RSICalculator,
+    SMACalculator,
+)
+
+
+def _legacy_set() -> List[Any]:
+    return [
+        SMACalculator(20),
+        SMACalculator(50),
+        EMACalculator(12),
+        EMACalculator(26),
+        RSICalculator(14),
+        MACDCalculator(),
+        BollingerBandsCalculator(),
+    ]
+
+
+def measure(symbols: int, bars: int, timed_bars: int) -> Dict[str, Any]:
+    rng = np.random.default_rng(symbols)
+    names = [f"SYM{i}USDT" for i in range(symbols)]
+    prices = 100 * np.exp(np.cumsum(rng.normal(scale=0.01, size=(bars + timed_bars, symbols)), axis=0))
+    history = pd.DataFrame(prices[:bars], columns=names)
+
+    bank = IndicatorBank(capacity=symbols)
+    started = time.perf_counter()
+    bank.calculate_all_indicators(history)
+    backfill = time.perf_counter() - started
+
+    legacy = {name: _legacy_set() for name in names}
+    for row in prices[:bars][-60:]:
+        for name, price in zip(names, row):
+            for calculator in legacy[name]:
+                calculator.update({"close": price})
+
+    started = time.perf_counter()
+    for row in prices[bars:]:
+        for name, price in zip(names, row):
+            candle = {"close": price}
+            for calculator in legacy[name]:
+                calculator.update(candle)
+    per_symbol = (time.perf_counter() - started) / timed_bars
+
+    started = time.perf_counter()
+    for row in prices[bars:]:
+        bank.update(dict(zip(names, row)))
+    vectorised = (time.perf_counter() - started) / timed_bars
+
+    return {
+        "symbols": symbols,
+        "backfill_bars": bars,
+        "backfill_sec": round(backfill, 3),
+        "per_symbol_ms": round(per_symbol * 1000, 3),
+        "bank_ms": round(vectorised * 1000, 3),
+        "speedup": round(per_symbol / vectorised, 1),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, nargs="+", default=[50, 500, 2000])
+    parser.add_argument("--bars", type=int, default=1000, help="backfill bars")
+    parser.add_argument("--timed-bars", type=int, default=20, help="streamed bars to time")
+    parser.add_argument("--json", action="store_true", help="emit JSON")
+    args = parser.parse_args(argv)
+
+    results = [measure(n, args.bars, args.timed_bars) for n in args.symbols]
+    if args.json:
+        print(json.dumps({"results": results}, indent=2))
+        return 0
+
+    print(f"{'symbols':>8} {'backfill s':>11} {'per-symbol ms':>14} {'bank ms':>8} {'speedup':>8}")
+    for row in results:
+        print(
+            f"{row['symbols']:>8} {row['backfill_sec']:>11} {row['per_symbol_ms']:>14} "
+            f"{row['bank_ms']:>8} {row['speedup']:>8}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
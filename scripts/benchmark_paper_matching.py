@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Order throughput of the paper-trading matching engine.
+
+Two flows are timed against ``MatchingEngine`` directly:
+
+* ``limit``: seeded LIMIT orders scattered around the mid price, so most
+  rest in the book and the rest cross and match resting orders;
+* ``market``: MARKET orders sweeping synthetic depth that is re-quoted every
+  ``--requote`` orders.
+
+Each run also cancels a share of the resting orders through the id index.
+Use ``--json`` for a machine-readable payload.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from app.trading.paper_matching import MatchingEngine  # noqa: E402
+
+
+def measure_limit(orders: int, seed: int = 7) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    engine = MatchingEngine(max_closed_orders=1_000)
+    flow = [
+        (
+            "BUY" if rng.random() < 0.5 else "SELL",
+            round(100.0 + rng.gauss(0.0, 0.5), 2),
+            round(rng.uniform(0.01, 1.0), 3),
+        )
+        for _ in range(orders)
+    ]
+    started = time.perf_counter()
+    for i, (side, price, quantity) in enumerate(flow):
+        order = engine.submit("BENCH", side, "LIMIT", quantity, price)
+        if i % 10 == 0 and order.is_open:
+            engine.cancel(order.order_id)
+    elapsed = time.perf_counter() - started
+    return {
+        "flow": "limit",
+        "orders": orders,
+        "orders_per_sec": round(orders / elapsed),
+        "fills": engine.stats["fills"],
+        "resting": len(engine.open_orders),
+    }
+
+
+def measure_market(orders: int, requote: int, seed: int = 7) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    engine = MatchingEngine(max_closed_orders=1_000)
+    flow = [("BUY" if rng.random() < 0.5 else "SELL", rng.uniform(0.01, 2.0)) for _ in range(orders)]
+    mid = 100.0
+    started = time.perf_counter()
+    for i, (side, quantity) in enumerate(flow):
+        if i % requote == 0:
+            mid *= 1.0 + rng.gauss(0.0, 0.0005)
+            engine.synthetic_depth("BENCH", mid, levels=20, timestamp=float(i))
+        engine.submit("BENCH", side, "MARKET", quantity)
+    elapsed = time.perf_counter() - started
+    return {
+        "flow": "market",
+        "orders": orders,
+        "orders_per_sec": round(orders / elapsed),
+        "fills": engine.stats["fills"],
+        "requote_every": requote,
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=200_000, help="orders per flow")
+    parser.add_argument("--requote", type=int, default=50, help="market orders per depth refresh")
+    parser.add_argument("--json", action="store_true", help="emit JSON")
+    args = parser.parse_args(argv)
+
+    results = [measure_limit(args.orders), measure_market(args.orders, args.requote)]
+    if args.json:
+        print(json.dumps({"results": results}, indent=2))
+        return 0
+
+    print(f"{'flow':>7} {'orders':>9} {'orders/sec':>11} {'fills':>9}")
+    for row in results:
+        print(f"{row['flow']:>7} {row['orders']:>9} {row['orders_per_sec']:>11} {row['fills']:>9}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Combinations per second of the backtest-grounded parameter objective.
+
+For each strategy the script replays ``analyze_market`` once over seeded
+synthetic candles (the signal pass ``SignalMemo`` caches), then scores the
+full 5^4 parameter grid with ``backtest_scores``. ``naive_combos_per_sec`` is
+what re-running the replay for every combination would manage, i.e. one
+combination per signal pass.
+
+Use ``--json`` for a machine-readable payload.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from app.strategies.backtest_objective import BacktestData, SignalMemo, backtest_scores  # noqa: E402
+from app.strategies.base import (  # noqa: E402
+    BreakoutStrategy,
+    MeanReversionStrategy,
+    MomentumStrategy,
+    TrendFollowingStrategy,
+)
+from app.strategies.optimizer import ParameterSpace  # noqa: E402
+from app.trading.kline_replay import synthetic_klines  # noqa: E402
+
+RANGES = {
+    "stop_loss_pct": (0.01, 0.05),
+    "take_profit_pct": (0.02, 0.1),
+    "confidence_threshold": (0.3, 0.8),
+    "max_position_size": (0.05, 0.2),
+}
+
+
+def measure(strategy: Any, bars: int, horizon: int, repeats: int) -> Dict[str, Any]:
+    candles = synthetic_klines("BTCUSDT", "1h", bars, price=30_000.0, end_ms=1.7e12, seed=11)
+    memo = SignalMemo()
+    started = time.perf_counter()
+    tape = memo.tape(strategy, "BTCUSDT", candles, horizon=horizon)
+    signal_pass = time.perf_counter() - started
+
+    space = ParameterSpace.from_ranges(RANGES)
+    grid = space.grid(5)
+    data = BacktestData([tape])
+    started = time.perf_counter()
+    for _ in range(repeats):
+        scores = backtest_scores(grid, space.names, data)
+    scoring = (time.perf_counter() - started) / repeats
+    return {
+        "strategy": strategy.name,
+        "bars": bars,
+        "signals": tape.signals,
+        "signal_pass_sec": round(signal_pass, 3),
+        "combos": len(grid),
+        "combos_per_sec": round(len(grid) / scoring),
+        "naive_combos_per_sec": round(1.0 / signal_pass, 2),
+        "best_params": space.to_dict(grid[int(scores.argmax())]),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bars", type=int, default=1000, help="candles per replay")
+    parser.add_argument("--horizon", type=int, default=48, help="bars a trade may stay open")
+    parser.add_argument("--repeats", type=int, default=5, help="grid scoring repeats")
+    parser.add_argument("--json", action="store_true", help="emit JSON")
+    args = parser.parse_args(argv)
+
+    strategies = [
+        TrendFollowingStrategy(),
+        MeanReversionStrategy(),
+        BreakoutStrategy(),
+        MomentumStrategy(),
+    ]
+    results = [measure(s, args.bars, args.horizon, args.repeats) for s in strategies]
+    if args.json:
+        print(json.dumps({"results": results}, indent=2))
+        return 0
+
+    print(f"{'strategy':>18} {'signals':>8} {'pass s':>7} {'combos/sec':>11} {'naive/sec':>10}")
+    for row in results:
+        print(
+            f"{row['strategy']:>18} {row['signals']:>8} {row['signal_pass_sec']:>7} "
+            f"{row['combos_per_sec']:>11} {row['naive_combos_per_sec']:>10}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Startup profile for the legacy ``ai_ml_auto_bot_final`` runtime.
+
+Imports the runtime in a fresh interpreter (``python -X importtime``) with
+``AI_BOT_TEST_MODE=1`` so no trading loops start, then reports:
+
+* total import wall time, peak RSS and live threads after import
+* the bootstrap stage timings recorded via ``app.runtime.lazy.startup_stage``
+* which lazy subsystems were resolved during import
+* the slowest cumulative module imports
+
+Use ``--json`` to get a machine-readable payload (e.g. for CI trend checks).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+_PROBE = r"""
+import json, resource, sys, threading, time
+started = time.perf_counter()
+import {module} as runtime_module  # noqa: F401
+elapsed = time.perf_counter() - started
+from app.runtime.lazy import get_startup_report
+payload = {{
+    "import_seconds": round(elapsed, 3),
+    "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0, 1),
+    "threads": sorted(t.name for t in threading.enumerate()),
+    "report": get_startup_report(),
+}}
+sys.__stderr__.write("STARTUP_REPORT " + json.dumps(payload) + "\n")
+sys.__stderr__.flush()
+"""
+
+
+def parse_importtime(lines: List[str], *, top: int) -> List[Dict[str, Any]]:
+    """Return the ``top`` slowest cumulative imports from ``-X importtime`` output."""
+
+    entries: List[Dict[str, Any]] = []
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:") :].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            cumulative = int(parts[1].strip())
+        except ValueError:
+            continue
+        entries.append({"module": parts[2].strip(), "cumulative_ms": round(cumulative / 1000.0, 1)})
+    entries.sort(key=lambda item: item["cumulative_ms"], reverse=True)
+    return entries[:top]
+
+
+def run_probe(module: str, *, top: int, timeout: float) -> Dict[str, Any]:
+    env = dict(os.environ)
+    env.setdefault("AI_BOT_TEST_MODE", "1")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(REPO_ROOT), env.get("PYTHONPATH")]))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(module=module)],
+        cwd=str(REPO_ROOT),
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+    )
+    stderr_lines = proc.stderr.splitlines()
+    payload: Dict[str, Any] = {}
+    for line in stderr_lines:
+        if line.startswith("STARTUP_REPORT "):
+            payload = json.loads(line[len("STARTUP_REPORT ") :])
+    if not payload:
+        tail = "\n".join(stderr_lines[-20:])
+        raise SystemExit(f"Import of {module} failed (exit {proc.returncode}):\n{tail}")
+    payload["module"] = module
+    payload["slowest_imports"] = parse_importtime(stderr_lines, top=top)
+    return payload
+
+
+def render(payload: Dict[str, Any]) -> str:
+    report = payload.get("report", {})
+    lines = [
+        f"Startup profile for {payload['module']}",
+        f"  import wall time : {payload['import_seconds']:.2f}s",
+        f"  peak RSS         : {payload['max_rss_mb']:.1f} MB",
+        f"  threads          : {len(payload['threads'])} ({', '.join(payload['threads'])})",
+        "",
+        "Bootstrap stages:",
+    ]
+    for stage in report.get("stages", []):
+        lines.append(f"  {stage['stage']:<24} {stage['seconds']:>8.3f}s")
+    lines.append("")
+    lines.append("Lazy subsystems:")
+    for name, info in sorted(report.get("lazy", {}).items()):
+        state = "resolved" if info.get("resolved") else "deferred"
+        lines.append(f"  {name:<48} {state}")
+    lines.append("")
+    lines.append("Slowest cumulative imports:")
+    for entry in payload.get("slowest_imports", []):
+        lines.append(f"  {entry['cumulative_ms']:>9.1f} ms  {entry['module']}")
+    return "\n".join(lines)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="ai_ml_auto_bot_final", help="Module to import")
+    parser.add_argument("--top", type=int, default=20, help="Number of slow imports to list")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Probe timeout in seconds")
+    parser.add_argument("--json", action="store_true", help="Emit JSON instead of text")
+    args = parser.parse_args(argv)
+
+    payload = run_probe(args.module, top=args.top, timeout=args.timeout)
+    if args.json:
+        print(json.dumps(payload, indent=2))
+    else:
+        print(render(payload))
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    sys.exit(main())
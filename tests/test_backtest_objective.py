@@ -0,0 +1,162 @@
+import numpy as np
+
+from app.strategies.backtest_objective import (
+    BacktestData,
+    SignalMemo,
+    backtest_scores,
+    build_signal_tape,
+)
+from app.strategies.base import BaseStrategy
+from app.strategies.manager import StrategyManager
+from app.strategies.optimizer import DEFAULT_PARAMETERS, ParameterSpace
+from app.trading.kline_replay import KlineStore, synthetic_klines
+
+RANGES = {
+    "stop_loss_pct": (0.01, 0.05),
+    "take_profit_pct": (0.02, 0.1),
+    "confidence_threshold": (0.3, 0.8),
+    "max_position_size": (0.05, 0.2),
+}
+
+
+def _rule(timestamp):
+    """BUY/SELL on every fifth hourly candle, with cycling confidence."""
+    hour = int(timestamp // 3_600_000)
+    if hour % 5:
+        return 0, 0.0
+    return (1 if hour % 10 else -1), 0.3 + (hour % 50) / 100
+
+
+class _EveryFifthBar(BaseStrategy):
+    def __init__(self):
+        super().__init__("Fifth", "test", {"period": 5, "stop_loss_pct": 0.02})
+        self.seen = []  # shared with the replay's shallow copy
+
+    def analyze_market(self, symbol, market_data, indicators=None):
+        self.seen.append(len(market_data))
+        side, confidence = _rule(market_data[-1]["timestamp"])
+        signal = {1: "BUY", -1: "SELL"}.get(side, "HOLD")
+        return {"signal": signal, "confidence": confidence}
+
+
+def _reference(candles, signals, params, horizon, fee_rate=0.001, penalty=0.5):
+    """Candle-by-candle replay of one parameter set."""
+    sl, tp, threshold, size = params
+    growth = peak = drawdown = 0.0
+    busy = 0
+    for bar, side, confidence in signals:
+        if confidence < threshold or bar < busy:
+            continue
+        entry = candles[bar, 4]
+        outcome, exit_offset = None, horizon - 1
+        for h in range(horizon):
+            row = candles[min(bar + 1 + h, len(candles) - 1)]
+            up, down = row[2] / entry - 1.0, row[3] / entry - 1.0
+            favourable, adverse = (up, -down) if side > 0 else (-down, up)
+            if adverse >= sl:
+                outcome, exit_offset = -sl, h
+                break
+            if favourable >= tp:
+                outcome, exit_offset = tp, h
+                break
+        if outcome is None:
+            last = candles[min(bar + horizon, len(candles) - 1), 4]
+            outcome = side * (last / entry - 1.0)
+        busy = bar + exit_offset + 1
+        growth += np.log1p(size * (outcome - 2 * fee_rate))
+        peak = max(peak, growth)
+        drawdown = max(drawdown, peak - growth)
+    return growth - penalty * drawdown
+
+
+def test_vectorised_exits_match_candle_by_candle_replay():
+    candles = synthetic_klines("BTCUSDT", "1h", 400, price=100.0, end_ms=1.7e12, seed=4)
+    strategy = _EveryFifthBar()
+    tape = build_signal_tape(strategy, "BTCUSDT", candles, horizon=12)
+    signals = [
+        (bar, *_rule(candles[bar, 0]))
+        for bar in range(len(candles) - 1)
+        if _rule(candles[bar, 0])[0]
+    ]
+    assert list(tape.index) == [bar for bar, _side, _conf in signals]
+    assert len(signals) == 80
+
+    space = ParameterSpace.from_ranges(RANGES)
+    matrix = space.sample(40, np.random.default_rng(2))
+    scores = backtest_scores(matrix, space.names, BacktestData([tape]))
+    expected = [_reference(candles, signals, row, horizon=12) for row in matrix]
+    np.testing.assert_allclose(scores, expected, rtol=1e-9, atol=1e-12)
+
+    # Half the budget only trades the most recent half of the tape.
+    half = backtest_scores(matrix, space.names, BacktestData([tape]), budget=0.5)
+    assert not np.allclose(half, scores)
+
+
+def test_signal_pass_is_shared_across_combinations_and_cycles():
+    candles = synthetic_klines("ETHUSDT", "1h", 300, price=50.0, end_ms=1.7e12, seed=9)
+    strategy = _EveryFifthBar()
+    memo = SignalMemo()
+
+    tape = memo.tape(strategy, "ETHUSDT", candles, horizon=24)
+    calls = len(strategy.seen)
+    assert calls == len(candles) - 1
+    assert max(strategy.seen) == 100
+
+    # Tuned parameters do not change the signals, so the tape is reused.
+    strategy.parameters["stop_loss_pct"] = 0.04
+    assert memo.tape(strategy, "ETHUSDT", candles, horizon=24) is tape
+    backtest_scores(ParameterSpace.from_ranges(RANGES).grid(5), tuple(RANGES), BacktestData([tape]))
+    assert len(strategy.seen) == calls
+    assert memo.stats() == {"entries": 1, "hits": 1, "misses": 1}
+
+    strategy.parameters["period"] = 7
+    assert memo.tape(strategy, "ETHUSDT", candles, horizon=24) is not tape
+
+
+def test_manager_scores_parameters_on_stored_candles(tmp_path):
+    store = KlineStore(tmp_path)
+    store.write("BTCUSDT", "1h", synthetic_klines("BTCUSDT", "1h", 400, price=100.0, end_ms=1.7e12, seed=5))
+    manager = StrategyManager()
+    manager.kline_store = store
+    manager.continuous_improvement["automated_optimization"]["backtest"]["bars"] = 400
+    name = next(iter(manager.strategies))
+    manager.strategies[name].trade_history = [{"pnl": 1.0, "symbol": "BTCUSDT"}] * 5
+
+    job = manager._optimization_job(name)
+    assert job.objective is backtest_scores
+    assert job.data.tapes[0].symbol == "BTCUSDT"
+
+    params = {"stop_loss_pct": 0.02, "take_profit_pct": 0.04}
+    score = manager._evaluate_parameter_combination(name, params, [])
+    assert score == backtest_scores(
+        np.array([[0.02, 0.04, 0.5, 0.1]]), tuple(DEFAULT_PARAMETERS), job.data
+    )[0]
+
+    result = manager.optimize_strategy_parameters(name, optimization_method="grid")
+    assert result["evaluations"] == 625
+    grid = ParameterSpace.from_ranges(RANGES).grid(5)
+    best = backtest_scores(grid, tuple(RANGES), job.data).max()
+    assert result["expected_improvement"]["optimized_score"] == best
+    assert manager.signal_memo.stats()["misses"] == 1
+
+
+def test_manager_downloads_candles_when_the_store_is_empty(tmp_path):
+    store = KlineStore(tmp_path)
+    fetched = []
+
+    def fetch(symbol, interval, bars):
+        fetched.append((symbol, interval, bars))
+        store.merge(symbol, interval, synthetic_klines(symbol, interval, bars, price=100.0, end_ms=1.7e12, seed=5))
+
+    manager = StrategyManager()
+    manager.kline_store = store
+    manager.kline_fetcher = fetch
+    manager.continuous_improvement["automated_optimization"]["backtest"]["bars"] = 400
+    name = next(iter(manager.strategies))
+
+    data = manager._backtest_data(name, [])
+    assert fetched == [("BTCUSDT", "1h", 400)]
+    assert data.tapes[0].symbol == "BTCUSDT"
+
+    manager._backtest_data(name, [])
+    assert len(fetched) == 1  # served from the store afterwards
@@ -0,0 +1,93 @@
+import threading
+
+from app.services.binance_requests import (
+    SPOT_ENDPOINTS,
+    BinanceRequestLayer,
+    FakeBinanceClient,
+    WeightRateLimiter,
+)
+
+
+def _layer(client, pool_size=4, limits=None):
+    layer = BinanceRequestLayer(
+        endpoints=SPOT_ENDPOINTS,
+        limiter=WeightRateLimiter(limits or {"REQUEST_WEIGHT": (10_000, 60.0)}),
+        pool_size=pool_size,
+    )
+    # Every session wraps the same fake so its concurrency counter sees them all.
+    layer.configure(client, factory=lambda: client)
+    return layer
+
+
+def _run(calls):
+    threads = [threading.Thread(target=call) for call in calls]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_reads_overlap_but_orders_on_one_symbol_are_serialised():
+    client = FakeBinanceClient(latency=0.05)
+    layer = _layer(client)
+
+    _run([lambda: layer.call("get_order_book", symbol="BTCUSDT", limit=5)] * 4)
+    assert client.peak_concurrency == 4
+    assert layer.stats["sessions"] == 4
+
+    client.peak_concurrency = 0
+    _run(
+        [lambda: layer.call("create_order", symbol="BTCUSDT", side="BUY", type="MARKET", quantity=1)]
+        * 3
+    )
+    assert client.peak_concurrency == 1
+    assert len(client.orders) == 3
+
+    client.peak_concurrency = 0
+    _run(
+        [
+            lambda s=s: layer.call("create_order", symbol=s, side="BUY", type="MARKET", quantity=1)
+            for s in ("BTCUSDT", "ETHUSDT", "BNBUSDT")
+        ]
+    )
+    assert client.peak_concurrency == 3
+
+
+def test_weight_budget_waits_for_next_window_and_follows_server_count():
+    limiter = WeightRateLimiter({"REQUEST_WEIGHT": (10, 0.2)})
+    limiter.acquire({"REQUEST_WEIGHT": 5})  # may straddle a window edge
+    limiter.acquire({"REQUEST_WEIGHT": 5})
+    assert limiter.acquire({"REQUEST_WEIGHT": 6}) > 0
+    assert limiter.usage()["REQUEST_WEIGHT"] == 6
+
+    limiter.observe("REQUEST_WEIGHT", 10)
+    assert limiter.acquire({"REQUEST_WEIGHT": 1}) > 0
+    # Per-account order buckets share the base limit; unknown buckets are free.
+    assert limiter.acquire({"UNKNOWN": 100}) == 0.0
+
+
+def test_trader_pools_sessions_and_accepts_direct_client_assignment():
+    from app.services.trading import RealBinanceTrader
+
+    created = []
+
+    class _Client(FakeBinanceClient):
+        def __init__(self, api_key, api_secret, testnet=True):
+            super().__init__(latency=0.05)
+            created.append(self)
+
+    trader = RealBinanceTrader(
+        api_key="k", api_secret="s", testnet=True, binance_client_cls=_Client
+    )
+    assert trader.is_ready() and trader.client is created[0]
+    trader.symbol_rules("BTCUSDT")  # settle the shared exchangeInfo warm-up
+    assert created[0].API_URL == RealBinanceTrader.TESTNET_API_URL
+
+    _run([lambda: trader.get_order_book("BTCUSDT")] * 3)
+    assert len(created) == 3  # extra sessions were built on demand
+    assert trader.client is created[0]
+
+    replacement = FakeBinanceClient()
+    trader.client = replacement
+    assert trader.get_order_book("ETHUSDT")["asks"]
+    assert replacement.calls == ["get_order_book"]
@@ -188,4 +188,202 @@ class TestTradingCache:
 
         # Memory increase should be reasonable
         # Allow some increase for the test data
-        assert memory_increase < 100  # Less than 100MB increase
\ No newline at end of file
+        assert memory_increase < 100  # Less than 100MB increase
+
+class _FakePipeline:
+    def __init__(self, client):
+        self._client = client
+        self._ops = []
+
+    def setex(self, key, ttl, value):
+        self._ops.append((key, ttl, value))
+        return self
+
+    def delete(self, key):
+        self._ops.append((key, None, None))
+        return self
+
+    def execute(self):
+        self._client.round_trips += 1
+        if self._client.fail_writes:
+            raise ConnectionError("redis down")
+        results = []
+        for key, ttl, value in self._ops:
+            if ttl is None:
+                results.append(int(self._client.store.pop(key, None) is not None))
+                continue
+            self._client.store[key] = value
+            self._client.ttls[key] = ttl
+            results.append(True)
+        self._ops = []
+        return results
+
+
+class _FakeRedis:
+    """In-process stand-in for the subset of redis-py TradingCache uses."""
+
+    def __init__(self):
+        self.store = {}
+        self.ttls = {}
+        self.round_trips = 0
+        self.fail_writes = False
+
+    def ping(self):
+        return True
+
+    def get(self, key):
+        self.round_trips += 1
+        return self.store.get(key)
+
+    def mget(self, keys):
+        self.round_trips += 1
+        return [self.store.get(key) for key in keys]
+
+    def setex(self, key, ttl, value):
+        self.round_trips += 1
+        self.store[key] = value
+        self.ttls[key] = ttl
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+    def delete(self, *keys):
+        self.round_trips += 1
+        removed = 0
+        for key in keys:
+            if isinstance(key, bytes):
+                key = key.decode()
+            if self.store.pop(key, None) is not None:
+                removed += 1
+        return removed
+
+    def scan_iter(self, match=None, count=None):
+        import fnmatch
+
+        return [key for key in list(self.store) if fnmatch.fnmatch(key, match or "*")]
+
+    def info(self, section=None):
+        return {"used_memory_human": "1K"}
+
+    def dbsize(self):
+        return len(self.store)
+
+
+class TestTradingCacheTiers:
+    """Bounded local tier, batched Redis access and serialization."""
+
+    def test_local_tier_is_bounded_and_evicts_lru(self):
+        cache = TradingCache(enable_redis=False, local_max_entries=3)
+
+        for symbol in ("A", "B", "C"):
+            cache.set_technical_indicators(symbol, "1h", {"v": symbol})
+        cache.get_technical_indicators("A", "1h")  # A becomes most recent
+        cache.set_technical_indicators("D", "1h", {"v": "D"})
+
+        assert cache.get_technical_indicators("B", "1h") is None
+        assert cache.get_technical_indicators("A", "1h") == {"v": "A"}
+        stats = cache.get_cache_stats()
+        assert stats["local_cache_entries"] == 3
+        assert stats["evictions"] == 1
+
+    def test_local_tier_respects_byte_budget(self):
+        import numpy as np
+
+        cache = TradingCache(enable_redis=False, local_max_bytes=20_000)
+        for i in range(5):
+            cache.set(f"arr:{i}", np.zeros(1000))  # ~8KB each
+
+        stats = cache.get_cache_stats()
+        assert stats["local_cache_bytes"] <= 20_000
+        assert stats["evictions"] >= 3
+        assert cache.get("arr:4") is not None
+
+    def test_local_entries_expire(self):
+        from app.cache.trading_cache import LocalLRUCache
+
+        now = {"t": 0.0}
+        lru = LocalLRUCache(default_ttl=10, clock=lambda: now["t"])
+        lru.set("k", 1)
+        now["t"] = 11
+        assert lru.get("k") is None
+        assert lru.expirations == 1
+        assert lru.current_bytes == 0
+
+    def test_get_many_and_set_many_use_single_round_trip(self):
+        fake = _FakeRedis()
+        writer = TradingCache(redis_client=fake)
+        symbols = [f"SYM{i}USDT" for i in range(50)]
+
+        assert writer.set_many_technical_indicators(
+            {s: {"rsi": float(i)} for i, s in enumerate(symbols)}, "1h", ttl_seconds=60
+        )
+        assert fake.round_trips == 1
+        assert set(fake.ttls.values()) == {60}
+
+        reader = TradingCache(redis_client=fake)
+        fake.round_trips = 0
+        found = reader.get_many_technical_indicators(symbols + ["MISSINGUSDT"], "1h")
+        assert fake.round_trips == 1
+        assert len(found) == 50
+        assert found["SYM7USDT"] == {"rsi": 7.0}
+
+        # Now served from the local tier.
+        reader.get_many_technical_indicators(symbols, "1h")
+        assert fake.round_trips == 1
+        stats = reader.get_cache_stats()
+        assert stats["redis_hits"] == 50
+        assert stats["local_hits"] == 50
+        assert stats["misses"] == 1
+        assert stats["get_latency_ms"]["samples"] == 2
+
+    def test_invalidation_removes_redis_keys_in_batches(self):
+        fake = _FakeRedis()
+        cache = TradingCache(redis_client=fake)
+        cache.set_technical_indicators("BTCUSDT", "1h", {"a": 1})
+        cache.set_technical_indicators("BTCUSDT", "4h", {"a": 2})
+        cache.set_technical_indicators("ETHUSDT", "1h", {"a": 3})
+
+        # Each key lives in both tiers but counts once.
+        assert cache.invalidate_on_new_data("BTCUSDT") == 2
+        assert list(fake.store) == ["indicators:ETHUSDT:1h"]
+        assert cache.get_technical_indicators("BTCUSDT", "1h") is None
+        assert cache.delete("indicators:ETHUSDT:1h", "indicators:ETHUSDT:1h") == 1
+
+    def test_failed_batch_write_leaves_nothing_cached(self):
+        fake = _FakeRedis()
+        cache = TradingCache(redis_client=fake)
+        fake.fail_writes = True
+
+        assert not cache.set_many({"a": 1, "b": 2})
+        assert cache.local_cache.keys() == []
+        assert cache.get_cache_stats()["redis_errors"] == 1
+
+        fake.fail_writes = False
+        assert cache.set_many({"a": 1, "b": 2})
+        assert cache.local_cache.keys() == ["a", "b"] and set(fake.store) == {"a", "b"}
+
+    def test_msgpack_zstd_roundtrip_keeps_numpy_arrays(self):
+        pytest.importorskip("msgpack")
+        import numpy as np
+        from app.cache.trading_cache import CacheSerializer
+
+        serializer = CacheSerializer("msgpack", "zstd", compress_min_bytes=64)
+        value = {"close": np.arange(512, dtype=np.float64), "rsi": 55.5, "tag": "x"}
+
+        payload = serializer.dumps(value)
+        restored = serializer.loads(payload)
+
+        assert payload[1:3] == b"MZ"
+        assert np.array_equal(restored["close"], value["close"])
+        assert restored["rsi"] == 55.5
+        assert len(payload) < value["close"].nbytes
+
+    def test_serializer_falls_back_to_pickle_and_reads_legacy_payloads(self):
+        import pickle
+        from app.cache.trading_cache import CacheSerializer
+
+        serializer = CacheSerializer("msgpack")
+        value = {"s": {1, 2}}  # sets are not msgpack-encodable
+
+        assert serializer.loads(serializer.dumps(value)) == value
+        assert serializer.loads(pickle.dumps({"legacy": True})) == {"legacy": True}
@@ -0,0 +1,125 @@
+import json
+import os
+import time
+
+from app.services.control_state import ControlStateBus
+
+
+class _Safety:
+    global_breaker_active = False
+
+
+class _Trader:
+    def __init__(self, profile=None, enabled=True):
+        self.persistence_profile = profile
+        self.trading_enabled = enabled
+        self.futures_trading_enabled = False
+        self.safety_manager = _Safety()
+
+
+def _bus(tmp_path, **kwargs):
+    return ControlStateBus(
+        state_dir_resolver=lambda profile: tmp_path / (profile or "default"),
+        autostart=False,
+        **kwargs,
+    )
+
+
+def test_bind_seeds_from_bot_state_once(tmp_path):
+    state_dir = tmp_path / "user_1"
+    state_dir.mkdir()
+    (state_dir / "bot_state.json").write_text(
+        json.dumps({"trader_state": {"trading_enabled": False}})
+    )
+    bus = _bus(tmp_path)
+    trader = _Trader("user_1", enabled=True)
+
+    bus.ensure_bound(trader)
+    assert trader.trading_enabled is False
+
+    # Once bound, the hot path does not touch the filesystem again.
+    (state_dir / "bot_state.json").write_text("not json")
+    trader.trading_enabled = True
+    bus.ensure_bound(trader)
+    assert trader.trading_enabled is True
+
+
+def test_publish_updates_bound_traders_and_respects_breaker(tmp_path):
+    bus = _bus(tmp_path)
+    ultimate, optimized, other = _Trader("user_1"), _Trader("user_1"), _Trader("user_2")
+    for trader in (ultimate, optimized, other):
+        bus.ensure_bound(trader)
+
+    bus.publish("user_1", "trading_enabled", False)
+    assert (ultimate.trading_enabled, optimized.trading_enabled) == (False, False)
+    assert other.trading_enabled is True
+
+    ultimate.safety_manager.global_breaker_active = True
+    bus.publish("user_1", "trading_enabled", True)
+    assert ultimate.trading_enabled is False
+    assert optimized.trading_enabled is True
+
+    bus.publish("user_1", "futures_trading_enabled", True)
+    assert optimized.futures_trading_enabled is True
+    saved = json.loads((tmp_path / "user_1" / "control_state.json").read_text())
+    assert saved["trading_enabled"] is True
+    assert saved["futures_trading_enabled"] is True
+
+
+def test_other_process_picks_up_toggle_via_file_watch(tmp_path):
+    worker_a = _bus(tmp_path)
+    worker_b = _bus(tmp_path)
+    trader_b = _Trader("user_7")
+    worker_b.ensure_bound(trader_b)
+    assert worker_b.poll_once() == 0
+
+    worker_a.publish("user_7", "trading_enabled", False)
+    # Make sure the mtime differs on coarse-grained filesystems.
+    path = tmp_path / "user_7" / "control_state.json"
+    later = time.time() + 1
+    os.utime(path, (later, later))
+
+    assert worker_b.poll_once() == 1
+    assert trader_b.trading_enabled is False
+    assert worker_b.poll_once() == 0
+
+
+def test_watcher_thread_applies_updates_within_poll_interval(tmp_path):
+    worker_a = _bus(tmp_path)
+    worker_b = ControlStateBus(
+        state_dir_resolver=lambda profile: tmp_path / (profile or "default"),
+        poll_seconds=0.05,
+    )
+    trader = _Trader("user_9")
+    worker_b.ensure_bound(trader)
+    try:
+        worker_a.publish("user_9", "trading_enabled", False)
+        later = time.time() + 1
+        os.utime(tmp_path / "user_9" / "control_state.json", (later, later))
+        deadline = time.time() + 2.0
+        while trader.trading_enabled and time.time() < deadline:
+            time.sleep(0.02)
+        assert trader.trading_enabled is False
+    finally:
+        worker_b.stop()
+
+
+def test_redis_messages_apply_and_ignore_own_origin(tmp_path):
+    published = []
+
+    class _Redis:
+        def publish(self, channel, data):
+            published.append((channel, data))
+
+    worker_a = _bus(tmp_path, redis_client=_Redis())
+    worker_b = _bus(tmp_path)
+    trader = _Trader()
+    worker_b.ensure_bound(trader)
+
+    worker_a.publish(None, "trading_enabled", False)
+    _channel, data = published[-1]
+
+    assert worker_a.handle_message(data) is False
+    assert worker_b.handle_message(data.encode()) is True
+    assert trader.trading_enabled is False
+    assert worker_b.get(None, "trading_enabled") is False
@@ -0,0 +1,84 @@
+import logging
+import types
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.services.correlation import CorrelationService, RollingCorrelation
+
+
+def test_sliding_welford_matches_corrcoef_with_late_symbols():
+    rng = np.random.default_rng(4)
+    data = rng.normal(size=(300, 6))
+    data[:, 2] += 0.8 * data[:, 0]
+    data[:150, 5] = 0.0  # joins halfway through
+    rolling = RollingCorrelation(window=64, min_periods=10, capacity=2)
+    for t, row in enumerate(data):
+        columns = range(6) if t >= 150 else range(5)
+        rolling.push({f"S{i}": row[i] for i in columns})
+        if t in (40, 63, 64, 151, 299):
+            symbols, corr = rolling.matrix()
+            window = data[max(0, t - 63) : t + 1, : len(symbols)]
+            expected = np.corrcoef(window.T)
+            expected[~np.isfinite(expected)] = 0.0
+            np.fill_diagonal(expected, 1.0)
+            np.testing.assert_allclose(corr, expected, atol=1e-9)
+    assert rolling.ready and rolling.count == 64
+
+
+def test_service_feeds_portfolio_adjustments_and_ensemble(monkeypatch, tmp_path):
+    service = CorrelationService(window=50, min_periods=10)
+    rng = np.random.default_rng(7)
+    prices = {"BTCUSDT": 100.0, "ETHUSDT": 50.0, "ADAUSDT": 1.0}
+    for _ in range(40):
+        shock = rng.normal(scale=0.01)
+        prices["BTCUSDT"] *= np.exp(shock)
+        prices["ETHUSDT"] *= np.exp(shock + rng.normal(scale=0.001))
+        prices["ADAUSDT"] *= np.exp(rng.normal(scale=0.01))
+        service.update_prices(prices)
+    pairs = service.pair_correlations(min_abs=0.6)
+    assert list(pairs) == ["BTCUSDT_ETHUSDT"] and pairs["BTCUSDT_ETHUSDT"] > 0.95
+
+    from app.tasks import self_improvement
+
+    monkeypatch.setattr(self_improvement, "get_correlation_service", lambda: service)
+    worker = self_improvement.SelfImprovementWorker(
+        ultimate_trader=SimpleNamespace(positions={"BTCUSDT": {}, "ETHUSDT": {}}),
+        optimized_trader=None,
+        ultimate_ml_system=None,
+        optimized_ml_system=None,
+        dashboard_data={},
+        trading_config={},
+        project_root=tmp_path,
+        logger=logging.getLogger("tests"),
+    )
+    worker._fix_correlation_rebalancing()
+    assert worker.trading_config["correlation_adjustments"] == {"BTCUSDT_ETHUSDT": 0.7}
+
+    import atexit
+
+    original_register = atexit.register
+    atexit.register = lambda *_args, **_kwargs: None
+    try:
+        import ai_ml_auto_bot_final as bot
+    finally:
+        atexit.register = original_register
+    monkeypatch.setattr(bot, "get_correlation_service", lambda: service)
+    ensemble = SimpleNamespace(models_dir=str(tmp_path / "ultimate_models"), log_ensemble=lambda *a: None)
+    create = types.MethodType(bot.UltimateEnsembleSystem.create_correlation_matrix, ensemble)
+
+    def _predictions(strengths):
+        return {
+            symbol: {"ultimate_ensemble": {"signal": "BUY" if s > 0 else "SELL", "confidence": abs(s)}}
+            for symbol, s in strengths.items()
+        }
+
+    symbols = ["A", "B", "C", "D"]
+    assert create(_predictions(dict(zip(symbols, [0.5, 0.5, -0.5, 0.9]))))
+    assert ensemble.correlation_matrix["A"]["D"] == 0.5 * 0.9  # co-signal until warmed up
+    for _ in range(12):
+        a = rng.uniform(0.1, 1.0)
+        create(_predictions({"A": a, "B": a, "C": -a, "D": rng.uniform(0.1, 1.0)}))
+    matrix = ensemble.correlation_matrix
+    assert round(matrix["A"]["B"], 6) == 1.0 and round(matrix["A"]["C"], 6) == -1.0
+    assert "A" not in matrix["A"]
@@ -0,0 +1,147 @@
+import numpy as np
+
+from app.indicators.crt import IncrementalCRTEngine, IncrementalCRTState
+from app.services.bar_store import Bar, BarStore
+
+
+class _Bar:
+    def __init__(self, o, h, l, c):
+        self.open, self.high, self.low, self.close = o, h, l, c
+
+
+def _walk(count, seed=5):
+    rng = np.random.default_rng(seed)
+    return list(100 + np.cumsum(rng.normal(0, 1.0, count)))
+
+
+def _reference_rsi(closes, period=14):
+    changes = np.diff(closes)
+    gains, losses = np.clip(changes, 0, None), np.clip(-changes, 0, None)
+    avg_gain, avg_loss = gains[:period].mean(), losses[:period].mean()
+    for gain, loss in zip(gains[period:], losses[period:]):
+        avg_gain = (avg_gain * (period - 1) + gain) / period
+        avg_loss = (avg_loss * (period - 1) + loss) / period
+    return 100.0 * avg_gain / (avg_gain + avg_loss)
+
+
+def test_streaming_indicators_match_batch_reference():
+    closes = _walk(400)
+    state = IncrementalCRTState(trend_window=100)
+    for price in closes:
+        state.update(_Bar(price, price, price, price))
+
+    assert abs(state.rsi.value - _reference_rsi(closes)) < 1e-9
+    assert abs(state.sma_50.value - np.mean(closes[-50:])) < 1e-9
+
+    slope, intercept = np.polyfit(np.arange(100), closes[-100:], 1)
+    trend = state.trend()
+    assert abs(trend["slope"] - slope) < 1e-9
+    r = np.corrcoef(np.arange(100), closes[-100:])[0, 1]
+    assert abs(trend["r_squared"] - r**2) < 1e-9
+
+    window = np.diff(closes[-20:])
+    expected_rsi = 100 * window.clip(0).sum() / np.abs(window).sum()
+    assert abs(state.multi_timeframe()["short_term"]["rsi"] - expected_rsi) < 1e-9
+
+
+def test_sliding_price_list_matches_full_stream():
+    closes = _walk(300, seed=9)
+    engine = IncrementalCRTEngine()
+    history = []
+    for price in closes:
+        history.append(price)
+        if len(history) > 100:
+            history.pop(0)
+        bars, live = engine.analyze("btcusdt", history)
+
+    reference = IncrementalCRTState()
+    previous = closes[0]
+    for price in closes:
+        reference.update(_Bar(previous, max(previous, price), min(previous, price), price))
+        previous = price
+
+    assert bars == 300
+    assert live == reference.analyses()
+    # One rebuild on first sight, then only appended prices were folded.
+    assert engine.stats["rebuilds"] == 1
+    assert engine.stats["bars_folded"] == 300
+
+
+def test_store_path_uses_real_ohlc_and_rebuilds_after_gap():
+    store = BarStore(max_bars=60)
+    engine = IncrementalCRTEngine()
+    closes = _walk(80, seed=2)
+    for i, price in enumerate(closes):
+        store.record_tick("ETHUSDT", price, timestamp=1000.0 + i)
+    bars, _ = engine.analyze("ETHUSDT", closes[-20:], store=store)
+    assert bars == 60  # the store only holds 60 bars
+
+    store.record_tick("ETHUSDT", closes[-1] * 1.01, timestamp=2000.0)
+    bars, _ = engine.analyze("ETHUSDT", [closes[-1] * 1.01], store=store)
+    assert bars == 61
+
+    # Miss more bars than the store retains: the state is rebuilt.
+    for i in range(100):
+        store.record_tick("ETHUSDT", 50 + i, timestamp=3000.0 + i)
+    bars, _ = engine.analyze("ETHUSDT", [149.0], store=store)
+    assert bars == 60
+    assert engine.state("ETHUSDT").last_seq == store.last_seq("ETHUSDT")
+
+
+def test_time_bucketed_bars_aggregate_ticks():
+    store = BarStore(bar_seconds=60)
+    assert store.record_tick("BTCUSDT", 100, timestamp=0) is None
+    store.record_tick("BTCUSDT", 104, timestamp=10)
+    store.record_tick("BTCUSDT", 97, timestamp=20)
+    store.record_tick("BTCUSDT", 101, timestamp=30)
+    closed = store.record_tick("BTCUSDT", 102, timestamp=61)
+    assert closed == Bar(seq=0, open_time=0, open=100, high=104, low=97, close=101, volume=0.0, ticks=4)
+    assert store.bars("BTCUSDT", since_seq=0) == []
+
+
+def test_tick_bars_do_not_fire_wick_patterns_or_trivial_engulfing():
+    store = BarStore(max_bars=20_000)
+    engine = IncrementalCRTEngine()
+    rng = np.random.default_rng(11)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, 20_000)))
+    counts = {}
+    for i, price in enumerate(closes):
+        store.record_tick("BTCUSDT", float(price), timestamp=float(i))
+        _, analyses = engine.analyze("BTCUSDT", [float(price)], store=store)
+        for name in analyses["pattern_recognition"]["patterns_detected"]:
+            counts[name] = counts.get(name, 0) + 1
+
+    assert "HAMMER" not in counts and "HANGING_MAN" not in counts
+    # Any direction flip with a bigger body used to count (~25% of bars).
+    assert 0 < counts.get("BULLISH_ENGULFING", 0) < 0.03 * len(closes)
+    assert 0 < counts.get("BEARISH_ENGULFING", 0) < 0.03 * len(closes)
+
+
+def test_patterns_and_swings_use_real_candles():
+    state = IncrementalCRTState()
+    # Downtrend with moderate bodies, then a bearish bar engulfed by a bullish one.
+    price = 120.0
+    for _ in range(12):
+        state.update(_Bar(price, price + 0.5, price - 1.5, price - 1.0))
+        price -= 1.0
+    state.update(_Bar(price, price + 0.2, price - 0.8, price - 0.6))
+    state.update(_Bar(price - 0.8, price + 0.9, price - 0.9, price + 0.4))
+    assert "BULLISH_ENGULFING" in state.pattern_recognition()["patterns_detected"]
+    assert state.pattern_recognition()["signal"] == "BULLISH"
+
+    # Hammer: small body at the top, long lower wick, after a decline.
+    hammer = IncrementalCRTState()
+    price = 120.0
+    for _ in range(12):
+        hammer.update(_Bar(price, price + 0.2, price - 1.2, price - 1.0))
+        price -= 1.0
+    hammer.update(_Bar(price, price + 0.05, price - 3.0, price + 0.3))
+    assert hammer.pattern_recognition()["patterns_detected"] == ["HAMMER"]
+
+    swings = IncrementalCRTState()
+    lows = [10, 9, 8, 7, 8, 9, 10, 11, 12, 11, 10] * 3
+    for low in lows:
+        swings.update(_Bar(low + 1, low + 2, low, low + 1))
+    structure = swings.market_structure()
+    assert 7.0 in structure["support_levels"]
+    assert 14.0 in structure["resistance_levels"]
@@ -0,0 +1,182 @@
+import gzip
+import json
+import time
+
+from flask import Flask
+from flask_login import LoginManager
+
+from app.routes.dashboard import dashboard_bp
+from app.services.dashboard_snapshots import CredentialStatusCache, DashboardSnapshotStore
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_versions_move_only_when_content_changes():
+    clock = _Clock()
+    payload = {"value": 1, "blob": "x" * 4096}
+    store = DashboardSnapshotStore(lambda uid, info: dict(payload), max_age=10, clock=clock)
+
+    first = store.get_or_build(7, {"username": "u"})
+    assert first.version == 1
+    assert store.get_or_build(7, {"username": "u"}) is first
+    assert gzip.decompress(first.encoded("gzip")) == first.body
+    assert first.encoded("gzip") is first.encoded("gzip")
+
+    clock.now += 11  # past max_age: rebuilt, same content keeps the version
+    assert store.get_or_build(7, {"username": "u"}).version == 1
+    payload["value"] = 2
+    assert store.refresh_subscribed() == 1
+    assert store.get(7).version == 2
+
+    store.invalidate(7)
+    assert store.get(7) is None
+
+    clock.now += 301  # subscriber expired: no longer republished
+    assert store.refresh_subscribed() == 0
+
+
+def test_credential_status_connection_check_runs_off_request_path():
+    calls = []
+    jobs = []
+    clock = _Clock()
+
+    def status_fn(*, include_connection, include_logs, user_id):
+        calls.append(include_connection)
+        return {"user_id": user_id, "connected": include_connection}
+
+    updated = []
+    cache = CredentialStatusCache(
+        status_fn, interval=30, on_update=updated.append, runner=jobs.append, clock=clock
+    )
+    assert cache.get(5) == {"user_id": 5, "connected": False}
+    assert cache.get(5)["connected"] is False  # refresh already queued once
+    assert len(jobs) == 1
+    jobs.pop()()
+    assert updated == [5]
+    assert cache.get(5)["connected"] is True
+    assert calls == [False, False, True]
+    clock.now += 31
+    cache.get(5)
+    assert len(jobs) == 1
+
+
+class _User:
+    def __init__(self, user_id):
+        self.id = user_id
+        self.username = f"user{user_id}"
+        self.is_admin = False
+        self.is_authenticated = True
+        self.is_active = True
+
+    def get_id(self):
+        return str(self.id)
+
+
+class _Trader:
+    def __init__(self, counter):
+        self.counter = counter
+        self.positions = {}
+
+    def get_performance_summary(self):
+        self.counter["builds"] += 1
+        return {"pnl": self.counter["pnl"]}
+
+
+class _Market:
+    def __init__(self, counter):
+        self.trader = _Trader(counter)
+
+    def _get_or_create_user_traders(self, _user_id):
+        return self.trader, None
+
+
+def _client():
+    counter = {"builds": 0, "pnl": 1.0}
+    app = Flask(__name__)
+    app.config.update(TESTING=True, SECRET_KEY="key")
+    login_manager = LoginManager()
+    login_manager.init_app(app)
+    login_manager.user_loader(lambda user_id: _User(int(user_id)))
+    app.register_blueprint(dashboard_bp)
+    selections = {"ultimate": []}
+    app.extensions["ai_bot_context"] = {
+        "dashboard_data": {"last_update": 1.0, "ml_telemetry": {"pad": "x" * 4096}},
+        "market_data_service": _Market(counter),
+        "indicator_signal_options": ["CRT"],
+        "indicator_profiles": ["ultimate"],
+        "get_all_indicator_selections": lambda: dict(selections),
+        "set_indicator_selection": lambda profile, sel: selections.__setitem__(profile, list(sel)) or list(sel),
+    }
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess["_user_id"] = "3"
+        sess["_fresh"] = True
+    return app, client, counter
+
+
+def test_dashboard_served_from_snapshot_with_etag_and_gzip():
+    app, client, counter = _client()
+
+    first = client.get("/api/dashboard")
+    assert first.status_code == 200
+    assert first.get_json()["performance"] == {"pnl": 1.0}
+    etag = first.headers["ETag"]
+
+    for _ in range(5):
+        assert client.get("/api/dashboard").headers["ETag"] == etag
+    assert counter["builds"] == 1
+
+    assert client.get("/api/dashboard", headers={"If-None-Match": etag}).status_code == 304
+    zipped = client.get("/api/dashboard", headers={"Accept-Encoding": "gzip"})
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(zipped.data)) == first.get_json()
+
+    # The market cycle republishes subscribed users with fresh data.
+    counter["pnl"] = 2.0
+    assert app.extensions["dashboard_snapshots"].refresh_subscribed() == 1
+    second = client.get("/api/dashboard")
+    assert second.get_json()["performance"] == {"pnl": 2.0}
+    assert int(second.headers["X-Dashboard-Version"]) == 2
+
+    # A write by the user is visible on the next poll.
+    client.post("/api/indicator_selection", json={"profile": "ultimate", "selections": ["CRT"]})
+    assert client.get("/api/dashboard").get_json()["indicator_selections"] == {"ultimate": ["CRT"]}
+
+
+def test_dashboard_does_not_block_on_connection_check():
+    app, client, _counter = _client()
+
+    def status_fn(*, include_connection=False, include_logs=False, user_id=None):
+        if include_connection:
+            time.sleep(0.5)
+        return {"user_id": user_id, "logs": []}
+
+    app.extensions["ai_bot_context"]["get_binance_credential_status"] = status_fn
+    started = time.perf_counter()
+    payload = client.get("/api/dashboard").get_json()
+    assert time.perf_counter() - started < 0.4
+    assert payload["binance_credentials"]["user_id"] == 3
+
+
+def test_snapshot_builder_logs_the_user_in_outside_requests():
+    from flask_login import current_user
+
+    from app.routes.dashboard import _snapshot_builder
+
+    app, _test_client, _counter = _client()
+    seen = []
+
+    def status_fn(*, include_connection=False, include_logs=False, user_id=None):
+        seen.append((user_id, current_user.id, current_user.is_authenticated))
+        return {"user_id": user_id, "logs": []}
+
+    app.extensions["ai_bot_context"]["get_binance_credential_status"] = status_fn
+    payload = _snapshot_builder(app)(7, {"id": 7})
+    assert payload["binance_credentials"]["user_id"] == 7
+    assert seen == [(7, 7, True)]
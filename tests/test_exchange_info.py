@@ -0,0 +1,119 @@
+import random
+from decimal import ROUND_DOWN, Decimal
+from types import SimpleNamespace
+
+from app.services import exchange_info
+from app.services.binance_requests import FakeBinanceClient
+from app.services.exchange_info import ExchangeInfoCache, SymbolRules
+
+
+def _decimal_quantity(qty, step, min_qty, max_qty):
+    # The Decimal path RealBinanceTrader._normalize_order_quantity used before.
+    step, min_qty, max_qty = Decimal(step), Decimal(min_qty), Decimal(max_qty)
+    value = (Decimal(str(qty)) / step).to_integral_value(rounding=ROUND_DOWN) * step
+    value = min(value, max_qty)
+    return None if value <= 0 or value < min_qty else float(value)
+
+
+def test_quantisers_match_decimal_rounding():
+    filters = [
+        {"filterType": "PRICE_FILTER", "tickSize": "0.01000000"},
+        {"filterType": "LOT_SIZE", "stepSize": "0.00010000", "minQty": "0.00100000", "maxQty": "900.00000000"},
+        {"filterType": "NOTIONAL", "minNotional": "5.00000000"},
+    ]
+    rules = SymbolRules.from_filters("btcusdt", filters)
+    assert (rules.symbol, rules.min_notional, rules.tick_size) == ("BTCUSDT", 5.0, 0.01)
+
+    rng = random.Random(3)
+    for _ in range(2000):
+        qty = round(rng.uniform(0, 1000), rng.randint(0, 8))
+        expected = _decimal_quantity(qty, "0.0001", "0.001", "900")
+        assert rules.quantize_quantity(qty)[0] == expected
+        price = round(rng.uniform(0, 60_000), rng.randint(0, 6))
+        assert rules.quantize_price(price) == float(
+            (Decimal(str(price)) / Decimal("0.01")).to_integral_value(rounding=ROUND_DOWN) * Decimal("0.01")
+        )
+    assert rules.quantize_quantity(0.3) == (0.3, None)
+    assert rules.quantize_quantity(0.0005) == (None, "Quantity 0.0005 below minQty 0.001")
+
+
+def test_cache_loads_once_persists_and_reloads_when_stale(tmp_path):
+    clock = SimpleNamespace(now=1_000.0)
+    client = FakeBinanceClient()
+    path = tmp_path / "exchange_info.json"
+    cache = ExchangeInfoCache(ttl=60, path=str(path), clock=lambda: clock.now)
+
+    assert cache.rules("BTCUSDT", client.get_exchange_info).step_size == 0.00001
+    assert cache.rules("ETHUSDT", client.get_exchange_info) is not None
+    assert cache.rules("NOPEUSDT", client.get_exchange_info) is None
+    assert client.calls == ["get_exchange_info"]
+
+    # A restart within the TTL reads the file instead of the exchange.
+    restarted = ExchangeInfoCache(ttl=60, path=str(path), clock=lambda: clock.now)
+    assert restarted.rules("BTCUSDT") is not None and restarted.stats["disk_loads"] == 1
+
+    clock.now += 61
+    cache.rules("BTCUSDT", client.get_exchange_info)
+    cache.invalidate("BTCUSDT")
+    cache.rules("BTCUSDT", client.get_exchange_info)
+    assert client.calls == ["get_exchange_info"] * 3
+
+
+def test_traders_share_one_bulk_load_and_filter_failures_invalidate(monkeypatch):
+    from app.services.trading import RealBinanceTrader
+
+    monkeypatch.setattr(exchange_info, "_CACHES", {})
+    clients = []
+
+    class _Client(FakeBinanceClient):
+        def __init__(self, api_key, api_secret, testnet=True):
+            super().__init__()
+            clients.append(self)
+
+        def create_test_order(self, **params):
+            self._request("create_test_order")
+            raise Exception("APIError(code=-1013): Filter failure: LOT_SIZE")
+
+    traders = [
+        RealBinanceTrader(api_key=f"k{i}", api_secret="s", testnet=True, binance_client_cls=_Client)
+        for i in range(3)
+    ]
+    for trader in traders:
+        assert trader.normalize_price("BTCUSDT", 30_000.129) == 30_000.12
+        assert trader._normalize_order_quantity("ETHUSDT", 1.234567) == (
+            1.23456,
+            "Adjusted to stepSize 0.00001",
+        )
+        assert trader.get_min_notional("BTCUSDT") == 5.0
+    calls = [call for client in clients for call in client.calls]
+    assert calls.count("get_exchange_info") == 1
+    assert "get_symbol_info" not in calls
+
+    cache = traders[0].exchange_info
+    cache.stop()  # keep the background refresher out of the counts below
+    assert traders[0].place_real_order("BTCUSDT", "BUY", 0.01, price=30_000) is None
+    assert cache.stats["invalidations"] == 1 and not cache.is_fresh()
+    traders[1].get_min_notional("BTCUSDT")
+    calls = [call for client in clients for call in client.calls]
+    assert calls.count("get_exchange_info") == 2
+
+
+def test_repeated_filter_failures_reload_once_per_symbol_per_interval():
+    clock = SimpleNamespace(now=1_000.0)
+    client = FakeBinanceClient()
+    cache = ExchangeInfoCache(ttl=3600, invalidate_interval=300, clock=lambda: clock.now)
+    cache.rules("BTCUSDT", client.get_exchange_info)
+
+    for _ in range(5):
+        cache.invalidate("btcusdt")
+        cache.rules("BTCUSDT", client.get_exchange_info)
+    assert client.calls == ["get_exchange_info"] * 2
+    assert cache.stats["invalidations"] == 1
+    assert cache.stats["invalidations_skipped"] == 4
+
+    # Another symbol has its own budget, and the first one gets a new one later.
+    assert cache.invalidate("ETHUSDT") is True
+    clock.now += 301
+    assert cache.invalidate("BTCUSDT") is True
+    cache.rules("BTCUSDT", client.get_exchange_info)
+    assert client.calls == ["get_exchange_info"] * 3
@@ -178,23 +178,6 @@ class TestFeatureStore:
         assert 'volume' in features
         # Note: Some features might not be calculated with insufficient data
 
-    def test_mock_predict(self):
-        """Test mock prediction function."""
-        features = {
-            'rsi_14': 30,  # Oversold
-            'close': 40000,
-            'sma_20': 41000
-        }
-
-        prediction = self.feature_store._mock_predict("test_model", features)
-
-        assert isinstance(prediction, dict)
-        assert 'signal' in prediction
-        assert 'confidence' in prediction
-        assert 'model' in prediction
-        assert prediction['signal'] in ['BUY', 'SELL', 'HOLD']
-        assert 0 <= prediction['confidence'] <= 1
-
     def test_schedule_precomputation(self):
         """Test precomputation scheduling interface."""
         # This is mainly an interface test since actual scheduling
@@ -0,0 +1,120 @@
+import numpy as np
+
+from app.cache.trading_cache import TradingCache
+from app.ml.feature_store import FeaturePipeline, FeatureStore
+from app.trading.kline_replay import KlineStore
+
+HOUR = 3_600_000
+START = 1_900_000_000_000
+
+
+def _candles(count, seed=3):
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.exp(np.cumsum(rng.normal(scale=0.01, size=count)))
+    times = START + HOUR * np.arange(count, dtype=np.float64)
+    volume = rng.uniform(10, 20, count)
+    return np.column_stack([times, closes, closes * 1.01, closes * 0.99, closes, volume])
+
+
+def _store(tmp_path, **pipeline):
+    klines = KlineStore(tmp_path / "klines")
+    return FeatureStore(
+        TradingCache(enable_redis=False),
+        kline_store=klines,
+        root=tmp_path / "features",
+        pipeline=FeaturePipeline(**pipeline) if pipeline else None,
+    )
+
+
+def test_appending_bars_matches_a_full_recompute(tmp_path):
+    store = _store(tmp_path)
+    candles = _candles(300)
+    store.klines.write("BTCUSDT", "1h", candles[:200])
+    assert store.materialize("BTCUSDT", "1h") == {"rows": 200, "computed": 200, "rebuilt": True}
+    for stop in (201, 230, 300):
+        store.klines.write("BTCUSDT", "1h", candles[:stop])
+        result = store.materialize("BTCUSDT", "1h")
+        assert not result["rebuilt"] and result["rows"] == stop
+
+    stored = store.load("BTCUSDT", "1h")
+    assert isinstance(stored, np.memmap) and not stored.flags.writeable
+    full = store.pipeline.compute(candles, 0, store.pipeline.new_bank())
+    assert np.array_equal(stored, full, equal_nan=True)
+    assert store.metrics["bars_computed"] == 300 and store.metrics["full_rebuilds"] == 1
+
+    assert store.materialize("BTCUSDT", "1h")["computed"] == 0
+    assert store.metrics["store_hits"] == 1 and store.metrics["store_misses"] == 4
+    frame = store.frame("BTCUSDT", "1h")
+    assert list(frame.columns) == list(store.pipeline.columns)
+    assert frame["close"].iloc[-1] == candles[-1, 4]
+
+
+def test_other_processes_share_the_versioned_matrices(tmp_path):
+    writer = _store(tmp_path)
+    candles = _candles(120)
+    writer.klines.write("ETHUSDT", "1h", candles)
+    writer.materialize("ETHUSDT", "1h")
+    manifest = writer.version_dir / "pipeline.json"
+    assert manifest.exists() and writer.pipeline.version.startswith("fp")
+
+    reader = _store(tmp_path)
+    assert reader.pipeline.version == writer.pipeline.version
+    assert reader.materialize("ETHUSDT", "1h")["computed"] == 0
+    latest = reader.get_features("ETHUSDT", "1h", reader.pipeline.version)
+    assert latest["open_time"] == candles[-1, 0] and "rsi_14" in latest
+    assert reader.metrics["bars_computed"] == 0
+
+    tweaked = _store(tmp_path, volatility_window=30)
+    assert tweaked.pipeline.version != writer.pipeline.version
+    assert tweaked.load("ETHUSDT", "1h") is None
+
+    # Rewritten history no longer lines up with the stored rows: rebuild.
+    reader.klines.write("ETHUSDT", "1h", _candles(130, seed=9))
+    assert reader.materialize("ETHUSDT", "1h")["rebuilt"]
+
+
+def test_precomputation_reads_stored_candles_and_registered_models(tmp_path):
+    store = _store(tmp_path)
+    store.klines.write("BTCUSDT", "1h", _candles(80))
+    store.register_model("trend", lambda f: {"signal": "BUY" if f["ema_cross_12_26"] > 0 else "SELL"})
+
+    first = store.precompute_features(["BTCUSDT", "MISSING"], ["1h"])
+    assert first["features_computed"] == 1 and first["predictions_computed"] == 1
+    assert first["errors"] == 1  # no candles for MISSING
+    prediction = store.get_predictions("trend", "BTCUSDT", "1h")
+    assert prediction["model"] == "trend" and prediction["open_time"] == START + 79 * HOUR
+
+    second = store.precompute_features(["BTCUSDT"], ["1h"])
+    assert second["cache_hits"] == 1 and store.metrics["bars_computed"] == 80
+
+    store.klines.write("BTCUSDT", "1h", _candles(85))
+    store.precompute_features(["BTCUSDT"], ["1h"])
+    assert store.metrics["bars_computed"] == 85
+    assert store.get_features("BTCUSDT", "1h")["open_time"] == START + 84 * HOUR
+
+    # A forced refresh recomputes the whole series inside materialize.
+    assert store.materialize("BTCUSDT", "1h", rebuild=True)["rebuilt"]
+    store.precompute_features(["BTCUSDT"], ["1h"], force_refresh=True)
+    assert store.metrics["full_rebuilds"] == 3 and store.metrics["bars_computed"] == 255
+
+    status = store.get_precomputation_status()
+    assert status["pipeline_version"] == store.pipeline.version
+    assert status["store_efficiency"] == 0 and status["compute_ms_per_bar"] > 0
+
+
+def test_missing_series_is_downloaded_into_the_kline_store(tmp_path):
+    store = _store(tmp_path)
+    requested = []
+
+    def fetch(symbol, interval, bars):
+        requested.append((symbol, interval, bars))
+        store.klines.merge(symbol, interval, _candles(80))
+
+    store.kline_fetcher = fetch
+    result = store.precompute_features(["BTCUSDT"], ["1h"])
+    assert result["features_computed"] == 1
+    assert requested == [("BTCUSDT", "1h", 1000)]
+    assert store.get_features("BTCUSDT", "1h")["open_time"] == START + 79 * HOUR
+
+    store.precompute_features(["BTCUSDT"], ["1h"])
+    assert len(requested) == 1
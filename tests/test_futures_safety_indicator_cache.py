@@ -0,0 +1,130 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+class _FakeTrader:
+    def __init__(self, frame):
+        self.frame = frame
+        self.calls = 0
+
+    def get_real_historical_data(self, symbol, years=1, interval="5m"):
+        self.calls += 1
+        return self.frame.copy()
+
+
+def _candles(count, *, start_ms=1_700_000_000_000, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.8, count))
+    high = close + rng.uniform(0.1, 1.5, count)
+    low = close - rng.uniform(0.1, 1.5, count)
+    return pd.DataFrame(
+        {
+            "open_time": start_ms + np.arange(count) * 300_000,
+            "high": high,
+            "low": low,
+            "close": close,
+        }
+    )
+
+
+@pytest.fixture
+def service_factory(tmp_path, monkeypatch):
+    from app.services import futures_safety as module
+
+    monkeypatch.setattr(module, "resolve_profile_path", lambda _name: str(tmp_path))
+
+    def _build(trader, **config):
+        return module.FuturesSafetyService(
+            ultimate_trader=trader,
+            trading_config=config,
+            futures_symbols=["BTCUSDT"],
+        )
+
+    return _build
+
+
+def test_incremental_regime_state_matches_batch_calculation(service_factory):
+    frame = _candles(400)
+    service = service_factory(_FakeTrader(frame))
+    cfg = service._effective_config()
+
+    batch = service._calculate_atr_adx(frame[["high", "low", "close"]], cfg)
+    streamed = service._update_regime_state("BTCUSDT", cfg, frame)
+
+    assert streamed["atr_pct"] == pytest.approx(batch["atr_pct"], abs=1e-4)
+    assert streamed["adx"] == pytest.approx(batch["adx"], abs=1e-4)
+
+
+def test_only_new_closed_candles_are_folded(service_factory):
+    frame = _candles(300)
+    service = service_factory(_FakeTrader(frame))
+    cfg = service._effective_config()
+
+    service._update_regime_state("BTCUSDT", cfg, frame.iloc[:200])
+    state = service._regime_states[("BTCUSDT", cfg.indicator_interval)]
+    assert state.bars == 199
+
+    # Overlapping window: only the 100 newer bars (minus the forming one) are applied.
+    streamed = service._update_regime_state("BTCUSDT", cfg, frame.iloc[150:])
+    assert service._regime_states[("BTCUSDT", cfg.indicator_interval)] is state
+    assert state.bars == 299
+
+    full = service._calculate_atr_adx(frame[["high", "low", "close"]], cfg)
+    assert streamed["adx"] == pytest.approx(full["adx"], abs=1e-4)
+
+
+def test_should_allow_order_uses_cached_snapshot(service_factory):
+    trader = _FakeTrader(_candles(100))
+    service = service_factory(trader, futures_safety_min_atr_pct=0.0, futures_safety_min_adx=0.0)
+    service.backtest["BTCUSDT"] = {"eligible": True}
+
+    for _ in range(5):
+        allowed, reason, _details = service.should_allow_order(
+            symbol="BTCUSDT", side="BUY", quantity=0.01, leverage=3, reduce_only=False
+        )
+        assert allowed, reason
+
+    assert trader.calls == 1
+    assert "BTCUSDT" in service._exposure_symbols(service._effective_config())
+
+
+def test_expired_snapshot_is_served_stale_while_refresher_runs(service_factory):
+    trader = _FakeTrader(_candles(100))
+    service = service_factory(trader)
+    cfg = service._effective_config()
+    service._refresh_indicator_metrics("BTCUSDT", cfg, trader=trader)
+    service.indicators["BTCUSDT"]["expires_at"] = 0
+
+    alive = threading.Event()
+    worker = threading.Thread(target=alive.wait)
+    worker.start()
+    service._indicator_thread = worker
+    try:
+        metrics = service._get_indicator_metrics("BTCUSDT", cfg, trader=trader)
+    finally:
+        alive.set()
+        worker.join()
+
+    assert metrics["stale"] is True
+    assert trader.calls == 1
+    assert "BTCUSDT" in service._refresh_requested
+
+    assert service._refresh_exposed_indicators_once(cfg) == 1
+    assert trader.calls == 2
+    assert "BTCUSDT" not in service._refresh_requested
+
+
+def test_expired_snapshot_refreshes_synchronously_without_refresher(service_factory):
+    trader = _FakeTrader(_candles(100))
+    service = service_factory(trader)
+    cfg = service._effective_config()
+    service._refresh_indicator_metrics("BTCUSDT", cfg, trader=trader)
+    service.indicators["BTCUSDT"]["expires_at"] = 0
+
+    metrics = service._get_indicator_metrics("BTCUSDT", cfg, trader=trader)
+
+    assert "stale" not in metrics
+    assert trader.calls == 2
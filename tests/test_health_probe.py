@@ -0,0 +1,136 @@
+import time
+import types
+
+from flask import Flask
+
+from app.routes.status import status_bp
+from app.services.health_probe import HealthProber
+from app.tasks import manager as task_manager
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_probes_run_on_their_own_cadence_and_record_history():
+    clock = _Clock()
+    calls = {"fast": 0, "slow": 0}
+
+    def fast():
+        calls["fast"] += 1
+        return "ok", {"latency_ms": 1.5}
+
+    def slow():
+        calls["slow"] += 1
+        raise RuntimeError("boom")
+
+    prober = HealthProber({"fast": (fast, 10), "slow": (slow, 60)}, clock=clock)
+    assert prober.snapshot()["fast"]["status"] == "pending"
+
+    assert prober.run_due() == 2
+    clock.now += 10
+    assert prober.run_due() == 1
+    assert calls == {"fast": 2, "slow": 1}
+
+    snapshot = prober.snapshot()
+    assert snapshot["fast"]["status"] == "ok"
+    assert snapshot["fast"]["latency_ms"] == 1.5
+    assert snapshot["fast"]["probe_latency_ms"]["samples"] == 2
+    assert snapshot["slow"]["status"] == "error"
+    assert snapshot["slow"]["error"].startswith("RuntimeError")
+    assert snapshot["slow"]["failures"] == 1
+
+
+def test_results_older_than_stale_factor_are_reported_stale():
+    clock = _Clock()
+    prober = HealthProber({"db": (lambda: ("ok", {}), 10)}, stale_factor=3, clock=clock)
+    prober.run_due()
+    clock.now += 29
+    assert prober.snapshot()["db"]["stale"] is False
+    clock.now += 2
+    entry = prober.snapshot()["db"]
+    assert entry["stale"] is True
+    assert entry["status"] == "stale"
+    assert entry["last_status"] == "ok"
+    assert entry["age_seconds"] == 31
+
+
+def _client(prober):
+    app = Flask(__name__)
+    app.register_blueprint(status_bp)
+    app.extensions["ai_bot_context"] = {"version_label": "test"}
+    app.extensions["health_prober"] = prober
+    return app.test_client()
+
+
+def test_health_serves_cached_snapshot_without_blocking(monkeypatch):
+    worker = types.SimpleNamespace(is_running=lambda: True)
+    manager = types.SimpleNamespace(self_improvement_worker=worker)
+    monkeypatch.setattr(task_manager, "_background_task_manager", manager)
+    clock = _Clock()
+
+    def slow_exchange():
+        time.sleep(0.5)
+        return "ok", {"latency_ms": 500.0}
+
+    probes = {
+        name: ((lambda: ("ok", {})), 10)
+        for name in ("binance_testnet_api", "database", "disk_space", "memory", "cpu")
+    }
+    probes["binance_api"] = (slow_exchange, 10)
+    prober = HealthProber(probes, clock=clock)
+    prober.run_due()
+    client = _client(prober)
+
+    started = time.perf_counter()
+    payload = client.get("/health").get_json()
+    assert time.perf_counter() - started < 0.25
+    assert payload["status"] == "healthy"
+    assert payload["checks"]["binance_api"]["latency_ms"] == 500.0
+    assert payload["checks"]["background_worker"]["status"] == "ok"
+    assert payload["stale_checks"] == []
+
+    clock.now += 60
+    payload = client.get("/health").get_json()
+    assert payload["status"] == "unhealthy"
+    assert "database" in payload["stale_checks"]
+
+
+def test_liveness_route_skips_dependency_checks():
+    prober = HealthProber({"database": (lambda: 1 / 0, 10)})
+    payload = _client(prober).get("/health/live").get_json()
+    assert payload["status"] == "alive"
+    assert payload["uptime_seconds"] >= 0
+    assert prober.snapshot()["database"]["runs"] == 0
+
+
+def test_health_reports_starting_until_every_probe_has_run(monkeypatch):
+    worker = types.SimpleNamespace(is_running=lambda: True)
+    manager = types.SimpleNamespace(self_improvement_worker=worker)
+    monkeypatch.setattr(task_manager, "_background_task_manager", manager)
+    probes = {
+        name: ((lambda: ("ok", {})), 10)
+        for name in (
+            "binance_api",
+            "binance_testnet_api",
+            "database",
+            "disk_space",
+            "memory",
+            "cpu",
+        )
+    }
+    prober = HealthProber(probes, clock=_Clock())
+    client = _client(prober)
+
+    payload = client.get("/health").get_json()
+    assert payload["status"] == "starting"
+    assert "database" in payload["pending_checks"]
+
+    prober.run_due()
+    payload = client.get("/health").get_json()
+    assert payload["status"] == "healthy"
+    assert payload["pending_checks"] == []
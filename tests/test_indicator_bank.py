@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+from app.indicators.calculator import (
+    EMACalculator,
+    IncrementalIndicatorCalculator,
+    IndicatorBank,
+    MACDCalculator,
+    RSICalculator,
+    SMACalculator,
+)
+
+
+def _closes(bars=160, symbols=6, seed=5, gaps=True):
+    rng = np.random.default_rng(seed)
+    prices = 100 * np.exp(np.cumsum(rng.normal(scale=0.01, size=(bars, symbols)), axis=0))
+    frame = pd.DataFrame(prices, columns=[f"S{i}" for i in range(symbols)])
+    if gaps:
+        frame.iloc[:30, 4] = np.nan  # lists late
+        frame.iloc[rng.integers(0, bars, 20), 2] = np.nan  # missed bars
+    return frame
+
+
+def test_batch_backfill_is_bit_for_bit_equal_to_streaming():
+    closes = _closes()
+    streaming = IndicatorBank(capacity=2)
+    streamed = {symbol: [] for symbol in closes.columns}
+    for _, bar in closes.iterrows():
+        present = bar.dropna()
+        streaming.update(present.to_dict())
+        for symbol in closes.columns:
+            row = streaming.latest(symbol) if symbol in present.index else {}
+            streamed[symbol].append([row.get(f, np.nan) for f in streaming.fields])
+
+    batch = IndicatorBank().calculate_all_indicators(closes)
+    for symbol in closes.columns:
+        assert np.array_equal(batch[symbol].to_numpy(), np.array(streamed[symbol]), equal_nan=True)
+
+    # The backfilled bank carries on exactly like the streaming one.
+    primed = IndicatorBank()
+    primed.calculate_all_indicators(closes)
+    nxt = {symbol: 101.0 + i for i, symbol in enumerate(closes.columns)}
+    primed.update(nxt)
+    streaming.update(nxt)
+    assert primed.frame().sort_index().equals(streaming.frame().sort_index())
+
+
+def test_streaming_skips_missing_closes_like_the_backfill():
+    closes = _closes(bars=60, symbols=2, gaps=False)
+    closes.iloc[[10, 25], 1] = np.nan
+    closes.iloc[40, 1] = np.inf
+    streaming = IndicatorBank()
+    for _, bar in closes.iterrows():
+        streaming.update(bar.to_dict())  # NaNs included, not dropped by the caller
+    batch = IndicatorBank()
+    batch.calculate_all_indicators(closes)
+    assert np.isfinite(streaming.frame().to_numpy()).all()
+    assert streaming.frame().equals(batch.frame())
+
+
+def test_bank_tracks_the_single_stream_calculators():
+    closes = _closes(symbols=1, gaps=False)["S0"].to_numpy()
+    bank = IndicatorBank()
+    legacy = {
+        "sma_20": SMACalculator(20),
+        "sma_50": SMACalculator(50),
+        "ema_12": EMACalculator(12),
+        "ema_26": EMACalculator(26),
+        "rsi_14": RSICalculator(14),
+    }
+    macd = MACDCalculator()
+    for price in closes:
+        bank.update({"BTCUSDT": price})
+        values = bank.latest("BTCUSDT")
+        for name, calc in legacy.items():
+            assert np.isclose(values[name], calc.update({"close": price}), rtol=1e-12)
+        expected = macd.update({"close": price})
+        assert np.isclose(values["macd_line"], expected["macd_line"], atol=1e-12)
+        assert np.isclose(values["macd_signal"], expected["signal_line"], atol=1e-12)
+
+    window = pd.Series(closes).rolling(20)
+    middle, std = window.mean().iloc[-1], window.std(ddof=0).iloc[-1]
+    assert np.isclose(values["bb_middle"], middle) and np.isclose(values["bb_upper"], middle + 2 * std)
+
+
+def test_single_stream_calculator_batch_matches_updates():
+    df = pd.DataFrame({"close": _closes(bars=80, symbols=1, gaps=False)["S0"].to_numpy(), "volume": 1.0})
+    calculator = IncrementalIndicatorCalculator()
+    streamed = [calculator.update_indicators({"close": c}) for c in df["close"]]
+    batch = IncrementalIndicatorCalculator().calculate_all_indicators(df)
+    assert list(batch.columns[:2]) == ["close", "volume"]
+    for name in ("sma_20", "rsi_14", "macd_hist", "bb_percent_b", "price_momentum"):
+        assert np.array_equal(batch[name].to_numpy(), [row[name] for row in streamed])
+    assert streamed[-1]["current_price"] == df["close"].iloc[-1]
@@ -0,0 +1,92 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.trading.exchange_adapters import ExchangeCredentials, PaperTradingAdapter
+from app.trading.kline_replay import KlineReplay, KlineStore, interval_ms, synthetic_klines
+from app.trading.paper_matching import FeeModel
+
+HOUR = 3_600_000
+START = int(datetime(2030, 1, 31, 20).timestamp() * 1000)
+
+
+def _rows(count, start=START, step=HOUR):
+    times = start + step * np.arange(count, dtype=np.float64)
+    closes = 100.0 + np.arange(count, dtype=np.float64)
+    return np.column_stack([times, closes - 0.5, closes + 1, closes - 1, closes, np.full(count, 10.0)])
+
+
+def test_windows_are_served_from_a_memory_map(tmp_path):
+    store = KlineStore(tmp_path)
+    store.write("BTCUSDT", "1h", _rows(1_000)[::-1])  # stored sorted regardless of input order
+
+    data = store.array("BTCUSDT", "1h")
+    assert isinstance(data, np.memmap)
+    assert store.array("BTCUSDT", "1h") is data
+
+    window = store.window("BTCUSDT", "1h", start_ms=START + 10 * HOUR, end_ms=START + 19 * HOUR)
+    assert window[:, 4].tolist() == [110.0 + i for i in range(10)]
+    assert store.window("BTCUSDT", "1h", limit=3)[:, 4].tolist() == [1097.0, 1098.0, 1099.0]
+    assert store.window("BTCUSDT", "1h", end_ms=START - 1).shape == (0, 6)
+    assert store.window("ETHUSDT", "1h").shape == (0, 6)
+
+
+def test_synthetic_fallback_is_seeded_and_crosses_midnight_and_month_end():
+    end_ms = datetime(2030, 2, 1, 2, 30).timestamp() * 1000
+    first = synthetic_klines("BTCUSDT", "1h", 48, price=45_000.0, end_ms=end_ms)
+    again = synthetic_klines("BTCUSDT", "1h", 48, price=45_000.0, end_ms=end_ms)
+    assert np.array_equal(first, again)
+    assert np.all(np.diff(first[:, 0]) == interval_ms("1h"))
+    assert first[-1, 4] == 45_000.0
+    assert np.all(first[:, 2] >= np.maximum(first[:, 1], first[:, 4]))
+    assert np.all(first[:, 3] <= np.minimum(first[:, 1], first[:, 4]))
+
+
+def test_adapter_prefers_stored_candles_and_replays_them_accelerated(tmp_path):
+    store = KlineStore(tmp_path)
+    store.write("ETHUSDT", "1h", _rows(48))
+    adapter = PaperTradingAdapter(
+        ExchangeCredentials("k", "s"), fee_model=FeeModel(0.0, 0.0), kline_store=store
+    )
+
+    klines = asyncio.run(adapter.get_historical_klines("ETHUSDT", "1h", limit=5))
+    assert [k.close for k in klines] == [143.0, 144.0, 145.0, 146.0, 147.0]
+    assert klines[1].timestamp - klines[0].timestamp == timedelta(hours=1)
+
+    synthetic = asyncio.run(adapter.get_historical_klines("SOLUSDT", "4h", limit=30))
+    assert len(synthetic) == 30 and synthetic[-1].close == 95.0
+
+    naps = []
+    replay = KlineReplay(store, "ETHUSDT", "1h", speed=3600.0, sleep=naps.append)
+    assert replay.run(lambda row: None) == 48
+    assert naps == [1.0] * 47
+
+    order = asyncio.run(adapter.place_order("ETHUSDT", "BUY", "LIMIT", 1.0, 120.0))
+    assert adapter.replay_stored_klines("ETHUSDT", "1h") == 48
+    assert asyncio.run(adapter.get_order_status("ETHUSDT", order.order_id)).status == "filled"
+    assert adapter.price_feeds["ETHUSDT"] == 147.0
+
+
+def test_merge_upserts_downloaded_frames(tmp_path):
+    import pandas as pd
+
+    from app.trading.kline_replay import candles_from_frame
+
+    store = KlineStore(tmp_path)
+    step = interval_ms("1d")
+    dates = pd.to_datetime([0, step, 2 * step], unit="ms")
+    first = pd.DataFrame(
+        {"date": dates, "open": 1.0, "high": 2.0, "low": 0.5, "close": [1.0, 1.1, 1.2], "volume": 10.0}
+    )
+    store.merge("BTCUSDT", "1d", candles_from_frame(first))
+
+    # A later download overlaps the last bar (revised close) and extends the series.
+    later = pd.DataFrame(
+        {"open_time": [2 * step, 3 * step], "open": 1.0, "high": 2.0, "low": 0.5, "close": [1.25, 1.3], "volume": 10.0}
+    )
+    store.merge("BTCUSDT", "1d", candles_from_frame(later))
+
+    rows = store.window("BTCUSDT", "1d")
+    assert rows[:, 0].tolist() == [0, step, 2 * step, 3 * step]
+    assert rows[:, 4].tolist() == [1.0, 1.1, 1.25, 1.3]
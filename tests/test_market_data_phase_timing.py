@@ -0,0 +1,146 @@
+import logging
+import os
+import time
+
+import pytest
+
+from app.services.phase_timing import PhaseTimingRecorder, SamplingProfiler, percentile
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _recorder(**kwargs):
+    clock = _Clock()
+    recorder = PhaseTimingRecorder(clock=clock, wall_clock=lambda: 1000.0 + clock.now, **kwargs)
+    return recorder, clock
+
+
+def test_percentile_interpolates():
+    values = [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert percentile(values, 0.5) == 3.0
+    assert percentile(values, 0.95) == pytest.approx(4.8)
+    assert percentile([], 0.99) == 0.0
+
+
+def test_phase_durations_symbol_totals_and_cycle():
+    recorder, clock = _recorder()
+    recorder.begin_cycle()
+
+    recorder.mark("BTCUSDT", "fetch_market_data")
+    clock.now += 0.5
+    assert recorder.mark("BTCUSDT", "fetch_market_data", "ok") == pytest.approx(0.5)
+    clock.now += 0.25
+    # Only marked as finished: measured from the symbol's previous mark.
+    assert recorder.mark("BTCUSDT", "crt", "ok") == pytest.approx(0.25)
+
+    recorder.mark("ETHUSDT", "fetch_market_data")
+    clock.now += 1.0
+    recorder.mark("ETHUSDT", "fetch_market_data", "error")
+    assert recorder.end_cycle() == pytest.approx(1.75)
+
+    snap = recorder.snapshot(phase_order=["fetch_market_data", "crt"])
+    assert list(snap["phases"]) == ["fetch_market_data", "crt"]
+    fetch = snap["phases"]["fetch_market_data"]
+    assert fetch["count"] == 2
+    assert fetch["max_seconds"] == pytest.approx(1.0)
+    assert fetch["p50_seconds"] == pytest.approx(0.75)
+    assert snap["symbols"]["BTCUSDT"]["total"]["max_seconds"] == pytest.approx(0.75)
+    assert snap["cycle"]["count"] == 1
+    assert snap["last_cycle"]["slowest_phases"][0]["phase"] == "fetch_market_data"
+
+    only_eth = recorder.snapshot(symbols=["ETHUSDT"])
+    assert set(only_eth["symbols"]) == {"ETHUSDT"}
+
+
+def test_rolling_window_prunes_old_samples_but_keeps_counters():
+    recorder, clock = _recorder(window_seconds=60)
+    recorder.mark("BTCUSDT", "crt")
+    clock.now += 1
+    recorder.mark("BTCUSDT", "crt", "ok")
+
+    clock.now += 120
+    stats = recorder.snapshot()["phases"]["crt"]
+    assert stats["samples"] == 0
+    assert stats["count"] == 1
+
+
+def test_prometheus_exposition_has_quantiles_sum_and_count():
+    recorder, clock = _recorder()
+    recorder.begin_cycle()
+    recorder.mark("BTCUSDT", "persist_state")
+    clock.now += 0.2
+    recorder.mark("BTCUSDT", "persist_state", "ok")
+    recorder.end_cycle()
+
+    text = recorder.render_prometheus()
+    assert "# TYPE market_data_phase_seconds summary" in text
+    assert 'market_data_phase_seconds{phase="persist_state",quantile="0.99"} 0.200000' in text
+    assert 'market_data_phase_seconds_count{phase="persist_state"} 1' in text
+    assert 'market_data_symbol_seconds_sum{symbol="BTCUSDT"}' in text
+    assert "market_data_cycle_seconds_count 1" in text
+
+
+def test_sampling_profiler_dumps_folded_stacks_only_for_slow_cycles(tmp_path):
+    profiler = SamplingProfiler(output_dir=str(tmp_path), slow_seconds=0.05, interval_seconds=0.002)
+
+    profiler.start()
+    time.sleep(0.03)
+    assert profiler.finish(0.01) is None
+
+    profiler.start()
+    deadline = time.perf_counter() + 0.1
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+    path = profiler.finish(0.1)
+
+    assert path and os.path.exists(path)
+    with open(path, encoding="utf-8") as handle:
+        line = handle.readline().strip()
+    stack, count = line.rsplit(" ", 1)
+    assert "test_sampling_profiler_dumps_folded_stacks_only_for_slow_cycles" in stack
+    assert int(count) >= 1
+
+
+class _DummyRedis:
+    def __init__(self, *args, **kwargs):
+        pass
+
+
+def test_market_data_service_records_phase_durations(monkeypatch):
+    from app.services import market_data as market_data_module
+
+    monkeypatch.setattr(market_data_module.redis, "Redis", _DummyRedis)
+    service = market_data_module.MarketDataService(
+        dashboard_data={"system_status": {}, "optimized_system_status": {}},
+        historical_data={},
+        trading_config={},
+        ultimate_trader=object(),
+        optimized_trader=object(),
+        ultimate_ml_system=object(),
+        optimized_ml_system=object(),
+        parallel_engine=object(),
+        futures_manual_settings={},
+        binance_credential_service=object(),
+        get_active_trading_universe=lambda: [],
+        get_real_market_data=lambda _symbol: None,
+        get_trending_pairs=lambda: [],
+        refresh_symbol_counters=lambda: None,
+        refresh_indicator_dashboard_state=lambda: None,
+        safe_float=lambda v, d=0.0: float(v),
+        bot_logger=logging.getLogger("test"),
+    )
+
+    service._set_symbol_phase("BTCUSDT", "crt_ultimate", progress=70)
+    service._set_symbol_phase("BTCUSDT", "crt_ultimate", status="ok", progress=74)
+
+    payload = service.get_phase_snapshot()["BTCUSDT"]["phases"]["crt_ultimate"]
+    assert payload["duration_ms"] >= 0
+    timings = service.get_phase_timings()
+    assert timings["phases"]["crt_ultimate"]["count"] == 1
+    assert "market_data_phase_seconds" in service.render_phase_metrics()
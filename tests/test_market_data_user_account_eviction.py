@@ -0,0 +1,210 @@
+import logging
+
+import pytest
+
+
+class _DummyRedis:
+    def __init__(self, *args, **kwargs):
+        self._store = {}
+
+    def get(self, key):
+        return self._store.get(key)
+
+    def setex(self, key, ttl, value):
+        self._store[key] = value
+
+
+class _FakeTradeHistory:
+    data_dir = "trade_data"
+
+
+class _FakeTrader:
+    def __init__(self, initial_balance=10000, shared_engines=None):
+        shared = dict(shared_engines or {})
+        self.initial_balance = initial_balance
+        self.balance = initial_balance
+        self.positions = {}
+        self.trading_config = {"auto_trade_enabled": True}
+        self.trading_enabled = True
+        self.paper_trading = True
+        self.trade_history = _FakeTradeHistory()
+        self.ensemble_system = shared.get("ensemble_system") or object()
+        self.crt_generator = shared.get("crt_generator") or object()
+        self.parallel_engine = shared.get("parallel_engine") or object()
+        self.timescaledb_service = shared.get("timescaledb_service") or object()
+        self.qfm_engine = object()
+
+
+class _LegacyTrader:
+    def __init__(self, initial_balance=10000):
+        self.initial_balance = initial_balance
+        self.crt_generator = object()
+        self.qfm_engine = object()
+
+
+class _FakePersistence:
+    def __init__(self):
+        self.saves = []
+        self.loads = []
+
+    def load_complete_state(self, trader, _ml_system, **kwargs):
+        self.loads.append(kwargs.get("profile"))
+
+    def save_complete_state(self, trader, _ml_system, _config, _symbols, _historical, **kwargs):
+        self.saves.append(kwargs.get("profile"))
+
+
+@pytest.fixture(autouse=True)
+def _patch_redis(monkeypatch):
+    from app.services import market_data as market_data_module
+
+    monkeypatch.setattr(market_data_module.redis, "Redis", _DummyRedis)
+
+
+def _build_service(base_ultimate, base_optimized, persistence, trading_config=None):
+    from app.services.market_data import MarketDataService
+
+    return MarketDataService(
+        dashboard_data={"system_status": {}, "optimized_system_status": {}},
+        historical_data={},
+        trading_config=trading_config or {},
+        ultimate_trader=base_ultimate,
+        optimized_trader=base_optimized,
+        ultimate_ml_system=object(),
+        optimized_ml_system=object(),
+        parallel_engine=object(),
+        futures_manual_settings={},
+        binance_credential_service=object(),
+        get_active_trading_universe=lambda: ["BTCUSDT"],
+        get_real_market_data=lambda _symbol: None,
+        get_trending_pairs=lambda: [],
+        refresh_symbol_counters=lambda: None,
+        refresh_indicator_dashboard_state=lambda: None,
+        safe_float=lambda v, d=0.0: float(v) if v is not None else float(d),
+        bot_logger=logging.getLogger("test"),
+        persistence_manager=persistence,
+    )
+
+
+def test_user_traders_share_market_engines_but_not_account_state():
+    base_ultimate = _FakeTrader()
+    base_optimized = _FakeTrader()
+    service = _build_service(base_ultimate, base_optimized, _FakePersistence())
+
+    u1_ult, u1_opt = service._get_or_create_user_traders(1)
+    u2_ult, _ = service._get_or_create_user_traders(2)
+
+    assert u1_ult.crt_generator is base_ultimate.crt_generator
+    assert u2_ult.ensemble_system is base_ultimate.ensemble_system
+    assert u1_opt.parallel_engine is base_optimized.parallel_engine
+    assert u1_ult.qfm_engine is not u2_ult.qfm_engine
+    assert u1_ult.positions is not u2_ult.positions
+
+
+def test_legacy_trader_signature_still_receives_shared_engines():
+    from app.services.user_accounts import build_user_trader
+
+    shared_crt = object()
+    trader = build_user_trader(
+        _LegacyTrader, initial_balance=500, shared_engines={"crt_generator": shared_crt}
+    )
+
+    assert trader.initial_balance == 500
+    assert trader.crt_generator is shared_crt
+
+
+def test_idle_user_traders_are_persisted_evicted_and_rehydrated():
+    persistence = _FakePersistence()
+    service = _build_service(
+        _FakeTrader(),
+        _FakeTrader(),
+        persistence,
+        trading_config={"user_trader_idle_seconds": 60},
+    )
+    clock = {"now": 1000.0}
+    service.user_accounts._clock = lambda: clock["now"]
+
+    u1_ult, _ = service._get_or_create_user_traders(1)
+    u1_ult.balance = 1234.5
+    u1_ult.positions["BTCUSDT"] = {"quantity": 0.1}
+    service._get_or_create_user_traders(2)
+
+    clock["now"] += 120
+    evicted = service.evict_idle_user_traders(active_user_ids=[2])
+
+    assert evicted == [1]
+    assert set(service._user_traders.keys()) == {2}
+    assert persistence.saves == ["user_1"]
+
+    state = service.get_user_account_state(1)
+    assert state["hydrated"] is False
+    assert state["balance"] == 1234.5
+    assert state["open_positions"] == 1
+    assert state["trade_history_dir"] == "trade_data"
+
+    rehydrated, _ = service._get_or_create_user_traders(1)
+    assert rehydrated is not u1_ult
+    assert persistence.loads.count("user_1") == 2
+    assert service.get_user_account_state(1)["hydrations"] == 2
+
+
+def test_hydration_cap_evicts_least_recently_used_outside_active_cycle():
+    persistence = _FakePersistence()
+    service = _build_service(
+        _FakeTrader(),
+        _FakeTrader(),
+        persistence,
+        trading_config={"user_trader_idle_seconds": 0, "max_hydrated_user_traders": 2},
+    )
+    clock = {"now": 1000.0}
+    service.user_accounts._clock = lambda: clock["now"]
+
+    for uid in (1, 2, 3):
+        clock["now"] += 1
+        service._get_or_create_user_traders(uid)
+
+    evicted = service.evict_idle_user_traders(active_user_ids=[1])
+
+    assert evicted == [2]
+    assert set(service._user_traders.keys()) == {1, 3}
+
+
+def test_eviction_keeps_trader_when_state_cannot_be_saved():
+    service = _build_service(
+        _FakeTrader(),
+        _FakeTrader(),
+        None,
+        trading_config={"user_trader_idle_seconds": 1},
+    )
+    clock = {"now": 1000.0}
+    service.user_accounts._clock = lambda: clock["now"]
+    service._get_or_create_user_traders(1)
+
+    clock["now"] += 10
+
+    assert service.evict_idle_user_traders() == []
+    assert 1 in service._user_traders
+
+
+def test_pair_is_kept_while_optimized_trader_holds_positions():
+    persistence = _FakePersistence()
+    service = _build_service(
+        _FakeTrader(),
+        _FakeTrader(),
+        persistence,
+        trading_config={"user_trader_idle_seconds": 60},
+    )
+    clock = {"now": 1000.0}
+    service.user_accounts._clock = lambda: clock["now"]
+
+    _, u1_opt = service._get_or_create_user_traders(1)
+    u1_opt.positions["ETHUSDT"] = {"quantity": 2.0}
+    assert service.get_user_account_state(1)["optimized_open_positions"] == 1
+
+    clock["now"] += 120
+    assert service.evict_idle_user_traders() == []
+    assert 1 in service._user_traders and persistence.saves == []
+
+    u1_opt.positions.clear()
+    assert service.evict_idle_user_traders() == [1]
+    assert service.get_user_account_state(1)["optimized_open_positions"] == 0
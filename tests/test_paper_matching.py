@@ -0,0 +1,172 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.trading.exchange_adapters import ExchangeCredentials, KlineData, PaperTradingAdapter
+from app.trading.paper_matching import FeeModel, LatencyModel, MatchingEngine, split_symbol
+
+
+def test_split_symbol_handles_non_usdt_quotes():
+    assert split_symbol("BTCUSDT") == ("BTC", "USDT")
+    assert split_symbol("ETHBTC") == ("ETH", "BTC")
+    assert split_symbol("SOLFDUSD") == ("SOL", "FDUSD")
+    with pytest.raises(ValueError):
+        split_symbol("USDT")
+
+
+def test_market_order_sweeps_levels_and_expires_unfilled_rest():
+    engine = MatchingEngine(fees=FeeModel(0.0, 0.001))
+    engine.set_depth("BTCUSDT", bids=[(99.0, 1.0)], asks=[(101.0, 1.0), (102.0, 2.0)])
+
+    order = engine.submit("BTCUSDT", "BUY", "MARKET", 2.0)
+    assert order.status == "filled"
+    assert order.average_price == pytest.approx(101.5)
+    assert order.fees == pytest.approx(0.002)
+
+    order = engine.submit("BTCUSDT", "BUY", "MARKET", 5.0)
+    assert order.status == "expired"
+    assert order.filled == pytest.approx(1.0)
+    assert engine.get(order.order_id) is order
+
+
+def test_limit_orders_rest_match_in_time_priority_and_partially_fill():
+    engine = MatchingEngine(fees=FeeModel(0.0, 0.0))
+    first = engine.submit("BTCUSDT", "SELL", "LIMIT", 1.0, 100.0)
+    second = engine.submit("BTCUSDT", "SELL", "LIMIT", 1.0, 100.0)
+    assert [o.order_id for o in engine.orders_for("BTCUSDT")] == [first.order_id, second.order_id]
+
+    taker = engine.submit("BTCUSDT", "BUY", "LIMIT", 1.5, 100.5)
+    assert taker.status == "filled" and taker.average_price == 100.0
+    assert first.status == "filled"
+    assert second.status == "partially_filled" and second.remaining == pytest.approx(0.5)
+
+    assert engine.cancel(second.order_id)
+    assert not engine.cancel(second.order_id)
+    assert engine.book("BTCUSDT").asks.best() is None
+
+
+def test_kline_replay_is_deterministic_with_latency_and_participation():
+    def run():
+        engine = MatchingEngine(latency=LatencyModel(base_ms=50, jitter_ms=100, seed=3), participation=0.5)
+        engine.synthetic_depth("ETHUSDT", 100.0, timestamp=0)
+        order = engine.submit("ETHUSDT", "BUY", "LIMIT", 3.0, 98.0)
+        assert order.status == "pending_new"
+        engine.replay_klines(
+            "ETHUSDT",
+            [(1_000, 100, 101, 99, 100, 10), (2_000, 100, 100, 97.5, 98.5, 2), (3_000, 98.5, 99, 97, 98, 10)],
+            depth_levels=0,
+        )
+        return order.status, order.filled, order.average_price
+
+    status, filled, average = run()
+    assert (status, filled) == ("filled", 3.0)  # 1.0 from the thin candle, 2.0 from the next
+    assert average == 98.0
+    assert run() == (status, filled, average)
+
+
+def test_adapter_locks_balances_and_looks_orders_up_by_id():
+    adapter = PaperTradingAdapter(ExchangeCredentials("k", "s"), fee_model=FeeModel(0.0, 0.0))
+
+    async def scenario():
+        resting = await adapter.place_order("BTCUSDT", "BUY", "LIMIT", 0.1, 40000.0)
+        assert resting.status == "new"
+        usdt = (await adapter.get_balance("USDT"))[0]
+        assert usdt.locked == pytest.approx(4000.0) and usdt.free == pytest.approx(6000.0)
+        assert len(await adapter.get_open_orders("BTCUSDT")) == 1
+
+        assert await adapter.cancel_order("BTCUSDT", resting.order_id)
+        assert (await adapter.get_order_status("BTCUSDT", resting.order_id)).status == "canceled"
+        assert (await adapter.get_balance("USDT"))[0].free == pytest.approx(10000.0)
+
+        # Non-USDT quote: proceeds land in BTC, not a phantom "THBTC"/"USDT".
+        adapter.price_feeds["ETHBTC"] = 0.05
+        sold = await adapter.place_order("ETHBTC", "SELL", "MARKET", 1.0)
+        assert sold.status == "filled" and sold.price < 0.05
+        assert (await adapter.place_order("ETHBTC", "SELL", "MARKET", 50.0)).order_id == "insufficient_balance"
+
+    asyncio.run(scenario())
+    assert adapter.paper_balances["ETH"].total == pytest.approx(4.0)
+    assert adapter.paper_balances["BTC"].total == pytest.approx(0.5 + 0.05, rel=1e-2)
+
+
+def test_adapter_fills_resting_limit_when_market_moves():
+    adapter = PaperTradingAdapter(ExchangeCredentials("k", "s"), fee_model=FeeModel(0.001, 0.001))
+
+    async def scenario():
+        order = await adapter.place_order("ETHUSDT", "SELL", "LIMIT", 1.0, 2900.0)
+        assert order.status == "new"
+        adapter.replay_klines(
+            "ETHUSDT",
+            [
+                KlineData(
+                    timestamp=datetime(2030, 1, 1),
+                    open=2850,
+                    high=2950,
+                    low=2840,
+                    close=2920,
+                    volume=100,
+                )
+            ],
+        )
+        return await adapter.get_order_status("ETHUSDT", order.order_id)
+
+    status = asyncio.run(scenario())
+    assert status.status == "filled" and status.price == 2900.0
+    eth = adapter.paper_balances["ETH"]
+    assert eth.locked == pytest.approx(0.0) and eth.total == pytest.approx(4.0)
+    assert adapter.paper_balances["USDT"].total == pytest.approx(10000.0 + 2900.0 * 0.999)
+
+
+def test_synthetic_depth_is_sized_by_quote_notional():
+    engine = MatchingEngine(quote_liquidity=1_000.0)
+    engine.synthetic_depth("ADAUSDT", 0.5, levels=3)
+    engine.synthetic_depth("BTCUSDT", 50_000.0, levels=3)
+    for symbol, mid in (("ADAUSDT", 0.5), ("BTCUSDT", 50_000.0)):
+        bids, asks = engine.book(symbol).snapshot()
+        assert asks[0][1] * mid == pytest.approx(1_000.0)
+        assert bids[1][1] == pytest.approx(bids[0][1] / 2)
+
+
+def test_adapter_keeps_filling_repeated_market_orders_on_low_priced_symbols():
+    adapter = PaperTradingAdapter(ExchangeCredentials("k", "s"), fee_model=FeeModel(0.0, 0.0))
+
+    async def scenario():
+        large = await adapter.place_order("ADAUSDT", "BUY", "MARKET", 200.0)
+        repeated = [await adapter.place_order("ADAUSDT", "BUY", "MARKET", 20.0) for _ in range(10)]
+        book = await adapter.get_orderbook("ADAUSDT", limit=5)
+        return large, repeated, book
+
+    large, repeated, book = asyncio.run(scenario())
+    assert large.status == "filled" and large.filled == pytest.approx(200.0)
+    assert [order.status for order in repeated] == ["filled"] * 10
+    assert all(order.filled == pytest.approx(20.0) for order in repeated)
+    # The book is re-quoted around the ticker rather than left drained.
+    assert book.asks[0][1] * 0.45 == pytest.approx(adapter.engine.quote_liquidity)
+    assert adapter.paper_balances["ADA"].total == pytest.approx(400.0)
+
+
+def test_adapter_latency_expires_with_wall_clock_outside_replay():
+    clock = {"ms": 1_000.0}
+    adapter = PaperTradingAdapter(
+        ExchangeCredentials("k", "s"),
+        fee_model=FeeModel(0.0, 0.0),
+        latency_model=LatencyModel(base_ms=50),
+        clock=lambda: clock["ms"],
+    )
+
+    async def scenario():
+        order = await adapter.place_order("BTCUSDT", "BUY", "MARKET", 0.004)
+        assert order.status == "pending_new"
+        assert (await adapter.get_balance("USDT"))[0].locked > 0
+
+        clock["ms"] += 20
+        assert (await adapter.get_order_status("BTCUSDT", order.order_id)).status == "pending_new"
+        clock["ms"] += 40
+        return await adapter.get_order_status("BTCUSDT", order.order_id)
+
+    status = asyncio.run(scenario())
+    assert status.status == "filled" and status.filled == pytest.approx(0.004)
+    usdt = adapter.paper_balances["USDT"]
+    assert usdt.locked == pytest.approx(0.0)
+    assert usdt.total == pytest.approx(10000.0 - status.price * 0.004)
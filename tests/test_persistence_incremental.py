@@ -0,0 +1,142 @@
+import json
+import types
+from collections import deque
+
+from app.services.persistence import ProfessionalPersistence
+
+
+class _History:
+    def __init__(self):
+        self.calls = 0
+
+    def get_trade_history(self):
+        raise AssertionError("full trade history reloaded")
+
+    def trade_index(self):
+        self.calls += 1
+        return types.SimpleNamespace(newest=lambda: {"timestamp": "2030-01-02T00:00:00"})
+
+
+def _trader():
+    return types.SimpleNamespace(
+        balance=1000.0,
+        positions={},
+        trading_enabled=True,
+        paper_trading=True,
+        futures_trading_enabled=False,
+        daily_pnl=0.0,
+        max_drawdown=0.0,
+        peak_balance=1000.0,
+        bot_efficiency={},
+        risk_manager=types.SimpleNamespace(
+            current_risk_profile="moderate",
+            risk_adjustment_history=[],
+            volatility_regime="NORMAL",
+            market_stress_indicator=0.0,
+        ),
+        ensemble_system=types.SimpleNamespace(
+            market_regime="NEUTRAL", correlation_matrix={}, last_rebuild_time=None
+        ),
+        trade_history=_History(),
+    )
+
+
+def _ml():
+    return types.SimpleNamespace(
+        models={"BTCUSDT": object()},
+        training_progress={},
+        training_logs=[],
+        crt_generator=types.SimpleNamespace(signals_history=[]),
+    )
+
+
+def _backups(directory, prefix):
+    return sorted(p.name for p in (directory / "backups").iterdir() if p.name.startswith(prefix))
+
+
+def test_unchanged_saves_skip_rewrites_and_backups_chain_deltas(tmp_path, monkeypatch):
+    monkeypatch.setenv("BOT_PERSISTENCE_DIR", str(tmp_path))
+    manager = ProfessionalPersistence(full_backup_every=3)
+    trader, ml = _trader(), _ml()
+    history = {"BTCUSDT": [1.0, 2.0, 3.0]}
+    profile_dir = tmp_path / "user_1"
+
+    def save():
+        assert manager.save_complete_state(trader, ml, {"k": 1}, ["BTCUSDT"], history, profile="user_1")
+        return manager.get_save_metrics(profile="user_1")
+
+    first = save()
+    state = json.loads((profile_dir / "bot_state.json").read_text())
+    assert state["trader_state"]["balance"] == 1000.0
+    assert state["system_metrics"]["last_trade_time"] == "2030-01-02T00:00:00"
+    assert first["last_backup"] == "full" and first["last_bytes_written"] > 0
+
+    signature = (profile_dir / "bot_state.json").stat().st_mtime_ns
+    second = save()
+    assert second["last_dirty_sections"] == []
+    assert second["state_writes_skipped"] == 1
+    assert second["last_backup"] is None
+    assert (profile_dir / "bot_state.json").stat().st_mtime_ns == signature
+
+    trader.balance = 1250.0
+    third = save()
+    assert third["last_dirty_sections"] == ["trader_state"]
+    assert third["last_backup"] == "delta"
+    assert len(_backups(profile_dir, "state_delta_")) == 1
+
+    restored = manager.load_backup_state(profile="user_1")
+    assert restored["trader_state"]["balance"] == 1250.0
+    assert restored["configuration"]["TOP_SYMBOLS"] == ["BTCUSDT"]
+
+    trader.balance = 1500.0
+    save()
+    history["BTCUSDT"].append(4.0)
+    assert save()["last_backup"] == "full"  # every third backup is a snapshot
+    assert len(_backups(profile_dir, "state_backup_")) == 2
+    assert manager.load_backup_state(profile="user_1")["historical_data_summary"]["BTCUSDT"]["latest_price"] == 4.0
+
+    status = manager.get_persistence_status(profile="user_1")
+    assert status["save_metrics"]["saves"] == 5
+    assert status["total_saves"] == 5
+
+
+def test_history_summary_tracks_rolling_window_with_same_ends():
+    manager = ProfessionalPersistence()
+    window = deque([1.0, 5.0, 3.0], maxlen=3)
+    assert manager._summarize_historical_data({"BTCUSDT": window})["BTCUSDT"]["price_range"] == (1.0, 5.0)
+
+    # Same length, first and last value; only the middle moved.
+    window[1] = 9.0
+    summary = manager._summarize_historical_data({"BTCUSDT": window})["BTCUSDT"]
+    assert summary["price_range"] == (1.0, 9.0)
+    assert manager._summarize_historical_data({"BTCUSDT": window})["BTCUSDT"] is summary
+
+
+def test_external_edit_of_state_file_forces_rewrite(tmp_path, monkeypatch):
+    monkeypatch.setenv("BOT_PERSISTENCE_DIR", str(tmp_path))
+    manager = ProfessionalPersistence()
+    trader, ml = _trader(), _ml()
+    manager.save_complete_state(trader, ml, {}, [], {})
+
+    state_file = tmp_path / "default" / "bot_state.json"
+    state = json.loads(state_file.read_text())
+    state["trader_state"]["trading_enabled"] = False
+    state_file.write_text(json.dumps(state))
+
+    manager.save_complete_state(trader, ml, {}, [], {})
+    assert json.loads(state_file.read_text())["trader_state"]["trading_enabled"] is True
+
+
+def test_critical_state_is_written_per_profile(tmp_path, monkeypatch):
+    monkeypatch.setenv("BOT_PERSISTENCE_DIR", str(tmp_path))
+    manager = ProfessionalPersistence()
+    ml = _ml()
+    for profile, balance in (("user_1", 1000.0), ("user_2", 2500.0)):
+        trader = _trader()
+        trader.balance = balance
+        assert manager.save_complete_state(trader, ml, {}, [], {}, profile=profile)
+
+    for profile, balance in (("user_1", 1000.0), ("user_2", 2500.0)):
+        critical = json.loads((tmp_path / profile / "critical_state.json").read_text())
+        assert critical["balance"] == balance
+    assert sorted(p.parent.name for p in tmp_path.rglob("critical_state.json")) == ["user_1", "user_2"]
@@ -0,0 +1,127 @@
+import copy
+import gc
+import importlib
+import pickle
+import sys
+
+import pytest
+
+from app.services.price_triggers import (
+    PriceTriggerBook,
+    TrackedPositions,
+    position_trigger_levels,
+    track_positions,
+)
+
+
+class _Owner:
+    pass
+
+
+def _position(stop, target, **advanced):
+    position = {"quantity": 1.0, "avg_price": 100.0, "stop_loss": stop, "take_profit": target}
+    if advanced:
+        position["advanced_stops"] = advanced
+    return position
+
+
+def test_trigger_levels_use_highest_active_stop():
+    position = _position(90, 120, fixed=92, atr=95, trailing=0, time=0, volatility=91)
+    assert position_trigger_levels(position) == (95.0, 120.0)
+    assert position_trigger_levels({"quantity": 1}) == (0.0, 0.0)
+
+
+def test_fan_out_only_returns_crossed_positions_across_owners():
+    book = PriceTriggerBook()
+    alice, bob = _Owner(), _Owner()
+    book.update(alice, "BTCUSDT", _position(90, 120))
+    book.update(bob, "BTCUSDT", _position(95, 130))
+    book.update(bob, "ETHUSDT", _position(10, 20))
+
+    assert book.fan_out({"BTCUSDT": 100, "ETHUSDT": 15}) == {}
+    assert book.fan_out({"BTCUSDT": 94}) == {bob: ["BTCUSDT"]}
+    assert book.fan_out({"BTCUSDT": 89}) == {alice: ["BTCUSDT"], bob: ["BTCUSDT"]}
+    assert book.fan_out({"BTCUSDT": 125, "ETHUSDT": 25}) == {
+        alice: ["BTCUSDT"],
+        bob: ["ETHUSDT"],
+    }
+
+    # Moving a stop (e.g. a trailing update) re-indexes the position.
+    book.update(alice, "BTCUSDT", _position(99, 120))
+    assert book.fan_out({"BTCUSDT": 98}) == {alice: ["BTCUSDT"]}
+
+    book.update(alice, "BTCUSDT", None)
+    book.remove_owner(bob)
+    assert book.fan_out({"BTCUSDT": 1, "ETHUSDT": 1000}) == {}
+    assert book.snapshot()["tracked"] == 0
+
+
+def test_tracked_positions_keep_book_in_sync_and_copy_as_plain_dicts():
+    book = PriceTriggerBook()
+    owner = _Owner()
+    positions = track_positions(owner, {"BTCUSDT": _position(90, 120)}, book)
+    assert isinstance(positions, TrackedPositions)
+    assert book.fan_out({"BTCUSDT": 80}) == {owner: ["BTCUSDT"]}
+
+    positions["ETHUSDT"] = _position(10, 20)
+    assert book.fan_out({"ETHUSDT": 21}) == {owner: ["ETHUSDT"]}
+    positions.pop("ETHUSDT")
+    del positions["BTCUSDT"]
+    assert book.fan_out({"BTCUSDT": 80, "ETHUSDT": 21}) == {}
+
+    positions["SOLUSDT"] = _position(5, 50)
+    for clone in (positions.copy(), copy.deepcopy(positions), pickle.loads(pickle.dumps(positions))):
+        assert type(clone) is dict
+        assert clone == {"SOLUSDT": _position(5, 50)}
+
+    positions.clear()
+    assert book.snapshot()["tracked"] == 0
+
+
+def test_collected_owner_is_dropped():
+    book = PriceTriggerBook()
+    owner = _Owner()
+    book.update(owner, "BTCUSDT", _position(90, 120))
+    del owner
+    gc.collect()
+    assert book.fan_out({"BTCUSDT": 50}) == {}
+    assert book.snapshot()["owners"] == 0
+
+
+@pytest.fixture(scope="module")
+def ai_module():
+    import atexit
+
+    mp = pytest.MonkeyPatch()
+    mp.setattr(atexit, "register", lambda *args, **kwargs: None)
+    module = sys.modules.get("ai_ml_auto_bot_final") or importlib.import_module(
+        "ai_ml_auto_bot_final"
+    )
+    yield module
+    mp.undo()
+
+
+def test_trader_only_visits_crossed_positions(ai_module, monkeypatch):
+    traders = [ai_module.UltimateAIAutoTrader(initial_balance=1000) for _ in range(2)]
+    for index, trader in enumerate(traders):
+        trader.positions = {
+            "BTCUSDT": _position(90 + index * 5, 200),
+            "ETHUSDT": _position(10, 20),
+        }
+
+    executed = []
+
+    def _fake_stop(self, symbol, position, price, stop_type, closed):
+        executed.append((self, symbol, stop_type))
+        del self.positions[symbol]
+        closed.append(f"{symbol} {stop_type}")
+
+    monkeypatch.setattr(ai_module.UltimateAIAutoTrader, "execute_stop_loss", _fake_stop)
+    prices = {"BTCUSDT": 93.0, "ETHUSDT": 15.0}
+
+    assert traders[0].check_advanced_stop_loss(prices) == []
+    assert traders[1].check_advanced_stop_loss(prices) == ["BTCUSDT TRADITIONAL_SL"]
+    assert executed == [(traders[1], "BTCUSDT", "TRADITIONAL_SL")]
+    assert "BTCUSDT" not in traders[1].positions
+    # The closed position left the book, so the same tick is a no-op now.
+    assert traders[1].check_advanced_stop_loss(prices) == []
@@ -0,0 +1,128 @@
+import time
+
+from app.services.realtime import DASHBOARD_ROOM, RealtimeUpdateService, user_room
+
+
+class _SocketIO:
+    def __init__(self):
+        self.sent = []
+
+    def emit(self, event, payload, to=None):
+        self.sent.append((event, to, payload))
+
+    def take(self):
+        sent, self.sent = self.sent, []
+        return sent
+
+
+def _market(count):
+    return {f"SYM{i}USDT": {"price": 100.0 + i, "volume": 10 * i} for i in range(count)}
+
+
+def _service(dashboard):
+    socketio = _SocketIO()
+    service = RealtimeUpdateService(
+        socketio,
+        dashboard,
+        lambda: sorted(dashboard["market_data"]),
+        market_symbols=50,
+        clock=lambda: 1_000.0,
+    )
+    return socketio, service
+
+
+def test_only_changed_sections_are_emitted_as_deltas():
+    dashboard = {
+        "portfolio": {"total_pnl": 5.0, "daily_pnl": 1.0, "positions": []},
+        "performance": {"win_rate": 0.5},
+        "market_data": _market(20),
+    }
+    socketio, service = _service(dashboard)
+
+    # Nobody connected: nothing is serialised onto the wire.
+    assert service.flush()["messages"] == 0
+
+    service.register_client("sid-1")
+    service.flush()
+    first = socketio.take()
+    assert {event for event, _to, _payload in first} == {
+        "portfolio_update",
+        "pnl_update",
+        "performance_update",
+        "market_data_update",
+    }
+    assert all(to == DASHBOARD_ROOM for _event, to, _payload in first)
+
+    counters = service.flush()
+    assert socketio.take() == []
+    assert counters["skipped"] == 4
+
+    dashboard["market_data"]["SYM3USDT"] = {"price": 999.0, "volume": 1}
+    service.flush()
+    [(event, to, payload)] = socketio.take()
+    assert event == "market_data_update" and to == DASHBOARD_ROOM
+    assert payload["delta"] is True
+    assert payload["market_data"] == {"SYM3USDT": {"price": 999.0, "volume": 1}}
+    assert payload["version"] == 2
+
+    # Most of the section changed: a full copy is cheaper to apply.
+    dashboard["market_data"] = _market(3)
+    service.flush()
+    [(_event, _to, payload)] = socketio.take()
+    assert "delta" not in payload and len(payload["market_data"]) == 3
+
+    stats = service.stats()
+    assert stats["totals"]["messages"] == 6
+    assert stats["totals"]["deltas"] == 1
+    assert stats["current"]["bytes"] > 0
+
+
+def test_user_sections_go_to_user_rooms_and_late_joiners_get_full_state():
+    dashboard = {"portfolio": {}, "performance": {}, "market_data": _market(2)}
+    socketio, service = _service(dashboard)
+    balances = {1: 10.0, 2: 20.0}
+    service.set_user_sections(lambda uid: {"user_portfolio": {"balance": balances[uid]}})
+
+    service.register_client("a", 1)
+    service.register_client("b", 2)
+    service.flush()
+    user_events = [(to, payload) for event, to, payload in socketio.take() if event == "user_portfolio_update"]
+    assert sorted(to for to, _payload in user_events) == [user_room(1), user_room(2)]
+
+    balances[2] = 25.0
+    service.flush()
+    assert [(event, to) for event, to, _payload in socketio.take()] == [
+        ("user_portfolio_update", user_room(2))
+    ]
+
+    # A second tab of user 1 catches up on its own sid without re-sending rooms.
+    service.register_client("c", 1)
+    service.flush()
+    sent = socketio.take()
+    assert sent and all(to == "c" for _event, to, _payload in sent)
+    assert ("user_portfolio_update", "c", {"user_portfolio": {"balance": 10.0}, "timestamp": 1_000.0}) in sent
+
+    service.unregister_client("b")
+    balances[2] = 30.0
+    service.flush()
+    assert socketio.take() == []
+    assert service.stats()["clients"] == 2
+
+
+def test_notify_bursts_coalesce_into_one_flush():
+    dashboard = {"portfolio": {}, "performance": {}, "market_data": {}}
+    socketio, service = _service(dashboard)
+    service.interval = 30.0
+    service.min_interval = 0.2
+    flushes = []
+    service.flush = lambda: flushes.append(1) or {}
+    service._clock = time.time
+    service._last_flush = service._clock()
+    service.start()
+    try:
+        for _ in range(20):
+            service.notify()
+        time.sleep(0.5)
+    finally:
+        service.stop()
+    assert len(flushes) == 1
@@ -0,0 +1,64 @@
+import sys
+
+from app.runtime.lazy import (
+    LazyImport,
+    LazyService,
+    get_startup_report,
+    is_resolved,
+    resolve,
+    startup_stage,
+)
+
+
+class _Service:
+    def __init__(self):
+        self.value = 1
+
+    def bump(self):
+        self.value += 1
+        return self.value
+
+
+def test_lazy_service_builds_once_on_first_use():
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return _Service()
+
+    proxy = LazyService("test_lazy_service", factory)
+    assert not is_resolved(proxy)
+    assert calls == []
+
+    assert proxy.bump() == 2
+    proxy.value = 10
+    assert proxy.bump() == 11
+    assert calls == [1]
+    assert is_resolved(proxy)
+    assert isinstance(resolve(proxy), _Service)
+
+    report = get_startup_report()["lazy"]["test_lazy_service"]
+    assert report["resolved"] is True
+    assert report["resolve_seconds"] is not None
+
+
+def test_lazy_import_runs_hook_then_imports_attribute():
+    hooks = []
+    proxy = LazyImport("json", "dumps", before_import=lambda: hooks.append("ran"))
+
+    assert hooks == []
+    assert proxy({"a": 1}) == '{"a": 1}'
+    assert hooks == ["ran"]
+    assert resolve(proxy) is sys.modules["json"].dumps
+
+
+def test_startup_stage_is_recorded_even_on_error():
+    try:
+        with startup_stage("test_failing_stage"):
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+
+    stages = [stage["stage"] for stage in get_startup_report()["stages"]]
+    assert "test_failing_stage" in stages
+    assert is_resolved(object())
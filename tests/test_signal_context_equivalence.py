@@ -0,0 +1,105 @@
+import importlib
+import sys
+
+import numpy as np
+import pytest
+
+from app.services.signal_context import SignalContext, history_version
+
+
+@pytest.fixture(scope="module")
+def ai_module():
+    """Import ai_ml_auto_bot_final without registering shutdown hooks."""
+
+    import atexit
+
+    mp = pytest.MonkeyPatch()
+    mp.setattr(atexit, "register", lambda *args, **kwargs: None)
+    module = sys.modules.get("ai_ml_auto_bot_final") or importlib.import_module(
+        "ai_ml_auto_bot_final"
+    )
+    yield module
+    mp.undo()
+
+
+def _history(count=160, seed=3):
+    rng = np.random.default_rng(seed)
+    return list(100 + np.cumsum(rng.normal(0, 1.5, count)))
+
+
+def _strip_timestamps(value):
+    if isinstance(value, dict):
+        return {k: _strip_timestamps(v) for k, v in value.items() if k != "timestamp"}
+    if isinstance(value, list):
+        return [_strip_timestamps(v) for v in value]
+    return value
+
+
+def test_history_version_tracks_appends():
+    prices = [1.0, 2.0, 3.0]
+    version = history_version(prices)
+    assert history_version(list(prices)) == version
+    prices.append(4.0)
+    assert history_version(prices) != version
+
+
+def test_technical_signals_computed_once_and_match_direct_path(ai_module, monkeypatch):
+    context = SignalContext()
+    monkeypatch.setattr(ai_module, "get_signal_context", lambda: context)
+    traders = [ai_module.UltimateAIAutoTrader(initial_balance=1000) for _ in range(3)]
+    for trader in traders:
+        trader.qfm_engine = None
+
+    history = _history()
+    # Push the tail into oversold territory so RSI signals fire.
+    history[-10:] = [history[-11] * (1 - 0.03 * i) for i in range(1, 11)]
+    market = {"price": history[-1], "volume": 1_000_000.0, "volume_change": 0.1}
+
+    expected = traders[0]._compute_market_technical_signals("BTCUSDT", market, history)
+    assert expected, "fixture should produce at least one signal"
+
+    calls = []
+    original = ai_module.UltimateAIAutoTrader._compute_market_technical_signals
+
+    def _counting(self, *args):
+        calls.append(self)
+        return original(self, *args)
+
+    monkeypatch.setattr(
+        ai_module.UltimateAIAutoTrader, "_compute_market_technical_signals", _counting
+    )
+    results = [t.generate_technical_signals("BTCUSDT", market, history) for t in traders]
+
+    assert len(calls) == 1
+    for result in results:
+        assert _strip_timestamps(result) == _strip_timestamps(expected)
+    # Consumers get independent copies.
+    results[0].append({"signal": "X"})
+    assert len(results[1]) == len(expected)
+
+    # A new candle invalidates the memo.
+    history.append(history[-1] * 1.01)
+    traders[0].generate_technical_signals("BTCUSDT", dict(market, price=history[-1]), history)
+    assert len(calls) == 2
+
+
+def test_crt_signals_shared_across_generators(ai_module):
+    context = SignalContext()
+    first = ai_module.CRTSignalGenerator()
+    second = ai_module.CRTSignalGenerator()
+    reference = ai_module.CRTSignalGenerator()
+    history = _history(220, seed=11)
+    market = {"price": history[-1], "volume": 2_000_000.0, "volume_change": -0.05}
+
+    direct = reference.generate_crt_signals("ETHUSDT", market, history)
+    shared_first = context.crt_signals(first, "ETHUSDT", market, history)
+    shared_second = context.crt_signals(second, "ETHUSDT", market, history)
+
+    assert _strip_timestamps(shared_first) == _strip_timestamps(direct)
+    assert _strip_timestamps(shared_second) == _strip_timestamps(direct)
+    assert context.stats["crt_misses"] == 1
+    assert context.stats["crt_hits"] == 1
+    assert "ETHUSDT" in second.signals_history
+
+    context.prune(["BTCUSDT"])
+    assert context.snapshot()["symbols"] == 0
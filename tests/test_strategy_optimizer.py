@@ -0,0 +1,153 @@
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import numpy as np
+
+from app.strategies.manager import StrategyManager
+from app.strategies.optimizer import (
+    OptimizationJob,
+    ParameterSpace,
+    TPESampler,
+    heuristic_scores,
+    optimize_many,
+    run_optimization,
+    successive_halving,
+)
+
+RANGES = {
+    "stop_loss_pct": (0.01, 0.05),
+    "take_profit_pct": (0.02, 0.1),
+    "confidence_threshold": (0.3, 0.8),
+    "max_position_size": (0.05, 0.2),
+}
+
+
+def _scalar_score(params):
+    risk_reward_ratio = params["take_profit_pct"] / max(params["stop_loss_pct"], 1e-6)
+    balance_score = 1.0 - abs(risk_reward_ratio - 2.0) / 4.0
+    position_score = 1.0 - abs(params["max_position_size"] - 0.1) / 0.2
+    confidence_score = 1.0 - abs(params["confidence_threshold"] - 0.6) / 0.8
+    return (balance_score * 0.5) + (position_score * 0.3) + (confidence_score * 0.2)
+
+
+def test_batch_scores_match_scalar_formula_and_grid_is_exhaustive():
+    space = ParameterSpace.from_ranges(RANGES)
+    grid = space.grid(5)
+    assert grid.shape == (625, 4)
+    scores = heuristic_scores(grid, space.names)
+    for row, score in zip(grid[::37], scores[::37]):
+        assert score == _scalar_score(space.to_dict(row))
+
+    result = run_optimization(OptimizationJob("s", RANGES, method="grid"))
+    assert result.evaluations == 625
+    assert result.score == scores.max()
+
+
+def test_tpe_concentrates_samples_near_the_optimum():
+    target = np.array([0.2, 0.7])
+    sampler = TPESampler(2, n_startup=20, seed=3)
+    for _ in range(8):
+        unit = sampler.ask(10)
+        sampler.tell(unit, -np.sum((unit - target) ** 2, axis=1))
+    late = sampler.ask(20)
+    random_baseline = np.random.default_rng(0).random((20, 2))
+    assert np.mean(np.sum((late - target) ** 2, axis=1)) < 0.2 * np.mean(
+        np.sum((random_baseline - target) ** 2, axis=1)
+    )
+
+
+def test_successive_halving_spends_full_budget_only_on_survivors():
+    budgets = []
+
+    def objective(matrix, names, data, budget):
+        budgets.append((budget, len(matrix)))
+        # Cheap rungs are noisy; the full budget reveals the true ordering.
+        noise = (1.0 - budget) * np.sin(matrix[:, 0] * 1e3) * 0.01
+        return heuristic_scores(matrix, names) + noise
+
+    space = ParameterSpace.from_ranges(RANGES)
+    configs = space.sample(81, np.random.default_rng(1))
+    job = OptimizationJob("s", RANGES, objective=objective, min_budget=1 / 9, eta=3)
+    row, score, evaluations, rungs = successive_halving(job, space, configs)
+
+    assert budgets == [(1 / 9, 81), (1 / 3, 27), (1.0, 9)]
+    assert evaluations == 117 and rungs == 3
+    assert score == heuristic_scores(row[None, :], space.names)[0]
+
+
+def test_bayesian_search_stops_early_once_converged():
+    result = run_optimization(
+        OptimizationJob(
+            "s", RANGES, method="bayesian", max_evaluations=400, batch_size=10,
+            convergence_threshold=0.05, patience=2, seed=7,
+        )
+    )
+    assert result.stopped_early and result.evaluations < 400
+    assert result.score > 0.85
+
+
+def test_optimize_many_runs_jobs_concurrently():
+    jobs = [OptimizationJob(name, RANGES, method="random", seed=i) for i, name in enumerate("ab")]
+    results = optimize_many(jobs, max_workers=2)
+    assert set(results) == {"a", "b"}
+    serial = optimize_many(jobs, max_workers=1)
+    for key in "ab":
+        assert results[key]["params"] == serial[key]["params"]
+        assert results[key]["score"] == serial[key]["score"]
+
+
+def test_optimize_many_never_runs_the_main_scripts_atexit_in_a_worker(tmp_path):
+    # Like ai_ml_auto_bot_final.py: state is saved by a module-level atexit hook.
+    marker = tmp_path / "atexit.log"
+    script = tmp_path / "bot_main.py"
+    script.write_text(
+        textwrap.dedent(
+            f"""
+            import atexit
+            import os
+
+            from app.strategies.optimizer import OptimizationJob, optimize_many
+
+            def save():
+                with open({str(marker)!r}, "a") as handle:
+                    handle.write(f"{{os.getpid()}}\\n")
+
+            atexit.register(save)
+
+            if __name__ == "__main__":
+                ranges = {{"stop_loss_pct": (0.01, 0.05), "take_profit_pct": (0.02, 0.1)}}
+                jobs = [OptimizationJob(k, ranges, method="random", seed=i) for i, k in enumerate("abcd")]
+                results = optimize_many(jobs, max_workers=4)
+                assert all("error" not in r for r in results.values()), results
+                print(os.getpid())
+            """
+        )
+    )
+    repo_root = Path(__file__).resolve().parents[1]
+    env = dict(os.environ, PYTHONPATH=str(repo_root))
+    done = subprocess.run(
+        [sys.executable, str(script)], capture_output=True, text=True, env=env, timeout=120
+    )
+    assert done.returncode == 0, done.stderr
+    assert marker.read_text().split() == [done.stdout.strip()]
+
+
+def test_manager_optimizes_strategies_and_reports_missing_data():
+    manager = StrategyManager()
+    names = list(manager.strategies)[:2]
+    manager.strategies[names[0]].trade_history = [{"pnl": 1.0}] * 10
+    manager.continuous_improvement["automated_optimization"]["max_workers"] = 1
+
+    results = manager.optimize_strategies(names)
+
+    assert results[names[1]] == {"error": "Insufficient performance data for optimization"}
+    optimized = results[names[0]]
+    assert optimized["method"] == "bayesian"
+    assert set(optimized["optimized_params"]) == set(RANGES)
+    assert manager.strategies[names[0]].parameters["stop_loss_pct"] == optimized[
+        "optimized_params"
+    ]["stop_loss_pct"]
+    assert optimized["expected_improvement"]["optimized_score"] > 0.8
@@ -0,0 +1,230 @@
+import threading
+import types
+from types import SimpleNamespace
+
+from app.services.order_tracking import (
+    BinanceUserDataStream,
+    LocalUserDataStream,
+    OrderStateTracker,
+)
+
+
+def _report(order_id, status, filled, event_time, price="110.0"):
+    return {
+        "e": "executionReport",
+        "E": event_time,
+        "s": "BTCUSDT",
+        "c": f"tp_{order_id}",
+        "S": "SELL",
+        "i": order_id,
+        "X": status,
+        "p": price,
+        "q": "1.0",
+        "z": str(filled),
+    }
+
+
+def test_execution_reports_update_tracked_orders_in_order():
+    updates = []
+    clock = SimpleNamespace(now=100.0)
+    tracker = OrderStateTracker(on_update=updates.append, clock=lambda: clock.now)
+    tracker.track("BTCUSDT", {"orderId": 1, "clientOrderId": "tp_1", "price": "110.0", "origQty": "1.0"})
+
+    tracker.apply_event(_report(1, "PARTIALLY_FILLED", 0.4, 2_000))
+    assert tracker.apply_event(_report(1, "NEW", 0.0, 1_000)) is None  # stale
+    assert tracker.apply_event(_report(99, "FILLED", 1.0, 3_000)) is None  # not ours
+    order = tracker.get(1)
+    assert (order.status, order.remaining) == ("PARTIALLY_FILLED", 0.6)
+
+    tracker.apply_event({"stream": "user", "data": _report(1, "FILLED", 1.0, 4_000)})
+    assert order.is_terminal and order.remaining == 0
+    assert len(updates) == 2 and all(update is order for update in updates)
+    assert tracker.stats["ignored"] == 2
+
+    # Reconciliation: orders missing from the snapshot left the book, but an
+    # order placed after the snapshot was requested is left alone.
+    tracker.track("ETHUSDT", {"orderId": 2, "price": "10", "origQty": "3"})
+    clock.now = 200.0
+    tracker.track("ETHUSDT", {"orderId": 3, "price": "10", "origQty": "3"})
+    changed = tracker.reconcile([], as_of=150.0)
+    assert [o.order_id for o in changed] == [2]
+    assert tracker.get(2).status == "CLOSED" and tracker.get(3).status == "NEW"
+
+
+class _Exchange:
+    def __init__(self):
+        self.calls = []
+        self.next_id = 10
+
+    def is_ready(self):
+        return True
+
+    def get_order(self, *_args, **_kwargs):
+        raise AssertionError("take-profit tracking must not poll get_order")
+
+    def get_open_orders(self, symbol=None):
+        self.calls.append(("get_open_orders", symbol))
+        return [{"orderId": 10, "clientOrderId": "tp_10", "status": "NEW", "price": "105.0", "executedQty": "0"}]
+
+    def get_order_book(self, symbol, limit=5):
+        self.calls.append(("get_order_book", symbol))
+        return {"asks": [["120.0", "1"]]}
+
+    def normalize_price(self, _symbol, price):
+        return round(price, 2)
+
+    def cancel_order(self, symbol, order_id=None, client_order_id=None):
+        self.calls.append(("cancel_order", order_id))
+        return {"orderId": order_id}
+
+    def place_limit_order(self, symbol, side, quantity, price=None, time_in_force="GTC"):
+        self.next_id += 1
+        self.calls.append(("place_limit_order", quantity, price))
+        return {"orderId": self.next_id, "clientOrderId": f"tp_{self.next_id}", "price": str(price), "origQty": str(quantity)}
+
+
+def _trader(bot):
+    trader = SimpleNamespace(
+        real_trading_enabled=True,
+        real_trader=_Exchange(),
+        auto_take_profit_state={},
+        user_data_stream=LocalUserDataStream(),
+        _user_data_stream_attempted_at=0.0,
+        _take_profit_reconciled_at=0.0,
+        _take_profit_lock=threading.RLock(),
+    )
+    cls = bot.UltimateAIAutoTrader
+    for name in (
+        "_ensure_user_data_stream",
+        "_on_take_profit_order_update",
+        "_reconcile_auto_take_profit_orders",
+        "_reprice_auto_take_profit",
+        "update_auto_take_profit_orders",
+    ):
+        setattr(trader, name, types.MethodType(getattr(cls, name), trader))
+    trader.order_tracker = OrderStateTracker(on_update=trader._on_take_profit_order_update)
+    return trader
+
+
+def _import_bot():
+    import atexit
+
+    original_register = atexit.register
+    atexit.register = lambda *_args, **_kwargs: None
+    try:
+        import ai_ml_auto_bot_final as bot
+    finally:
+        atexit.register = original_register
+    return bot
+
+
+def test_restarting_the_binance_stream_stops_the_previous_manager():
+    managers = []
+
+    class FakeManager:
+        def __init__(self):
+            self.callback = None
+            self.stopped = False
+            managers.append(self)
+
+        def start(self):
+            pass
+
+        def start_user_socket(self, callback):
+            self.callback = callback
+
+        def stop(self):
+            self.stopped = True
+
+    received = []
+    stream = BinanceUserDataStream("k", "s", manager_factory=FakeManager)
+    assert stream.start(received.append)
+    managers[0].callback({"e": "error", "m": "socket closed"})
+    assert not stream.connected
+
+    assert stream.start(received.append)  # what _ensure_user_data_stream does
+    assert [m.stopped for m in managers] == [True, False]
+    managers[1].callback(_report(1, "FILLED", 1.0, 1_000))
+    assert len(received) == 1 and stream.connected
+
+    stream.stop()
+    assert managers[1].stopped
+
+
+def test_take_profit_fills_and_reprices_are_event_driven():
+    bot = _import_bot()
+    trader = _trader(bot)
+    exchange = trader.real_trader
+    trader.auto_take_profit_state["BTCUSDT"] = {
+        "order_id": 10,
+        "client_order_id": "tp_10",
+        "target_price": 105.0,
+        "entry_price": 100.0,
+        "quantity": 1.0,
+        "last_checked": None,
+        "percent": 0.05,
+    }
+    trader.order_tracker.track(
+        "BTCUSDT", {"orderId": 10, "clientOrderId": "tp_10", "price": "105.0", "origQty": "1.0"}
+    )
+
+    # Price near the order: one batched reconciliation, no per-symbol REST.
+    trader.update_auto_take_profit_orders({"BTCUSDT": {"price": 100.0}})
+    trader.update_auto_take_profit_orders({"BTCUSDT": {"price": 100.5}})
+    assert exchange.calls == [("get_open_orders", None)]
+
+    # A partial fill arrives on the stream and shrinks the tracked quantity.
+    stream = trader.user_data_stream
+    stream.push(_report(10, "PARTIALLY_FILLED", 0.25, 1_000, price="105.0"))
+    assert trader.auto_take_profit_state["BTCUSDT"]["quantity"] == 0.75
+
+    # The market runs through the reprice threshold: book checked, order replaced.
+    trader.update_auto_take_profit_orders({"BTCUSDT": {"price": 119.0}})
+    assert exchange.calls[1:] == [
+        ("get_order_book", "BTCUSDT"),
+        ("cancel_order", 10),
+        ("place_limit_order", 0.75, 120.06),
+    ]
+    state = trader.auto_take_profit_state["BTCUSDT"]
+    assert state["order_id"] == 11 and state["target_price"] == 120.06
+
+    # The replacement fills: the state is dropped straight from the event.
+    stream.push(_report(11, "FILLED", 0.75, 2_000, price="120.06"))
+    assert trader.auto_take_profit_state == {}
+    assert trader.order_tracker.open_orders() == []
+
+
+def test_cancel_report_during_reprice_keeps_the_replacement():
+    bot = _import_bot()
+    trader = _trader(bot)
+    exchange = trader.real_trader
+    stream = trader.user_data_stream
+    trader._ensure_user_data_stream()
+    trader.auto_take_profit_state["BTCUSDT"] = {
+        "order_id": 10,
+        "client_order_id": "tp_10",
+        "target_price": 105.0,
+        "entry_price": 100.0,
+        "quantity": 1.0,
+        "last_checked": None,
+        "percent": 0.05,
+    }
+    trader.order_tracker.track(
+        "BTCUSDT", {"orderId": 10, "clientOrderId": "tp_10", "price": "105.0", "origQty": "1.0"}
+    )
+    trader._take_profit_reconciled_at = float("inf")
+
+    # The exchange reports the cancel on the stream before cancel_order returns.
+    cancel = exchange.cancel_order
+
+    def cancel_and_report(symbol, order_id=None, client_order_id=None):
+        result = cancel(symbol, order_id=order_id, client_order_id=client_order_id)
+        stream.push(_report(order_id, "CANCELED", 0.0, 1_000, price="105.0"))
+        return result
+
+    exchange.cancel_order = cancel_and_report
+    trader.update_auto_take_profit_orders({"BTCUSDT": {"price": 119.0}})
+
+    state = trader.auto_take_profit_state["BTCUSDT"]
+    assert state["order_id"] == 11 and "repricing" not in state
+    assert [o.order_id for o in trader.order_tracker.open_orders()] == [11]
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+
+from app.extensions import db, init_extensions
+from app.models import User, UserTrade
+from app.routes.metrics import metrics_bp
+from app.services.trade_history import ComprehensiveTradeHistory
+from app.services.trade_pages import TradeKey, merge_pages, trade_timestamp
+
+BASE = datetime(2030, 1, 1, 12, 0, 0)
+
+
+def _journal_trades(count):
+    trades = []
+    for i in range(count):
+        trades.append(
+            {
+                "trade_id": i,
+                # Mixed timestamp formats and a few duplicate instants.
+                "timestamp": (BASE - timedelta(minutes=i // 2)).isoformat()
+                if i % 3
+                else str(int((BASE - timedelta(minutes=i // 2)).timestamp())),
+                "symbol": "BTCUSDT" if i % 2 else "ETHUSDT",
+                "execution_mode": "real" if i % 4 == 0 else "paper",
+                "price": 100.0 + i,
+            }
+        )
+    return trades
+
+
+def _walk(index, filters, per_page):
+    seen, after = [], None
+    while True:
+        page, last_key, has_more = merge_pages(
+            [index.stream(filters, after=after)], limit=per_page
+        )
+        seen.extend(trade["trade_id"] for trade in page)
+        if not has_more:
+            return seen
+        after = TradeKey.decode(last_key.encode())
+
+
+def test_keyset_walk_matches_full_sort(tmp_path):
+    history = ComprehensiveTradeHistory(str(tmp_path))
+    history.save_trades(_journal_trades(57))
+    index = history.trade_index()
+    assert history.trade_index() is index
+
+    for filters in ({}, {"symbol": "BTCUSDT"}, {"execution_mode": "real"}):
+        expected = [trade["trade_id"] for trade in history.get_trade_history(filters)]
+        assert sorted(_walk(index, filters, 7)) == sorted(expected)
+        assert _walk(index, filters, 7) == _walk(index, filters, 100)
+        assert index.count(filters) == len(expected)
+
+    history.save_trades(_journal_trades(3))
+    assert history.trade_index() is not index
+    assert len(history.trade_index()) == 3
+
+
+class TestConfig:
+    TESTING = True
+    SECRET_KEY = "test-key"
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+
+@pytest.fixture()
+def client(tmp_path):
+    app = Flask(__name__)
+    app.config.from_object(TestConfig)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'trades.db'}"
+    init_extensions(app)
+    app.register_blueprint(metrics_bp)
+
+    history = ComprehensiveTradeHistory(str(tmp_path / "trade_data"))
+    history.save_trades(_journal_trades(30))
+
+    class _Trader:
+        trade_history = history
+
+    app.extensions["ai_bot_context"] = {"ultimate_trader": _Trader()}
+    with app.app_context():
+        db.create_all()
+        admin = User(username="admin", email="admin@test", is_admin=True)  # type: ignore
+        admin.set_password("pass")
+        db.session.add(admin)
+        db.session.commit()
+        for i in range(15):
+            db.session.add(
+                UserTrade(
+                    user_id=admin.id,
+                    symbol="BTCUSDT",
+                    side="SELL",
+                    quantity=1.0,
+                    entry_price=200.0 + i,
+                    timestamp=BASE - timedelta(minutes=i, seconds=30),
+                )
+            )
+        db.session.commit()
+        test_client = app.test_client()
+        with test_client.session_transaction() as sess:
+            sess["_user_id"] = str(admin.id)
+            sess["_fresh"] = True
+            sess["user_id"] = admin.id
+        yield test_client
+        db.session.remove()
+
+
+def _collect(client, query):
+    rows, cursor = [], None
+    while True:
+        url = f"/api/trades?{query}" + (f"&cursor={cursor}" if cursor else "")
+        payload = json.loads(client.get(url).data)
+        rows.extend(payload["trades"])
+        cursor = payload["next_cursor"]
+        if not cursor:
+            return rows, payload
+
+
+def test_merged_cursor_pages_cover_both_sources_in_order(client):
+    rows, payload = _collect(client, "merge_db=1&per_page=8")
+    assert payload["total_trades"] == 45
+    assert len(rows) == 45
+    assert sum(1 for row in rows if row.get("source") == "db") == 15
+    stamps = [trade_timestamp(row["timestamp"]) for row in rows]
+    assert stamps == sorted(stamps, reverse=True)
+
+    # Page numbers still work and agree with the cursor walk.
+    second = json.loads(client.get("/api/trades?merge_db=1&per_page=8&page=2").data)
+    assert second["trades"] == rows[8:16]
+
+
+def test_unchanged_page_returns_304(client):
+    first = client.get("/api/trades?symbol=BTCUSDT&per_page=5")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    again = client.get("/api/trades?symbol=BTCUSDT&per_page=5", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    other = client.get("/api/trades?symbol=ETHUSDT&per_page=5", headers={"If-None-Match": etag})
+    assert other.status_code == 200
+
+    assert client.get("/api/trades?cursor=not-a-cursor").status_code == 400
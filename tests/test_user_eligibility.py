@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from flask import Flask
+from sqlalchemy import event
+
+from app.extensions import db, init_extensions
+from app.models import SubscriptionPlan, User, UserSubscription
+from app.services.binance import BinanceCredentialStore
+from app.services.user_eligibility import (
+    AutoTradingEligibilityIndex,
+    install_model_listeners,
+)
+
+
+class TestConfig:
+    TESTING = True
+    SECRET_KEY = "test-key"
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+
+def _user(name, *, is_admin=False, is_active=True):
+    user = User()
+    user.username = name
+    user.email = f"{name}@test"
+    user.is_admin = is_admin
+    user.is_active = is_active
+    user.set_password("pass")
+    return user
+
+
+@pytest.fixture()
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config.from_object(TestConfig)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'eligibility.db'}"
+    init_extensions(app)
+    with app.app_context():
+        db.create_all()
+        plan = SubscriptionPlan(
+            name="Pro Monthly",
+            code="pro-monthly",
+            plan_type="monthly",
+            price_usd=Decimal("149"),
+            duration_days=30,
+        )
+        users = [
+            _user("admin", is_admin=True),
+            _user("alice"),
+            _user("bob"),
+            _user("carol"),
+            _user("dave", is_active=False),
+        ]
+        db.session.add_all([plan, *users])
+        db.session.commit()
+        for user in users:
+            if user.username != "carol":
+                db.session.add(UserSubscription(user_id=user.id, plan_id=plan.id, status="active"))
+        db.session.commit()
+        yield app
+        db.session.remove()
+
+
+def _count_queries():
+    counter = {"n": 0}
+
+    def _before(*_args, **_kwargs):
+        counter["n"] += 1
+
+    event.listen(db.engine, "before_cursor_execute", _before)
+    return counter
+
+
+def _ids(*names):
+    return sorted(User.query.filter_by(username=name).one().id for name in names)
+
+
+def test_single_query_then_cached_until_a_write(app):
+    index = AutoTradingEligibilityIndex()
+    install_model_listeners(index)
+    expected = _ids("alice", "bob")
+    counter = _count_queries()
+
+    assert index.eligible_user_ids() == expected
+    assert counter["n"] == 1
+    for _ in range(5):
+        index.eligible_user_ids()
+    assert counter["n"] == 1
+    assert index.stats["hits"] == 5
+
+    carol = User.query.filter_by(username="carol").one()
+    plan = SubscriptionPlan.query.one()
+    db.session.add(UserSubscription(user_id=carol.id, plan_id=plan.id, status="trialing"))
+    db.session.commit()
+    assert index.eligible_user_ids() == _ids("alice", "bob", "carol")
+
+    UserSubscription.query.filter_by(user_id=carol.id).delete()
+    db.session.commit()
+    assert index.eligible_user_ids() == _ids("alice", "bob")
+
+    bob = User.query.filter_by(username="bob").one()
+    bob.is_active = False
+    db.session.commit()
+    assert index.eligible_user_ids() == _ids("alice")
+
+
+def test_cached_set_expires_at_next_subscription_boundary(app):
+    now = {"value": datetime(2030, 1, 1)}
+    index = AutoTradingEligibilityIndex(utcnow=lambda: now["value"])
+    subscription = UserSubscription.query.join(User).filter(User.username == "bob").one()
+    subscription.auto_renew = False
+    subscription.current_period_end = datetime(2030, 1, 2)
+    db.session.commit()
+
+    assert index.eligible_user_ids() == _ids("alice", "bob")
+    assert index.snapshot()["valid_until"] == "2030-01-02T00:00:00"
+    now["value"] = datetime(2030, 1, 2) + timedelta(seconds=1)
+    assert index.eligible_user_ids() == _ids("alice")
+
+
+def test_resolve_intersects_with_memoised_credentials(app, tmp_path):
+    store = BinanceCredentialStore(str(tmp_path / "creds"))
+    index = AutoTradingEligibilityIndex()
+    alice, bob = _ids("alice", "bob")
+
+    assert index.resolve_auto_user_ids(store) == [alice, bob]
+    store.save_credentials("key", "secret", user_id=bob)
+    assert index.resolve_auto_user_ids(store) == [bob]
+
+    # Unchanged file: served from the memo without re-reading it.
+    store._load_from_disk = lambda: pytest.fail("credential file re-read")
+    assert store.list_user_ids() == [bob]
+    del store._load_from_disk
+
+    store.save_credentials("key", "secret", user_id=alice)
+    assert index.resolve_auto_user_ids(store) == [alice, bob]
+    store.clear_credentials(user_id=alice)
+    assert index.resolve_auto_user_ids(store) == [bob]